@@ -45,6 +45,7 @@ def initialize_extensions(app: DifyApp):
         ext_commands,
         ext_compress,
         ext_database,
+        ext_gevent_monitor,
         ext_hosting_provider,
         ext_import_modules,
         ext_logging,
@@ -63,6 +64,7 @@ def initialize_extensions(app: DifyApp):
     extensions = [
         ext_timezone,
         ext_logging,
+        ext_gevent_monitor,
         ext_warnings,
         ext_import_modules,
         ext_set_secretkey,
@@ -290,6 +290,7 @@ def migrate_knowledge_vector_database():
         VectorType.UPSTASH,
         VectorType.COUCHBASE,
         VectorType.OCEANBASE,
+        VectorType.LOCAL,
     }
     page = 1
     while True:
@@ -65,6 +65,24 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of requests per app per day",
         default=5000,
     )
+    APP_QUEUE_SQLALCHEMY_MODEL_CHECK_ENABLED: bool = Field(
+        description="Check every event published to the app queue for SQLAlchemy model instances, for debugging",
+        default=False,
+    )
+    APP_QUEUE_CHANNEL: Literal["memory", "redis_stream"] = Field(
+        description="Channel carrying app queue events from the generation thread to the listener,"
+        " 'memory' for an in-process queue, 'redis_stream' for a redis stream per task readable from any api node;"
+        " resuming an interrupted SSE response from the stream is not supported yet",
+        default="memory",
+    )
+    APP_QUEUE_REDIS_STREAM_MAX_LENGTH: PositiveInt = Field(
+        description="Approximate maximum number of events kept in the redis stream of a task",
+        default=10000,
+    )
+    APP_QUEUE_REDIS_STREAM_EXPIRE: PositiveInt = Field(
+        description="Time in seconds the redis stream of a task is kept after its last event",
+        default=600,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -97,6 +115,34 @@ class CodeExecutionSandboxConfig(BaseSettings):
         default=10.0,
     )
 
+    CODE_EXECUTION_POOL_MAX_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of concurrent connections to the code execution service",
+        default=100,
+    )
+
+    CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = Field(
+        description="Maximum number of idle keep-alive connections to the code execution service",
+        default=20,
+    )
+
+    CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY: PositiveFloat = Field(
+        description="Time in seconds after which idle keep-alive connections to the code execution service are closed",
+        default=5.0,
+    )
+
+    CODE_EXECUTION_BATCH_WINDOW_MS: NonNegativeInt = Field(
+        description="Maximum time in milliseconds an execution of a code node in a parallel iteration waits for"
+        " an execution of the same code in flight before being sent, executions waiting together are sent to"
+        " the code execution service in one batch and share its timeout. An execution is sent right away when no"
+        " execution of the same code is in flight, 0 to disable batching",
+        default=0,
+    )
+
+    CODE_EXECUTION_BATCH_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of input sets executed in one batched code execution request",
+        default=50,
+    )
+
     CODE_MAX_NUMBER: PositiveInt = Field(
         description="Maximum allowed numeric value in code execution",
         default=9223372036854775807,
@@ -137,6 +183,27 @@ class CodeExecutionSandboxConfig(BaseSettings):
         default=1000,
     )
 
+    JINJA2_IN_PROCESS_RENDER_ENABLED: bool = Field(
+        description="Render Jinja2 templates in process with a sandboxed environment,"
+        " falling back to the code execution service only when needed",
+        default=False,
+    )
+
+    JINJA2_IN_PROCESS_TEMPLATE_CACHE_SIZE: PositiveInt = Field(
+        description="Maximum number of compiled Jinja2 templates cached for in process rendering",
+        default=1000,
+    )
+
+    JINJA2_IN_PROCESS_MAX_OUTPUT_LENGTH: PositiveInt = Field(
+        description="Maximum output length of in process Jinja2 rendering before falling back to the code sandbox",
+        default=1000000,
+    )
+
+    JINJA2_IN_PROCESS_RENDER_TIMEOUT: PositiveFloat = Field(
+        description="Maximum time in seconds of in process Jinja2 rendering before falling back to the code sandbox",
+        default=1.0,
+    )
+
 
 class PluginConfig(BaseSettings):
     """
@@ -153,6 +220,29 @@ class PluginConfig(BaseSettings):
         default="plugin-api-key",
     )
 
+    PLUGIN_DAEMON_POOL_MAXSIZE: PositiveInt = Field(
+        description="Maximum number of keep-alive connections to the plugin daemon kept in the connection pool",
+        default=100,
+    )
+
+    PLUGIN_MODEL_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds plugin model provider catalogs and model schemas are cached across requests,"
+        " 0 to disable",
+        default=600,
+    )
+
+    PLUGIN_MODEL_CACHE_SIZE: PositiveInt = Field(
+        description="Maximum number of plugin model provider catalogs and model schemas cached per process",
+        default=4096,
+    )
+
+    PLUGIN_MODEL_CACHE_GENERATION_TTL: NonNegativeInt = Field(
+        description="Time in seconds the plugin generation of a tenant is kept per process before it is read from"
+        " redis again, plugin changes made in other processes are seen after at most this time, 0 to read it"
+        " on every lookup",
+        default=5,
+    )
+
     INNER_API_KEY_FOR_PLUGIN: str = Field(description="Inner api key for plugin", default="inner-api-key")
 
     PLUGIN_REMOTE_INSTALL_HOST: str = Field(
@@ -440,6 +530,17 @@ class LoggingConfig(BaseSettings):
     )
 
 
+class MetricsConfig(BaseSettings):
+    """
+    Configuration for prometheus metrics of the hot paths
+    """
+
+    METRICS_ENABLED: bool = Field(
+        description="Collect prometheus metrics of the hot paths and expose them on /metrics",
+        default=False,
+    )
+
+
 class ModelLoadBalanceConfig(BaseSettings):
     """
     Configuration for model load balancing
@@ -451,6 +552,79 @@ class ModelLoadBalanceConfig(BaseSettings):
     )
 
 
+class TokenCountConfig(BaseSettings):
+    """
+    Configuration for counting tokens of prompt messages
+    """
+
+    LLM_TOKEN_COUNT_MODE: Literal["exact", "local", "estimate"] = Field(
+        description="How tokens of prompt messages are counted:"
+        " 'exact' always asks the model plugin through the plugin daemon,"
+        " 'local' uses a local tokenizer for models it is known to match and asks the plugin daemon otherwise,"
+        " 'estimate' never asks the plugin daemon and estimates unknown models with the GPT-2 tokenizer",
+        default="exact",
+    )
+
+    LLM_TOKEN_COUNT_CACHE_SIZE: PositiveInt = Field(
+        description="Maximum number of token counts of prompt messages memoized in each process",
+        default=10000,
+    )
+
+
+class LLMResponseCacheConfig(BaseSettings):
+    """
+    Configuration for caching responses of deterministic large language model invocations
+    """
+
+    LLM_RESPONSE_CACHE_ENABLED: bool = Field(
+        description="Allow apps and workflow nodes opting in to reuse responses of identical invocations"
+        " with temperature 0",
+        default=False,
+    )
+
+    LLM_RESPONSE_CACHE_STORAGE: Literal["redis", "local"] = Field(
+        description="Where cached responses are stored, 'redis' shares them between processes,"
+        " 'local' keeps them in the memory of each process",
+        default="redis",
+    )
+
+    LLM_RESPONSE_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds cached responses are reused",
+        default=86400,
+    )
+
+    LLM_RESPONSE_CACHE_LOCAL_SIZE: PositiveInt = Field(
+        description="Maximum number of responses cached in each process when the storage is 'local'",
+        default=1000,
+    )
+
+    LLM_RESPONSE_CACHE_MAX_ENTRY_SIZE: PositiveInt = Field(
+        description="Maximum size in bytes of a cached response, larger responses are not cached",
+        default=1024 * 1024,
+    )
+
+
+class SemanticCacheConfig(BaseSettings):
+    """
+    Configuration for the semantic cache of answers of chat apps
+    """
+
+    SEMANTIC_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a past answer is reused for semantically similar queries",
+        default=604800,
+    )
+
+    SEMANTIC_CACHE_TOP_K: PositiveInt = Field(
+        description="Number of similar past queries checked for a reusable answer",
+        default=3,
+    )
+
+    SEMANTIC_CACHE_MIN_ANSWER_LENGTH: NonNegativeInt = Field(
+        description="Minimum length in characters of an answer to be reused, shorter answers are not cached",
+        default=20,
+    )
+
+
 class BillingConfig(BaseSettings):
     """
     Configuration for platform billing features
@@ -461,6 +635,24 @@ class BillingConfig(BaseSettings):
         default=False,
     )
 
+    BILLING_INFO_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds the plan and features of a tenant are cached before being refreshed from the billing api,"
+        " 0 to disable the cache",
+        default=60,
+    )
+
+    BILLING_INFO_CACHE_STALE_TTL: NonNegativeInt = Field(
+        description="Seconds an expired plan and features of a tenant are still served while being refreshed"
+        " in the background",
+        default=600,
+    )
+
+    BILLING_PLAN_CACHE_TTL: NonNegativeInt = Field(
+        description="Seconds the plan of a tenant is cached for the rate limit of app generations, 0 to request"
+        " the billing api on every generation",
+        default=10,
+    )
+
 
 class UpdateConfig(BaseSettings):
     """
@@ -565,6 +757,12 @@ class AuthConfig(BaseSettings):
         default=86400,
     )
 
+    API_AUTH_CACHE_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) api tokens, end users and tenant statuses looked up to authenticate"
+        " service api and web app requests are cached, 0 to disable the cache",
+        default=60,
+    )
+
 
 class ModerationConfig(BaseSettings):
     """
@@ -744,6 +942,54 @@ class IndexingConfig(BaseSettings):
         default=50,
     )
 
+    INDEXING_PIPELINE_ENABLED: bool = Field(
+        description="Enable streaming indexing pipeline, overlapping splitting, embedding and writing of segments",
+        default=False,
+    )
+
+    INDEXING_PIPELINE_BATCH_SIZE: PositiveInt = Field(
+        description="Number of segments per batch passed between stages of the streaming indexing pipeline",
+        default=50,
+    )
+
+    INDEXING_PIPELINE_QUEUE_SIZE: PositiveInt = Field(
+        description="Maximum number of batches buffered between stages of the streaming indexing pipeline",
+        default=4,
+    )
+
+
+class CpuOffloadConfig(BaseSettings):
+    """
+    Configuration for offloading CPU-bound work out of the gevent hub
+    """
+
+    CPU_OFFLOAD_ENABLED: bool = Field(
+        description="Run CPU-bound work such as keyword extraction, tokenization and document parsing"
+        " in a process pool when running under gevent",
+        default=False,
+    )
+
+    CPU_OFFLOAD_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of processes in the CPU offload process pool of each worker",
+        default=2,
+    )
+
+    CPU_OFFLOAD_MIN_INPUT_SIZE: NonNegativeInt = Field(
+        description="Minimum input size in characters or bytes for work to be offloaded,"
+        " smaller inputs are processed in place",
+        default=20000,
+    )
+
+    GEVENT_HUB_BLOCKING_MONITOR_ENABLED: bool = Field(
+        description="Log the call sites blocking the gevent hub longer than GEVENT_HUB_BLOCKING_THRESHOLD",
+        default=False,
+    )
+
+    GEVENT_HUB_BLOCKING_THRESHOLD: PositiveFloat = Field(
+        description="Time in seconds the gevent hub may be blocked before the call site is logged",
+        default=0.1,
+    )
+
 
 class MultiModalTransferConfig(BaseSettings):
     MULTIMODAL_SEND_FORMAT: Literal["base64", "url"] = Field(
@@ -751,6 +997,23 @@ class MultiModalTransferConfig(BaseSettings):
         default="base64",
     )
 
+    MULTIMODAL_ENCODED_FILE_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum total size in bytes of base64 encoded files cached in each process"
+        " to be sent again with chat history, 0 to disable",
+        default=64 * 1024 * 1024,
+    )
+
+    MULTIMODAL_ENCODED_FILE_CACHE_MAX_ENTRY_SIZE: PositiveInt = Field(
+        description="Maximum size in bytes of a cached base64 encoded file, larger files are not cached",
+        default=8 * 1024 * 1024,
+    )
+
+    MULTIMODAL_ENCODED_FILE_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a base64 encoded file is reused, bounding how long changes of remote urls"
+        " go unnoticed",
+        default=3600,
+    )
+
 
 class CeleryBeatConfig(BaseSettings):
     CELERY_BEAT_SCHEDULER_TIME: int = Field(
@@ -855,6 +1118,7 @@ class FeatureConfig(
     AuthConfig,  # Changed from OAuthConfig to AuthConfig
     BillingConfig,
     CodeExecutionSandboxConfig,
+    CpuOffloadConfig,
     PluginConfig,
     MarketplaceConfig,
     DataSetConfig,
@@ -864,14 +1128,18 @@ class FeatureConfig(
     HttpConfig,
     InnerAPIConfig,
     IndexingConfig,
+    LLMResponseCacheConfig,
+    SemanticCacheConfig,
     LoggingConfig,
     MailConfig,
+    MetricsConfig,
     ModelLoadBalanceConfig,
     ModerationConfig,
     MultiModalTransferConfig,
     PositionConfig,
     RagEtlConfig,
     SecurityConfig,
+    TokenCountConfig,
     ToolConfig,
     UpdateConfig,
     WorkflowConfig,
@@ -23,6 +23,7 @@ from .vdb.chroma_config import ChromaConfig
 from .vdb.couchbase_config import CouchbaseConfig
 from .vdb.elasticsearch_config import ElasticsearchConfig
 from .vdb.lindorm_config import LindormConfig
+from .vdb.local_vector_config import LocalVectorConfig
 from .vdb.milvus_config import MilvusConfig
 from .vdb.myscale_config import MyScaleConfig
 from .vdb.oceanbase_config import OceanBaseVectorConfig
@@ -68,6 +69,39 @@ class StorageConfig(BaseSettings):
         deprecated=True,
     )
 
+    STORAGE_BATCH_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of concurrent requests of batched storage operations"
+        " on storages running them concurrently (s3, opendal and local).",
+        default=8,
+    )
+
+    STORAGE_CACHE_ENABLED: bool = Field(
+        description="Enable the read-through cache of files of remote storages on the local disk."
+        " Not applied to the local storage and the fs scheme of opendal.",
+        default=False,
+    )
+
+    STORAGE_CACHE_PATH: str = Field(
+        description="Directory of the local disk cache of storage files, shared by the processes of a host.",
+        default="storage_cache",
+    )
+
+    STORAGE_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum size in bytes of the local disk cache of storage files,"
+        " the least recently read files are evicted beyond it.",
+        default=1024 * 1024 * 1024,
+    )
+
+    STORAGE_CACHE_MAX_FILE_SIZE: PositiveInt = Field(
+        description="Maximum size in bytes of a file kept in the local disk cache of storage files.",
+        default=20 * 1024 * 1024,
+    )
+
+    STORAGE_CACHE_TTL: PositiveInt = Field(
+        description="Time in seconds a file is served from the local disk cache of storage files.",
+        default=86400,
+    )
+
 
 class VectorStoreConfig(BaseSettings):
     VECTOR_STORE: Optional[str] = Field(
@@ -283,5 +317,6 @@ class MiddlewareConfig(
     OceanBaseVectorConfig,
     BaiduVectorDBConfig,
     OpenGaussConfig,
+    LocalVectorConfig,
 ):
     pass
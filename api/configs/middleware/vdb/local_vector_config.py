@@ -0,0 +1,29 @@
+from pydantic import Field, PositiveInt
+from pydantic_settings import BaseSettings
+
+
+class LocalVectorConfig(BaseSettings):
+    """
+    Configuration settings for the embedded local vector store
+    """
+
+    LOCAL_VECTOR_CACHE_DIR: str = Field(
+        description="Local directory where collections are downloaded from the storage and memory-mapped",
+        default="local_vector_cache",
+    )
+
+    LOCAL_VECTOR_CACHED_COLLECTIONS: PositiveInt = Field(
+        description="Maximum number of collections kept loaded in each process",
+        default=100,
+    )
+
+    LOCAL_VECTOR_IVF_MIN_SIZE: PositiveInt = Field(
+        description="Minimum number of vectors in a collection to search it through an inverted file index"
+        " instead of exhaustively",
+        default=20000,
+    )
+
+    LOCAL_VECTOR_IVF_NPROBE: PositiveInt = Field(
+        description="Number of inverted file lists nearest to the query searched",
+        default=16,
+    )
@@ -15,6 +15,9 @@ tenant_id: ContextVar[str] = ContextVar("tenant_id")
 
 workflow_variable_pool: ContextVar["VariablePool"] = ContextVar("workflow_variable_pool")
 
+# set while a single iteration of a parallel iteration node runs
+in_parallel_iteration: ContextVar[bool] = ContextVar("in_parallel_iteration", default=False)
+
 """
 To avoid race-conditions caused by gunicorn thread recycling, using RecyclableContextVar to replace with
 """
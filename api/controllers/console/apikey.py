@@ -12,6 +12,7 @@ from libs.helper import TimestampField
 from libs.login import login_required
 from models.dataset import Dataset
 from models.model import ApiToken, App
+from services.api_auth_cache import ApiAuthCache
 
 from . import api
 from .wraps import account_initialization_required, setup_required
@@ -127,9 +128,11 @@ class BaseApiKeyResource(Resource):
 
         if key is None:
             flask_restful.abort(404, message="API key not found")
-
-        db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
-        db.session.commit()
+        else:
+            token, token_type = key.token, key.type
+            db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
+            db.session.commit()
+            ApiAuthCache.delete_api_token(token, token_type)
 
         return {"result": "success"}, 204
 
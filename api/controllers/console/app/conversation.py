@@ -4,7 +4,7 @@ import pytz  # pip install pytz
 from flask_login import current_user  # type: ignore
 from flask_restful import Resource, marshal_with, reqparse  # type: ignore
 from flask_restful.inputs import int_range  # type: ignore
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import joinedload
 from werkzeug.exceptions import Forbidden, NotFound
 
@@ -23,6 +23,7 @@ from libs.helper import DatetimeString
 from libs.login import login_required
 from models import Conversation, EndUser, Message, MessageAnnotation
 from models.model import AppMode
+from services.message_preload_service import MessagePreloadService
 
 
 class CompletionConversationApi(Resource):
@@ -48,12 +49,7 @@ class CompletionConversationApi(Resource):
         query = db.select(Conversation).where(Conversation.app_id == app_model.id, Conversation.mode == "completion")
 
         if args["keyword"]:
-            query = query.join(Message, Message.conversation_id == Conversation.id).filter(
-                or_(
-                    Message.query.ilike("%{}%".format(args["keyword"])),
-                    Message.answer.ilike("%{}%".format(args["keyword"])),
-                )
-            )
+            query = query.where(Conversation.id.in_(_search_messages(app_model, args["keyword"])))
 
         account = current_user
         timezone = pytz.timezone(account.timezone)
@@ -92,6 +88,7 @@ class CompletionConversationApi(Resource):
         query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        MessagePreloadService.preload_conversations(conversations.items)
 
         return conversations
 
@@ -174,22 +171,13 @@ class ChatConversationApi(Resource):
 
         if args["keyword"]:
             keyword_filter = "%{}%".format(args["keyword"])
-            query = (
-                query.join(
-                    Message,
-                    Message.conversation_id == Conversation.id,
-                )
-                .join(subquery, subquery.c.conversation_id == Conversation.id)
-                .filter(
-                    or_(
-                        Message.query.ilike(keyword_filter),
-                        Message.answer.ilike(keyword_filter),
-                        Conversation.name.ilike(keyword_filter),
-                        Conversation.introduction.ilike(keyword_filter),
-                        subquery.c.from_end_user_session_id.ilike(keyword_filter),
-                    ),
-                )
-                .group_by(Conversation.id)
+            query = query.join(subquery, subquery.c.conversation_id == Conversation.id).filter(
+                or_(
+                    Conversation.id.in_(_search_messages(app_model, args["keyword"])),
+                    Conversation.name.ilike(keyword_filter),
+                    Conversation.introduction.ilike(keyword_filter),
+                    subquery.c.from_end_user_session_id.ilike(keyword_filter),
+                ),
             )
 
         account = current_user
@@ -257,6 +245,7 @@ class ChatConversationApi(Resource):
                 query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        MessagePreloadService.preload_conversations(conversations.items)
 
         return conversations
 
@@ -320,3 +309,16 @@ def _get_conversation(app_model, conversation_id):
         db.session.commit()
 
     return conversation
+
+
+def _search_messages(app_model, keyword: str):
+    """
+    Select the conversations with a message whose query or answer contains the keyword.
+    The match is served by the trigram indexes of messages, also for CJK text,
+    keywords shorter than 3 characters are matched by scanning the messages of the app.
+    """
+    keyword_filter = "%{}%".format(keyword)
+    return select(Message.conversation_id).where(
+        Message.app_id == app_model.id,
+        or_(Message.query.ilike(keyword_filter), Message.answer.ilike(keyword_filter)),
+    )
@@ -29,8 +29,10 @@ from libs.infinite_scroll_pagination import InfiniteScrollPagination
 from libs.login import login_required
 from models.model import AppMode, Conversation, Message, MessageAnnotation, MessageFeedback
 from services.annotation_service import AppAnnotationService
+from services.app_statistic_service import AppStatisticService
 from services.errors.conversation import ConversationNotExistsError
 from services.errors.message import MessageNotExistsError, SuggestedQuestionsAfterAnswerDisabledError
+from services.message_preload_service import MessagePreloadService
 from services.message_service import MessageService
 
 
@@ -109,6 +111,7 @@ class ChatMessageListApi(Resource):
                 has_more = True
 
         history_messages = list(reversed(history_messages))
+        MessagePreloadService.preload_messages(history_messages)
 
         return InfiniteScrollPagination(data=history_messages, limit=args["limit"], has_more=has_more)
 
@@ -152,6 +155,8 @@ class MessageFeedbackApi(Resource):
 
         db.session.commit()
 
+        AppStatisticService.mark_message_feedback(message.id)
+
         return {"result": "success"}
 
 
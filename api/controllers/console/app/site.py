@@ -12,6 +12,7 @@ from extensions.ext_database import db
 from fields.app_fields import app_site_fields
 from libs.login import login_required
 from models import Site
+from services.api_auth_cache import ApiAuthCache
 
 
 def parse_app_site_args():
@@ -99,10 +100,12 @@ class AppSiteAccessTokenReset(Resource):
         if not site:
             raise NotFound
 
+        old_code = site.code
         site.code = Site.generate_code(16)
         site.updated_by = current_user.id
         site.updated_at = datetime.now(UTC).replace(tzinfo=None)
         db.session.commit()
+        ApiAuthCache.delete_site(old_code)
 
         return site
 
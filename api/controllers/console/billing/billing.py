@@ -19,6 +19,8 @@ class Subscription(Resource):
         args = parser.parse_args()
 
         BillingService.is_tenant_owner_or_admin(current_user)
+        # the plan is about to change
+        BillingService.clean_plan_cache(current_user.current_tenant_id)
 
         return BillingService.get_subscription(
             args["plan"], args["interval"], current_user.email, current_user.current_tenant_id
@@ -31,6 +31,7 @@ from fields.document_fields import document_status_fields
 from libs.login import login_required
 from models import ApiToken, Dataset, Document, DocumentSegment, UploadFile
 from models.dataset import DatasetPermissionEnum
+from services.api_auth_cache import ApiAuthCache
 from services.dataset_service import DatasetPermissionService, DatasetService, DocumentService
 
 
@@ -615,9 +616,11 @@ class DatasetApiDeleteApi(Resource):
 
         if key is None:
             flask_restful.abort(404, message="API key not found")
-
-        db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
-        db.session.commit()
+        else:
+            token, token_type = key.token, key.type
+            db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
+            db.session.commit()
+            ApiAuthCache.delete_api_token(token, token_type)
 
         return {"result": "success"}, 204
 
@@ -664,6 +667,7 @@ class DatasetRetrievalSettingApi(Resource):
                 | VectorType.MILVUS
                 | VectorType.OPENGAUSS
                 | VectorType.OCEANBASE
+                | VectorType.LOCAL
             ):
                 return {
                     "retrieval_method": [
@@ -708,6 +712,7 @@ class DatasetRetrievalSettingMockApi(Resource):
                 | VectorType.LINDORM
                 | VectorType.OPENGAUSS
                 | VectorType.OCEANBASE
+                | VectorType.LOCAL
             ):
                 return {
                     "retrieval_method": [
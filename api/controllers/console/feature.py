@@ -14,7 +14,7 @@ class FeatureApi(Resource):
     @account_initialization_required
     @cloud_utm_record
     def get(self):
-        return FeatureService.get_features(current_user.current_tenant_id).model_dump()
+        return FeatureService.get_features(current_user.current_tenant_id, use_cache=True).model_dump()
 
 
 class SystemFeatureApi(Resource):
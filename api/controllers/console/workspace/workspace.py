@@ -69,7 +69,7 @@ class TenantListApi(Resource):
         tenants = TenantService.get_join_tenants(current_user)
 
         for tenant in tenants:
-            features = FeatureService.get_features(tenant.id)
+            features = FeatureService.get_features(tenant.id, use_cache=True)
             if features.billing.enabled:
                 tenant.plan = features.billing.subscription.plan
             else:
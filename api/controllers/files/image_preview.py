@@ -2,7 +2,7 @@ from urllib.parse import quote
 
 from flask import Response, request
 from flask_restful import Resource, reqparse  # type: ignore
-from werkzeug.exceptions import NotFound
+from werkzeug.exceptions import NotFound, RequestedRangeNotSatisfiable
 
 import services
 from controllers.files import api
@@ -10,6 +10,10 @@ from controllers.files.error import UnsupportedFileTypeError
 from services.account_service import TenantService
 from services.file_service import FileService
 
+# max bytes served for a range request, a longer or open-ended range is answered with its beginning,
+# which clients like audio and video players follow with a request for the rest
+MAX_RANGE_LENGTH = 4 * 1024 * 1024
+
 
 class ImagePreviewApi(Resource):
     """
@@ -64,14 +68,31 @@ class FilePreviewApi(Resource):
         except services.errors.file.UnsupportedFileTypeError:
             raise UnsupportedFileTypeError()
 
-        response = Response(
-            generator,
-            mimetype=upload_file.mime_type,
-            direct_passthrough=True,
-            headers={},
-        )
+        # serve the requested part only, e.g. when seeking in audio and video
+        if upload_file.size > 0 and request.range:
+            content_range = request.range.range_for_length(upload_file.size)
+            if content_range is None:
+                raise RequestedRangeNotSatisfiable(length=upload_file.size)
+            start, stop = content_range
+            stop = min(stop, start + MAX_RANGE_LENGTH)
+            response = Response(
+                FileService.get_file_range(upload_file, start, stop - start),
+                status=206,
+                mimetype=upload_file.mime_type,
+                headers={},
+            )
+            response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{upload_file.size}"
+        else:
+            response = Response(
+                generator,
+                mimetype=upload_file.mime_type,
+                direct_passthrough=True,
+                headers={},
+            )
+            if upload_file.size > 0:
+                response.headers["Content-Length"] = str(upload_file.size)
         if upload_file.size > 0:
-            response.headers["Content-Length"] = str(upload_file.size)
+            response.headers["Accept-Ranges"] = "bytes"
         if args["as_attachment"]:
             encoded_filename = quote(upload_file.name)
             response.headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{encoded_filename}"
@@ -1,6 +1,5 @@
 import time
 from collections.abc import Callable
-from datetime import UTC, datetime, timedelta
 from enum import Enum
 from functools import wraps
 from typing import Optional
@@ -9,7 +8,7 @@ from flask import current_app, request
 from flask_login import user_logged_in  # type: ignore
 from flask_restful import Resource  # type: ignore
 from pydantic import BaseModel
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from werkzeug.exceptions import Forbidden, Unauthorized
 
@@ -19,6 +18,7 @@ from libs.login import _get_user
 from models.account import Account, Tenant, TenantAccountJoin, TenantStatus
 from models.dataset import RateLimitLog
 from models.model import ApiToken, App, EndUser
+from services.api_auth_cache import ApiAuthCache
 from services.feature_service import FeatureService
 
 
@@ -53,10 +53,14 @@ def validate_app_token(view: Optional[Callable] = None, *, fetch_user_arg: Optio
             if not app_model.enable_api:
                 raise Forbidden("The app's API service has been disabled.")
 
-            tenant = db.session.query(Tenant).filter(Tenant.id == app_model.tenant_id).first()
-            if tenant is None:
-                raise ValueError("Tenant does not exist.")
-            if tenant.status == TenantStatus.ARCHIVE:
+            tenant_archived = ApiAuthCache.get_tenant_archived(app_model.tenant_id)
+            if tenant_archived is None:
+                tenant = db.session.query(Tenant).filter(Tenant.id == app_model.tenant_id).first()
+                if tenant is None:
+                    raise ValueError("Tenant does not exist.")
+                tenant_archived = tenant.status == TenantStatus.ARCHIVE
+                ApiAuthCache.set_tenant_archived(app_model.tenant_id, tenant_archived)
+            if tenant_archived:
                 raise Forbidden("The workspace's status is archived.")
 
             kwargs["app_model"] = app_model
@@ -230,29 +234,17 @@ def validate_and_get_api_token(scope: str | None = None):
     if auth_scheme != "bearer":
         raise Unauthorized("Authorization scheme must be 'Bearer'")
 
-    current_time = datetime.now(UTC).replace(tzinfo=None)
-    cutoff_time = current_time - timedelta(minutes=1)
-    with Session(db.engine, expire_on_commit=False) as session:
-        update_stmt = (
-            update(ApiToken)
-            .where(
-                ApiToken.token == auth_token,
-                (ApiToken.last_used_at.is_(None) | (ApiToken.last_used_at < cutoff_time)),
-                ApiToken.type == scope,
-            )
-            .values(last_used_at=current_time)
-            .returning(ApiToken)
-        )
-        result = session.execute(update_stmt)
-        api_token = result.scalar_one_or_none()
-
-        if not api_token:
-            stmt = select(ApiToken).where(ApiToken.token == auth_token, ApiToken.type == scope)
+    api_token = ApiAuthCache.get_api_token(auth_token, scope)
+    if api_token is None:
+        stmt = select(ApiToken).where(ApiToken.token == auth_token, ApiToken.type == scope)
+        with Session(db.engine, expire_on_commit=False) as session:
             api_token = session.scalar(stmt)
-            if not api_token:
-                raise Unauthorized("Access token is invalid")
-        else:
-            session.commit()
+        if not api_token:
+            raise Unauthorized("Access token is invalid")
+        ApiAuthCache.set_api_token(api_token)
+
+    # last_used_at is written in batches by update_api_token_last_used_at_task
+    ApiAuthCache.record_api_token_usage(api_token.id)
 
     return api_token
 
@@ -264,6 +256,12 @@ def create_or_update_end_user_for_user_id(app_model: App, user_id: Optional[str]
     if not user_id:
         user_id = "DEFAULT-USER"
 
+    end_user_id = ApiAuthCache.get_service_api_end_user_id(app_model.id, user_id)
+    if end_user_id is not None:
+        end_user = db.session.get(EndUser, end_user_id)
+        if end_user is not None:
+            return end_user
+
     end_user = (
         db.session.query(EndUser)
         .filter(
@@ -286,6 +284,7 @@ def create_or_update_end_user_for_user_id(app_model: App, user_id: Optional[str]
         db.session.add(end_user)
         db.session.commit()
 
+    ApiAuthCache.set_service_api_end_user_id(end_user)
     return end_user
 
 
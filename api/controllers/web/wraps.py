@@ -8,6 +8,7 @@ from controllers.web.error import WebSSOAuthRequiredError
 from extensions.ext_database import db
 from libs.passport import PassportService
 from models.model import App, EndUser, Site
+from services.api_auth_cache import ApiAuthCache
 from services.enterprise.enterprise_service import EnterpriseService
 from services.feature_service import FeatureService
 
@@ -46,10 +47,9 @@ def decode_jwt_token():
         decoded = PassportService().verify(tk)
         app_code = decoded.get("app_code")
         app_model = db.session.query(App).filter(App.id == decoded["app_id"]).first()
-        site = db.session.query(Site).filter(Site.code == app_code).first()
         if not app_model:
             raise NotFound()
-        if not app_code or not site:
+        if not app_code or not _site_exists(app_code):
             raise BadRequest("Site URL is no longer valid.")
         if app_model.enable_site is False:
             raise BadRequest("Site is disabled.")
@@ -69,6 +69,16 @@ def decode_jwt_token():
         raise Unauthorized(e.description)
 
 
+def _site_exists(app_code: str) -> bool:
+    if ApiAuthCache.get_site_app_id(app_code) is not None:
+        return True
+    site = db.session.query(Site).filter(Site.code == app_code).first()
+    if not site:
+        return False
+    ApiAuthCache.set_site_app_id(app_code, site.app_id)
+    return True
+
+
 def _validate_web_sso_token(decoded, system_features, app_code):
     app_web_sso_enabled = False
 
@@ -85,4 +85,5 @@ class ModelConfigConverter:
             credentials=model_credentials,
             parameters=completion_params,
             stop=stop,
+            response_cache=model_config.response_cache,
         )
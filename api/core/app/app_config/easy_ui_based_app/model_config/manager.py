@@ -37,6 +37,7 @@ class ModelConfigManager:
             mode=model_mode,
             parameters=completion_params,
             stop=stop,
+            response_cache=model_config.get("response_cache", False),
         )
 
     @classmethod
@@ -102,6 +103,10 @@ class ModelConfigManager:
             config["model"]["completion_params"]
         )
 
+        # model.response_cache
+        if not isinstance(config["model"].get("response_cache", False), bool):
+            raise ValueError("model.response_cache must be of boolean type")
+
         return dict(config), ["model"]
 
     @classmethod
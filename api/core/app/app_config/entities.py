@@ -20,6 +20,7 @@ class ModelConfigEntity(BaseModel):
     mode: Optional[str] = None
     parameters: dict[str, Any] = Field(default_factory=dict)
     stop: list[str] = Field(default_factory=list)
+    response_cache: bool = False
 
 
 class AdvancedChatMessageEntity(BaseModel):
@@ -254,6 +255,16 @@ class TextToSpeechEntity(BaseModel):
     language: Optional[str] = None
 
 
+class SemanticCacheEntity(BaseModel):
+    """
+    Semantic Cache Entity.
+    """
+
+    enabled: bool
+    score_threshold: float = 0.95
+    fingerprint_inputs: bool = True
+
+
 class TracingConfigEntity(BaseModel):
     """
     Tracing Config Entity.
@@ -272,6 +283,7 @@ class AppAdditionalFeatures(BaseModel):
     more_like_this: bool = False
     speech_to_text: bool = False
     text_to_speech: Optional[TextToSpeechEntity] = None
+    semantic_cache: Optional[SemanticCacheEntity] = None
     trace_config: Optional[TracingConfigEntity] = None
 
 
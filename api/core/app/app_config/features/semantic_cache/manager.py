@@ -0,0 +1,50 @@
+from typing import Optional
+
+from core.app.app_config.entities import SemanticCacheEntity
+
+
+class SemanticCacheConfigManager:
+    @classmethod
+    def convert(cls, config: dict) -> Optional[SemanticCacheEntity]:
+        """
+        Convert model config to model config
+
+        :param config: model config args
+        """
+        semantic_cache = None
+        semantic_cache_dict = config.get("semantic_cache")
+        if semantic_cache_dict:
+            if semantic_cache_dict.get("enabled"):
+                semantic_cache = SemanticCacheEntity.model_validate(semantic_cache_dict)
+
+        return semantic_cache
+
+    @classmethod
+    def validate_and_set_defaults(cls, config: dict) -> tuple[dict, list[str]]:
+        """
+        Validate and set defaults for semantic cache feature
+
+        :param config: app model config args
+        """
+        if not config.get("semantic_cache"):
+            config["semantic_cache"] = {"enabled": False}
+
+        if not isinstance(config["semantic_cache"], dict):
+            raise ValueError("semantic_cache must be of dict type")
+
+        if "enabled" not in config["semantic_cache"] or not config["semantic_cache"]["enabled"]:
+            config["semantic_cache"]["enabled"] = False
+
+        if not isinstance(config["semantic_cache"]["enabled"], bool):
+            raise ValueError("enabled in semantic_cache must be of boolean type")
+
+        if config["semantic_cache"]["enabled"]:
+            score_threshold = config["semantic_cache"].setdefault("score_threshold", 0.95)
+            if not isinstance(score_threshold, int | float) or not 0 < score_threshold <= 1:
+                raise ValueError("score_threshold in semantic_cache must be a number between 0 and 1")
+
+            fingerprint_inputs = config["semantic_cache"].setdefault("fingerprint_inputs", True)
+            if not isinstance(fingerprint_inputs, bool):
+                raise ValueError("fingerprint_inputs in semantic_cache must be of boolean type")
+
+        return config, ["semantic_cache"]
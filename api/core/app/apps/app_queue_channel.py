@@ -0,0 +1,276 @@
+import json
+import queue
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Mapping
+from threading import Lock
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from configs import dify_config
+from core.app.entities.queue_entities import QueueMessage
+from core.errors.error import QuotaExceededError
+from core.model_runtime.errors.invoke import InvokeAuthorizationError, InvokeError
+from extensions.ext_redis import redis_client
+from libs import metrics
+
+# Payload of the stream entry which marks the end of the task stream
+_END_OF_STREAM = b""
+
+# Keys of serialized models and errors telling their class, and the private attributes of models
+_MODEL_KEY = "__queue_model__"
+_PRIVATE_KEY = "__queue_private__"
+_ERROR_KEY = "__queue_error__"
+
+# Errors the task pipelines tell apart, most specific first, other errors are restored as plain exceptions
+_RESTORABLE_ERRORS: tuple[type[Exception], ...] = (
+    InvokeAuthorizationError,
+    QuotaExceededError,
+    InvokeError,
+    ValueError,
+)
+
+
+class AppQueueChannel(ABC):
+    """
+    Channel carrying queue messages from the generation thread to the listener of a task.
+    """
+
+    @abstractmethod
+    def put(self, message: Optional[QueueMessage]) -> None:
+        """
+        Put message to channel, None marks the end of the task
+        :param message: queue message
+        :return:
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, timeout: float) -> Optional[QueueMessage]:
+        """
+        Get next message from channel
+        :param timeout: seconds to wait for a message
+        :return: queue message, None at the end of the task
+        :raises queue.Empty: if no message arrived in time
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Close channel once the listener stopped, messages left in it are never read
+        :return:
+        """
+        raise NotImplementedError
+
+
+class InMemoryAppQueueChannel(AppQueueChannel):
+    """
+    Channel backed by an in-process queue, the generation thread and the listener must share the process.
+    """
+
+    def __init__(self) -> None:
+        self._q: queue.Queue[Optional[QueueMessage]] = queue.Queue()
+        # messages counted in the queue depth metric, which are uncounted when the channel is closed
+        self._depth = 0
+        self._closed = False
+        self._depth_lock = Lock()
+
+    def put(self, message: Optional[QueueMessage]) -> None:
+        self._q.put(message)
+        with self._depth_lock:
+            if not self._closed:
+                self._depth += 1
+                metrics.inc_app_queue_depth()
+
+    def get(self, timeout: float) -> Optional[QueueMessage]:
+        message = self._q.get(timeout=timeout)
+        with self._depth_lock:
+            if not self._closed:
+                self._depth -= 1
+                metrics.dec_app_queue_depth()
+        return message
+
+    def close(self) -> None:
+        with self._depth_lock:
+            if not self._closed:
+                self._closed = True
+                metrics.dec_app_queue_depth(self._depth)
+                self._depth = 0
+
+
+class RedisStreamAppQueueChannel(AppQueueChannel):
+    """
+    Channel backed by a redis stream per task, so the generation thread and the listener may run on different
+    api nodes.
+
+    This is a building block for resumable task streams only: the listener reads the stream from its beginning,
+    the SSE events sent to the client carry no stream entry id, and there is no endpoint resuming a task stream
+    from a Last-Event-ID yet.
+    """
+
+    def __init__(self, task_id: str) -> None:
+        self._stream_key = self.generate_stream_key(task_id)
+        # id of the last entry read, task ids are unique so the stream of a new task is read from its beginning
+        self._last_event_id = "0-0"
+        self._buffer: deque[tuple[str, bytes]] = deque()
+
+    @classmethod
+    def generate_stream_key(cls, task_id: str) -> str:
+        """
+        Generate stream key
+        :param task_id: task id
+        :return:
+        """
+        return f"generate_task_stream:{task_id}"
+
+    def put(self, message: Optional[QueueMessage]) -> None:
+        payload = _END_OF_STREAM if message is None else dumps_queue_message(message)
+
+        pipeline = redis_client.pipeline()
+        pipeline.xadd(
+            self._stream_key,
+            {"message": payload},
+            maxlen=dify_config.APP_QUEUE_REDIS_STREAM_MAX_LENGTH,
+            approximate=True,
+        )
+        pipeline.expire(self._stream_key, dify_config.APP_QUEUE_REDIS_STREAM_EXPIRE)
+        pipeline.execute()
+
+    def get(self, timeout: float) -> Optional[QueueMessage]:
+        if not self._buffer:
+            response = redis_client.xread({self._stream_key: self._last_event_id}, count=100, block=int(timeout * 1000))
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                    self._buffer.append((entry_id, fields[b"message"]))
+
+        if not self._buffer:
+            raise queue.Empty()
+
+        self._last_event_id, payload = self._buffer.popleft()
+        if payload == _END_OF_STREAM:
+            return None
+
+        return loads_queue_message(payload)
+
+    def close(self) -> None:
+        # the stream is left to expire
+        pass
+
+
+def create_app_queue_channel(task_id: str) -> AppQueueChannel:
+    """
+    Create channel of the task according to APP_QUEUE_CHANNEL
+    :param task_id: task id
+    :return:
+    """
+    if dify_config.APP_QUEUE_CHANNEL == "redis_stream":
+        return RedisStreamAppQueueChannel(task_id)
+
+    return InMemoryAppQueueChannel()
+
+
+def dumps_queue_message(message: QueueMessage) -> bytes:
+    """
+    Serialize queue message to json, tagging models with their class so that events keep their types
+    :param message: queue message
+    :return: json payload
+    """
+    return json.dumps(_to_jsonable(message), ensure_ascii=False).encode()
+
+
+def loads_queue_message(payload: bytes) -> QueueMessage:
+    """
+    Deserialize queue message from json, only models of the application core are restored
+    :param payload: json payload
+    :return: queue message
+    :raises ValueError: if the payload is not a queue message
+    """
+    message = _from_jsonable(json.loads(payload))
+    if not isinstance(message, QueueMessage):
+        raise ValueError("payload is not a queue message")
+    return message
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        model_class = type(value)
+        data = {
+            field.alias or name: _to_jsonable(getattr(value, name)) for name, field in model_class.model_fields.items()
+        }
+        if not _is_restorable_model(model_class):
+            return data
+
+        data[_MODEL_KEY] = _get_model_name(model_class)
+        if value.__pydantic_private__:
+            data[_PRIVATE_KEY] = _to_jsonable(value.__pydantic_private__)
+        return data
+
+    if isinstance(value, BaseException):
+        # errors are restored as the closest error the task pipelines tell apart
+        error_class = next((cls for cls in _RESTORABLE_ERRORS if isinstance(value, cls)), Exception)
+        description = getattr(value, "description", None)
+        message = str(value) if error_class is not Exception or description is None else str(description)
+        return {_ERROR_KEY: error_class.__name__, "message": message}
+
+    if isinstance(value, Mapping):
+        return {str(key): _to_jsonable(item) for key, item in value.items()}
+
+    if isinstance(value, list | tuple | set | frozenset):
+        return [_to_jsonable(item) for item in value]
+
+    return to_jsonable_python(value, fallback=str)
+
+
+def _from_jsonable(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_from_jsonable(item) for item in value]
+
+    if not isinstance(value, dict):
+        return value
+
+    if _ERROR_KEY in value:
+        error_class = next((cls for cls in _RESTORABLE_ERRORS if cls.__name__ == value[_ERROR_KEY]), Exception)
+        return error_class(value.get("message"))
+
+    data = {key: _from_jsonable(item) for key, item in value.items() if key not in (_MODEL_KEY, _PRIVATE_KEY)}
+    if _MODEL_KEY not in value:
+        return data
+
+    model_class = _get_model_class(value[_MODEL_KEY])
+    model = model_class.model_validate(data)
+    if value.get(_PRIVATE_KEY):
+        for name, item in _from_jsonable(value[_PRIVATE_KEY]).items():
+            setattr(model, name, item)
+    return model
+
+
+def _is_restorable_model(model_class: type[BaseModel]) -> bool:
+    return model_class.__module__.startswith("core.") and "[" not in model_class.__qualname__
+
+
+def _get_model_name(model_class: type[BaseModel]) -> str:
+    return f"{model_class.__module__}.{model_class.__qualname__}"
+
+
+_model_classes: dict[str, type[BaseModel]] = {}
+
+
+def _get_model_class(name: str) -> type[BaseModel]:
+    """
+    Get model of the application core by name, models are never imported from the name
+    """
+    if name not in _model_classes:
+        pending: list[type[BaseModel]] = [BaseModel]
+        while pending:
+            model_class = pending.pop()
+            pending.extend(model_class.__subclasses__())
+            if _is_restorable_model(model_class):
+                _model_classes[_get_model_name(model_class)] = model_class
+
+    if name not in _model_classes:
+        raise ValueError(f"unknown queue model {name}")
+    return _model_classes[name]
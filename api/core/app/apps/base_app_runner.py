@@ -2,10 +2,15 @@ import time
 from collections.abc import Generator, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, Optional, Union
 
-from core.app.app_config.entities import ExternalDataVariableEntity, PromptTemplateEntity
+from core.app.app_config.entities import (
+    EasyUIBasedAppModelConfigFrom,
+    ExternalDataVariableEntity,
+    PromptTemplateEntity,
+)
 from core.app.apps.base_app_queue_manager import AppQueueManager, PublishFrom
 from core.app.entities.app_invoke_entities import (
     AppGenerateEntity,
+    ConversationAppGenerateEntity,
     EasyUIBasedAppGenerateEntity,
     InvokeFrom,
     ModelConfigWithCredentialsEntity,
@@ -13,6 +18,7 @@ from core.app.entities.app_invoke_entities import (
 from core.app.entities.queue_entities import QueueAgentMessageEvent, QueueLLMChunkEvent, QueueMessageEndEvent
 from core.app.features.annotation_reply.annotation_reply import AnnotationReplyFeature
 from core.app.features.hosting_moderation.hosting_moderation import HostingModerationFeature
+from core.app.features.semantic_cache.semantic_cache import SemanticCacheFeature
 from core.external_data_tool.external_data_fetch import ExternalDataFetch
 from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance
@@ -221,6 +227,7 @@ class AppRunner:
         text: str,
         stream: bool,
         usage: Optional[LLMUsage] = None,
+        simulate_typing: bool = True,
     ) -> None:
         """
         Direct output
@@ -230,6 +237,7 @@ class AppRunner:
         :param text: text
         :param stream: stream
         :param usage: usage
+        :param simulate_typing: pause between streamed characters
         :return:
         """
         if stream:
@@ -243,7 +251,8 @@ class AppRunner:
 
                 queue_manager.publish(QueueLLMChunkEvent(chunk=chunk), PublishFrom.APPLICATION_MANAGER)
                 index += 1
-                time.sleep(0.01)
+                if simulate_typing:
+                    time.sleep(0.01)
 
         queue_manager.publish(
             QueueMessageEndEvent(
@@ -440,3 +449,35 @@ class AppRunner:
         return annotation_reply_feature.query(
             app_record=app_record, message=message, query=query, user_id=user_id, invoke_from=invoke_from
         )
+
+    def query_semantic_cache_to_reply(
+        self, app_record: App, app_generate_entity: EasyUIBasedAppGenerateEntity, query: str
+    ) -> Optional[Message]:
+        """
+        Query a past answer of the app to reply from the semantic cache
+        :param app_record: app record
+        :param app_generate_entity: app generate entity
+        :param query: query
+        :return: message with the past answer
+        """
+        app_config = app_generate_entity.app_config
+        semantic_cache = app_config.additional_features.semantic_cache
+        # answers are reused for first queries without files only, and not for debugging draft configs
+        if (
+            not semantic_cache
+            or app_config.app_model_config_from == EasyUIBasedAppModelConfigFrom.ARGS
+            or not isinstance(app_generate_entity, ConversationAppGenerateEntity)
+            or app_generate_entity.conversation_id
+            or app_generate_entity.files
+        ):
+            return None
+
+        semantic_cache_feature = SemanticCacheFeature()
+        return semantic_cache_feature.query(
+            tenant_id=app_record.tenant_id,
+            app_id=app_record.id,
+            app_model_config_id=app_config.app_model_config_id,
+            semantic_cache=semantic_cache,
+            query=query,
+            inputs=app_generate_entity.inputs,
+        )
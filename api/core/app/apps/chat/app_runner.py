@@ -145,6 +145,24 @@ class ChatAppRunner(AppRunner):
                 )
                 return
 
+            # semantic cache
+            cached_message = self.query_semantic_cache_to_reply(
+                app_record=app_record,
+                app_generate_entity=application_generate_entity,
+                query=query,
+            )
+
+            if cached_message:
+                self.direct_output(
+                    queue_manager=queue_manager,
+                    app_generate_entity=application_generate_entity,
+                    prompt_messages=prompt_messages,
+                    text=cached_message.answer,
+                    stream=application_generate_entity.stream,
+                    simulate_typing=False,
+                )
+                return
+
         # fill in variable inputs from external data tools if exists
         external_data_tools = app_config.external_data_variables
         if external_data_tools:
@@ -225,6 +243,7 @@ class ChatAppRunner(AppRunner):
             stop=stop,
             stream=application_generate_entity.stream,
             user=application_generate_entity.user_id,
+            response_cache=application_generate_entity.model_conf.response_cache,
         )
 
         # handle invoke result
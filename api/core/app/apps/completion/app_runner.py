@@ -183,6 +183,7 @@ class CompletionAppRunner(AppRunner):
             stop=stop,
             stream=application_generate_entity.stream,
             user=application_generate_entity.user_id,
+            response_cache=application_generate_entity.model_conf.response_cache,
         )
 
         # handle invoke result
@@ -66,6 +66,7 @@ class ModelConfigWithCredentialsEntity(BaseModel):
     credentials: dict[str, Any] = Field(default_factory=dict)
     parameters: dict[str, Any] = Field(default_factory=dict)
     stop: list[str] = Field(default_factory=list)
+    response_cache: bool = False
 
     # pydantic configs
     model_config = ConfigDict(protected_namespaces=())
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from configs import dify_config
+from core.app.app_config.entities import SemanticCacheEntity
+from core.model_manager import ModelManager
+from core.model_runtime.entities.model_entities import ModelType
+from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from libs import metrics
+from models.dataset import Dataset, DatasetCollectionBinding
+from models.model import Message, MessageFeedback
+from services.dataset_service import DatasetCollectionBindingService
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCacheFeature:
+    """
+    Reuse past answers of a chat app for semantically similar queries.
+
+    Like annotations, first queries of conversations are embedded with the default embedding model of the tenant
+    and indexed in a collection shared by the apps using the same model, grouped by app.
+    Entries reference the answering message and the app model config it was answered with, so publishing a new
+    config invalidates them, and they expire after SEMANTIC_CACHE_TTL.
+    Hits and misses are counted per app in a redis hash, as labelling the metric by app would grow it with every app.
+    """
+
+    COLLECTION_TYPE = "semantic_cache"
+    LOOKUPS_KEY_PREFIX = "semantic_cache_lookups:"
+    ATTRIBUTES = ["doc_id", "message_id", "app_id", "app_model_config_id", "inputs_fingerprint", "created_at"]
+
+    def query(
+        self,
+        tenant_id: str,
+        app_id: str,
+        app_model_config_id: str,
+        semantic_cache: SemanticCacheEntity,
+        query: str,
+        inputs: Mapping[str, Any],
+    ) -> Optional[Message]:
+        """
+        Query a past answer of the app to reply
+        :param tenant_id: tenant id
+        :param app_id: app id
+        :param app_model_config_id: id of the app model config answering the query
+        :param semantic_cache: semantic cache feature config
+        :param query: query
+        :param inputs: inputs
+        :return: message with the past answer, None if there is none
+        """
+        message = None
+        try:
+            vector = self._get_vector(tenant_id, app_id)
+            documents = vector.search_by_vector(
+                query=query,
+                top_k=dify_config.SEMANTIC_CACHE_TOP_K,
+                score_threshold=semantic_cache.score_threshold,
+                filter={"group_id": [app_id]},
+            )
+
+            expired_at = int(time.time()) - dify_config.SEMANTIC_CACHE_TTL
+            inputs_fingerprint = get_inputs_fingerprint(inputs)
+            message_ids = [
+                document.metadata["message_id"]
+                for document in documents
+                if document.metadata
+                and document.metadata.get("app_id") == app_id
+                and document.metadata.get("app_model_config_id") == app_model_config_id
+                and int(document.metadata.get("created_at", 0)) > expired_at
+                and (
+                    not semantic_cache.fingerprint_inputs
+                    or document.metadata.get("inputs_fingerprint") == inputs_fingerprint
+                )
+            ]
+            if message_ids:
+                message = self._get_reusable_message(app_id, message_ids)
+        except Exception as e:
+            logger.warning(f"Query semantic cache failed, exception: {str(e)}.")
+
+        self._count_lookup(app_id, hit=message is not None)
+        metrics.observe_semantic_cache_lookup(hit=message is not None)
+        return message
+
+    @classmethod
+    def get_lookup_statistics(cls, app_id: str) -> dict[str, Any]:
+        """
+        Get the number of hits and misses of the semantic cache of the app
+        :param app_id: app id
+        :return: hits, misses and hit rate
+        """
+        hits, misses = (int(count or 0) for count in redis_client.hmget(cls.LOOKUPS_KEY_PREFIX + app_id, "hit", "miss"))
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0,
+        }
+
+    def add(
+        self,
+        tenant_id: str,
+        app_id: str,
+        app_model_config_id: str,
+        message_id: str,
+        query: str,
+        inputs_fingerprint: str,
+    ) -> None:
+        """
+        Add the answer of the first message of a conversation to the semantic cache of the app
+        :param tenant_id: tenant id
+        :param app_id: app id
+        :param app_model_config_id: id of the app model config the message was answered with
+        :param message_id: message id
+        :param query: query of the message
+        :param inputs_fingerprint: fingerprint of the inputs of the message
+        """
+        document = Document(
+            page_content=query,
+            metadata={
+                "doc_id": message_id,
+                "message_id": message_id,
+                "app_id": app_id,
+                "app_model_config_id": app_model_config_id,
+                "inputs_fingerprint": inputs_fingerprint,
+                "created_at": int(time.time()),
+            },
+        )
+        vector = self._get_vector(tenant_id, app_id)
+        vector.create([document], duplicate_check=True)
+
+    def clear(self, tenant_id: str, app_id: str) -> None:
+        """
+        Remove all answers from the semantic cache of the app
+        """
+        for vector in self._get_vectors(tenant_id, app_id):
+            vector.delete_by_metadata_field("app_id", app_id)
+
+    def _count_lookup(self, app_id: str, hit: bool) -> None:
+        try:
+            redis_client.hincrby(self.LOOKUPS_KEY_PREFIX + app_id, "hit" if hit else "miss", 1)
+        except Exception as e:
+            logger.warning(f"Count semantic cache lookup failed, exception: {str(e)}.")
+
+    def _get_reusable_message(self, app_id: str, message_ids: list[str]) -> Optional[Message]:
+        messages = {
+            message.id: message
+            for message in db.session.query(Message)
+            .filter(Message.app_id == app_id, Message.id.in_(message_ids), Message.status == "normal")
+            .all()
+        }
+        disliked_message_ids = {
+            message_id
+            for (message_id,) in db.session.query(MessageFeedback.message_id).filter(
+                MessageFeedback.message_id.in_(message_ids), MessageFeedback.rating == "dislike"
+            )
+        }
+        for message_id in message_ids:
+            message = messages.get(message_id)
+            if message and message.answer and message_id not in disliked_message_ids:
+                return message
+        return None
+
+    def _get_vector(self, tenant_id: str, app_id: str) -> Vector:
+        embedding_model = ModelManager().get_default_model_instance(
+            tenant_id=tenant_id, model_type=ModelType.TEXT_EMBEDDING
+        )
+        dataset_collection_binding = DatasetCollectionBindingService.get_dataset_collection_binding(
+            embedding_model.provider, embedding_model.model, self.COLLECTION_TYPE
+        )
+        return self._build_vector(tenant_id, app_id, dataset_collection_binding)
+
+    def _get_vectors(self, tenant_id: str, app_id: str) -> list[Vector]:
+        """
+        Vectors of every embedding model, answers may have been added before the default model changed
+        """
+        dataset_collection_bindings = (
+            db.session.query(DatasetCollectionBinding)
+            .filter(DatasetCollectionBinding.type == self.COLLECTION_TYPE)
+            .all()
+        )
+        return [
+            self._build_vector(tenant_id, app_id, dataset_collection_binding)
+            for dataset_collection_binding in dataset_collection_bindings
+        ]
+
+    def _build_vector(
+        self, tenant_id: str, app_id: str, dataset_collection_binding: DatasetCollectionBinding
+    ) -> Vector:
+        dataset = Dataset(
+            id=app_id,
+            tenant_id=tenant_id,
+            indexing_technique="high_quality",
+            embedding_model_provider=dataset_collection_binding.provider_name,
+            embedding_model=dataset_collection_binding.model_name,
+            collection_binding_id=dataset_collection_binding.id,
+        )
+        return Vector(dataset, attributes=self.ATTRIBUTES)
+
+
+def get_inputs_fingerprint(inputs: Mapping[str, Any]) -> str:
+    """
+    Fingerprint of the inputs of a message, answers are only reused for the same inputs
+    """
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
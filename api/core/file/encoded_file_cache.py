@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from configs import dify_config
+from libs import metrics
+
+from .enums import FileTransferMethod
+from .models import File
+
+
+class EncodedFileCache:
+    """
+    Cache of base64 encoded contents of files sent to models, in the memory of each process.
+
+    Chat history sends the files of past messages on every turn, they are downloaded and encoded once.
+    Files are cached by their transfer method and their upload file, tool file or url, with the total size of the
+    encoded contents bounded, the least recently used ones are evicted first.
+    """
+
+    _entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+    _size = 0
+    _lock = Lock()
+
+    @classmethod
+    def get(cls, f: File) -> Optional[str]:
+        """
+        Get the cached encoded content of the file
+        :return: base64 encoded content, None if it is not cached
+        """
+        key = cls._get_key(f)
+        if key is None:
+            return None
+
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is not None and entry[0] <= time.time() - dify_config.MULTIMODAL_ENCODED_FILE_CACHE_TTL:
+                cls._pop(key)
+                entry = None
+            if entry is not None:
+                cls._entries.move_to_end(key)
+
+        metrics.observe_encoded_file_cache_lookup(hit=entry is not None)
+        return entry[1] if entry is not None else None
+
+    @classmethod
+    def set(cls, f: File, encoded_string: str) -> None:
+        key = cls._get_key(f)
+        if key is None or len(encoded_string) > dify_config.MULTIMODAL_ENCODED_FILE_CACHE_MAX_ENTRY_SIZE:
+            return
+
+        with cls._lock:
+            cls._pop(key)
+            cls._entries[key] = (time.time(), encoded_string)
+            cls._size += len(encoded_string)
+            while cls._size > dify_config.MULTIMODAL_ENCODED_FILE_CACHE_SIZE:
+                cls._pop(next(iter(cls._entries)))
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._size = 0
+
+    @classmethod
+    def _pop(cls, key: str) -> None:
+        entry = cls._entries.pop(key, None)
+        if entry is not None:
+            cls._size -= len(entry[1])
+
+    @staticmethod
+    def _get_key(f: File) -> Optional[str]:
+        if not dify_config.MULTIMODAL_ENCODED_FILE_CACHE_SIZE:
+            return None
+
+        match f.transfer_method:
+            case FileTransferMethod.LOCAL_FILE | FileTransferMethod.TOOL_FILE:
+                if not f.related_id:
+                    return None
+                return f"{f.transfer_method.value}:{f.related_id}"
+            case FileTransferMethod.REMOTE_URL:
+                if not f.remote_url:
+                    return None
+                return f"{f.transfer_method.value}:{f.remote_url}"
+        return None
@@ -13,6 +13,7 @@ from core.model_runtime.entities import (
 from extensions.ext_storage import storage
 
 from . import helpers
+from .encoded_file_cache import EncodedFileCache
 from .enums import FileAttribute
 from .models import File, FileTransferMethod, FileType
 from .tool_file_parser import ToolFileParser
@@ -103,6 +104,10 @@ def _download_file_content(path: str, /):
 
 
 def _get_encoded_string(f: File, /):
+    encoded_string = EncodedFileCache.get(f)
+    if encoded_string is not None:
+        return encoded_string
+
     match f.transfer_method:
         case FileTransferMethod.REMOTE_URL:
             response = ssrf_proxy.get(f.remote_url, follow_redirects=True)
@@ -114,6 +119,7 @@ def _get_encoded_string(f: File, /):
             data = _download_file_content(f._storage_key)
 
     encoded_string = base64.b64encode(data).decode("utf-8")
+    EncodedFileCache.set(f, encoded_string)
     return encoded_string
 
 
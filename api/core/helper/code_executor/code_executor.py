@@ -1,21 +1,32 @@
+import hashlib
 import logging
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from enum import StrEnum
-from threading import Lock
+from threading import Event, Lock
 from typing import Any, Optional
 
-from httpx import Timeout, post
+import httpx
+from httpx import Timeout
 from pydantic import BaseModel
 from yarl import URL
 
 from configs import dify_config
 from core.helper.code_executor.javascript.javascript_transformer import NodeJsTemplateTransformer
+from core.helper.code_executor.jinja2.jinja2_renderer import Jinja2InProcessRenderer, Jinja2RenderFallbackError
 from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
 from core.helper.code_executor.python3.python3_transformer import Python3TemplateTransformer
 from core.helper.code_executor.template_transformer import TemplateTransformer
 
 logger = logging.getLogger(__name__)
 
+code_execution_client = httpx.Client(
+    limits=httpx.Limits(
+        max_connections=dify_config.CODE_EXECUTION_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=dify_config.CODE_EXECUTION_POOL_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=dify_config.CODE_EXECUTION_POOL_KEEPALIVE_EXPIRY,
+    ),
+)
+
 
 class CodeExecutionError(Exception):
     pass
@@ -37,10 +48,29 @@ class CodeLanguage(StrEnum):
     JAVASCRIPT = "javascript"
 
 
+class CodeExecutionBatch:
+    """
+    Executions of the same code collected to be sent to the code execution service in one request.
+    """
+
+    def __init__(self, language: "CodeLanguage", code: str):
+        self.language = language
+        self.code = code
+        self.inputs_list: list[Mapping[str, Any]] = []
+        self.results: list[Mapping[str, Any] | Exception] = []
+        # set once the batch is to be sent: it is full, or no execution of the same code is in flight anymore
+        self.ready = Event()
+        self.done = Event()
+
+
 class CodeExecutor:
     dependencies_cache: dict[str, str] = {}
     dependencies_cache_lock = Lock()
 
+    pending_batches: dict[tuple[str, str], CodeExecutionBatch] = {}
+    running_batches: dict[tuple[str, str], CodeExecutionBatch] = {}
+    pending_batches_lock = Lock()
+
     code_template_transformers: dict[CodeLanguage, type[TemplateTransformer]] = {
         CodeLanguage.PYTHON3: Python3TemplateTransformer,
         CodeLanguage.JINJA2: Jinja2TemplateTransformer,
@@ -75,7 +105,7 @@ class CodeExecutor:
         }
 
         try:
-            response = post(
+            response = code_execution_client.post(
                 str(url),
                 json=data,
                 headers=headers,
@@ -118,18 +148,36 @@ class CodeExecutor:
         return response_code.data.stdout or ""
 
     @classmethod
-    def execute_workflow_code_template(cls, language: CodeLanguage, code: str, inputs: Mapping[str, Any]):
+    def execute_workflow_code_template(
+        cls, language: CodeLanguage, code: str, inputs: Mapping[str, Any], batchable: bool = False
+    ):
         """
         Execute code
         :param language: code language
         :param code: code
         :param inputs: inputs
+        :param batchable: whether the execution may be batched with concurrent executions of the same code,
+            only set by callers running the same code in parallel, e.g. parallel iterations
         :return:
         """
+        if language == CodeLanguage.JINJA2 and dify_config.JINJA2_IN_PROCESS_RENDER_ENABLED:
+            try:
+                return {"result": Jinja2InProcessRenderer.render(code, inputs)}
+            except Jinja2RenderFallbackError as e:
+                logger.debug(f"Fall back to the code sandbox to render jinja2 template: {e}")
+
         template_transformer = cls.code_template_transformers.get(language)
         if not template_transformer:
             raise CodeExecutionError(f"Unsupported language {language}")
 
+        if batchable and dify_config.CODE_EXECUTION_BATCH_WINDOW_MS > 0:
+            return cls._execute_workflow_code_template_in_batch(language, code, inputs)
+
+        return cls._execute_workflow_code_template(language, code, inputs)
+
+    @classmethod
+    def _execute_workflow_code_template(cls, language: CodeLanguage, code: str, inputs: Mapping[str, Any]):
+        template_transformer = cls.code_template_transformers[language]
         runner, preload = template_transformer.transform_caller(code, inputs)
 
         try:
@@ -138,3 +186,109 @@ class CodeExecutor:
             raise e
 
         return template_transformer.transform_response(response)
+
+    @classmethod
+    def execute_workflow_code_template_batch(
+        cls, language: CodeLanguage, code: str, inputs_list: Sequence[Mapping[str, Any]]
+    ) -> list[Mapping[str, Any] | Exception]:
+        """
+        Execute code once for every input set in one request
+        :param language: code language
+        :param code: code
+        :param inputs_list: list of inputs
+        :return: result or error of every execution, in the order of inputs_list
+        """
+        template_transformer = cls.code_template_transformers.get(language)
+        if not template_transformer:
+            raise CodeExecutionError(f"Unsupported language {language}")
+
+        runner, preload = template_transformer.transform_batch_caller(code, inputs_list)
+        response = cls.execute_code(language, preload, runner)
+
+        items = template_transformer.transform_batch_response(response)
+        if len(items) != len(inputs_list):
+            raise CodeExecutionError(f"Expected {len(inputs_list)} results, got {len(items)}")
+
+        results: list[Mapping[str, Any] | Exception] = []
+        for item in items:
+            if item.get("error") is not None:
+                results.append(CodeExecutionError(item["error"]))
+                continue
+            try:
+                results.append(template_transformer.transform_batch_output(item.get("output") or ""))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @classmethod
+    def _execute_workflow_code_template_in_batch(cls, language: CodeLanguage, code: str, inputs: Mapping[str, Any]):
+        """
+        Execute code together with concurrent executions of the same code, e.g. from parallel iterations.
+        An execution is sent right away when no execution of the same code is in flight. Otherwise it joins
+        the pending batch, which is sent by its first caller once the execution in flight is done, the batch
+        is full or the batch window elapsed, whichever comes first. The others wait for their results.
+        """
+        batch_key = (language.value, hashlib.sha256(code.encode()).hexdigest())
+        with cls.pending_batches_lock:
+            batch = cls.pending_batches.get(batch_key)
+            is_leader = batch is None
+            if batch is None:
+                batch = CodeExecutionBatch(language, code)
+                if batch_key in cls.running_batches:
+                    cls.pending_batches[batch_key] = batch
+                else:
+                    batch.ready.set()
+            index = len(batch.inputs_list)
+            batch.inputs_list.append(inputs)
+            if len(batch.inputs_list) >= dify_config.CODE_EXECUTION_BATCH_MAX_SIZE:
+                # close the batch, the following executions start a new one
+                cls.pending_batches.pop(batch_key, None)
+                batch.ready.set()
+
+        if is_leader:
+            batch.ready.wait(timeout=dify_config.CODE_EXECUTION_BATCH_WINDOW_MS / 1000)
+            with cls.pending_batches_lock:
+                if cls.pending_batches.get(batch_key) is batch:
+                    cls.pending_batches.pop(batch_key)
+                cls.running_batches[batch_key] = batch
+            try:
+                cls._execute_batch(batch)
+            finally:
+                with cls.pending_batches_lock:
+                    if cls.running_batches.get(batch_key) is batch:
+                        cls.running_batches.pop(batch_key)
+                    pending_batch = cls.pending_batches.get(batch_key)
+                    if pending_batch is not None:
+                        pending_batch.ready.set()
+        else:
+            batch.done.wait()
+
+        result = batch.results[index]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    @classmethod
+    def _execute_batch(cls, batch: CodeExecutionBatch) -> None:
+        template_transformer = cls.code_template_transformers[batch.language]
+        try:
+            if len(batch.inputs_list) == 1:
+                # a single execution runs the plain runner, keeping its exact behavior
+                runner, preload = template_transformer.transform_caller(batch.code, batch.inputs_list[0])
+                response = cls.execute_code(batch.language, preload, runner)
+                batch.results = [template_transformer.transform_response(response)]
+            else:
+                batch.results = list(
+                    cls.execute_workflow_code_template_batch(batch.language, batch.code, batch.inputs_list)
+                )
+        except Exception as e:
+            if len(batch.inputs_list) == 1:
+                batch.results = [e]
+            else:
+                # the whole request failed, e.g. one execution exceeded the time limit of the code execution
+                # service, every execution fails as it is unknown which ones already ran
+                logger.warning(f"Failed to execute a batch of {len(batch.inputs_list)} code executions: {e}")
+                error = CodeExecutionError(f"Batched code execution failed: {e}")
+                batch.results = [error] * len(batch.inputs_list)
+        finally:
+            batch.done.set()
@@ -24,3 +24,31 @@ class NodeJsTemplateTransformer(TemplateTransformer):
             """
         )
         return runner_script
+
+    @classmethod
+    def get_batch_runner_script(cls) -> str:
+        runner_script = dedent(
+            f"""
+            // the code is declared in a fresh scope for every input object so no state is shared
+            var code = Buffer.from('{cls._code_placeholder}', 'base64').toString('utf-8') + '\\nreturn main'
+            
+            // decode and prepare input object list
+            var inputs_list = JSON.parse(Buffer.from('{cls._inputs_placeholder}', 'base64').toString('utf-8'))
+            
+            // execute main function for every input object
+            var outputs = inputs_list.map(function (inputs_obj) {{
+                try {{
+                    var main = new Function('require', 'module', 'exports', code)(require, module, exports)
+                    return {{ output: JSON.stringify(main(inputs_obj)) }}
+                }} catch (e) {{
+                    return {{ error: String((e && e.stack) || e) }}
+                }}
+            }})
+            
+            // convert outputs to json and print
+            var outputs_json = JSON.stringify(outputs)
+            var result = `<<RESULT>>${{outputs_json}}<<RESULT>>`
+            console.log(result)
+            """
+        )
+        return runner_script
@@ -0,0 +1,274 @@
+import ast
+import hashlib
+import json
+import re
+import sys
+import time
+from collections.abc import Callable, Iterable, Mapping
+from string import Formatter
+from threading import Lock
+from types import FrameType
+from typing import Any, Optional
+
+from jinja2 import Template, pass_eval_context
+from jinja2.filters import do_center, do_format, do_indent, do_join, do_replace, make_attrgetter
+from jinja2.nodes import EvalContext
+from jinja2.sandbox import ImmutableSandboxedEnvironment, SecurityError
+
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
+
+# Marker cached for templates which can only be rendered by the code sandbox
+_SANDBOX_ONLY = False
+
+MAX_POWER_EXPONENT = 1024
+
+# A printf-style conversion specifier, or an escaped percent sign
+_PERCENT_SPEC_PATTERN = re.compile(r"%(?:%|(?:\([^)]*\))?[#0\- +]*(\*|\d*)(?:\.(\*|\d*))?)")
+
+
+class Jinja2RenderFallbackError(Exception):
+    """
+    Raised when a template can not be rendered in process and has to be rendered by the code sandbox.
+    """
+
+    pass
+
+
+def _check_length(length: int) -> None:
+    if length > dify_config.JINJA2_IN_PROCESS_MAX_OUTPUT_LENGTH:
+        raise SecurityError("the value is too large to be built in process")
+
+
+def _check_format_string(format_string: str) -> None:
+    """
+    Refuse `str.format` strings with widths or precisions which would build oversized values
+    """
+    for _, _, format_spec, _ in Formatter().parse(format_string):
+        if not format_spec:
+            continue
+        if "{" in format_spec:
+            raise SecurityError("nested format fields are not allowed in process")
+        for number in re.findall(r"\d+", format_spec):
+            _check_length(int(number))
+
+
+def _check_percent_format_string(format_string: str) -> None:
+    """
+    Refuse printf-style format strings with widths or precisions which would build oversized values
+    """
+    for match in _PERCENT_SPEC_PATTERN.finditer(format_string):
+        for number in match.groups():
+            if number == "*":
+                raise SecurityError("variable widths are not allowed in process")
+            if number:
+                _check_length(int(number))
+
+
+def _check_str_method_call(value: str, method: str, args: tuple, kwargs: dict) -> tuple:
+    """
+    Refuse calls of str methods which would build oversized values
+    :return: arguments of the call, with the iterable joined by `join` turned into a list
+    """
+    match method:
+        case "center" | "ljust" | "rjust" | "zfill" if args and isinstance(args[0], int):
+            _check_length(args[0])
+        case "expandtabs":
+            tabsize = args[0] if args else kwargs.get("tabsize", 8)
+            if isinstance(tabsize, int):
+                _check_length(len(value) + value.count("\t") * tabsize)
+        case "replace" if len(args) >= 2 and isinstance(args[0], str) and isinstance(args[1], str):
+            old, new = args[0], args[1]
+            count = value.count(old) if old else len(value) + 1
+            if len(args) > 2 and isinstance(args[2], int) and args[2] >= 0:
+                count = min(count, args[2])
+            _check_length(len(value) + count * (len(new) - len(old)))
+        case "join" if args:
+            items = list(args[0])
+            _check_joined_length(items, value)
+            return (items, *args[1:])
+    return args
+
+
+def _check_joined_length(items: list, separator: str) -> None:
+    _check_length(sum(len(item) for item in items if isinstance(item, str)) + len(separator) * max(len(items) - 1, 0))
+
+
+def _limited_center(value: str, width: int = 80) -> str:
+    if isinstance(width, int):
+        _check_length(width)
+    return do_center(value, width)
+
+
+def _limited_indent(s: str, width: int | str = 4, first: bool = False, blank: bool = False) -> str:
+    indention_length = width if isinstance(width, int) else len(width)
+    _check_length(len(str(s)) + (str(s).count("\n") + 1) * indention_length)
+    return do_indent(s, width, first, blank)
+
+
+def _limited_format(value: str, *args: Any, **kwargs: Any) -> str:
+    _check_percent_format_string(str(value))
+    return do_format(value, *args, **kwargs)
+
+
+@pass_eval_context
+def _limited_join(
+    eval_ctx: EvalContext, value: Iterable[Any], d: str = "", attribute: Optional[str | int] = None
+) -> str:
+    if attribute is not None:
+        value = map(make_attrgetter(eval_ctx.environment, attribute), value)
+    items = list(value)
+    _check_joined_length(items, d)
+    return str(do_join(eval_ctx, items, d))
+
+
+@pass_eval_context
+def _limited_replace(eval_ctx: EvalContext, s: str, old: str, new: str, count: Optional[int] = None) -> str:
+    _check_str_method_call(str(s), "replace", (str(old), str(new), -1 if count is None else count), {})
+    return do_replace(eval_ctx, s, old, new, count)
+
+
+class LimitedSandboxedEnvironment(ImmutableSandboxedEnvironment):
+    """
+    Immutable sandboxed environment which also refuses to build oversized values, with `*`, `**`, `%`,
+    str methods and filters padding, repeating, replacing or joining strings.
+
+    Loops are bounded by the render deadline, `range` is already bounded by the sandbox.
+    """
+
+    intercepted_binops = frozenset(["*", "**", "%"])
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.filters.update(
+            {
+                "center": _limited_center,
+                "indent": _limited_indent,
+                "format": _limited_format,
+                "join": _limited_join,
+                "replace": _limited_replace,
+            }
+        )
+
+    def call_binop(self, context, operator: str, left: Any, right: Any) -> Any:
+        if operator == "*":
+            for sequence, times in ((left, right), (right, left)):
+                if isinstance(sequence, str | list | tuple) and isinstance(times, int):
+                    _check_length(len(sequence) * times)
+        elif operator == "**":
+            if isinstance(left, int) and isinstance(right, int) and right > MAX_POWER_EXPONENT:
+                raise SecurityError("the power is too large to be computed in process")
+        elif operator == "%":
+            if isinstance(left, str):
+                _check_percent_format_string(left)
+        return super().call_binop(context, operator, left, right)
+
+    def call(__self, __context, __obj, *args, **kwargs):  # noqa: N805
+        method_self = getattr(__obj, "__self__", None)
+        if isinstance(method_self, str):
+            args = _check_str_method_call(method_self, getattr(__obj, "__name__", ""), args, kwargs)
+        return super().call(__context, __obj, *args, **kwargs)
+
+    def wrap_str_format(self, value: Any) -> Optional[Callable[..., str]]:
+        wrapper = super().wrap_str_format(value)
+        if wrapper is not None:
+            _check_format_string(value.__self__)
+        return wrapper
+
+
+class Jinja2InProcessRenderer:
+    """
+    Render Jinja2 templates in process, producing the same output as the Jinja2 runner of the code sandbox.
+    """
+
+    _environment = LimitedSandboxedEnvironment()
+    _template_cache = LRUCache(dify_config.JINJA2_IN_PROCESS_TEMPLATE_CACHE_SIZE)
+    _template_cache_lock = Lock()
+
+    @classmethod
+    def render(cls, template: str, inputs: Mapping[str, Any]) -> str:
+        """
+        Render template
+        :param template: template
+        :param inputs: inputs
+        :return: rendered text
+        :raises Jinja2RenderFallbackError: if the template has to be rendered by the code sandbox
+        """
+        template_key = hashlib.sha256(template.encode()).hexdigest()
+        compiled_template = cls._get_template(template_key, template)
+
+        try:
+            # inputs are passed to the code sandbox as json, so they are rendered with json types here as well
+            render_inputs = json.loads(json.dumps(inputs, ensure_ascii=False))
+        except (TypeError, ValueError) as e:
+            raise Jinja2RenderFallbackError(f"inputs are not json serializable: {e}")
+
+        max_output_length = dify_config.JINJA2_IN_PROCESS_MAX_OUTPUT_LENGTH
+        output_length = 0
+        chunks = []
+        previous_trace = sys.gettrace()
+        # the deadline is checked on every line run by the template, so loops without output are bounded as well
+        sys.settrace(cls._get_deadline_trace(time.perf_counter() + dify_config.JINJA2_IN_PROCESS_RENDER_TIMEOUT))
+        try:
+            for chunk in compiled_template.generate(**render_inputs):
+                output_length += len(chunk)
+                if output_length > max_output_length:
+                    raise Jinja2RenderFallbackError(f"output exceeds {max_output_length} characters")
+                chunks.append(chunk)
+        except Jinja2RenderFallbackError:
+            raise
+        except SecurityError as e:
+            cls._put_template(template_key, _SANDBOX_ONLY)
+            raise Jinja2RenderFallbackError(f"template is not allowed in process: {e}")
+        except Exception as e:
+            raise Jinja2RenderFallbackError(f"failed to render template in process: {e}")
+        finally:
+            sys.settrace(previous_trace)
+
+        return "".join(chunks)
+
+    @staticmethod
+    def _get_deadline_trace(deadline: float) -> Callable:
+        def trace(frame: FrameType, event: str, arg: Any) -> Optional[Callable]:
+            if time.perf_counter() > deadline:
+                # raising from a trace function also removes it
+                raise Jinja2RenderFallbackError("rendering timed out")
+            # only lines of the template are traced, calls of any function are
+            return trace if frame.f_code.co_filename == "<template>" else None
+
+        return trace
+
+    @classmethod
+    def _get_template(cls, template_key: str, template: str) -> Template:
+        with cls._template_cache_lock:
+            compiled_template: Template | bool | None = cls._template_cache.get(template_key)
+        if compiled_template is _SANDBOX_ONLY:
+            raise Jinja2RenderFallbackError("template is only renderable by the code sandbox")
+        if isinstance(compiled_template, Template):
+            return compiled_template
+
+        try:
+            compiled_template = cls._environment.from_string(cls._to_runner_source(template))
+        except Exception as e:
+            cls._put_template(template_key, _SANDBOX_ONLY)
+            raise Jinja2RenderFallbackError(f"failed to compile template in process: {e}")
+
+        cls._put_template(template_key, compiled_template)
+        return compiled_template
+
+    @classmethod
+    def _put_template(cls, template_key: str, compiled_template: Template | bool) -> None:
+        with cls._template_cache_lock:
+            cls._template_cache.put(template_key, compiled_template)
+
+    @staticmethod
+    def _to_runner_source(template: str) -> str:
+        """
+        The Jinja2 runner of the code sandbox embeds the template into a python triple-quoted string literal,
+        so escape sequences in the template are interpreted before the template is compiled.
+        """
+        if "'''" in template or template.endswith("'"):
+            raise ValueError("template can not be embedded into the runner script")
+        if "\\" not in template:
+            return template
+        return str(ast.literal_eval(f"'''{template}'''"))
@@ -38,6 +38,38 @@ class Jinja2TemplateTransformer(TemplateTransformer):
             """)
         return runner_script
 
+    @classmethod
+    def get_batch_runner_script(cls) -> str:
+        runner_script = dedent(f"""
+            # declare main function
+            def main(**inputs):
+                import jinja2
+                template = jinja2.Template('''{cls._code_placeholder}''')
+                return template.render(**inputs)
+
+            import json
+            import traceback
+            from base64 import b64decode
+
+            # decode and prepare input dict list
+            inputs_list = json.loads(b64decode('{cls._inputs_placeholder}').decode('utf-8'))
+
+            # execute main function for every input dict
+            outputs = []
+            for inputs_obj in inputs_list:
+                try:
+                    outputs.append({{"output": main(**inputs_obj)}})
+                except Exception:
+                    outputs.append({{"error": traceback.format_exc()}})
+
+            # convert outputs to json and print
+            outputs_json = json.dumps(outputs)
+            result = f'''<<RESULT>>{{outputs_json}}<<RESULT>>'''
+            print(result)
+
+            """)
+        return runner_script
+
     @classmethod
     def get_preload_script(cls) -> str:
         preload_script = dedent("""
@@ -25,3 +25,34 @@ class Python3TemplateTransformer(TemplateTransformer):
             print(result)
             """)
         return runner_script
+
+    @classmethod
+    def get_batch_runner_script(cls) -> str:
+        runner_script = dedent(f"""
+            import json
+            import traceback
+            from base64 import b64decode
+            
+            # compile the code, it is executed in a fresh namespace for every input dict so no state is shared
+            code = compile(b64decode('{cls._code_placeholder}').decode('utf-8'), '<code>', 'exec')
+            
+            # decode and prepare input dict list
+            inputs_list = json.loads(b64decode('{cls._inputs_placeholder}').decode('utf-8'))
+            
+            # execute main function for every input dict
+            outputs = []
+            for inputs_obj in inputs_list:
+                try:
+                    namespace = {{"__name__": "__main__"}}
+                    exec(code, namespace)
+                    output_obj = namespace["main"](**inputs_obj)
+                    outputs.append({{"output": json.dumps(output_obj, indent=4)}})
+                except BaseException:
+                    outputs.append({{"error": traceback.format_exc()}})
+            
+            # convert outputs to json and print
+            outputs_json = json.dumps(outputs)
+            result = f'''<<RESULT>>{{outputs_json}}<<RESULT>>'''
+            print(result)
+            """)
+        return runner_script
@@ -1,9 +1,15 @@
+import hashlib
 import json
 import re
 from abc import ABC, abstractmethod
 from base64 import b64encode
-from collections.abc import Mapping
-from typing import Any
+from collections.abc import Mapping, Sequence
+from threading import Lock
+from typing import Any, Optional
+
+from core.helper.lru_cache import LRUCache
+
+RUNNER_SCRIPT_CACHE_SIZE = 1000
 
 
 class TemplateTransformer(ABC):
@@ -11,6 +17,10 @@ class TemplateTransformer(ABC):
     _inputs_placeholder: str = "{{inputs}}"
     _result_tag: str = "<<RESULT>>"
 
+    # runner scripts with the code embedded, keyed by transformer, runner kind and code hash
+    _runner_script_cache = LRUCache(RUNNER_SCRIPT_CACHE_SIZE)
+    _runner_script_cache_lock = Lock()
+
     @classmethod
     def transform_caller(cls, code: str, inputs: Mapping[str, Any]) -> tuple[str, str]:
         """
@@ -24,6 +34,20 @@ class TemplateTransformer(ABC):
 
         return runner_script, preload_script
 
+    @classmethod
+    def transform_batch_caller(cls, code: str, inputs_list: Sequence[Mapping[str, Any]]) -> tuple[str, str]:
+        """
+        Transform code to runner executing the code once for every input set
+        :param code: code
+        :param inputs_list: list of inputs
+        :return: runner, preload
+        """
+        runner_script = cls.get_code_runner_script(code, batch=True)
+        runner_script = runner_script.replace(cls._inputs_placeholder, cls.serialize_inputs(inputs_list))
+        preload_script = cls.get_preload_script()
+
+        return runner_script, preload_script
+
     @classmethod
     def extract_result_str_from_response(cls, response: str):
         result = re.search(rf"{cls._result_tag}(.*){cls._result_tag}", response, re.DOTALL)
@@ -48,6 +72,31 @@ class TemplateTransformer(ABC):
             raise ValueError("result keys must be strings")
         return result
 
+    @classmethod
+    def transform_batch_response(cls, response: str) -> list[Mapping[str, Any]]:
+        """
+        Transform response of the batch runner to a list of items,
+        each one is either {"output": <output of the runner>} or {"error": <error message>}
+        :param response: response
+        :return:
+        """
+        try:
+            result = json.loads(cls.extract_result_str_from_response(response))
+        except json.JSONDecodeError:
+            raise ValueError("failed to parse response")
+        if not isinstance(result, list) or not all(isinstance(item, dict) for item in result):
+            raise ValueError("result must be a list of dict")
+        return result
+
+    @classmethod
+    def transform_batch_output(cls, output: str) -> Mapping[str, Any]:
+        """
+        Transform output of one execution of the batch runner to dict
+        :param output: output
+        :return:
+        """
+        return cls.transform_response(f"{cls._result_tag}{output}{cls._result_tag}")
+
     @classmethod
     @abstractmethod
     def get_runner_script(cls) -> str:
@@ -57,16 +106,50 @@ class TemplateTransformer(ABC):
         pass
 
     @classmethod
-    def serialize_inputs(cls, inputs: Mapping[str, Any]) -> str:
+    @abstractmethod
+    def get_batch_runner_script(cls) -> str:
+        """
+        Get runner script executing the code once for every input set, each time in a fresh scope,
+        printing a json list of {"output": ...} or {"error": ...} items.
+        The code placeholder is replaced with the base64 encoded code
+        """
+        pass
+
+    @classmethod
+    def serialize_inputs(cls, inputs: Mapping[str, Any] | Sequence[Mapping[str, Any]]) -> str:
         inputs_json_str = json.dumps(inputs, ensure_ascii=False).encode()
         input_base64_encoded = b64encode(inputs_json_str).decode("utf-8")
         return input_base64_encoded
 
+    @classmethod
+    def serialize_code(cls, code: str) -> str:
+        return b64encode(code.encode()).decode("utf-8")
+
+    @classmethod
+    def get_code_runner_script(cls, code: str, batch: bool = False) -> str:
+        """
+        Get runner script with the code embedded, cached by code hash
+        :param code: code
+        :param batch: whether to get the batch runner script
+        :return:
+        """
+        cache_key = (cls.__name__, batch, hashlib.sha256(code.encode()).hexdigest())
+        with cls._runner_script_cache_lock:
+            script: Optional[str] = cls._runner_script_cache.get(cache_key)
+        if script is None:
+            if batch:
+                # the batch runner executes the code itself, so it embeds the code encoded
+                script = cls.get_batch_runner_script().replace(cls._code_placeholder, cls.serialize_code(code))
+            else:
+                script = cls.get_runner_script().replace(cls._code_placeholder, code)
+            with cls._runner_script_cache_lock:
+                cls._runner_script_cache.put(cache_key, script)
+        return script
+
     @classmethod
     def assemble_runner_script(cls, code: str, inputs: Mapping[str, Any]) -> str:
         # assemble runner script
-        script = cls.get_runner_script()
-        script = script.replace(cls._code_placeholder, code)
+        script = cls.get_code_runner_script(code)
         inputs_str = cls.serialize_inputs(inputs)
         script = script.replace(cls._inputs_placeholder, inputs_str)
         return script
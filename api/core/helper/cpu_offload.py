@@ -0,0 +1,85 @@
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Optional, TypeVar
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = Lock()
+
+
+def _is_gevent_patched() -> bool:
+    try:
+        from gevent import monkey  # type: ignore
+    except ImportError:
+        return False
+
+    return bool(monkey.is_module_patched("threading"))
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor, _executor_pid
+    with _executor_lock:
+        # the pool can not be shared with processes forked after it was created, e.g. gunicorn workers
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(
+                max_workers=dify_config.CPU_OFFLOAD_MAX_WORKERS,
+                # spawn fresh interpreters instead of forking the monkey-patched worker with its open connections
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def run_cpu_bound(func: Callable[..., T], *args, input_size: int, **kwargs) -> T:
+    """
+    Run CPU-bound function out of the gevent hub.
+
+    Under gevent, the function runs in a process pool and the calling greenlet waits cooperatively,
+    so other greenlets of the worker keep being served. Otherwise, or for inputs smaller than
+    CPU_OFFLOAD_MIN_INPUT_SIZE, the function runs in place.
+    The function, its arguments and its result must be picklable.
+
+    :param func: module level function
+    :param input_size: size of the input in characters or bytes
+    :return: result of the function
+    """
+    if (
+        not dify_config.CPU_OFFLOAD_ENABLED
+        or input_size < dify_config.CPU_OFFLOAD_MIN_INPUT_SIZE
+        or not _is_gevent_patched()
+    ):
+        return func(*args, **kwargs)
+
+    executor = _get_executor()
+    try:
+        future = executor.submit(func, *args, **kwargs)
+    except (BrokenProcessPool, RuntimeError):
+        _discard_executor(executor)
+        return func(*args, **kwargs)
+
+    try:
+        # threading primitives are patched by gevent, so waiting for the result yields to the hub
+        return future.result()
+    except BrokenProcessPool:
+        logger.warning("CPU offload process pool is broken, run %s in place", func.__qualname__)
+        _discard_executor(executor)
+        return func(*args, **kwargs)
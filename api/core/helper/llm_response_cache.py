@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Generator, Sequence
+from threading import Lock
+from typing import Any, Optional
+
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
+from core.model_runtime.entities.llm_entities import LLMResult, LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import AssistantPromptMessage, PromptMessage, PromptMessageTool
+from extensions.ext_redis import redis_client
+from libs import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Cache of responses of deterministic large language model invocations.
+
+    Invocations with temperature 0 and the same provider, model, parameters, tools, stop words and prompt messages
+    are answered from the cache. Streamed responses are replayed with the same chunks, without usage,
+    as cached responses are not billed.
+    """
+
+    KEY_PREFIX = "llm_response_cache"
+
+    _local = LRUCache(dify_config.LLM_RESPONSE_CACHE_LOCAL_SIZE)
+    _local_lock = Lock()
+
+    @classmethod
+    def get_key(
+        cls,
+        tenant_id: str,
+        provider: str,
+        model: str,
+        prompt_messages: Sequence[PromptMessage],
+        model_parameters: Optional[dict],
+        tools: Optional[Sequence[PromptMessageTool]],
+        stop: Optional[Sequence[str]],
+    ) -> Optional[str]:
+        """
+        Get the cache key of the invocation
+        :return: cache key, None if the invocation is not deterministic or the cache is disabled
+        """
+        if not dify_config.LLM_RESPONSE_CACHE_ENABLED:
+            return None
+        if not model_parameters or model_parameters.get("temperature") != 0:
+            return None
+
+        request = {
+            "tenant_id": tenant_id,
+            "provider": provider,
+            "model": model,
+            "prompt_messages": [message.model_dump(mode="json", serialize_as_any=True) for message in prompt_messages],
+            "model_parameters": model_parameters,
+            "tools": [tool.model_dump(mode="json") for tool in tools or []],
+            "stop": list(stop or []),
+        }
+        digest = hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{cls.KEY_PREFIX}:{digest}"
+
+    @classmethod
+    def get(
+        cls, key: str, prompt_messages: Sequence[PromptMessage], stream: bool
+    ) -> Optional[LLMResult | Generator[LLMResultChunk, None, None]]:
+        """
+        Get the cached response of the invocation
+        :return: response in the form of the invocation, None if it is not cached
+        """
+        entry = cls._get_entry(key)
+        if entry is None:
+            metrics.observe_llm_response_cache_lookup(hit=False)
+            return None
+
+        usage = LLMUsage.model_validate(entry["usage"])
+        metrics.observe_llm_response_cache_lookup(hit=True, saved_tokens=usage.total_tokens)
+        message = AssistantPromptMessage.model_validate(entry["message"])
+        if stream:
+            return cls._replay(entry, message, list(prompt_messages))
+        return LLMResult(
+            model=entry["model"],
+            prompt_messages=list(prompt_messages),
+            message=message,
+            usage=LLMUsage.empty_usage(),
+            system_fingerprint=entry["system_fingerprint"],
+        )
+
+    @classmethod
+    def set(cls, key: str, result: LLMResult) -> None:
+        """
+        Cache the response of a blocking invocation
+        """
+        if not isinstance(result.message.content, str | None):
+            return
+        cls._set_entry(
+            key,
+            {
+                "model": result.model,
+                "system_fingerprint": result.system_fingerprint,
+                "message": result.message.model_dump(mode="json"),
+                "usage": result.usage.model_dump(mode="json"),
+                "chunks": [result.message.content or ""],
+            },
+        )
+
+    @classmethod
+    def record(cls, key: str, result: Generator[LLMResultChunk, None, None]) -> Generator[LLMResultChunk, None, None]:
+        """
+        Pass the chunks of a streamed invocation through and cache the response once it is complete
+        """
+        chunks: list[str] = []
+        cacheable = True
+        last_chunk = None
+        for chunk in result:
+            yield chunk
+
+            last_chunk = chunk
+            # partial tool calls and multi-modal contents are not replayed
+            if chunk.delta.message.tool_calls or not isinstance(chunk.delta.message.content, str | None):
+                cacheable = False
+            elif chunk.delta.message.content:
+                chunks.append(chunk.delta.message.content)
+
+        if not cacheable or last_chunk is None:
+            return
+        cls._set_entry(
+            key,
+            {
+                "model": last_chunk.model,
+                "system_fingerprint": last_chunk.system_fingerprint,
+                "message": AssistantPromptMessage(content="".join(chunks)).model_dump(mode="json"),
+                "usage": (last_chunk.delta.usage or LLMUsage.empty_usage()).model_dump(mode="json"),
+                "chunks": chunks,
+            },
+        )
+
+    @classmethod
+    def _replay(
+        cls, entry: dict, message: AssistantPromptMessage, prompt_messages: list[PromptMessage]
+    ) -> Generator[LLMResultChunk, None, None]:
+        chunks = entry["chunks"] or [""]
+        for index, content in enumerate(chunks):
+            is_last = index == len(chunks) - 1
+            yield LLMResultChunk(
+                model=entry["model"],
+                prompt_messages=prompt_messages,
+                system_fingerprint=entry["system_fingerprint"],
+                delta=LLMResultChunkDelta(
+                    index=index,
+                    message=AssistantPromptMessage(content=content, tool_calls=message.tool_calls if is_last else []),
+                    usage=LLMUsage.empty_usage() if is_last else None,
+                    finish_reason="stop" if is_last else None,
+                ),
+            )
+
+    @classmethod
+    def _get_entry(cls, key: str) -> Optional[dict[str, Any]]:
+        if dify_config.LLM_RESPONSE_CACHE_STORAGE == "local":
+            with cls._local_lock:
+                cached = cls._local.get(key)
+            if cached is None:
+                return None
+            expires_at, entry = cached
+            return entry if expires_at > time.time() else None
+
+        try:
+            cached = redis_client.get(key)
+        except Exception:
+            logger.warning("Failed to read llm response cache", exc_info=True)
+            return None
+        return None if cached is None else json.loads(cached)
+
+    @classmethod
+    def _set_entry(cls, key: str, entry: dict[str, Any]) -> None:
+        value = json.dumps(entry)
+        if len(value) > dify_config.LLM_RESPONSE_CACHE_MAX_ENTRY_SIZE:
+            return
+
+        if dify_config.LLM_RESPONSE_CACHE_STORAGE == "local":
+            with cls._local_lock:
+                cls._local.put(key, (time.time() + dify_config.LLM_RESPONSE_CACHE_TTL, entry))
+            return
+
+        try:
+            redis_client.setex(key, dify_config.LLM_RESPONSE_CACHE_TTL, value)
+        except Exception:
+            logger.warning("Failed to write llm response cache", exc_info=True)
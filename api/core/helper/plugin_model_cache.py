@@ -0,0 +1,111 @@
+import logging
+import time
+from threading import Lock
+from typing import Any, Optional
+
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class PluginModelCache:
+    """
+    Process-level cache of plugin model provider catalogs and model schemas.
+
+    Entries are bound to the plugin generation of the tenant, a counter kept in redis which is bumped whenever
+    plugins of the tenant are installed, upgraded or uninstalled, so every process drops its entries.
+    The generation itself is kept per process for PLUGIN_MODEL_CACHE_GENERATION_TTL seconds, so a lookup
+    usually does not read redis at all.
+    """
+
+    REDIS_KEY_PREFIX = "plugin_model_cache:generation:"
+
+    _cache = LRUCache(dify_config.PLUGIN_MODEL_CACHE_SIZE)
+    _generations = LRUCache(dify_config.PLUGIN_MODEL_CACHE_SIZE)
+    _lock = Lock()
+
+    @classmethod
+    def get(cls, tenant_id: str, key: str) -> Optional[Any]:
+        """
+        Get cached value
+
+        :param tenant_id: tenant id
+        :param key: cache key
+        :return: cached value, None if missing or stale
+        """
+        if not dify_config.PLUGIN_MODEL_CACHE_TTL:
+            return None
+
+        generation = cls._get_generation(tenant_id)
+        if generation is None:
+            return None
+
+        with cls._lock:
+            entry = cls._cache.get((tenant_id, key))
+        if entry is None:
+            return None
+
+        entry_generation, expires_at, value = entry
+        if entry_generation != generation or expires_at < time.monotonic():
+            return None
+
+        return value
+
+    @classmethod
+    def set(cls, tenant_id: str, key: str, value: Any) -> None:
+        """
+        Cache value for the current plugin generation of the tenant
+
+        :param tenant_id: tenant id
+        :param key: cache key
+        :param value: value
+        """
+        if not dify_config.PLUGIN_MODEL_CACHE_TTL:
+            return
+
+        generation = cls._get_generation(tenant_id)
+        if generation is None:
+            return
+
+        expires_at = time.monotonic() + dify_config.PLUGIN_MODEL_CACHE_TTL
+        with cls._lock:
+            cls._cache.put((tenant_id, key), (generation, expires_at, value))
+
+    @classmethod
+    def invalidate(cls, tenant_id: str) -> None:
+        """
+        Invalidate cached values of the tenant in all processes
+
+        :param tenant_id: tenant id
+        """
+        with cls._lock:
+            cls._generations.cache.pop(tenant_id, None)
+        try:
+            redis_client.incr(cls.REDIS_KEY_PREFIX + tenant_id)
+        except Exception:
+            logger.exception(f"Failed to invalidate plugin model cache of tenant {tenant_id}")
+
+    @classmethod
+    def _get_generation(cls, tenant_id: str) -> Optional[int]:
+        """
+        Get plugin generation of the tenant, None if it can not be read
+        """
+        now = time.monotonic()
+        with cls._lock:
+            entry: Optional[tuple[int, float]] = cls._generations.get(tenant_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        try:
+            cached = redis_client.get(cls.REDIS_KEY_PREFIX + tenant_id)
+        except Exception:
+            logger.warning(f"Failed to get plugin generation of tenant {tenant_id}, skip plugin model cache")
+            return None
+
+        generation = int(cached) if cached else 0
+        if dify_config.PLUGIN_MODEL_CACHE_GENERATION_TTL:
+            with cls._lock:
+                cls._generations.put(tenant_id, (generation, now + dify_config.PLUGIN_MODEL_CACHE_GENERATION_TTL))
+        return generation
@@ -2,6 +2,7 @@ import concurrent.futures
 import datetime
 import json
 import logging
+import queue
 import re
 import threading
 import time
@@ -38,6 +39,7 @@ from libs import helper
 from models.dataset import ChildChunk, Dataset, DatasetProcessRule, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from models.model import UploadFile
+from services.entities.knowledge_entities.knowledge_entities import ParentMode
 from services.feature_service import FeatureService
 
 
@@ -66,6 +68,11 @@ class IndexingRunner:
                     raise ValueError("no process rule found")
                 index_type = dataset_document.doc_form
                 index_processor = IndexProcessorFactory(index_type).init_index_processor()
+                if self._is_pipeline_supported(dataset_document, processing_rule.to_dict()):
+                    # extract, transform, save segment and load in overlapping stages
+                    self._run_pipeline(index_processor, dataset, dataset_document, processing_rule.to_dict())
+                    continue
+
                 # extract
                 text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
 
@@ -130,6 +137,11 @@ class IndexingRunner:
 
             index_type = dataset_document.doc_form
             index_processor = IndexProcessorFactory(index_type).init_index_processor()
+            if self._is_pipeline_supported(dataset_document, processing_rule.to_dict()):
+                # extract, transform, save segment and load in overlapping stages
+                self._run_pipeline(index_processor, dataset, dataset_document, processing_rule.to_dict())
+                return
+
             # extract
             text_docs = self._extract(index_processor, dataset_document, processing_rule.to_dict())
 
@@ -679,15 +691,10 @@ class IndexingRunner:
         DocumentSegment.query.filter_by(document_id=dataset_document_id).update(update_params)
         db.session.commit()
 
-    def _transform(
-        self,
-        index_processor: BaseIndexProcessor,
-        dataset: Dataset,
-        text_docs: list[Document],
-        doc_language: str,
-        process_rule: dict,
-    ) -> list[Document]:
-        # get embedding model instance
+    def _get_transform_embedding_model_instance(self, dataset: Dataset) -> Optional[ModelInstance]:
+        """
+        Get the embedding model instance used by the splitter to count tokens.
+        """
         embedding_model_instance = None
         if dataset.indexing_technique == "high_quality":
             if dataset.embedding_model_provider:
@@ -703,6 +710,19 @@ class IndexingRunner:
                     model_type=ModelType.TEXT_EMBEDDING,
                 )
 
+        return embedding_model_instance
+
+    def _transform(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        text_docs: list[Document],
+        doc_language: str,
+        process_rule: dict,
+    ) -> list[Document]:
+        # get embedding model instance
+        embedding_model_instance = self._get_transform_embedding_model_instance(dataset)
+
         documents = index_processor.transform(
             text_docs,
             embedding_model_instance=embedding_model_instance,
@@ -743,6 +763,322 @@ class IndexingRunner:
         )
         pass
 
+    @staticmethod
+    def _is_pipeline_supported(dataset_document: DatasetDocument, process_rule: dict) -> bool:
+        """
+        Check whether the document can be indexed by the streaming pipeline.
+        Full-doc parent-child indexing merges all extracted pages into a single parent chunk,
+        so it can not be split page by page and always runs stage by stage.
+        """
+        if not dify_config.INDEXING_PIPELINE_ENABLED:
+            return False
+        if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+            rules = process_rule.get("rules") or {}
+            return rules.get("parent_mode") != ParentMode.FULL_DOC
+        return True
+
+    def _run_pipeline(
+        self,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        process_rule: dict,
+    ) -> None:
+        """
+        Index the document with overlapping stages connected by bounded queues.
+        A splitter thread transforms the extracted pages into batches of segments,
+        the current thread saves each batch as segment rows, and the embedding and
+        keyword workers write the batch into the index as soon as it is saved.
+        """
+        flask_app = current_app._get_current_object()  # type: ignore
+        progress = IndexingPipelineProgress(document_id=dataset_document.id)
+
+        # extract
+        text_docs = self._extract(index_processor, dataset_document, process_rule)
+        progress.advance("extract", len(text_docs))
+        progress.complete("extract")
+
+        embedding_model_instance = None
+        if dataset.indexing_technique == "high_quality":
+            embedding_model_instance = self.model_manager.get_model_instance(
+                tenant_id=dataset.tenant_id,
+                provider=dataset.embedding_model_provider,
+                model_type=ModelType.TEXT_EMBEDDING,
+                model=dataset.embedding_model,
+            )
+
+        # transform in a separate thread, handing over batches of segments through a bounded queue
+        split_queue: queue.Queue = queue.Queue(maxsize=dify_config.INDEXING_PIPELINE_QUEUE_SIZE)
+        stop_event = threading.Event()
+        split_thread = threading.Thread(
+            target=self._pipeline_split,
+            args=(
+                flask_app,
+                index_processor,
+                dataset,
+                text_docs,
+                dataset_document.doc_language,
+                process_rule,
+                split_queue,
+                stop_event,
+                progress,
+            ),
+        )
+        doc_store = DatasetDocumentStore(
+            dataset=dataset, user_id=dataset_document.created_by, document_id=dataset_document.id
+        )
+        max_workers = 10
+        # Documents of each batch are distributed into groups based on the hash values of page_content,
+        # and each group has at most one chunk in flight, so that the same document is never loaded
+        # by multiple threads at once, thereby avoiding potential database insertion deadlocks
+        group_futures: list[Optional[tuple[concurrent.futures.Future, int]]] = [None] * max_workers
+        keyword_future: Optional[tuple[concurrent.futures.Future, int]] = None
+        # segments are completed by the embedding workers, or by the keyword worker for economy datasets
+        keyword_completes_segments = dataset.indexing_technique != "high_quality"
+        tokens = 0
+
+        indexing_start_at = time.perf_counter()
+        split_thread.start()
+        try:
+            with (
+                concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor,
+                concurrent.futures.ThreadPoolExecutor(max_workers=1) as keyword_executor,
+            ):
+                while True:
+                    documents = split_queue.get()
+                    if documents is None:
+                        break
+                    if isinstance(documents, Exception):
+                        raise documents
+
+                    # save segment
+                    self._check_document_paused_status(dataset_document.id)
+                    self._load_segments_batch(doc_store, dataset_document, documents, progress.count("save") == 0)
+                    progress.advance("save", len(documents))
+
+                    # load
+                    if dataset_document.doc_form != IndexType.PARENT_CHILD_INDEX:
+                        if keyword_future:
+                            self._wait_pipeline_future(keyword_future, progress, keyword_completes_segments)
+                        keyword_future = (
+                            keyword_executor.submit(
+                                self._process_keyword_index, flask_app, dataset.id, dataset_document.id, documents
+                            ),
+                            len(documents),
+                        )
+                    if dataset.indexing_technique == "high_quality":
+                        document_groups: list[list[Document]] = [[] for _ in range(max_workers)]
+                        for document in documents:
+                            hash = helper.generate_text_hash(document.page_content)
+                            document_groups[int(hash, 16) % max_workers].append(document)
+                        for group_index, chunk_documents in enumerate(document_groups):
+                            if not chunk_documents:
+                                continue
+                            tokens += self._submit_pipeline_chunk(
+                                executor,
+                                group_futures,
+                                group_index,
+                                flask_app,
+                                index_processor,
+                                chunk_documents,
+                                dataset,
+                                dataset_document,
+                                embedding_model_instance,
+                                progress,
+                            )
+                progress.complete("save")
+
+                for group_future in group_futures:
+                    if group_future:
+                        tokens += self._wait_pipeline_future(group_future, progress, True)
+                if keyword_future:
+                    self._wait_pipeline_future(keyword_future, progress, keyword_completes_segments)
+                progress.complete("index")
+        finally:
+            stop_event.set()
+            split_thread.join()
+        indexing_end_at = time.perf_counter()
+
+        # update document status to completed
+        self._update_document_index_status(
+            document_id=dataset_document.id,
+            after_indexing_status="completed",
+            extra_update_params={
+                DatasetDocument.tokens: tokens,
+                DatasetDocument.splitting_completed_at: progress.completed_at.get("split"),
+                DatasetDocument.completed_at: datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                DatasetDocument.indexing_latency: indexing_end_at - indexing_start_at,
+                DatasetDocument.error: None,
+            },
+        )
+
+    def _pipeline_split(
+        self,
+        flask_app,
+        index_processor: BaseIndexProcessor,
+        dataset: Dataset,
+        text_docs: list[Document],
+        doc_language: str,
+        process_rule: dict,
+        split_queue: queue.Queue,
+        stop_event: threading.Event,
+        progress: "IndexingPipelineProgress",
+    ) -> None:
+        with flask_app.app_context():
+            try:
+                embedding_model_instance = self._get_transform_embedding_model_instance(dataset)
+                batch_size = dify_config.INDEXING_PIPELINE_BATCH_SIZE
+                batch: list[Document] = []
+                # pop the pages in order, so that every page can be released once it is split
+                text_docs.reverse()
+                while text_docs:
+                    if stop_event.is_set():
+                        return
+                    documents = index_processor.transform(
+                        [text_docs.pop()],
+                        embedding_model_instance=embedding_model_instance,
+                        process_rule=process_rule,
+                        tenant_id=dataset.tenant_id,
+                        doc_language=doc_language,
+                    )
+                    batch.extend(documents)
+                    while len(batch) >= batch_size:
+                        if not self._put_pipeline_item(split_queue, stop_event, batch[:batch_size]):
+                            return
+                        progress.advance("split", batch_size)
+                        batch = batch[batch_size:]
+                if batch:
+                    if not self._put_pipeline_item(split_queue, stop_event, batch):
+                        return
+                    progress.advance("split", len(batch))
+                progress.complete("split")
+                self._put_pipeline_item(split_queue, stop_event, None)
+            except Exception as e:
+                self._put_pipeline_item(split_queue, stop_event, e)
+
+    @staticmethod
+    def _put_pipeline_item(pipeline_queue: queue.Queue, stop_event: threading.Event, item: Any) -> bool:
+        """
+        Put the item into the bounded queue, giving up once the consumer has stopped.
+        """
+        while not stop_event.is_set():
+            try:
+                pipeline_queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _load_segments_batch(
+        self,
+        doc_store: DatasetDocumentStore,
+        dataset_document: DatasetDocument,
+        documents: list[Document],
+        is_first_batch: bool,
+    ) -> None:
+        # save node to document segment
+        doc_store.add_documents(docs=documents, save_child=dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX)
+
+        cur_time = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+        if is_first_batch:
+            # update document status to indexing
+            self._update_document_index_status(
+                document_id=dataset_document.id,
+                after_indexing_status="indexing",
+                extra_update_params={
+                    DatasetDocument.cleaning_completed_at: cur_time,
+                },
+            )
+
+        # update segment status to indexing
+        document_ids = [document.metadata["doc_id"] for document in documents]
+        DocumentSegment.query.filter(
+            DocumentSegment.document_id == dataset_document.id,
+            DocumentSegment.index_node_id.in_(document_ids),
+        ).update(
+            {
+                DocumentSegment.status: "indexing",
+                DocumentSegment.indexing_at: cur_time,
+            }
+        )
+        db.session.commit()
+
+    def _submit_pipeline_chunk(
+        self,
+        executor: concurrent.futures.ThreadPoolExecutor,
+        group_futures: list[Optional[tuple[concurrent.futures.Future, int]]],
+        group_index: int,
+        flask_app,
+        index_processor: BaseIndexProcessor,
+        chunk_documents: list[Document],
+        dataset: Dataset,
+        dataset_document: DatasetDocument,
+        embedding_model_instance: Optional[ModelInstance],
+        progress: "IndexingPipelineProgress",
+    ) -> int:
+        """
+        Submit a chunk of the group after the previous chunk of the same group has been loaded,
+        return the tokens of the previous chunk.
+        """
+        tokens = 0
+        previous_future = group_futures[group_index]
+        if previous_future:
+            tokens = self._wait_pipeline_future(previous_future, progress, True)
+        future = executor.submit(
+            self._process_chunk,
+            flask_app,
+            index_processor,
+            chunk_documents,
+            dataset,
+            dataset_document,
+            embedding_model_instance,
+        )
+        group_futures[group_index] = (future, len(chunk_documents))
+        return tokens
+
+    @staticmethod
+    def _wait_pipeline_future(
+        pipeline_future: tuple[concurrent.futures.Future, int],
+        progress: "IndexingPipelineProgress",
+        completes_segments: bool,
+    ) -> int:
+        """
+        Wait for a batch submitted to the load workers, return the tokens it consumed.
+        """
+        future, segment_count = pipeline_future
+        tokens = future.result()
+        if completes_segments:
+            progress.advance("index", segment_count)
+        return tokens or 0
+
+
+class IndexingPipelineProgress:
+    """
+    Per stage progress of the streaming indexing pipeline, shared by the pipeline threads.
+    """
+
+    STAGES = ("extract", "split", "save", "index")
+
+    def __init__(self, document_id: str):
+        self.document_id = document_id
+        self.counts: dict[str, int] = dict.fromkeys(self.STAGES, 0)
+        self.completed_at: dict[str, datetime.datetime] = {}
+        self._lock = threading.Lock()
+
+    def count(self, stage: str) -> int:
+        with self._lock:
+            return self.counts[stage]
+
+    def advance(self, stage: str, count: int) -> None:
+        with self._lock:
+            self.counts[stage] += count
+            logging.debug("Document %s indexing %s progress: %s", self.document_id, stage, self.counts)
+
+    def complete(self, stage: str) -> None:
+        with self._lock:
+            self.completed_at[stage] = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+            logging.info("Document %s indexing %s completed: %s", self.document_id, stage, self.counts)
+
 
 class DocumentIsPausedError(Exception):
     pass
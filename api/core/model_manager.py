@@ -7,6 +7,7 @@ from core.entities.embedding_type import EmbeddingInputType
 from core.entities.provider_configuration import ProviderConfiguration, ProviderModelBundle
 from core.entities.provider_entities import ModelLoadBalancingConfiguration
 from core.errors.error import ProviderTokenNotInitError
+from core.helper.llm_response_cache import LLMResponseCache
 from core.model_runtime.callbacks.base_callback import Callback
 from core.model_runtime.entities.llm_entities import LLMResult
 from core.model_runtime.entities.message_entities import PromptMessage, PromptMessageTool
@@ -108,6 +109,7 @@ class ModelInstance:
         stream: Literal[True] = True,
         user: Optional[str] = None,
         callbacks: Optional[list[Callback]] = None,
+        response_cache: bool = False,
     ) -> Generator: ...
 
     @overload
@@ -120,6 +122,7 @@ class ModelInstance:
         stream: Literal[False] = False,
         user: Optional[str] = None,
         callbacks: Optional[list[Callback]] = None,
+        response_cache: bool = False,
     ) -> LLMResult: ...
 
     @overload
@@ -132,6 +135,7 @@ class ModelInstance:
         stream: bool = True,
         user: Optional[str] = None,
         callbacks: Optional[list[Callback]] = None,
+        response_cache: bool = False,
     ) -> Union[LLMResult, Generator]: ...
 
     def invoke_llm(
@@ -143,6 +147,7 @@ class ModelInstance:
         stream: bool = True,
         user: Optional[str] = None,
         callbacks: Optional[list[Callback]] = None,
+        response_cache: bool = False,
     ) -> Union[LLMResult, Generator]:
         """
         Invoke large language model
@@ -154,13 +159,30 @@ class ModelInstance:
         :param stream: is stream response
         :param user: unique user id
         :param callbacks: callbacks
+        :param response_cache: reuse the response of an identical invocation with temperature 0
         :return: full response or stream response chunk generator result
         """
         if not isinstance(self.model_type_instance, LargeLanguageModel):
             raise Exception("Model type instance is not LargeLanguageModel")
 
+        cache_key = None
+        if response_cache:
+            cache_key = LLMResponseCache.get_key(
+                tenant_id=self.provider_model_bundle.configuration.tenant_id,
+                provider=self.provider,
+                model=self.model,
+                prompt_messages=prompt_messages,
+                model_parameters=model_parameters,
+                tools=tools,
+                stop=stop,
+            )
+        if cache_key:
+            cached_result = LLMResponseCache.get(cache_key, prompt_messages, stream)
+            if cached_result is not None:
+                return cached_result
+
         self.model_type_instance = cast(LargeLanguageModel, self.model_type_instance)
-        return cast(
+        result = cast(
             Union[LLMResult, Generator],
             self._round_robin_invoke(
                 function=self.model_type_instance.invoke,
@@ -175,6 +197,12 @@ class ModelInstance:
                 callbacks=callbacks,
             ),
         )
+        if cache_key:
+            if isinstance(result, LLMResult):
+                LLMResponseCache.set(cache_key, result)
+            else:
+                result = LLMResponseCache.record(cache_key, result)
+        return result
 
     def get_llm_num_tokens(
         self, prompt_messages: list[PromptMessage], tools: Optional[list[PromptMessageTool]] = None
@@ -6,6 +6,7 @@ from typing import Optional
 from pydantic import BaseModel, ConfigDict, Field
 
 import contexts
+from core.helper.plugin_model_cache import PluginModelCache
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.defaults import PARAMETER_RULE_TEMPLATE
 from core.model_runtime.entities.model_entities import (
@@ -157,6 +158,11 @@ class AIModel(BaseModel):
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
+            schema: Optional[AIModelEntity] = PluginModelCache.get(self.tenant_id, f"schema:{cache_key}")
+            if schema:
+                contexts.plugin_model_schemas.get()[cache_key] = schema
+                return schema
+
             schema = plugin_model_manager.get_model_schema(
                 tenant_id=self.tenant_id,
                 user_id="unknown",
@@ -169,6 +175,7 @@ class AIModel(BaseModel):
 
             if schema:
                 contexts.plugin_model_schemas.get()[cache_key] = schema
+                PluginModelCache.set(self.tenant_id, f"schema:{cache_key}", schema)
 
             return schema
 
@@ -19,7 +19,9 @@ from core.model_runtime.entities.model_entities import (
     PriceType,
 )
 from core.model_runtime.model_providers.__base.ai_model import AIModel
+from core.model_runtime.model_providers.__base.tokenizers.token_counter import PromptTokenCounter
 from core.plugin.manager.model import PluginModelManager
+from libs import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -193,6 +195,16 @@ class LargeLanguageModel(AIModel):
                 callbacks=callbacks,
             )
         elif isinstance(result, LLMResult):
+            # the whole result is the first token of blocking invocations
+            elapsed = time.perf_counter() - self.started_at
+            metrics.observe_llm_invoke(
+                provider=self.provider_name,
+                model=model,
+                stream=False,
+                first_token_seconds=elapsed,
+                completion_tokens=result.usage.completion_tokens,
+                seconds=elapsed,
+            )
             self._trigger_after_invoke_callbacks(
                 model=model,
                 result=result,
@@ -232,9 +244,13 @@ class LargeLanguageModel(AIModel):
         usage = None
         system_fingerprint = None
         real_model = model
+        first_token_at = None
 
         try:
             for chunk in result:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+
                 yield chunk
 
                 self._trigger_new_chunk_callbacks(
@@ -260,6 +276,16 @@ class LargeLanguageModel(AIModel):
         except Exception as e:
             raise self._transform_invoke_error(e)
 
+        if first_token_at is not None:
+            metrics.observe_llm_invoke(
+                provider=self.provider_name,
+                model=model,
+                stream=True,
+                first_token_seconds=first_token_at - self.started_at,
+                completion_tokens=usage.completion_tokens if usage else 0,
+                seconds=time.perf_counter() - first_token_at,
+            )
+
         self._trigger_after_invoke_callbacks(
             model=model,
             result=LLMResult(
@@ -295,17 +321,28 @@ class LargeLanguageModel(AIModel):
         :param tools: tools for tool calling
         :return:
         """
-        plugin_model_manager = PluginModelManager()
-        return plugin_model_manager.get_llm_num_tokens(
-            tenant_id=self.tenant_id,
-            user_id="unknown",
-            plugin_id=self.plugin_id,
-            provider=self.provider_name,
-            model_type=self.model_type.value,
+
+        def count_by_plugin() -> int:
+            plugin_model_manager = PluginModelManager()
+            return plugin_model_manager.get_llm_num_tokens(
+                tenant_id=self.tenant_id,
+                user_id="unknown",
+                plugin_id=self.plugin_id,
+                provider=self.provider_name,
+                model_type=self.model_type.value,
+                model=model,
+                credentials=credentials,
+                prompt_messages=prompt_messages,
+                tools=tools,
+            )
+
+        return PromptTokenCounter.get_num_tokens(
+            provider=f"{self.plugin_id}/{self.provider_name}",
             model=model,
             credentials=credentials,
             prompt_messages=prompt_messages,
             tools=tools,
+            count_by_plugin=count_by_plugin,
         )
 
     def _calc_response_usage(
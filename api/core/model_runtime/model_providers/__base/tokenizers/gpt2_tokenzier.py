@@ -2,6 +2,8 @@ import logging
 from threading import Lock
 from typing import Any
 
+from core.helper.cpu_offload import run_cpu_bound
+
 logger = logging.getLogger(__name__)
 
 _tokenizer: Any = None
@@ -18,14 +20,24 @@ class GPT2Tokenizer:
         tokens = _tokenizer.encode(text)
         return len(tokens)
 
+    @staticmethod
+    def _get_num_tokens_list_by_gpt2(texts: list[str]) -> list[int]:
+        """
+        use gpt2 tokenizer to get num tokens of each text
+        """
+        _tokenizer = GPT2Tokenizer.get_encoder()
+        return [len(_tokenizer.encode(text)) for text in texts]
+
     @staticmethod
     def get_num_tokens(text: str) -> int:
-        # Because this process needs more cpu resource, we turn this back before we find a better way to handle it.
-        #
-        # future = _executor.submit(GPT2Tokenizer._get_num_tokens_by_gpt2, text)
-        # result = future.result()
-        # return cast(int, result)
-        return GPT2Tokenizer._get_num_tokens_by_gpt2(text)
+        # large texts are encoded out of the gevent hub, so they do not stall other requests
+        return run_cpu_bound(GPT2Tokenizer._get_num_tokens_by_gpt2, text, input_size=len(text))
+
+    @staticmethod
+    def get_num_tokens_list(texts: list[str]) -> list[int]:
+        return run_cpu_bound(
+            GPT2Tokenizer._get_num_tokens_list_by_gpt2, texts, input_size=sum(len(text) for text in texts)
+        )
 
     @staticmethod
     def get_encoder() -> Any:
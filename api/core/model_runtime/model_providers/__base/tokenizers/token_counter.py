@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+from collections.abc import Callable, Sequence
+from threading import Lock
+from typing import Any, Optional
+
+from configs import dify_config
+from core.helper.cpu_offload import run_cpu_bound
+from core.helper.lru_cache import LRUCache
+from core.model_runtime.entities.message_entities import (
+    AssistantPromptMessage,
+    PromptMessage,
+    PromptMessageTool,
+    TextPromptMessageContent,
+)
+from core.model_runtime.model_providers.__base.tokenizers.gpt2_tokenzier import GPT2Tokenizer
+from libs import metrics
+
+logger = logging.getLogger(__name__)
+
+GPT2_ENCODING = "gpt2"
+
+# tokens added to every message and to the reply by chat models, see
+# https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_tokens_with_tiktoken.ipynb
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+_encodings: dict[str, Any] = {}
+_encodings_lock = Lock()
+
+
+def _get_encoding(encoding_name: str) -> Optional[Any]:
+    """
+    Get the tiktoken encoding, None if it can not be loaded, e.g. when its files can not be downloaded
+    """
+    with _encodings_lock:
+        if encoding_name in _encodings:
+            return _encodings[encoding_name]
+
+    # loading may download the encoding files, so it's done out of the lock and concurrent loads keep the first one
+    encoding: Optional[Any]
+    try:
+        if encoding_name == GPT2_ENCODING:
+            encoding = GPT2Tokenizer.get_encoder()
+        else:
+            import tiktoken
+
+            encoding = tiktoken.get_encoding(encoding_name)
+    except Exception:
+        logger.warning("Failed to load tokenizer %s, tokens are counted by the plugin", encoding_name)
+        encoding = None
+
+    with _encodings_lock:
+        return _encodings.setdefault(encoding_name, encoding)
+
+
+def _count_texts(encoding_name: str, texts: list[str]) -> list[int]:
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        raise ValueError(f"Tokenizer {encoding_name} is not available")
+    return [len(encoding.encode(text)) for text in texts]
+
+
+class PromptTokenCounter:
+    """
+    Counts tokens of prompt messages without a plugin daemon request where possible.
+
+    Models known to tiktoken are counted with their tokenizer locally, each message is counted once and memoized
+    by its content hash, so counting a growing or shrinking conversation only encodes the changed messages.
+    Counts of the plugin daemon are memoized by the hash of the whole request.
+    """
+
+    _counts = LRUCache(dify_config.LLM_TOKEN_COUNT_CACHE_SIZE)
+    _lock = Lock()
+
+    @classmethod
+    def get_num_tokens(
+        cls,
+        provider: str,
+        model: str,
+        credentials: dict,
+        prompt_messages: Sequence[PromptMessage],
+        tools: Optional[Sequence[PromptMessageTool]],
+        count_by_plugin: Callable[[], int],
+    ) -> int:
+        """
+        Get number of tokens of the prompt messages
+
+        :param provider: plugin and name of the model provider
+        :param model: model name
+        :param credentials: model credentials
+        :param prompt_messages: prompt messages
+        :param tools: tools for tool calling
+        :param count_by_plugin: ask the model plugin through the plugin daemon
+        :return: number of tokens
+        """
+        mode = dify_config.LLM_TOKEN_COUNT_MODE
+        if mode != "exact":
+            encoding_name = cls._get_local_encoding_name(model, estimate=mode == "estimate")
+            if encoding_name and (mode == "estimate" or all(_is_text_only(message) for message in prompt_messages)):
+                metrics.inc_llm_token_count_daemon_calls_avoided("local_tokenizer")
+                return cls._count_locally(encoding_name, prompt_messages, tools)
+
+        key = ("plugin", _hash_request(provider, model, credentials, prompt_messages, tools))
+        with cls._lock:
+            num_tokens: Optional[int] = cls._counts.get(key)
+        if num_tokens is not None:
+            metrics.inc_llm_token_count_daemon_calls_avoided("cache")
+            return num_tokens
+
+        num_tokens = count_by_plugin()
+        with cls._lock:
+            cls._counts.put(key, num_tokens)
+        return num_tokens
+
+    @classmethod
+    def _get_local_encoding_name(cls, model: str, estimate: bool) -> Optional[str]:
+        try:
+            import tiktoken
+
+            encoding_name = tiktoken.encoding_name_for_model(model)
+        except (ImportError, KeyError):
+            encoding_name = None
+
+        if encoding_name and _get_encoding(encoding_name) is not None:
+            return encoding_name
+        if estimate and _get_encoding(GPT2_ENCODING) is not None:
+            return GPT2_ENCODING
+        return None
+
+    @classmethod
+    def _count_locally(
+        cls,
+        encoding_name: str,
+        prompt_messages: Sequence[PromptMessage],
+        tools: Optional[Sequence[PromptMessageTool]],
+    ) -> int:
+        keys = [(encoding_name, _hash(message.model_dump_json(serialize_as_any=True))) for message in prompt_messages]
+        with cls._lock:
+            counts = [cls._counts.get(key) for key in keys]
+
+        missing = [index for index, count in enumerate(counts) if count is None]
+        if missing:
+            texts = [_get_message_text(prompt_messages[index]) for index in missing]
+            missing_counts = run_cpu_bound(
+                _count_texts, encoding_name, texts, input_size=sum(len(text) for text in texts)
+            )
+            with cls._lock:
+                for index, count in zip(missing, missing_counts):
+                    counts[index] = count + TOKENS_PER_MESSAGE
+                    cls._counts.put(keys[index], counts[index])
+
+        num_tokens: int = sum(counts) + TOKENS_PER_REPLY
+        if tools:
+            tools_text = json.dumps([tool.model_dump() for tool in tools], ensure_ascii=False)
+            num_tokens += _count_texts(encoding_name, [tools_text])[0]
+        return num_tokens
+
+
+def _is_text_only(message: PromptMessage) -> bool:
+    if message.content is None or isinstance(message.content, str):
+        return True
+    return all(isinstance(content, TextPromptMessageContent) for content in message.content)
+
+
+def _get_message_text(message: PromptMessage) -> str:
+    """
+    Text of the message which is tokenized, multi-modal contents are ignored
+    """
+    parts = [message.role.value]
+    if isinstance(message.content, str):
+        parts.append(message.content)
+    elif message.content:
+        parts.extend(content.data for content in message.content if isinstance(content, TextPromptMessageContent))
+    if message.name:
+        parts.append(message.name)
+    if isinstance(message, AssistantPromptMessage):
+        for tool_call in message.tool_calls:
+            parts.append(tool_call.function.name)
+            parts.append(tool_call.function.arguments)
+    return "\n".join(parts)
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _hash_request(
+    provider: str,
+    model: str,
+    credentials: dict,
+    prompt_messages: Sequence[PromptMessage],
+    tools: Optional[Sequence[PromptMessageTool]],
+) -> str:
+    request = {
+        "provider": provider,
+        "model": model,
+        "credentials": credentials,
+        "prompt_messages": [message.model_dump(mode="json", serialize_as_any=True) for message in prompt_messages],
+        "tools": [tool.model_dump(mode="json") for tool in tools or []],
+    }
+    return _hash(json.dumps(request, sort_keys=True, default=str))
@@ -8,6 +8,7 @@ from typing import Optional
 from pydantic import BaseModel
 
 import contexts
+from core.helper.plugin_model_cache import PluginModelCache
 from core.helper.position_helper import get_provider_position_map, sort_to_dict_by_position_map
 from core.model_runtime.entities.model_entities import AIModelEntity, ModelType
 from core.model_runtime.entities.provider_entities import ProviderConfig, ProviderEntity, SimpleProviderEntity
@@ -88,6 +89,14 @@ class ModelProviderFactory:
             if plugin_model_providers is not None:
                 return plugin_model_providers
 
+            # Fetch plugin model providers from the process cache, shared across requests
+            cached_providers: Optional[list[PluginModelProviderEntity]] = PluginModelCache.get(
+                self.tenant_id, "providers"
+            )
+            if cached_providers is not None:
+                contexts.plugin_model_providers.set(cached_providers)
+                return cached_providers
+
             plugin_model_providers = []
             contexts.plugin_model_providers.set(plugin_model_providers)
 
@@ -98,6 +107,8 @@ class ModelProviderFactory:
                 provider.declaration.provider = provider.plugin_id + "/" + provider.declaration.provider
                 plugin_model_providers.append(provider)
 
+            PluginModelCache.set(self.tenant_id, "providers", plugin_model_providers)
+
             return plugin_model_providers
 
     def get_provider_schema(self, provider: str) -> ProviderEntity:
@@ -222,6 +233,11 @@ class ModelProviderFactory:
             if cache_key in contexts.plugin_model_schemas.get():
                 return contexts.plugin_model_schemas.get()[cache_key]
 
+            cached_schema: Optional[AIModelEntity] = PluginModelCache.get(self.tenant_id, f"schema:{cache_key}")
+            if cached_schema:
+                contexts.plugin_model_schemas.get()[cache_key] = cached_schema
+                return cached_schema
+
             schema = self.plugin_model_manager.get_model_schema(
                 tenant_id=self.tenant_id,
                 user_id="unknown",
@@ -234,6 +250,7 @@ class ModelProviderFactory:
 
             if schema:
                 contexts.plugin_model_schemas.get()[cache_key] = schema
+                PluginModelCache.set(self.tenant_id, f"schema:{cache_key}", schema)
 
             return schema
 
@@ -800,6 +800,8 @@ class TraceQueueManager:
 
     def send_to_celery(self, tasks: list[TraceTask]):
         with self.flask_app.app_context():
+            files: dict[str, bytes] = {}
+            file_infos: list[dict[str, str]] = []
             for task in tasks:
                 if task.app_id is None:
                     continue
@@ -811,9 +813,9 @@ class TraceQueueManager:
                     trace_info=trace_info.model_dump() if trace_info else None,
                 )
                 file_path = f"{OPS_FILE_PATH}{task.app_id}/{file_id}.json"
-                storage.save(file_path, task_data.model_dump_json().encode("utf-8"))
-                file_info = {
-                    "file_id": file_id,
-                    "app_id": task.app_id,
-                }
+                files[file_path] = task_data.model_dump_json().encode("utf-8")
+                file_infos.append({"file_id": file_id, "app_id": task.app_id})
+
+            storage.save_many(files)
+            for file_info in file_infos:
                 process_trace_tasks.delay(file_info)
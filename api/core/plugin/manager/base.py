@@ -1,11 +1,15 @@
 import inspect
 import json
 import logging
+import os
+import time
 from collections.abc import Callable, Generator
-from typing import TypeVar
+from threading import Lock
+from typing import Any, Optional, TypeVar
 
 import requests
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from requests.adapters import HTTPAdapter
 from yarl import URL
 
 from configs import dify_config
@@ -28,6 +32,7 @@ from core.plugin.manager.exc import (
     PluginPermissionDeniedError,
     PluginUniqueIdentifierError,
 )
+from libs import metrics
 
 plugin_daemon_inner_api_baseurl = dify_config.PLUGIN_DAEMON_URL
 plugin_daemon_inner_api_key = dify_config.PLUGIN_DAEMON_KEY
@@ -38,6 +43,40 @@ logger = logging.getLogger(__name__)
 
 
 class BasePluginManager:
+    _session: Optional[requests.Session] = None
+    _session_pid: Optional[int] = None
+    _session_lock = Lock()
+    _type_adapters: dict[Any, TypeAdapter] = {}
+
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """
+        Get the keep-alive session to the plugin daemon shared by the process.
+        A forked process creates its own session instead of sharing the connections of its parent.
+        """
+        pid = os.getpid()
+        if cls._session is None or cls._session_pid != pid:
+            with cls._session_lock:
+                if cls._session is None or cls._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_maxsize=dify_config.PLUGIN_DAEMON_POOL_MAXSIZE)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    cls._session = session
+                    cls._session_pid = pid
+        return cls._session
+
+    @classmethod
+    def _get_response_type_adapter(cls, type: Any) -> TypeAdapter:
+        """
+        Get the adapter of the plugin daemon response with data of the type, building it once per type
+        """
+        type_adapter = cls._type_adapters.get(type)
+        if type_adapter is None:
+            type_adapter = TypeAdapter(PluginDaemonBasicResponse[type])  # type: ignore
+            cls._type_adapters[type] = type_adapter
+        return type_adapter
+
     def _request(
         self,
         method: str,
@@ -59,13 +98,16 @@ class BasePluginManager:
         if headers.get("Content-Type") == "application/json" and isinstance(data, dict):
             data = json.dumps(data)
 
+        start_at = time.perf_counter()
         try:
-            response = requests.request(
+            response = self._get_session().request(
                 method=method, url=str(url), headers=headers, data=data, params=params, stream=stream, files=files
             )
         except requests.exceptions.ConnectionError:
             logger.exception("Request to Plugin Daemon Service failed")
             raise PluginDaemonInnerError(code=-500, message="Request to Plugin Daemon Service failed")
+        finally:
+            metrics.observe_plugin_daemon_request(method, path, time.perf_counter() - start_at)
 
         return response
 
@@ -82,12 +124,16 @@ class BasePluginManager:
         Make a stream request to the plugin daemon inner API
         """
         response = self._request(method, path, headers, data, params, files, stream=True)
-        for line in response.iter_lines():
-            line = line.decode("utf-8").strip()
-            if line.startswith("data:"):
-                line = line[5:].strip()
-            if line:
-                yield line
+        try:
+            for line in response.iter_lines():
+                line = line.decode("utf-8").strip()
+                if line.startswith("data:"):
+                    line = line[5:].strip()
+                if line:
+                    yield line
+        finally:
+            # release the connection back to the pool even if the stream is not fully consumed
+            response.close()
 
     def _stream_request_with_model(
         self,
@@ -167,14 +213,18 @@ class BasePluginManager:
         """
         Make a stream request to the plugin daemon inner API and yield the response as a model.
         """
+        type_adapter = self._get_response_type_adapter(type)
         for line in self._stream_request(method, path, params, headers, data, files):
-            line_data = None
             try:
-                line_data = json.loads(line)
-                rep = PluginDaemonBasicResponse[type](**line_data)  # type: ignore
+                # parse and validate the line in a single pass, without building a python dict first
+                rep = type_adapter.validate_json(line)
             except Exception:
                 # TODO modify this when line_data has code and message
-                if line_data and "error" in line_data:
+                try:
+                    line_data = json.loads(line)
+                except ValueError:
+                    line_data = None
+                if isinstance(line_data, dict) and "error" in line_data:
                     raise ValueError(line_data["error"])
                 else:
                     raise ValueError(line)
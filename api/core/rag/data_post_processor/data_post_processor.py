@@ -9,6 +9,7 @@ from core.rag.rerank.entity.weight import KeywordSetting, VectorSetting, Weights
 from core.rag.rerank.rerank_base import BaseRerankRunner
 from core.rag.rerank.rerank_factory import RerankRunnerFactory
 from core.rag.rerank.rerank_type import RerankMode
+from libs import metrics
 
 
 class DataPostProcessor:
@@ -34,7 +35,8 @@ class DataPostProcessor:
         user: Optional[str] = None,
     ) -> list[Document]:
         if self.rerank_runner:
-            documents = self.rerank_runner.run(query, documents, score_threshold, top_n, user)
+            with metrics.time_retrieval_stage("rerank"):
+                documents = self.rerank_runner.run(query, documents, score_threshold, top_n, user)
 
         if self.reorder_runner:
             documents = self.reorder_runner.run(documents)
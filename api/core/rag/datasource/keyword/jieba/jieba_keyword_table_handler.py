@@ -1,6 +1,8 @@
 import re
 from typing import Optional, cast
 
+from core.helper.cpu_offload import run_cpu_bound
+
 
 class JiebaKeywordTableHandler:
     def __init__(self):
@@ -11,7 +13,10 @@ class JiebaKeywordTableHandler:
         jieba.analyse.default_tfidf.stop_words = STOPWORDS  # type: ignore
 
     def extract_keywords(self, text: str, max_keywords_per_chunk: Optional[int] = 10) -> set[str]:
-        """Extract keywords with JIEBA tfidf."""
+        """Extract keywords with JIEBA tfidf, out of the gevent hub for large texts."""
+        return run_cpu_bound(_extract_keywords, text, max_keywords_per_chunk, input_size=len(text))
+
+    def _extract_keywords(self, text: str, max_keywords_per_chunk: Optional[int] = 10) -> set[str]:
         import jieba.analyse  # type: ignore
 
         keywords = jieba.analyse.extract_tags(
@@ -35,3 +40,7 @@ class JiebaKeywordTableHandler:
                 results.update({w for w in sub_tokens if w not in list(STOPWORDS)})
 
         return results
+
+
+def _extract_keywords(text: str, max_keywords_per_chunk: Optional[int]) -> set[str]:
+    return JiebaKeywordTableHandler()._extract_keywords(text, max_keywords_per_chunk)
@@ -15,6 +15,7 @@ from core.rag.models.document import Document
 from core.rag.rerank.rerank_type import RerankMode
 from core.rag.retrieval.retrieval_methods import RetrievalMethod
 from extensions.ext_database import db
+from libs import metrics
 from models.dataset import ChildChunk, Dataset, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from services.external_knowledge_service import ExternalDatasetService
@@ -151,9 +152,10 @@ class RetrievalService:
 
                 keyword = Keyword(dataset=dataset)
 
-                documents = keyword.search(
-                    cls.escape_query_for_search(query), top_k=top_k, document_ids_filter=document_ids_filter
-                )
+                with metrics.time_retrieval_stage("keyword_search"):
+                    documents = keyword.search(
+                        cls.escape_query_for_search(query), top_k=top_k, document_ids_filter=document_ids_filter
+                    )
                 all_documents.extend(documents)
             except Exception as e:
                 exceptions.append(str(e))
@@ -266,6 +268,11 @@ class RetrievalService:
     @classmethod
     def format_retrieval_documents(cls, documents: list[Document]) -> list[RetrievalSegments]:
         """Format retrieval documents with optimized batch processing"""
+        with metrics.time_retrieval_stage("hydrate"):
+            return cls._format_retrieval_documents(documents)
+
+    @classmethod
+    def _format_retrieval_documents(cls, documents: list[Document]) -> list[RetrievalSegments]:
         if not documents:
             return []
 
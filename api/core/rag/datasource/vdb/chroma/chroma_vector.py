@@ -93,6 +93,13 @@ class ChromaVector(BaseVector):
         response = collection.get(ids=[id])
         return len(response) > 0
 
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        collection = self._client.get_or_create_collection(self._collection_name)
+        response = collection.get(ids=ids, include=[])
+        return set(response["ids"])
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         collection = self._client.get_or_create_collection(self._collection_name)
         document_ids_filter = kwargs.get("document_ids_filter")
@@ -0,0 +1,618 @@
+import io
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import uuid
+from collections import Counter
+from collections.abc import Callable
+from threading import Lock
+from typing import Any, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
+from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_factory import AbstractVectorFactory
+from core.rag.datasource.vdb.vector_type import VectorType
+from core.rag.embedding.embedding_base import Embeddings
+from core.rag.models.document import Document
+from extensions.ext_redis import redis_client
+from extensions.ext_storage import storage
+from models.dataset import Dataset
+
+logger = logging.getLogger(__name__)
+
+# cjk characters are indexed one by one, other words as a whole
+_TOKEN_PATTERN = re.compile(r"[぀-ヿ㐀-鿿가-힯]|[^\W぀-ヿ㐀-鿿가-힯]+")
+
+# rows of the vector matrix multiplied at once when assigning vectors to ivf lists
+_ASSIGN_BATCH_SIZE = 8192
+
+# seconds the lock of a collection is held for by a write, renewed before each step of the write
+_LOCK_TIMEOUT = 60
+# rows a write at least loads, indexes or saves per second, so the lock is held longer for larger collections
+_LOCK_ROWS_PER_SECOND = 10000
+
+# segments and tombstones are compacted into a new base once there are this many of them,
+# or once the segments hold more rows than the base
+_COMPACT_MAX_SEGMENTS = 32
+_COMPACT_MAX_DELETED_IDS = 10000
+_COMPACT_MIN_SEGMENT_SIZE = 1000
+
+
+class LocalVectorConfig(BaseModel):
+    cache_dir: str
+    ivf_min_size: int
+    ivf_nprobe: int
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    normalized: np.ndarray = (vectors / norms).astype(np.float32)
+    return normalized
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _train_ivf(vectors: np.ndarray, nlist: int) -> np.ndarray:
+    """
+    Train the centroids of the ivf lists with spherical k-means on a sample of the normalized vectors
+    """
+    rng = np.random.default_rng(0)
+    sample_size = min(len(vectors), nlist * 64)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids: np.ndarray = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(10):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        # lists left empty keep their previous centroid
+        non_empty = np.any(sums != 0, axis=1)
+        centroids[non_empty] = _normalize(sums[non_empty])
+    return centroids
+
+
+def _lock_timeout(size: int) -> int:
+    return _LOCK_TIMEOUT + math.ceil(size / _LOCK_ROWS_PER_SECOND)
+
+
+def _assign_ivf(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_BATCH_SIZE):
+        batch = np.asarray(vectors[start : start + _ASSIGN_BATCH_SIZE])
+        assignments[start : start + len(batch)] = np.argmax(batch @ centroids.T, axis=1)
+    return assignments
+
+
+class _LocalIndex:
+    """
+    Immutable snapshot of a collection, the vector matrix is memory-mapped from the local cache directory.
+    """
+
+    def __init__(
+        self,
+        version: Optional[str],
+        vectors: np.ndarray,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[dict],
+        centroids: Optional[np.ndarray] = None,
+        assignments: Optional[np.ndarray] = None,
+        ivf_trained_size: int = 0,
+    ):
+        self.version = version
+        self.vectors = vectors
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.centroids = centroids
+        self.assignments = assignments
+        self.ivf_trained_size = ivf_trained_size
+        self.positions = {id: position for position, id in enumerate(ids)}
+        self.document_ids = np.array([metadata.get("document_id") for metadata in metadatas], dtype=object)
+
+        self._list_rows: Optional[np.ndarray] = None
+        self._list_bounds: Optional[np.ndarray] = None
+        if centroids is not None and assignments is not None:
+            self._list_rows = np.argsort(assignments, kind="stable")
+            self._list_bounds = np.searchsorted(assignments[self._list_rows], np.arange(len(centroids) + 1))
+
+        self._tokens_lock = Lock()
+        self._tokens: Optional[list[Counter[str]]] = None
+        self._document_frequencies: Optional[Counter[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.vectors.shape[1] if self.vectors.ndim == 2 and self.vectors.shape[1] else None
+
+    def probe(self, query: np.ndarray, nprobe: int) -> Optional[np.ndarray]:
+        """
+        Rows in the ivf lists nearest to the query, None if the collection is not indexed
+        """
+        if self.centroids is None or self._list_rows is None or self._list_bounds is None:
+            return None
+        nprobe = min(nprobe, len(self.centroids))
+        nearest_lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        bounds = self._list_bounds
+        return np.sort(np.concatenate([self._list_rows[bounds[i] : bounds[i + 1]] for i in nearest_lists]))
+
+    def bm25_scores(self, query_tokens: list[str], rows: np.ndarray) -> np.ndarray:
+        tokens, document_frequencies = self._get_tokens()
+        average_length = sum(sum(counter.values()) for counter in tokens) / max(len(tokens), 1)
+        scores = np.zeros(len(rows), dtype=np.float32)
+        k1, b = 1.5, 0.75
+        for token in set(query_tokens):
+            frequency = document_frequencies.get(token, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(tokens) - frequency + 0.5) / (frequency + 0.5))
+            for i, row in enumerate(rows):
+                counter = tokens[row]
+                term_frequency = counter.get(token, 0)
+                if term_frequency:
+                    length = sum(counter.values())
+                    scores[i] += (
+                        idf * term_frequency * (k1 + 1) / (term_frequency + k1 * (1 - b + b * length / average_length))
+                    )
+        return scores
+
+    def _get_tokens(self) -> tuple[list[Counter[str]], Counter[str]]:
+        # texts are tokenized on the first full text search of the snapshot
+        with self._tokens_lock:
+            if self._tokens is None or self._document_frequencies is None:
+                self._tokens = [Counter(_tokenize(text)) for text in self.texts]
+                self._document_frequencies = Counter()
+                for counter in self._tokens:
+                    self._document_frequencies.update(counter.keys())
+            return self._tokens, self._document_frequencies
+
+
+class LocalVector(BaseVector):
+    """
+    Embedded vector store keeping each collection as NumPy matrices in the configured storage.
+
+    A collection is stored as a base snapshot, the segments of rows added since and the ids deleted since,
+    kept as tombstones in its manifest, so a write only saves what it changed. Segments and tombstones are
+    compacted into a new base once they grow too large, the inverted file index is (re)trained then.
+
+    Parts are downloaded to a local cache directory, bases are memory-mapped, and the loaded snapshot is cached
+    per process until another process writes a new version. Collections larger than LOCAL_VECTOR_IVF_MIN_SIZE
+    are searched through an inverted file index of k-means lists, rows of segments are assigned to its lists
+    when loaded.
+    """
+
+    STORAGE_PREFIX = "local_vector"
+
+    _indexes = LRUCache(dify_config.LOCAL_VECTOR_CACHED_COLLECTIONS)
+    _indexes_lock = Lock()
+
+    def __init__(self, collection_name: str, config: LocalVectorConfig):
+        super().__init__(collection_name)
+        self._config = config
+        self._version_key = f"local_vector_version_{collection_name}"
+        self._lock_name = f"local_vector_lock_{collection_name}"
+
+    def get_type(self) -> str:
+        return VectorType.LOCAL
+
+    def create(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
+        if texts:
+            self.add_texts(texts, embeddings, **kwargs)
+
+    def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        ids = [(document.metadata or {}).get("doc_id") or str(uuid.uuid4()) for document in documents]
+        # rows replace existing rows with the same ids once loaded
+        segment = _LocalIndex(
+            version=None,
+            vectors=_normalize(np.asarray(embeddings, dtype=np.float32)),
+            ids=ids,
+            texts=[document.page_content for document in documents],
+            metadatas=[dict(document.metadata or {}) for document in documents],
+        )
+        self._update(segment=segment)
+
+    def text_exists(self, id: str) -> bool:
+        return id in self._get_index().positions
+
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        positions = self._get_index().positions
+        return {id for id in ids if id in positions}
+
+    def get_ids_by_metadata_field(self, key: str, value: str):
+        index = self._get_index()
+        return [index.ids[position] for position, metadata in enumerate(index.metadatas) if metadata.get(key) == value]
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids:
+            return
+        deleted_ids = set(ids)
+        self._update(select_deleted=lambda index: [id for id in index.ids if id in deleted_ids])
+
+    def delete_by_metadata_field(self, key: str, value: str) -> None:
+        self._update(
+            select_deleted=lambda index: [
+                index.ids[position] for position, metadata in enumerate(index.metadatas) if metadata.get(key) == value
+            ]
+        )
+
+    def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        top_k = kwargs.get("top_k", 4)
+        if not isinstance(top_k, int) or top_k <= 0:
+            raise ValueError("top_k must be a positive integer")
+        score_threshold = float(kwargs.get("score_threshold") or 0.0)
+
+        index = self._get_index()
+        if not len(index):
+            return []
+
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        allowed_rows = self._get_allowed_rows(index, kwargs.get("document_ids_filter"))
+        rows = index.probe(query, self._config.ivf_nprobe)
+        if rows is not None and allowed_rows is not None:
+            rows = np.intersect1d(rows, allowed_rows, assume_unique=True)
+        if rows is None or len(rows) < top_k:
+            # too few candidates in the nearest lists, search the allowed rows exhaustively
+            rows = allowed_rows
+
+        if rows is None:
+            scores = np.asarray(index.vectors @ query)
+            rows = np.arange(len(index))
+        else:
+            scores = np.asarray(index.vectors[rows] @ query)
+
+        if len(scores) > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        docs = []
+        for i in top:
+            score = float(scores[i])
+            if score > score_threshold:
+                docs.append(self._to_document(index, int(rows[i]), score))
+        return docs
+
+    def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
+        top_k = kwargs.get("top_k", 4)
+        if not isinstance(top_k, int) or top_k <= 0:
+            raise ValueError("top_k must be a positive integer")
+
+        index = self._get_index()
+        query_tokens = _tokenize(query)
+        if not len(index) or not query_tokens:
+            return []
+
+        rows = self._get_allowed_rows(index, kwargs.get("document_ids_filter"))
+        if rows is None:
+            rows = np.arange(len(index))
+        scores = index.bm25_scores(query_tokens, rows)
+
+        top = np.argsort(-scores, kind="stable")[:top_k]
+        return [self._to_document(index, int(rows[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def delete(self) -> None:
+        with redis_client.lock(self._lock_name, timeout=_LOCK_TIMEOUT):
+            manifest = self._load_manifest()
+            if manifest is not None:
+                for part in self._get_parts(manifest):
+                    self._delete_part_files(part)
+                storage.delete(self._manifest_path())
+            redis_client.delete(self._version_key)
+        with self._indexes_lock:
+            self._indexes.put(self._collection_name, None)
+        shutil.rmtree(self._local_collection_dir(), ignore_errors=True)
+
+    @staticmethod
+    def _get_allowed_rows(index: _LocalIndex, document_ids_filter: Optional[list[str]]) -> Optional[np.ndarray]:
+        if not document_ids_filter:
+            return None
+        return np.flatnonzero(np.isin(index.document_ids, np.array(document_ids_filter, dtype=object)))
+
+    @staticmethod
+    def _to_document(index: _LocalIndex, row: int, score: float) -> Document:
+        metadata = dict(index.metadatas[row])
+        metadata["score"] = score
+        return Document(page_content=index.texts[row], metadata=metadata)
+
+    def _update(
+        self,
+        segment: Optional[_LocalIndex] = None,
+        select_deleted: Optional[Callable[[_LocalIndex], list[str]]] = None,
+    ) -> None:
+        """
+        Write a new version of the collection, appending the segment or deleting the ids selected from the current
+        rows, and compact the collection if needed
+        """
+        with redis_client.lock(self._lock_name, timeout=_LOCK_TIMEOUT) as lock:
+            manifest = self._load_manifest() or self._empty_manifest()
+            # the lock is renewed before each step, for as long as the step may take with the size of the collection
+            lock.extend(_lock_timeout(self._get_stored_size(manifest)), replace_ttl=True)
+            updated = dict(manifest)
+            deleted = set(manifest["deleted"])
+
+            if select_deleted is not None:
+                selected = select_deleted(self._load_index(manifest))
+                if not selected:
+                    return
+                deleted.update(selected)
+
+            if segment is not None:
+                segment_id = uuid.uuid4().hex
+                self._save_part(segment_id, segment)
+                updated["segments"] = [*manifest["segments"], segment_id]
+                updated["segment_size"] = manifest["segment_size"] + len(segment)
+                # added rows are live even if their ids were deleted before
+                deleted.difference_update(segment.ids)
+
+            updated["deleted"] = sorted(deleted)
+            updated["version"] = uuid.uuid4().hex
+
+            compacted_parts = []
+            if self._needs_compaction(updated):
+                compacted_parts = self._get_parts(updated)
+                lock.extend(_lock_timeout(self._get_stored_size(updated)), replace_ttl=True)
+                index = self._maintain_ivf(self._load_index(updated))
+                lock.extend(_lock_timeout(len(index)), replace_ttl=True)
+                base = uuid.uuid4().hex
+                self._save_part(base, index)
+                updated = {**self._empty_manifest(), "version": uuid.uuid4().hex, "base": base, "base_size": len(index)}
+
+            storage.save(self._manifest_path(), json.dumps(updated).encode())
+            redis_client.set(self._version_key, updated["version"], ex=86400)
+            for part in compacted_parts:
+                self._delete_part_files(part)
+
+    @staticmethod
+    def _empty_manifest() -> dict:
+        return {"version": None, "base": None, "base_size": 0, "segments": [], "segment_size": 0, "deleted": []}
+
+    @staticmethod
+    def _get_parts(manifest: dict) -> list[str]:
+        segments: list[str] = manifest["segments"]
+        return ([manifest["base"]] if manifest["base"] else []) + segments
+
+    @staticmethod
+    def _get_stored_size(manifest: dict) -> int:
+        size: int = manifest["base_size"] + manifest["segment_size"]
+        return size
+
+    @staticmethod
+    def _needs_compaction(manifest: dict) -> bool:
+        return (
+            len(manifest["segments"]) >= _COMPACT_MAX_SEGMENTS
+            or len(manifest["deleted"]) >= _COMPACT_MAX_DELETED_IDS
+            or manifest["segment_size"] > max(manifest["base_size"], _COMPACT_MIN_SEGMENT_SIZE)
+        )
+
+    def _maintain_ivf(self, index: _LocalIndex) -> _LocalIndex:
+        size = len(index)
+        if size < self._config.ivf_min_size:
+            if index.centroids is None:
+                return index
+            # small collections are searched exhaustively
+            centroids, assignments, trained_size = None, None, 0
+        elif index.centroids is not None and size <= index.ivf_trained_size * 4:
+            return index
+        else:
+            # lists are retrained when the collection grew too much since they were trained
+            centroids = _train_ivf(index.vectors, nlist=int(math.sqrt(size)))
+            assignments = _assign_ivf(index.vectors, centroids)
+            trained_size = size
+        return _LocalIndex(
+            version=None,
+            vectors=index.vectors,
+            ids=index.ids,
+            texts=index.texts,
+            metadatas=index.metadatas,
+            centroids=centroids,
+            assignments=assignments,
+            ivf_trained_size=trained_size,
+        )
+
+    def _get_index(self) -> _LocalIndex:
+        manifest = None
+        version = redis_client.get(self._version_key)
+        if version is not None:
+            version = version.decode() if isinstance(version, bytes) else version
+        else:
+            manifest = self._load_manifest()
+            if manifest is None:
+                return self._empty_index()
+            version = manifest["version"]
+            redis_client.set(self._version_key, version, ex=86400)
+
+        with self._indexes_lock:
+            index: Optional[_LocalIndex] = self._indexes.get(self._collection_name)
+        if index is not None and index.version == version:
+            return index
+
+        try:
+            manifest = manifest or self._load_manifest()
+            if manifest is None:
+                return self._empty_index()
+            index = self._load_index(manifest)
+        except Exception:
+            # the parts were compacted while being downloaded, load the current ones
+            logger.warning("Failed to load version %s of local vector %s", version, self._collection_name)
+            manifest = self._load_manifest()
+            if manifest is None:
+                return self._empty_index()
+            index = self._load_index(manifest)
+
+        with self._indexes_lock:
+            self._indexes.put(self._collection_name, index)
+        return index
+
+    def _empty_index(self) -> _LocalIndex:
+        return _LocalIndex(version=None, vectors=np.empty((0, 0), dtype=np.float32), ids=[], texts=[], metadatas=[])
+
+    def _load_manifest(self) -> Optional[dict]:
+        if not storage.exists(self._manifest_path()):
+            return None
+        manifest: dict = json.loads(storage.load_once(self._manifest_path()))
+        if "base" not in manifest:
+            # written before segments, the version is the base
+            manifest = {
+                **self._empty_manifest(),
+                "version": manifest["version"],
+                "base": manifest["version"],
+                "base_size": manifest.get("size", 0),
+            }
+        return manifest
+
+    def _load_index(self, manifest: dict) -> _LocalIndex:
+        """
+        Load the base and the segments of the collection, merged into one snapshot
+        """
+        parts = self._get_parts(manifest)
+        self._remove_stale_local_parts(set(parts))
+        loaded = [self._load_part(part) for part in parts]
+        base = loaded[0] if manifest["base"] else self._empty_index()
+        segments = loaded[1:] if manifest["base"] else loaded
+        deleted = set(manifest["deleted"])
+        if not segments and not deleted:
+            base.version = manifest["version"]
+            return base
+
+        parts_with_rows = [part for part in [base, *segments] if len(part)]
+        ids = [id for part in parts_with_rows for id in part.ids]
+        # the last row of an id replaces the rows before it
+        last_rows = {id: row for row, id in enumerate(ids)}
+        keep = np.array(sorted(row for id, row in last_rows.items() if id not in deleted), dtype=np.int64)
+        if not len(keep):
+            empty = self._empty_index()
+            empty.version = manifest["version"]
+            return empty
+
+        vectors = np.concatenate([np.asarray(part.vectors) for part in parts_with_rows])
+        assignments = None
+        if base.centroids is not None and base.assignments is not None:
+            centroids = base.centroids
+            assignments = np.concatenate(
+                [base.assignments, *[_assign_ivf(np.asarray(segment.vectors), centroids) for segment in segments]]
+            )[keep]
+        texts = [text for part in parts_with_rows for text in part.texts]
+        metadatas = [metadata for part in parts_with_rows for metadata in part.metadatas]
+        return _LocalIndex(
+            version=manifest["version"],
+            vectors=vectors[keep],
+            ids=[ids[row] for row in keep],
+            texts=[texts[row] for row in keep],
+            metadatas=[metadatas[row] for row in keep],
+            centroids=base.centroids,
+            assignments=assignments,
+            ivf_trained_size=base.ivf_trained_size,
+        )
+
+    def _load_part(self, part: str) -> _LocalIndex:
+        local_dir = os.path.join(self._local_collection_dir(), part)
+        if not os.path.exists(local_dir):
+            download_dir = f"{local_dir}.{uuid.uuid4().hex}.tmp"
+            os.makedirs(download_dir)
+            try:
+                with open(os.path.join(download_dir, "documents.json"), "wb") as f:
+                    f.write(storage.load_once(self._storage_path(part, "documents.json")))
+                documents = self._read_documents(download_dir)
+                for name in ("vectors.npy", "centroids.npy", "assignments.npy"):
+                    if name != "vectors.npy" and not documents["ivf_trained_size"]:
+                        continue
+                    storage.download(self._storage_path(part, name), os.path.join(download_dir, name))
+                os.replace(download_dir, local_dir)
+            except OSError:
+                # another process of the host downloaded the same part first
+                shutil.rmtree(download_dir, ignore_errors=True)
+                if not os.path.exists(local_dir):
+                    raise
+
+        documents = self._read_documents(local_dir)
+        ivf = bool(documents["ivf_trained_size"])
+        return _LocalIndex(
+            version=part,
+            vectors=np.load(os.path.join(local_dir, "vectors.npy"), mmap_mode="r"),
+            ids=documents["ids"],
+            texts=documents["texts"],
+            metadatas=documents["metadatas"],
+            centroids=np.load(os.path.join(local_dir, "centroids.npy")) if ivf else None,
+            assignments=np.load(os.path.join(local_dir, "assignments.npy")) if ivf else None,
+            ivf_trained_size=documents["ivf_trained_size"],
+        )
+
+    @staticmethod
+    def _read_documents(local_dir: str) -> dict:
+        with open(os.path.join(local_dir, "documents.json"), "rb") as f:
+            documents: dict = json.load(f)
+        return documents
+
+    def _save_part(self, part: str, index: _LocalIndex) -> None:
+        arrays = {"vectors.npy": index.vectors}
+        if index.centroids is not None and index.assignments is not None:
+            arrays["centroids.npy"] = index.centroids
+            arrays["assignments.npy"] = index.assignments
+        files = {}
+        for name, array in arrays.items():
+            buffer = io.BytesIO()
+            np.save(buffer, np.asarray(array))
+            files[self._storage_path(part, name)] = buffer.getvalue()
+        documents = {
+            "ids": index.ids,
+            "texts": index.texts,
+            "metadatas": index.metadatas,
+            "ivf_trained_size": index.ivf_trained_size,
+        }
+        files[self._storage_path(part, "documents.json")] = json.dumps(documents).encode()
+        storage.save_many(files)
+
+    def _delete_part_files(self, part: str) -> None:
+        for name in ("vectors.npy", "centroids.npy", "assignments.npy", "documents.json"):
+            path = self._storage_path(part, name)
+            if storage.exists(path):
+                storage.delete(path)
+
+    def _remove_stale_local_parts(self, parts: set[str]) -> None:
+        # memory-mapped files of other snapshots still in use stay readable after being unlinked
+        if not os.path.isdir(self._local_collection_dir()):
+            return
+        for name in os.listdir(self._local_collection_dir()):
+            if name not in parts and not name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(self._local_collection_dir(), name), ignore_errors=True)
+
+    def _manifest_path(self) -> str:
+        return f"{self.STORAGE_PREFIX}/{self._collection_name}/manifest.json"
+
+    def _storage_path(self, part: str, name: str) -> str:
+        return f"{self.STORAGE_PREFIX}/{self._collection_name}/{part}/{name}"
+
+    def _local_collection_dir(self) -> str:
+        return os.path.join(self._config.cache_dir, self._collection_name)
+
+
+class LocalVectorFactory(AbstractVectorFactory):
+    def init_vector(self, dataset: Dataset, attributes: list, embeddings: Embeddings) -> LocalVector:
+        if dataset.index_struct_dict:
+            class_prefix: str = dataset.index_struct_dict["vector_store"]["class_prefix"]
+            collection_name = class_prefix.lower()
+        else:
+            dataset_id = dataset.id
+            collection_name = Dataset.gen_collection_name_by_id(dataset_id).lower()
+            dataset.index_struct = json.dumps(self.gen_index_struct_dict(VectorType.LOCAL, collection_name))
+
+        return LocalVector(
+            collection_name=collection_name,
+            config=LocalVectorConfig(
+                cache_dir=dify_config.LOCAL_VECTOR_CACHE_DIR,
+                ivf_min_size=dify_config.LOCAL_VECTOR_IVF_MIN_SIZE,
+                ivf_nprobe=dify_config.LOCAL_VECTOR_IVF_NPROBE,
+            ),
+        )
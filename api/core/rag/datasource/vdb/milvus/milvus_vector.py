@@ -196,6 +196,21 @@ class MilvusVector(BaseVector):
 
         return len(result) > 0
 
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        """
+        Get the doc ids of the given texts which exist in the collection.
+        """
+        if not ids or not self._client.has_collection(self._collection_name):
+            return set()
+
+        result = self._client.query(
+            collection_name=self._collection_name,
+            filter=f'metadata["doc_id"] in {json.dumps(ids)}',
+            output_fields=[Field.METADATA_KEY.value],
+        )
+
+        return {item[Field.METADATA_KEY.value]["doc_id"] for item in result}
+
     def field_exists(self, field: str) -> bool:
         """
         Check if a field exists in the collection.
@@ -99,6 +99,15 @@ class MyScaleVector(BaseVector):
         results = self._client.query(f"SELECT id FROM {self._config.database}.{self._collection_name} WHERE id='{id}'")
         return results.row_count > 0
 
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        results = self._client.query(
+            f"SELECT id FROM {self._config.database}.{self._collection_name} WHERE id IN %(ids)s",
+            parameters={"ids": tuple(ids)},
+        )
+        return {row[0] for row in results.result_rows}
+
     def delete_by_ids(self, ids: list[str]) -> None:
         if not ids:
             return
@@ -141,6 +141,15 @@ class OpenSearchVector(BaseVector):
         except:
             return False
 
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        if not ids or not self._client.indices.exists(index=self._collection_name.lower()):
+            return set()
+        # documents are indexed under random ids, so look them up by their doc_id metadata
+        doc_id_field = f"{Field.METADATA_KEY.value}.doc_id"
+        query = {"query": {"terms": {doc_id_field: ids}}, "_source": [doc_id_field], "size": len(ids)}
+        response = self._client.search(index=self._collection_name.lower(), body=query)
+        return {hit["_source"][Field.METADATA_KEY.value]["doc_id"] for hit in response["hits"]["hits"]}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         # Make sure query_vector is a list
         if not isinstance(query_vector, list):
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 from core.rag.models.document import Document
 
 
 class BaseVector(ABC):
+    # number of ids looked up in one request when filtering duplicate texts
+    EXISTING_IDS_BATCH_SIZE = 1000
+
     def __init__(self, collection_name: str):
         self._collection_name = collection_name
 
@@ -26,6 +29,13 @@ class BaseVector(ABC):
     def text_exists(self, id: str) -> bool:
         raise NotImplementedError
 
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        """
+        Get the ids which already exist in the collection.
+        Falls back to one text_exists call per id, stores able to look up many ids at once should override it.
+        """
+        return {id for id in ids if self.text_exists(id)}
+
     @abstractmethod
     def delete_by_ids(self, ids: list[str]) -> None:
         raise NotImplementedError
@@ -50,14 +60,14 @@ class BaseVector(ABC):
         raise NotImplementedError
 
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts.copy():
-            if text.metadata and "doc_id" in text.metadata:
-                doc_id = text.metadata["doc_id"]
-                exists_duplicate_node = self.text_exists(doc_id)
-                if exists_duplicate_node:
-                    texts.remove(text)
+        doc_ids = list(dict.fromkeys(text.metadata["doc_id"] for text in texts if _get_doc_id(text)))
+        existing_ids: set[str] = set()
+        for i in range(0, len(doc_ids), self.EXISTING_IDS_BATCH_SIZE):
+            existing_ids.update(self.existing_ids(doc_ids[i : i + self.EXISTING_IDS_BATCH_SIZE]))
+        if not existing_ids:
+            return texts
 
-        return texts
+        return [text for text in texts if _get_doc_id(text) not in existing_ids]
 
     def _get_uuids(self, texts: list[Document]) -> list[str]:
         return [text.metadata["doc_id"] for text in texts if text.metadata and "doc_id" in text.metadata]
@@ -65,3 +75,7 @@ class BaseVector(ABC):
     @property
     def collection_name(self):
         return self._collection_name
+
+
+def _get_doc_id(text: Document) -> Optional[str]:
+    return text.metadata.get("doc_id") if text.metadata else None
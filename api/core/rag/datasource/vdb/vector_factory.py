@@ -11,6 +11,7 @@ from core.rag.embedding.embedding_base import Embeddings
 from core.rag.models.document import Document
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
+from libs import metrics
 from models.dataset import Dataset, Whitelist
 
 
@@ -152,6 +153,10 @@ class Vector:
                 from core.rag.datasource.vdb.opengauss.opengauss import OpenGaussFactory
 
                 return OpenGaussFactory
+            case VectorType.LOCAL:
+                from core.rag.datasource.vdb.local.local_vector import LocalVectorFactory
+
+                return LocalVectorFactory
             case _:
                 raise ValueError(f"Vector store {vector_type} is not supported.")
 
@@ -163,6 +168,8 @@ class Vector:
     def add_texts(self, documents: list[Document], **kwargs):
         if kwargs.get("duplicate_check", False):
             documents = self._filter_duplicate_texts(documents)
+            if not documents:
+                return
 
         embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
         self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
@@ -170,6 +177,9 @@ class Vector:
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
 
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        return self._vector_processor.existing_ids(ids)
+
     def delete_by_ids(self, ids: list[str]) -> None:
         self._vector_processor.delete_by_ids(ids)
 
@@ -177,11 +187,14 @@ class Vector:
         self._vector_processor.delete_by_metadata_field(key, value)
 
     def search_by_vector(self, query: str, **kwargs: Any) -> list[Document]:
-        query_vector = self._embeddings.embed_query(query)
-        return self._vector_processor.search_by_vector(query_vector, **kwargs)
+        with metrics.time_retrieval_stage("embed"):
+            query_vector = self._embeddings.embed_query(query)
+        with metrics.time_retrieval_stage("vector_search"):
+            return self._vector_processor.search_by_vector(query_vector, **kwargs)
 
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
-        return self._vector_processor.search_by_full_text(query, **kwargs)
+        with metrics.time_retrieval_stage("full_text_search"):
+            return self._vector_processor.search_by_full_text(query, **kwargs)
 
     def delete(self) -> None:
         self._vector_processor.delete()
@@ -202,16 +215,7 @@ class Vector:
         return CacheEmbedding(embedding_model)
 
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts.copy():
-            if text.metadata is None:
-                continue
-            doc_id = text.metadata["doc_id"]
-            if doc_id:
-                exists_duplicate_node = self.text_exists(doc_id)
-                if exists_duplicate_node:
-                    texts.remove(text)
-
-        return texts
+        return self._vector_processor._filter_duplicate_texts(texts)
 
     def __getattr__(self, name):
         if self._vector_processor is not None:
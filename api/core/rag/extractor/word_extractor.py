@@ -80,6 +80,8 @@ class WordExtractor(BaseExtractor):
         os.makedirs(image_folder, exist_ok=True)
         image_count = 0
         image_map = {}
+        files: dict[str, bytes] = {}
+        upload_files = []
 
         for rel in doc.part.rels.values():
             if "image" in rel.target_ref:
@@ -94,7 +96,7 @@ class WordExtractor(BaseExtractor):
                         file_uuid = str(uuid.uuid4())
                         file_key = "image_files/" + self.tenant_id + "/" + file_uuid + "." + image_ext
                         mime_type, _ = mimetypes.guess_type(file_key)
-                        storage.save(file_key, response.content)
+                        files[file_key] = response.content
                     else:
                         continue
                 else:
@@ -106,7 +108,7 @@ class WordExtractor(BaseExtractor):
                     file_key = "image_files/" + self.tenant_id + "/" + file_uuid + "." + image_ext
                     mime_type, _ = mimetypes.guess_type(file_key)
 
-                    storage.save(file_key, rel.target_part.blob)
+                    files[file_key] = rel.target_part.blob
                 # save file to db
                 upload_file = UploadFile(
                     tenant_id=self.tenant_id,
@@ -124,11 +126,13 @@ class WordExtractor(BaseExtractor):
                     used_at=datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
                 )
 
-                db.session.add(upload_file)
-                db.session.commit()
-                image_map[rel.target_part] = (
-                    f"![image]({dify_config.CONSOLE_API_URL}/files/{upload_file.id}/file-preview)"
-                )
+                upload_files.append((rel.target_part, upload_file))
+
+        storage.save_many(files)
+        db.session.add_all(upload_file for _, upload_file in upload_files)
+        db.session.commit()
+        for target_part, upload_file in upload_files:
+            image_map[target_part] = f"![image]({dify_config.CONSOLE_API_URL}/files/{upload_file.id}/file-preview)"
 
         return image_map
 
@@ -53,6 +53,7 @@ from core.workflow.nodes.enums import ErrorStrategy, FailBranchSourceHandle
 from core.workflow.nodes.event import RunCompletedEvent, RunRetrieverResourceEvent, RunStreamChunkEvent
 from core.workflow.nodes.node_mapping import NODE_TYPE_CLASSES_MAPPING
 from extensions.ext_database import db
+from libs import metrics
 from models.enums import UserFrom
 from models.workflow import WorkflowNodeExecutionStatus, WorkflowType
 
@@ -690,6 +691,13 @@ class GraphEngine:
                                     time.sleep(retry_interval)
                                     break
                             route_node_state.set_finished(run_result=run_result)
+                            metrics.observe_workflow_node_execution(
+                                node_type=node_instance.node_type.value,
+                                status=run_result.status.value,
+                                seconds=(
+                                    cast(datetime, route_node_state.finished_at) - route_node_state.start_at
+                                ).total_seconds(),
+                            )
 
                             if run_result.status == WorkflowNodeExecutionStatus.FAILED:
                                 if node_instance.should_continue_on_error:
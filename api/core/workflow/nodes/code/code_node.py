@@ -1,6 +1,7 @@
 from collections.abc import Mapping, Sequence
 from typing import Any, Optional
 
+import contexts
 from configs import dify_config
 from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
 from core.helper.code_executor.code_node_provider import CodeNodeProvider
@@ -56,6 +57,8 @@ class CodeNode(BaseNode[CodeNodeData]):
                 language=code_language,
                 code=code,
                 inputs=variables,
+                # the same code runs concurrently in the iterations of a parallel iteration
+                batchable=contexts.in_parallel_iteration.get(),
             )
 
             # Transform result
@@ -20,6 +20,7 @@ from docx.text.paragraph import Paragraph
 from configs import dify_config
 from core.file import File, FileTransferMethod, file_manager
 from core.helper import ssrf_proxy
+from core.helper.cpu_offload import run_cpu_bound
 from core.variables import ArrayFileSegment
 from core.variables.segments import FileSegment
 from core.workflow.entities.node_entities import NodeRunResult
@@ -317,10 +318,21 @@ def _download_file_content(file: File) -> bytes:
 
 def _extract_text_from_file(file: File):
     file_content = _download_file_content(file)
+    # parsing runs out of the gevent hub, so large documents do not stall other requests
     if file.extension:
-        extracted_text = _extract_text_by_file_extension(file_content=file_content, file_extension=file.extension)
+        extracted_text = run_cpu_bound(
+            _extract_text_by_file_extension,
+            file_content=file_content,
+            file_extension=file.extension,
+            input_size=len(file_content),
+        )
     elif file.mime_type:
-        extracted_text = _extract_text_by_mime_type(file_content=file_content, mime_type=file.mime_type)
+        extracted_text = run_cpu_bound(
+            _extract_text_by_mime_type,
+            file_content=file_content,
+            mime_type=file.mime_type,
+            input_size=len(file_content),
+        )
     else:
         raise UnsupportedFileTypeError("Unable to determine file type: MIME type or file extension is missing")
     return extracted_text
@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, Any, Optional, cast
 
 from flask import Flask, current_app
 
+import contexts
 from configs import dify_config
 from core.variables import ArrayVariable, IntegerVariable, NoneVariable
 from core.workflow.entities.node_entities import (
@@ -587,22 +588,27 @@ class IterationNode(BaseNode[IterationNodeData]):
         """
         for var, val in context.items():
             var.set(val)
-        with flask_app.app_context():
-            parallel_mode_run_id = uuid.uuid4().hex
-            graph_engine_copy = graph_engine.create_copy()
-            variable_pool_copy = graph_engine_copy.graph_runtime_state.variable_pool
-            variable_pool_copy.add([self.node_id, "index"], index)
-            variable_pool_copy.add([self.node_id, "item"], item)
-            for event in self._run_single_iter(
-                iterator_list_value=iterator_list_value,
-                variable_pool=variable_pool_copy,
-                inputs=inputs,
-                outputs=outputs,
-                start_at=start_at,
-                graph_engine=graph_engine_copy,
-                iteration_graph=iteration_graph,
-                iter_run_map=iter_run_map,
-                parallel_mode_run_id=parallel_mode_run_id,
-            ):
-                q.put(event)
-            graph_engine.graph_runtime_state.total_tokens += graph_engine_copy.graph_runtime_state.total_tokens
+        # reset once done, the thread of the pool may run other tasks afterwards
+        in_parallel_iteration_token = contexts.in_parallel_iteration.set(True)
+        try:
+            with flask_app.app_context():
+                parallel_mode_run_id = uuid.uuid4().hex
+                graph_engine_copy = graph_engine.create_copy()
+                variable_pool_copy = graph_engine_copy.graph_runtime_state.variable_pool
+                variable_pool_copy.add([self.node_id, "index"], index)
+                variable_pool_copy.add([self.node_id, "item"], item)
+                for event in self._run_single_iter(
+                    iterator_list_value=iterator_list_value,
+                    variable_pool=variable_pool_copy,
+                    inputs=inputs,
+                    outputs=outputs,
+                    start_at=start_at,
+                    graph_engine=graph_engine_copy,
+                    iteration_graph=iteration_graph,
+                    iter_run_map=iter_run_map,
+                    parallel_mode_run_id=parallel_mode_run_id,
+                ):
+                    q.put(event)
+                graph_engine.graph_runtime_state.total_tokens += graph_engine_copy.graph_runtime_state.total_tokens
+        finally:
+            contexts.in_parallel_iteration.reset(in_parallel_iteration_token)
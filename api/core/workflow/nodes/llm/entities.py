@@ -14,6 +14,8 @@ class ModelConfig(BaseModel):
     name: str
     mode: LLMMode
     completion_params: dict[str, Any] = {}
+    # reuse the response of an identical invocation with temperature 0
+    response_cache: bool = False
 
 
 class ContextConfig(BaseModel):
@@ -242,6 +242,7 @@ class LLMNode(BaseNode[LLMNodeData]):
             stop=list(stop or []),
             stream=True,
             user=self.user_id,
+            response_cache=node_data_model.response_cache,
         )
 
         return self._handle_invoke_result(invoke_result=invoke_result)
@@ -241,6 +241,7 @@ class ParameterExtractorNode(LLMNode):
             stop=stop,
             stream=False,
             user=self.user_id,
+            response_cache=node_data_model.response_cache,
         )
 
         # handle invoke result
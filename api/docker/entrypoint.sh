@@ -7,6 +7,12 @@ if [[ "${MIGRATION_ENABLED}" == "true" ]]; then
   flask upgrade-db
 fi
 
+if [[ -n "${PROMETHEUS_MULTIPROC_DIR}" ]]; then
+  # drop metrics of the processes of previous runs
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+  mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
 if [[ "${MODE}" == "worker" ]]; then
 
   # Get the number of available CPU cores
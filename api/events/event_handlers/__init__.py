@@ -1,10 +1,13 @@
+from .add_message_to_semantic_cache_when_message_created import handle
 from .clean_when_dataset_deleted import handle
 from .clean_when_document_deleted import handle
+from .clear_semantic_cache_when_app_model_config_updated import handle
 from .create_document_index import handle
 from .create_installed_app_when_app_created import handle
 from .create_site_record_when_app_created import handle
 from .deduct_quota_when_message_created import handle
 from .delete_tool_parameters_cache_when_sync_draft_workflow import handle
+from .invalidate_app_statistics_when_message_created import handle
 from .update_app_dataset_join_when_app_model_config_updated import handle
 from .update_app_dataset_join_when_app_published_workflow_updated import handle
 from .update_provider_last_used_at_when_message_created import handle
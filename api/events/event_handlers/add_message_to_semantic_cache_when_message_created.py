@@ -0,0 +1,44 @@
+from configs import dify_config
+from core.app.app_config.entities import EasyUIBasedAppModelConfigFrom
+from core.app.entities.app_invoke_entities import ChatAppGenerateEntity
+from core.app.features.semantic_cache.semantic_cache import get_inputs_fingerprint
+from events.message_event import message_was_created
+from models.model import AppMode
+from tasks.semantic_cache.add_message_to_semantic_cache_task import add_message_to_semantic_cache_task
+
+
+@message_was_created.connect
+def handle(sender, **kwargs):
+    message = sender
+    application_generate_entity = kwargs.get("application_generate_entity")
+
+    if not isinstance(application_generate_entity, ChatAppGenerateEntity):
+        return
+
+    app_config = application_generate_entity.app_config
+    if (
+        app_config.app_mode != AppMode.CHAT
+        or not app_config.additional_features.semantic_cache
+        or app_config.app_model_config_from == EasyUIBasedAppModelConfigFrom.ARGS
+    ):
+        return
+
+    # only answers to the first query of a conversation without files do not depend on the conversation,
+    # answers without completion tokens come from annotations, moderation or the semantic cache itself.
+    # short answers like refusals or greetings are not worth reusing, and answers disliked later on
+    # are skipped when looking up the cache
+    if application_generate_entity.conversation_id or application_generate_entity.files:
+        return
+    if not message.answer or not message.answer_tokens:
+        return
+    if len(message.answer) < dify_config.SEMANTIC_CACHE_MIN_ANSWER_LENGTH:
+        return
+
+    add_message_to_semantic_cache_task.delay(
+        message.id,
+        application_generate_entity.query,
+        get_inputs_fingerprint(application_generate_entity.inputs),
+        app_config.tenant_id,
+        app_config.app_id,
+        app_config.app_model_config_id,
+    )
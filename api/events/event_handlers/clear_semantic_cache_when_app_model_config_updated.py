@@ -0,0 +1,9 @@
+from events.app_event import app_model_config_was_updated
+from tasks.semantic_cache.clear_semantic_cache_task import clear_semantic_cache_task
+
+
+@app_model_config_was_updated.connect
+def handle(sender, **kwargs):
+    app = sender
+    # answers of the previous app model config are not reused anymore, remove them from the vector store
+    clear_semantic_cache_task.delay(app.tenant_id, app.id)
@@ -0,0 +1,18 @@
+from core.app.entities.app_invoke_entities import ConversationAppGenerateEntity
+from events.message_event import message_was_created
+from services.app_statistic_service import AppStatisticService
+
+
+@message_was_created.connect
+def handle(sender, **kwargs):
+    message = sender
+    application_generate_entity = kwargs.get("application_generate_entity")
+
+    if not isinstance(application_generate_entity, ConversationAppGenerateEntity):
+        return
+    if not application_generate_entity.conversation_id:
+        return
+
+    # statistics of conversations are rolled up by the day the conversation was created,
+    # they are invalidated in batches by the scheduled rollup task
+    AppStatisticService.mark_conversation_continued(message.conversation_id)
@@ -65,3 +65,34 @@ def init_app(app: DifyApp):
             "connection_timeout": engine.pool.timeout(),  # type: ignore
             "recycle_time": db.engine.pool._recycle,  # type: ignore
         }
+
+    if dify_config.METRICS_ENABLED:
+        _init_metrics(app)
+
+
+def _init_metrics(app: DifyApp):
+    import atexit
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from libs import metrics
+
+    @app.before_request
+    def start_request_call_counts():
+        metrics.start_request_call_counts()
+
+    @app.teardown_request
+    def finish_request_call_counts(exc):
+        metrics.finish_request_call_counts()
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def count_db_query(conn, cursor, statement, parameters, context, executemany):
+        metrics.count_request_call("db")
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        data, content_type = metrics.generate_metrics()
+        return Response(data, status=200, content_type=content_type)
+
+    atexit.register(metrics.mark_process_dead)
@@ -6,12 +6,13 @@ from celery.schedules import crontab  # type: ignore
 
 from configs import dify_config
 from dify_app import DifyApp
+from libs import metrics
 
 
 def init_app(app: DifyApp) -> Celery:
     class FlaskTask(Task):
         def __call__(self, *args: object, **kwargs: object) -> object:
-            with app.app_context():
+            with app.app_context(), metrics.time_celery_task(self.name):
                 return self.run(*args, **kwargs)
 
     broker_transport_options = {}
@@ -70,6 +71,8 @@ def init_app(app: DifyApp) -> Celery:
         "schedule.update_tidb_serverless_status_task",
         "schedule.clean_messages",
         "schedule.mail_clean_document_notify_task",
+        "schedule.update_api_token_last_used_at_task",
+        "schedule.roll_up_app_daily_statistics_task",
     ]
     day = dify_config.CELERY_BEAT_SCHEDULER_TIME
     beat_schedule = {
@@ -98,6 +101,14 @@ def init_app(app: DifyApp) -> Celery:
             "task": "schedule.mail_clean_document_notify_task.mail_clean_document_notify_task",
             "schedule": crontab(minute="0", hour="10", day_of_week="1"),
         },
+        "update_api_token_last_used_at_task": {
+            "task": "schedule.update_api_token_last_used_at_task.update_api_token_last_used_at_task",
+            "schedule": timedelta(minutes=1),
+        },
+        "roll_up_app_daily_statistics_task": {
+            "task": "schedule.roll_up_app_daily_statistics_task.roll_up_app_daily_statistics_task",
+            "schedule": crontab(minute="5", hour="*"),
+        },
     }
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
 
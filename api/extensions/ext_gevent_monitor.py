@@ -0,0 +1,46 @@
+import logging
+
+from configs import dify_config
+from dify_app import DifyApp
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled() -> bool:
+    if not dify_config.GEVENT_HUB_BLOCKING_MONITOR_ENABLED:
+        return False
+
+    try:
+        from gevent import monkey  # type: ignore
+    except ImportError:
+        return False
+
+    # the hub only serves requests when the worker is monkey-patched
+    return bool(monkey.is_module_patched("threading"))
+
+
+def _log_event_loop_blocked(event) -> None:
+    from gevent.events import EventLoopBlocked  # type: ignore
+
+    if not isinstance(event, EventLoopBlocked):
+        return
+
+    logger.warning(
+        "gevent hub was blocked for more than %.3fs by %s:\n%s",
+        event.blocking_time,
+        event.greenlet,
+        "\n".join(event.info),
+    )
+
+
+def init_app(app: DifyApp):
+    import gevent  # type: ignore
+    from gevent import events
+
+    gevent.config.monitor_thread = True
+    gevent.config.max_blocking_time = dify_config.GEVENT_HUB_BLOCKING_THRESHOLD
+    if _log_event_loop_blocked not in events.subscribers:
+        events.subscribers.append(_log_event_loop_blocked)
+
+    # the monitor thread walks the stack of the greenlet blocking the hub and reports it with EventLoopBlocked
+    gevent.get_hub().start_periodic_monitoring_thread()
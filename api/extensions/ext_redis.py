@@ -7,6 +7,7 @@ from redis.sentinel import Sentinel
 
 from configs import dify_config
 from dify_app import DifyApp
+from libs.metrics import count_request_call
 
 
 class RedisClientWrapper:
@@ -40,6 +41,7 @@ class RedisClientWrapper:
     def __getattr__(self, item):
         if self._client is None:
             raise RuntimeError("Redis client is not initialized. Call init_app first.")
+        count_request_call("redis")
         return getattr(self._client, item)
 
 
@@ -1,5 +1,5 @@
 import logging
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Mapping
 from typing import Literal, Union, overload
 
 from flask import Flask
@@ -18,6 +18,23 @@ class Storage:
         with app.app_context():
             self.storage_runner = storage_factory()
 
+        if dify_config.STORAGE_CACHE_ENABLED and not self.is_local_storage():
+            from extensions.storage.cached_storage import CachedStorage
+
+            self.storage_runner = CachedStorage(
+                self.storage_runner,
+                path=dify_config.STORAGE_CACHE_PATH,
+                max_size=dify_config.STORAGE_CACHE_MAX_SIZE,
+                max_file_size=dify_config.STORAGE_CACHE_MAX_FILE_SIZE,
+                ttl=dify_config.STORAGE_CACHE_TTL,
+            )
+
+    @staticmethod
+    def is_local_storage() -> bool:
+        return dify_config.STORAGE_TYPE == StorageType.LOCAL or (
+            dify_config.STORAGE_TYPE == StorageType.OPENDAL and dify_config.OPENDAL_SCHEME == "fs"
+        )
+
     @staticmethod
     def get_storage_factory(storage_type: str) -> Callable[[], BaseStorage]:
         match storage_type:
@@ -130,6 +147,34 @@ class Storage:
             logger.exception(f"Failed to delete file {filename}")
             raise e
 
+    def load_many(self, filenames: list[str]) -> list[bytes]:
+        try:
+            return self.storage_runner.load_many(filenames)
+        except Exception as e:
+            logger.exception(f"Failed to load {len(filenames)} files")
+            raise e
+
+    def save_many(self, files: Mapping[str, bytes]):
+        try:
+            return self.storage_runner.save_many(files)
+        except Exception as e:
+            logger.exception(f"Failed to save {len(files)} files")
+            raise e
+
+    def delete_many(self, filenames: list[str]):
+        try:
+            return self.storage_runner.delete_many(filenames)
+        except Exception as e:
+            logger.exception(f"Failed to delete {len(filenames)} files")
+            raise e
+
+    def load_range(self, filename: str, offset: int, size: int) -> bytes:
+        try:
+            return self.storage_runner.load_range(filename, offset, size)
+        except Exception as e:
+            logger.exception(f"Failed to load range of file {filename}")
+            raise e
+
 
 storage = Storage()
 
@@ -1,12 +1,12 @@
 import logging
-from collections.abc import Generator
+from collections.abc import Generator, Mapping
 
 import boto3  # type: ignore
 from botocore.client import Config  # type: ignore
 from botocore.exceptions import ClientError  # type: ignore
 
 from configs import dify_config
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, run_concurrently
 
 logger = logging.getLogger(__name__)
 
@@ -85,3 +85,37 @@ class AwsS3Storage(BaseStorage):
 
     def delete(self, filename):
         self.client.delete_object(Bucket=self.bucket_name, Key=filename)
+
+    def delete_many(self, filenames: list[str]) -> None:
+        # a DeleteObjects request deletes up to 1000 keys
+        for i in range(0, len(filenames), 1000):
+            response = self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": filename} for filename in filenames[i : i + 1000]], "Quiet": True},
+            )
+            errors = response.get("Errors")
+            if errors:
+                raise Exception(f"Failed to delete {len(errors)} files, first error: {errors[0].get('Message')}")
+
+    def load_many(self, filenames: list[str]) -> list[bytes]:
+        return run_concurrently(self.load_once, filenames)
+
+    def save_many(self, files: Mapping[str, bytes]) -> None:
+        run_concurrently(lambda file: self.save(*file), list(files.items()))
+
+    def load_range(self, filename: str, offset: int, size: int) -> bytes:
+        if size <= 0:
+            return b""
+        try:
+            data: bytes = self.client.get_object(
+                Bucket=self.bucket_name, Key=filename, Range=f"bytes={offset}-{offset + size - 1}"
+            )["Body"].read()
+        except ClientError as ex:
+            if ex.response["Error"]["Code"] == "NoSuchKey":
+                raise FileNotFoundError("File not found")
+            elif ex.response["Error"]["Code"] == "InvalidRange":
+                # the range starts after the end of the file
+                return b""
+            else:
+                raise
+        return data
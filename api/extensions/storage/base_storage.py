@@ -1,7 +1,14 @@
 """Abstract interface for file storage implementations."""
 
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from configs import dify_config
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 class BaseStorage(ABC):
@@ -30,3 +37,41 @@ class BaseStorage(ABC):
     @abstractmethod
     def delete(self, filename):
         raise NotImplementedError
+
+    def load_many(self, filenames: list[str]) -> list[bytes]:
+        """
+        Load files, in the order of the filenames
+        """
+        return [self.load_once(filename) for filename in filenames]
+
+    def save_many(self, files: Mapping[str, bytes]) -> None:
+        """
+        Save files by filename
+        """
+        for filename, data in files.items():
+            self.save(filename, data)
+
+    def delete_many(self, filenames: list[str]) -> None:
+        """
+        Delete files, backends supporting bulk deletes override it to delete them in a few requests
+        """
+        for filename in filenames:
+            self.delete(filename)
+
+    def load_range(self, filename: str, offset: int, size: int) -> bytes:
+        """
+        Load size bytes of a file from offset, shorter at the end of the file.
+        Backends supporting ranged reads override it to not read the whole file.
+        """
+        return self.load_once(filename)[offset : offset + size]
+
+
+def run_concurrently(func: Callable[[T], R], items: Sequence[T]) -> list[R]:
+    """
+    Run a storage operation on items in a pool of STORAGE_BATCH_MAX_WORKERS threads, results in the order of the items
+    """
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(dify_config.STORAGE_BATCH_MAX_WORKERS, len(items))) as executor:
+        return list(executor.map(func, items))
@@ -0,0 +1,274 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections.abc import Generator, Mapping
+from pathlib import Path
+
+from extensions.ext_redis import redis_client
+from extensions.storage.base_storage import BaseStorage
+from libs import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CachedStorage(BaseStorage):
+    """
+    Read-through cache of files of a remote storage on the local disk.
+
+    Files are cached in a directory shared by the processes of the host, named after the hash of their filename.
+    The modification time of a cached file is when it was cached and its access time when it was last read, so the
+    least recently read files are evicted when the cache outgrows its size. Each process tracks the size of its own
+    writes between scans of the directory, which measure the size written by every process, at most SCAN_INTERVAL
+    seconds apart.
+
+    Writes go through to the cache. As other hosts may overwrite or delete a file, each write and delete leaves
+    an invalidation mark in redis for the lifetime of cached files, and files cached before their mark are stale.
+    A file read from the remote storage is only cached if its mark did not change during the read, as the read may
+    have returned the content from before a concurrent write, and it is cached as of the start of the read.
+    """
+
+    INVALIDATION_KEY_PREFIX = "storage_cache_invalidated:"
+    CHUNK_SIZE = 64 * 1024
+    # seconds between two scans of the size of the cache directory
+    SCAN_INTERVAL = 60
+
+    def __init__(self, storage: BaseStorage, path: str, max_size: int, max_file_size: int, ttl: int):
+        self.storage = storage
+        self.path = Path(path)
+        self.max_size = max_size
+        self.max_file_size = max_file_size
+        self.ttl = ttl
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # size of the directory as of the last scan plus the writes of this process since, the first write scans
+        self._size = 0
+        self._next_scan_at = 0.0
+
+    def save(self, filename, data):
+        self.storage.save(filename, data)
+        self._invalidate(filename)
+        self._put(filename, data)
+
+    def load_once(self, filename: str) -> bytes:
+        cache_path = self._get(filename)
+        if cache_path:
+            try:
+                return cache_path.read_bytes()
+            except FileNotFoundError:
+                # evicted by another process
+                pass
+
+        invalidated_at, read_at = self._get_invalidation_mark(filename), time.time()
+        data = self.storage.load_once(filename)
+        self._put_read(filename, data, invalidated_at, read_at)
+        return data
+
+    def load_stream(self, filename: str) -> Generator:
+        cache_path = self._get(filename)
+        if cache_path:
+            try:
+                file = cache_path.open("rb")
+            except FileNotFoundError:
+                pass
+            else:
+                with file:
+                    while chunk := file.read(self.CHUNK_SIZE):
+                        yield chunk
+                return
+
+        # cache the file while streaming it, unless it turns out too large
+        chunks: list[bytes] = []
+        size = 0
+        invalidated_at, read_at = self._get_invalidation_mark(filename), time.time()
+        for chunk in self.storage.load_stream(filename):
+            if size <= self.max_file_size:
+                chunks.append(chunk)
+                size += len(chunk)
+            yield chunk
+        if size <= self.max_file_size:
+            self._put_read(filename, b"".join(chunks), invalidated_at, read_at)
+
+    def download(self, filename, target_filepath):
+        cache_path = self._get(filename)
+        if cache_path:
+            try:
+                shutil.copyfile(cache_path, target_filepath)
+                return
+            except FileNotFoundError:
+                pass
+
+        self.storage.download(filename, target_filepath)
+
+    def exists(self, filename):
+        return self.storage.exists(filename)
+
+    def delete(self, filename):
+        self._invalidate(filename)
+        self._remove(filename)
+        self.storage.delete(filename)
+
+    def load_many(self, filenames: list[str]) -> list[bytes]:
+        files: dict[str, bytes] = {}
+        for filename in filenames:
+            cache_path = self._get(filename)
+            if cache_path:
+                try:
+                    files[filename] = cache_path.read_bytes()
+                except FileNotFoundError:
+                    pass
+
+        missing_filenames = [filename for filename in dict.fromkeys(filenames) if filename not in files]
+        invalidated_ats = [self._get_invalidation_mark(filename) for filename in missing_filenames]
+        read_at = time.time()
+        for filename, data, invalidated_at in zip(
+            missing_filenames, self.storage.load_many(missing_filenames), invalidated_ats
+        ):
+            files[filename] = data
+            self._put_read(filename, data, invalidated_at, read_at)
+
+        return [files[filename] for filename in filenames]
+
+    def save_many(self, files: Mapping[str, bytes]) -> None:
+        self.storage.save_many(files)
+        for filename, data in files.items():
+            self._invalidate(filename)
+            self._put(filename, data)
+
+    def delete_many(self, filenames: list[str]) -> None:
+        for filename in filenames:
+            self._invalidate(filename)
+            self._remove(filename)
+        self.storage.delete_many(filenames)
+
+    def load_range(self, filename: str, offset: int, size: int) -> bytes:
+        cache_path = self._get(filename)
+        if cache_path:
+            try:
+                with cache_path.open("rb") as file:
+                    file.seek(offset)
+                    return file.read(max(size, 0))
+            except FileNotFoundError:
+                pass
+
+        return self.storage.load_range(filename, offset, size)
+
+    def _cache_path(self, filename: str) -> Path:
+        return self.path / hashlib.sha256(filename.encode()).hexdigest()
+
+    def _get(self, filename: str) -> Path | None:
+        """
+        Path of the fresh cached file, None on a miss
+        """
+        cache_path = self._cache_path(filename)
+        try:
+            cached_at = cache_path.stat().st_mtime
+            hit = cached_at > time.time() - self.ttl and cached_at > self._get_invalidated_at(filename)
+            if hit:
+                # keep the cached time as modification time
+                os.utime(cache_path, (time.time(), cached_at))
+        except FileNotFoundError:
+            hit = False
+        except Exception:
+            logger.exception(f"Failed to look up cached file {filename}")
+            hit = False
+
+        metrics.observe_storage_cache_lookup(hit)
+        return cache_path if hit else None
+
+    def _put_read(self, filename: str, data: bytes, invalidated_at: float | None, read_at: float) -> None:
+        """
+        Cache a file read from the remote storage, unless it was written or deleted during the read
+        :param invalidated_at: invalidation mark of the file before the read, None if it could not be read
+        :param read_at: time the read started
+        """
+        if invalidated_at is None or self._get_invalidation_mark(filename) != invalidated_at:
+            return
+        self._put(filename, data, cached_at=read_at)
+
+    def _put(self, filename: str, data: bytes, cached_at: float | None = None) -> None:
+        if len(data) > self.max_file_size:
+            return
+
+        cache_path = self._cache_path(filename)
+        temp_path = cache_path.with_name(f".{cache_path.name}.{uuid.uuid4().hex}")
+        try:
+            # an overwritten file no longer takes up its previous size
+            replaced_size = cache_path.stat().st_size
+        except FileNotFoundError:
+            replaced_size = 0
+        try:
+            temp_path.write_bytes(data)
+            if cached_at is not None:
+                os.utime(temp_path, (time.time(), cached_at))
+            os.replace(temp_path, cache_path)
+        except Exception:
+            logger.exception(f"Failed to cache file {filename}")
+            temp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._size += len(data) - replaced_size
+            if self._size > self.max_size or time.monotonic() >= self._next_scan_at:
+                self._evict()
+
+    def _remove(self, filename: str) -> None:
+        cache_path = self._cache_path(filename)
+        try:
+            size = cache_path.stat().st_size
+            cache_path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._size -= size
+
+    def _evict(self) -> None:
+        """
+        Scan the size of the cache directory, as written by every process, and remove the least recently read files
+        until the cache is 10% below its size if it outgrew it
+        """
+        self._next_scan_at = time.monotonic() + self.SCAN_INTERVAL
+        entries = []
+        for entry in os.scandir(self.path):
+            try:
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+            except FileNotFoundError:
+                continue
+
+        self._size = sum(size for _, size, _ in entries)
+        if self._size <= self.max_size:
+            return
+
+        for _, size, path in sorted(entries):
+            if self._size <= self.max_size * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def _invalidate(self, filename: str) -> None:
+        try:
+            redis_client.setex(self._invalidation_key(filename), self.ttl, str(time.time()))
+        except Exception:
+            logger.exception(f"Failed to invalidate cached file {filename}")
+
+    def _get_invalidation_mark(self, filename: str) -> float | None:
+        try:
+            return self._get_invalidated_at(filename)
+        except Exception:
+            logger.exception(f"Failed to look up invalidation of cached file {filename}")
+            return None
+
+    def _get_invalidated_at(self, filename: str) -> float:
+        invalidated_at = redis_client.get(self._invalidation_key(filename))
+        return float(invalidated_at) if invalidated_at else 0.0
+
+    def _invalidation_key(self, filename: str) -> str:
+        return self.INVALIDATION_KEY_PREFIX + hashlib.sha256(filename.encode()).hexdigest()
@@ -1,12 +1,12 @@
 import logging
 import os
-from collections.abc import Generator
+from collections.abc import Generator, Mapping
 from pathlib import Path
 
 import opendal  # type: ignore[import]
 from dotenv import dotenv_values
 
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, run_concurrently
 
 logger = logging.getLogger(__name__)
 
@@ -80,3 +80,27 @@ class OpenDALStorage(BaseStorage):
             logger.debug(f"file {filename} deleted")
             return
         logger.debug(f"file {filename} not found, skip delete")
+
+    def load_many(self, filenames: list[str]) -> list[bytes]:
+        return run_concurrently(self.load_once, filenames)
+
+    def save_many(self, files: Mapping[str, bytes]) -> None:
+        run_concurrently(lambda file: self.save(*file), list(files.items()))
+
+    def delete_many(self, filenames: list[str]) -> None:
+        run_concurrently(self.delete, filenames)
+
+    def load_range(self, filename: str, offset: int, size: int) -> bytes:
+        if not self.exists(filename):
+            raise FileNotFoundError("File not found")
+
+        # reading past the end of the file fails
+        length = self.op.stat(path=filename).content_length
+        if size <= 0 or offset >= length:
+            return b""
+
+        with self.op.open(path=filename, mode="rb") as file:
+            file.seek(offset)
+            content: bytes = file.read(min(size, length - offset))
+        logger.debug(f"file {filename} loaded from {offset} to {offset + len(content)}")
+        return content
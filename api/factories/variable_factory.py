@@ -2,6 +2,8 @@ from collections.abc import Mapping, Sequence
 from typing import Any, cast
 from uuid import uuid4
 
+from pydantic import BaseModel
+
 from configs import dify_config
 from core.file import File
 from core.variables.exc import VariableError
@@ -48,7 +50,7 @@ class UnsupportedSegmentTypeError(Exception):
 
 
 # Define the constant
-SEGMENT_TO_VARIABLE_MAP = {
+SEGMENT_TO_VARIABLE_MAP: Mapping[type[Segment], type[BaseModel]] = {
     StringSegment: StringVariable,
     IntegerSegment: IntegerVariable,
     FloatSegment: FloatVariable,
@@ -62,6 +64,23 @@ SEGMENT_TO_VARIABLE_MAP = {
     NoneSegment: NoneVariable,
 }
 
+ARRAY_SEGMENT_TYPE_TO_SEGMENT_MAP: Mapping[SegmentType, type[ArraySegment]] = {
+    SegmentType.ARRAY_ANY: ArrayAnySegment,
+    SegmentType.ARRAY_STRING: ArrayStringSegment,
+    SegmentType.ARRAY_NUMBER: ArrayNumberSegment,
+    SegmentType.ARRAY_OBJECT: ArrayObjectSegment,
+    SegmentType.ARRAY_FILE: ArrayFileSegment,
+}
+
+PYTHON_TYPE_TO_ARRAY_SEGMENT_TYPE_MAP: Mapping[type, SegmentType] = {
+    str: SegmentType.ARRAY_STRING,
+    int: SegmentType.ARRAY_NUMBER,
+    float: SegmentType.ARRAY_NUMBER,
+    dict: SegmentType.ARRAY_OBJECT,
+    File: SegmentType.ARRAY_FILE,
+    type(None): SegmentType.ARRAY_ANY,
+}
+
 
 def build_conversation_variable_from_mapping(mapping: Mapping[str, Any], /) -> Variable:
     if not mapping.get("name"):
@@ -128,26 +147,54 @@ def build_segment(value: Any, /) -> Segment:
     if isinstance(value, File):
         return FileSegment(value=value)
     if isinstance(value, list):
-        items = [build_segment(item) for item in value]
-        types = {item.value_type for item in items}
-        if len(types) != 1 or all(isinstance(item, ArraySegment) for item in items):
-            return ArrayAnySegment(value=value)
-        match types.pop():
-            case SegmentType.STRING:
-                return ArrayStringSegment(value=value)
-            case SegmentType.NUMBER:
-                return ArrayNumberSegment(value=value)
-            case SegmentType.OBJECT:
-                return ArrayObjectSegment(value=value)
-            case SegmentType.FILE:
-                return ArrayFileSegment(value=value)
-            case SegmentType.NONE:
-                return ArrayAnySegment(value=value)
-            case _:
-                raise ValueError(f"not supported value {value}")
+        segment_class = ARRAY_SEGMENT_TYPE_TO_SEGMENT_MAP[_infer_array_type(value)]
+        # the elements are already checked by the type inference, skip validating them one by one again
+        return segment_class.model_construct(value=list(value))
+    raise ValueError(f"not supported value {value}")
+
+
+def _infer_segment_type(value: Any, /) -> SegmentType:
+    """
+    Infer the type of the segment built from the value without building it.
+    """
+    if value is None:
+        return SegmentType.NONE
+    if isinstance(value, str):
+        return SegmentType.STRING
+    if isinstance(value, int | float):
+        return SegmentType.NUMBER
+    if isinstance(value, dict):
+        return SegmentType.OBJECT
+    if isinstance(value, File):
+        return SegmentType.FILE
+    if isinstance(value, list):
+        return _infer_array_type(value)
     raise ValueError(f"not supported value {value}")
 
 
+def _infer_array_type(value: list, /) -> SegmentType:
+    # most arrays hold elements of one builtin type, which is decided without inspecting every element
+    array_types = {PYTHON_TYPE_TO_ARRAY_SEGMENT_TYPE_MAP.get(python_type) for python_type in set(map(type, value))}
+    if len(array_types) == 1 and None not in array_types:
+        return cast(SegmentType, array_types.pop())
+
+    element_types = {_infer_segment_type(item) for item in value}
+    if len(element_types) != 1:
+        return SegmentType.ARRAY_ANY
+    match element_types.pop():
+        case SegmentType.STRING:
+            return SegmentType.ARRAY_STRING
+        case SegmentType.NUMBER:
+            return SegmentType.ARRAY_NUMBER
+        case SegmentType.OBJECT:
+            return SegmentType.ARRAY_OBJECT
+        case SegmentType.FILE:
+            return SegmentType.ARRAY_FILE
+        case _:
+            # arrays of nones or of arrays
+            return SegmentType.ARRAY_ANY
+
+
 def segment_to_variable(
     *,
     segment: Segment,
@@ -166,9 +213,11 @@ def segment_to_variable(
         raise UnsupportedSegmentTypeError(f"not supported segment type {segment_type}")
 
     variable_class = SEGMENT_TO_VARIABLE_MAP[segment_type]
+    # elements of arrays are already validated by the segment, skip validating them one by one again
+    create = variable_class.model_construct if isinstance(segment, ArraySegment) else variable_class
     return cast(
         Variable,
-        variable_class(
+        create(
             id=id,
             name=name,
             description=description,
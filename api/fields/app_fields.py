@@ -40,6 +40,7 @@ model_config_fields = {
     "completion_prompt_config": fields.Raw(attribute="completion_prompt_config_dict"),
     "dataset_configs": fields.Raw(attribute="dataset_configs_dict"),
     "file_upload": fields.Raw(attribute="file_upload_dict"),
+    "semantic_cache": fields.Raw(attribute="semantic_cache_dict"),
     "created_by": fields.String,
     "created_at": TimestampField,
     "updated_by": fields.String,
@@ -0,0 +1,89 @@
+import json
+import logging
+from collections.abc import Callable
+from typing import Optional, Union
+
+from sqlalchemy import ColumnElement, delete, select
+from sqlalchemy.orm import InstrumentedAttribute, Session, scoped_session
+
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_EXPIRES_IN = 7 * 24 * 60 * 60
+
+
+def delete_in_batches(
+    session: Union[Session, scoped_session],
+    id_column: InstrumentedAttribute,
+    *whereclauses: ColumnElement[bool],
+    batch_size: int = 1000,
+    before_delete: Optional[Callable[[list[str]], None]] = None,
+    checkpoint_key: Optional[str] = None,
+) -> int:
+    """
+    Delete the rows matching the where clauses in batches, until no row matches anymore.
+
+    Each batch is selected by `LIMIT` without any order, deleted by one `DELETE ... WHERE id IN (...)` statement
+    and committed on its own, so neither the rows nor a long transaction pile up in memory whatever the number
+    of rows. As deleted rows no longer match, no cursor is needed, and rows inserted during the deletion are
+    deleted as well.
+    Rows depending on a batch, like files in storage or child rows, are deleted first by before_delete.
+    With a checkpoint key, the number of deleted rows is kept in redis after each batch so a retried deletion
+    reports the rows deleted by the failed one as well.
+
+    :param session: database session
+    :param id_column: unique id column of the table
+    :param whereclauses: conditions of the rows to delete
+    :param batch_size: max number of rows deleted by a statement
+    :param before_delete: called with the ids of each batch before it's deleted
+    :param checkpoint_key: key of the progress of the deletion in redis
+    :return: number of deleted rows
+    """
+    model = id_column.class_
+    deleted = _load_checkpoint(checkpoint_key)
+    while True:
+        stmt = select(id_column).where(*whereclauses).limit(batch_size)
+
+        if before_delete is None:
+            ids = list(
+                session.scalars(
+                    delete(model)
+                    .where(id_column.in_(stmt.scalar_subquery()))
+                    .returning(id_column)
+                    .execution_options(synchronize_session=False)
+                ).all()
+            )
+        else:
+            ids = list(session.scalars(stmt).all())
+            if ids:
+                before_delete(ids)
+                session.execute(delete(model).where(id_column.in_(ids)).execution_options(synchronize_session=False))
+        session.commit()
+
+        if not ids:
+            break
+
+        deleted += len(ids)
+        _save_checkpoint(checkpoint_key, deleted)
+        logger.info(f"Deleted {deleted} rows of {model.__tablename__}")
+
+    if checkpoint_key:
+        redis_client.delete(checkpoint_key)
+    return deleted
+
+
+def _load_checkpoint(checkpoint_key: Optional[str]) -> int:
+    if not checkpoint_key:
+        return 0
+
+    checkpoint = redis_client.get(checkpoint_key)
+    if not checkpoint:
+        return 0
+
+    return int(json.loads(checkpoint)["deleted"])
+
+
+def _save_checkpoint(checkpoint_key: Optional[str], deleted: int) -> None:
+    if checkpoint_key:
+        redis_client.setex(checkpoint_key, CHECKPOINT_EXPIRES_IN, json.dumps({"deleted": deleted}))
@@ -1,5 +1,46 @@
+from typing import Any, Optional, Union
+
+from sqlalchemy import Select, asc, desc, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Session, scoped_session
+
+
 class InfiniteScrollPagination:
     def __init__(self, data, limit, has_more):
         self.data = data
         self.limit = limit
         self.has_more = has_more
+
+
+def paginate_by_keyset(
+    session: Union[Session, scoped_session],
+    stmt: Select,
+    *,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    limit: int,
+    descending: bool = True,
+    cursor: Optional[tuple[Any, str]] = None,
+) -> InfiniteScrollPagination:
+    """
+    Fetch a page of the rows selected by stmt ordered by (sort_column, id_column).
+
+    One more row than the limit is fetched to know whether there are more rows, instead of counting them.
+    The id breaks ties between rows with the same sort value, so no row is skipped or repeated across pages.
+
+    :param session: database session
+    :param stmt: select statement of the rows
+    :param sort_column: column to sort the rows by
+    :param id_column: unique column breaking ties of the sort column
+    :param limit: max number of rows of the page
+    :param descending: whether to sort the rows in descending order
+    :param cursor: (sort value, id) of the last row of the previous page
+    """
+    if cursor is not None:
+        keys = tuple_(sort_column, id_column)
+        stmt = stmt.where(keys < cursor if descending else keys > cursor)
+
+    direction = desc if descending else asc
+    stmt = stmt.order_by(direction(sort_column), direction(id_column)).limit(limit + 1)
+    rows = list(session.scalars(stmt).all())
+
+    return InfiniteScrollPagination(data=rows[:limit], limit=limit, has_more=len(rows) > limit)
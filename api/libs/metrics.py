@@ -0,0 +1,263 @@
+"""
+Prometheus metrics of the hot paths.
+
+Metrics are collected per process. When the PROMETHEUS_MULTIPROC_DIR environment variable points to a shared
+directory, the values of all gunicorn workers and celery processes of the host are written there and aggregated
+by the metrics endpoint.
+"""
+
+import os
+import re
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Literal, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from configs import dify_config
+
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+TOKENS_PER_SECOND_BUCKETS = (1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000)
+
+_ID_PATH_SEGMENT_PATTERN = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(?=/|$)")
+
+workflow_node_execution_seconds = Histogram(
+    "dify_workflow_node_execution_seconds",
+    "Time spent running graph nodes, including retries",
+    ["node_type", "status"],
+)
+llm_time_to_first_token_seconds = Histogram(
+    "dify_llm_time_to_first_token_seconds",
+    "Time from invoking a large language model to its first chunk",
+    ["provider", "model", "stream"],
+)
+llm_tokens_per_second = Histogram(
+    "dify_llm_tokens_per_second",
+    "Completion tokens generated per second by large language models",
+    ["provider", "model", "stream"],
+    buckets=TOKENS_PER_SECOND_BUCKETS,
+)
+retrieval_stage_seconds = Histogram(
+    "dify_retrieval_stage_seconds",
+    "Time spent in stages of knowledge retrieval",
+    ["stage"],
+)
+plugin_daemon_request_seconds = Histogram(
+    "dify_plugin_daemon_request_seconds",
+    "Latency of requests to the plugin daemon until the response headers are received",
+    ["method", "path"],
+)
+llm_token_count_daemon_calls_avoided = Counter(
+    "dify_llm_token_count_daemon_calls_avoided",
+    "Number of token counts of prompt messages answered without a plugin daemon request",
+    ["source"],
+)
+llm_response_cache_lookups = Counter(
+    "dify_llm_response_cache_lookups",
+    "Number of lookups of cached large language model responses",
+    ["result"],
+)
+llm_response_cache_saved_tokens = Counter(
+    "dify_llm_response_cache_saved_tokens",
+    "Number of tokens of large language model invocations answered from the response cache",
+)
+semantic_cache_lookups = Counter(
+    "dify_semantic_cache_lookups",
+    "Number of lookups of past answers in the semantic cache of chat apps",
+    ["result"],
+)
+storage_cache_lookups = Counter(
+    "dify_storage_cache_lookups",
+    "Number of lookups of storage files in the local disk cache",
+    ["result"],
+)
+encoded_file_cache_lookups = Counter(
+    "dify_encoded_file_cache_lookups",
+    "Number of lookups of base64 encoded files sent to models",
+    ["result"],
+)
+request_redis_calls = Histogram(
+    "dify_request_redis_calls",
+    "Number of redis calls made by an http request",
+    buckets=COUNT_BUCKETS,
+)
+request_db_queries = Histogram(
+    "dify_request_db_queries",
+    "Number of database queries made by an http request",
+    buckets=COUNT_BUCKETS,
+)
+app_queue_depth = Gauge(
+    "dify_app_queue_depth",
+    "Number of events waiting in in-process app queues",
+    multiprocess_mode="livesum",
+)
+celery_task_seconds = Histogram(
+    "dify_celery_task_seconds",
+    "Time spent running celery tasks",
+    ["task", "state"],
+)
+celery_tasks = Counter(
+    "dify_celery_tasks",
+    "Number of celery tasks run",
+    ["task", "state"],
+)
+
+# Counts of calls made by the current http request, None outside requests
+_request_call_counts: ContextVar[Optional[dict[str, int]]] = ContextVar("request_call_counts", default=None)
+
+
+def is_enabled() -> bool:
+    return dify_config.METRICS_ENABLED
+
+
+def observe_workflow_node_execution(node_type: str, status: str, seconds: float) -> None:
+    if not is_enabled():
+        return
+    workflow_node_execution_seconds.labels(node_type=node_type, status=status).observe(seconds)
+
+
+def observe_llm_invoke(
+    provider: str, model: str, stream: bool, first_token_seconds: float, completion_tokens: int, seconds: float
+) -> None:
+    """
+    Observe a finished large language model invocation
+    :param first_token_seconds: seconds until the first chunk was received
+    :param completion_tokens: number of completion tokens
+    :param seconds: seconds from the first chunk until the end of the invocation
+    """
+    if not is_enabled():
+        return
+    labels = {"provider": provider, "model": model, "stream": str(stream).lower()}
+    llm_time_to_first_token_seconds.labels(**labels).observe(first_token_seconds)
+    if completion_tokens and seconds > 0:
+        llm_tokens_per_second.labels(**labels).observe(completion_tokens / seconds)
+
+
+@contextmanager
+def time_retrieval_stage(
+    stage: Literal["embed", "vector_search", "full_text_search", "keyword_search", "rerank", "hydrate"],
+) -> Generator[None, None, None]:
+    if not is_enabled():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        retrieval_stage_seconds.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def observe_plugin_daemon_request(method: str, path: str, seconds: float) -> None:
+    if not is_enabled():
+        return
+    # tenant ids in paths are replaced to keep the number of label values bounded
+    path = _ID_PATH_SEGMENT_PATTERN.sub("/{id}", "/" + path.lstrip("/"))
+    plugin_daemon_request_seconds.labels(method=method.upper(), path=path).observe(seconds)
+
+
+def inc_llm_token_count_daemon_calls_avoided(source: Literal["cache", "local_tokenizer"]) -> None:
+    if is_enabled():
+        llm_token_count_daemon_calls_avoided.labels(source=source).inc()
+
+
+def observe_llm_response_cache_lookup(hit: bool, saved_tokens: int = 0) -> None:
+    if not is_enabled():
+        return
+    llm_response_cache_lookups.labels(result="hit" if hit else "miss").inc()
+    if saved_tokens:
+        llm_response_cache_saved_tokens.inc(saved_tokens)
+
+
+def observe_semantic_cache_lookup(hit: bool) -> None:
+    if not is_enabled():
+        return
+    semantic_cache_lookups.labels(result="hit" if hit else "miss").inc()
+
+
+def observe_storage_cache_lookup(hit: bool) -> None:
+    if not is_enabled():
+        return
+    storage_cache_lookups.labels(result="hit" if hit else "miss").inc()
+
+
+def observe_encoded_file_cache_lookup(hit: bool) -> None:
+    if not is_enabled():
+        return
+    encoded_file_cache_lookups.labels(result="hit" if hit else "miss").inc()
+
+
+def start_request_call_counts() -> None:
+    if not is_enabled():
+        return
+    _request_call_counts.set({"redis": 0, "db": 0})
+
+
+def count_request_call(kind: Literal["redis", "db"]) -> None:
+    counts = _request_call_counts.get()
+    if counts is not None:
+        counts[kind] += 1
+
+
+def finish_request_call_counts() -> None:
+    counts = _request_call_counts.get()
+    if counts is None:
+        return
+    _request_call_counts.set(None)
+    request_redis_calls.observe(counts["redis"])
+    request_db_queries.observe(counts["db"])
+
+
+def inc_app_queue_depth() -> None:
+    if is_enabled():
+        app_queue_depth.inc()
+
+
+def dec_app_queue_depth(amount: int = 1) -> None:
+    if is_enabled():
+        app_queue_depth.dec(amount)
+
+
+@contextmanager
+def time_celery_task(task: str) -> Generator[None, None, None]:
+    if not is_enabled():
+        yield
+        return
+    start = time.perf_counter()
+    state = "failure"
+    try:
+        yield
+        state = "success"
+    finally:
+        celery_task_seconds.labels(task=task, state=state).observe(time.perf_counter() - start)
+        celery_tasks.labels(task=task, state=state).inc()
+
+
+def generate_metrics() -> tuple[bytes, str]:
+    """
+    Generate metrics of this process, or of all processes sharing PROMETHEUS_MULTIPROC_DIR
+    :return: metrics in the prometheus text format and its content type
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """
+    Drop the live gauge values of this process from PROMETHEUS_MULTIPROC_DIR
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
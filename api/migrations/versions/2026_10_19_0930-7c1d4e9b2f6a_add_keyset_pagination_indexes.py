@@ -0,0 +1,34 @@
+"""add keyset pagination indexes
+
+Revision ID: 7c1d4e9b2f6a
+Revises: d20049ed0af6
+Create Date: 2026-10-19 09:30:12.318474
+
+"""
+from alembic import op
+import models as models
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1d4e9b2f6a'
+down_revision = 'd20049ed0af6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # build the indexes without locking writes of these tables, which can take a while on large tables
+    with op.get_context().autocommit_block():
+        op.create_index('conversation_account_updated_at_idx', 'conversations', ['app_id', 'from_account_id', 'updated_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('conversation_end_user_updated_at_idx', 'conversations', ['app_id', 'from_end_user_id', 'updated_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('message_conversation_created_at_idx', 'messages', ['conversation_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('workflow_run_triggered_from_created_at_idx', 'workflow_runs', ['tenant_id', 'app_id', 'triggered_from', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('workflow_run_triggered_from_created_at_idx', table_name='workflow_runs', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('message_conversation_created_at_idx', table_name='messages', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('conversation_end_user_updated_at_idx', table_name='conversations', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('conversation_account_updated_at_idx', table_name='conversations', postgresql_concurrently=True, if_exists=True)
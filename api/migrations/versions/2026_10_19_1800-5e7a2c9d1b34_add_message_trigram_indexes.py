@@ -0,0 +1,32 @@
+"""add message trigram indexes
+
+Revision ID: 5e7a2c9d1b34
+Revises: 9d2f6c1a4e83
+Create Date: 2026-10-19 18:00:41.207563
+
+"""
+from alembic import op
+import models as models
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e7a2c9d1b34'
+down_revision = '9d2f6c1a4e83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # build the indexes without locking writes of messages, which can take a while on large tables
+    with op.get_context().autocommit_block():
+        op.create_index('message_query_trgm_idx', 'messages', ['query'], unique=False, postgresql_using='gin', postgresql_ops={'query': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('message_answer_trgm_idx', 'messages', ['answer'], unique=False, postgresql_using='gin', postgresql_ops={'answer': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('message_answer_trgm_idx', table_name='messages', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('message_query_trgm_idx', table_name='messages', postgresql_concurrently=True, if_exists=True)
@@ -34,6 +34,7 @@ from .model import (
     App,
     AppAnnotationHitHistory,
     AppAnnotationSetting,
+    AppDailyStatistic,
     AppMode,
     AppModelConfig,
     Conversation,
@@ -104,6 +105,7 @@ __all__ = [
     "App",
     "AppAnnotationHitHistory",
     "AppAnnotationSetting",
+    "AppDailyStatistic",
     "AppDatasetJoin",
     "AppMode",
     "AppModelConfig",
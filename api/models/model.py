@@ -1,7 +1,8 @@
+import functools
 import json
 import re
 import uuid
-from collections.abc import Mapping
+from collections.abc import Callable, Mapping
 from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
@@ -39,6 +40,29 @@ if TYPE_CHECKING:
     from .workflow import Workflow
 
 
+def preloaded(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """
+    Serve a property from the value batch-loaded for the instance by services.message_preload_service,
+    the property queries it on its own otherwise.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self):
+        preloaded_values = self.__dict__.get("_preloaded")
+        if preloaded_values is not None and func.__name__ in preloaded_values:
+            return preloaded_values[func.__name__]
+        return func(self)
+
+    return wrapper
+
+
+def set_preloaded(instance: Any, name: str, value: Any) -> None:
+    """
+    Attach a batch-loaded value of a property decorated with preloaded to the instance
+    """
+    instance.__dict__.setdefault("_preloaded", {})[name] = value
+
+
 class DifySetup(Base):
     __tablename__ = "dify_setups"
     __table_args__ = (db.PrimaryKeyConstraint("version", name="dify_setup_pkey"),)
@@ -329,6 +353,7 @@ class AppModelConfig(Base):
     dataset_configs = db.Column(db.Text)
     external_data_tools = db.Column(db.Text)
     file_upload = db.Column(db.Text)
+    semantic_cache = db.Column(db.Text)
 
     @property
     def app(self):
@@ -390,6 +415,10 @@ class AppModelConfig(Base):
     def more_like_this_dict(self) -> dict:
         return json.loads(self.more_like_this) if self.more_like_this else {"enabled": False}
 
+    @property
+    def semantic_cache_dict(self) -> dict:
+        return json.loads(self.semantic_cache) if self.semantic_cache else {"enabled": False}
+
     @property
     def sensitive_word_avoidance_dict(self) -> dict:
         return (
@@ -471,6 +500,7 @@ class AppModelConfig(Base):
             "completion_prompt_config": self.completion_prompt_config_dict,
             "dataset_configs": self.dataset_configs_dict,
             "file_upload": self.file_upload_dict,
+            "semantic_cache": self.semantic_cache_dict,
         }
 
     def from_model_config_dict(self, model_config: Mapping[str, Any]):
@@ -517,6 +547,9 @@ class AppModelConfig(Base):
             json.dumps(model_config.get("dataset_configs")) if model_config.get("dataset_configs") else None
         )
         self.file_upload = json.dumps(model_config.get("file_upload")) if model_config.get("file_upload") else None
+        self.semantic_cache = (
+            json.dumps(model_config.get("semantic_cache")) if model_config.get("semantic_cache") else None
+        )
         return self
 
     def copy(self):
@@ -542,6 +575,7 @@ class AppModelConfig(Base):
             completion_prompt_config=self.completion_prompt_config,
             dataset_configs=self.dataset_configs,
             file_upload=self.file_upload,
+            semantic_cache=self.semantic_cache,
         )
 
         return new_app_model_config
@@ -609,6 +643,8 @@ class Conversation(db.Model):  # type: ignore[name-defined]
     __table_args__ = (
         db.PrimaryKeyConstraint("id", name="conversation_pkey"),
         db.Index("conversation_app_from_user_idx", "app_id", "from_source", "from_end_user_id"),
+        db.Index("conversation_end_user_updated_at_idx", "app_id", "from_end_user_id", "updated_at", "id"),
+        db.Index("conversation_account_updated_at_idx", "app_id", "from_account_id", "updated_at", "id"),
     )
 
     id: Mapped[str] = mapped_column(StringUUID, server_default=db.text("uuid_generate_v4()"))
@@ -701,9 +737,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
                 else:
                     model_config["configs"] = override_model_configs
             else:
-                app_model_config = (
-                    db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
-                )
+                app_model_config = self.app_model_config
                 if app_model_config:
                     model_config = app_model_config.to_dict()
 
@@ -712,6 +746,11 @@ class Conversation(db.Model):  # type: ignore[name-defined]
 
         return model_config
 
+    @property
+    @preloaded
+    def app_model_config(self) -> Optional["AppModelConfig"]:
+        return db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
+
     @property
     def summary_or_query(self):
         if self.summary:
@@ -724,18 +763,22 @@ class Conversation(db.Model):  # type: ignore[name-defined]
                 return ""
 
     @property
+    @preloaded
     def annotated(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).count() > 0
 
     @property
+    @preloaded
     def annotation(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).first()
 
     @property
+    @preloaded
     def message_count(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).count()
 
     @property
+    @preloaded
     def user_feedback_stats(self):
         like = (
             db.session.query(MessageFeedback)
@@ -760,6 +803,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
         return {"like": like, "dislike": dislike}
 
     @property
+    @preloaded
     def admin_feedback_stats(self):
         like = (
             db.session.query(MessageFeedback)
@@ -784,6 +828,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
         return {"like": like, "dislike": dislike}
 
     @property
+    @preloaded
     def status_count(self):
         messages = db.session.query(Message).filter(Message.conversation_id == self.id).all()
         status_counts = {
@@ -809,6 +854,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
         )
 
     @property
+    @preloaded
     def first_message(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).first()
 
@@ -817,6 +863,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
         return db.session.query(App).filter(App.id == self.app_id).first()
 
     @property
+    @preloaded
     def from_end_user_session_id(self):
         if self.from_end_user_id:
             end_user = db.session.query(EndUser).filter(EndUser.id == self.from_end_user_id).first()
@@ -826,6 +873,7 @@ class Conversation(db.Model):  # type: ignore[name-defined]
         return None
 
     @property
+    @preloaded
     def from_account_name(self):
         if self.from_account_id:
             account = db.session.query(Account).filter(Account.id == self.from_account_id).first()
@@ -876,6 +924,10 @@ class Message(db.Model):  # type: ignore[name-defined]
         Index("message_account_idx", "app_id", "from_source", "from_account_id"),
         Index("message_workflow_run_id_idx", "conversation_id", "workflow_run_id"),
         Index("message_created_at_idx", "created_at"),
+        Index("message_conversation_created_at_idx", "conversation_id", "created_at", "id"),
+        # trigram indexes for keyword search in logs, they need the pg_trgm extension
+        Index("message_query_trgm_idx", "query", postgresql_using="gin", postgresql_ops={"query": "gin_trgm_ops"}),
+        Index("message_answer_trgm_idx", "answer", postgresql_using="gin", postgresql_ops={"answer": "gin_trgm_ops"}),
     )
 
     id: Mapped[str] = mapped_column(StringUUID, server_default=db.text("uuid_generate_v4()"))
@@ -1020,6 +1072,7 @@ class Message(db.Model):  # type: ignore[name-defined]
         return re_sign_file_url_answer
 
     @property
+    @preloaded
     def user_feedback(self):
         feedback = (
             db.session.query(MessageFeedback)
@@ -1029,6 +1082,7 @@ class Message(db.Model):  # type: ignore[name-defined]
         return feedback
 
     @property
+    @preloaded
     def admin_feedback(self):
         feedback = (
             db.session.query(MessageFeedback)
@@ -1038,16 +1092,19 @@ class Message(db.Model):  # type: ignore[name-defined]
         return feedback
 
     @property
+    @preloaded
     def feedbacks(self):
         feedbacks = db.session.query(MessageFeedback).filter(MessageFeedback.message_id == self.id).all()
         return feedbacks
 
     @property
+    @preloaded
     def annotation(self):
         annotation = db.session.query(MessageAnnotation).filter(MessageAnnotation.message_id == self.id).first()
         return annotation
 
     @property
+    @preloaded
     def annotation_hit_history(self):
         annotation_history = (
             db.session.query(AppAnnotationHitHistory).filter(AppAnnotationHitHistory.message_id == self.id).first()
@@ -1080,6 +1137,7 @@ class Message(db.Model):  # type: ignore[name-defined]
         return json.loads(self.message_metadata) if self.message_metadata else {}
 
     @property
+    @preloaded
     def agent_thoughts(self):
         return (
             db.session.query(MessageAgentThought)
@@ -1089,6 +1147,7 @@ class Message(db.Model):  # type: ignore[name-defined]
         )
 
     @property
+    @preloaded
     def retriever_resources(self):
         return (
             db.session.query(DatasetRetrieverResource)
@@ -1098,14 +1157,25 @@ class Message(db.Model):  # type: ignore[name-defined]
         )
 
     @property
+    @preloaded
     def message_files(self):
-        from factories import file_factory
-
         message_files = db.session.query(MessageFile).filter(MessageFile.message_id == self.id).all()
         current_app = db.session.query(App).filter(App.id == self.app_id).first()
         if not current_app:
             raise ValueError(f"App {self.app_id} not found")
 
+        result = self.build_message_files(message_files, current_app.tenant_id)
+
+        db.session.commit()
+        return result
+
+    @staticmethod
+    def build_message_files(message_files: list["MessageFile"], tenant_id: str) -> list[dict]:
+        """
+        Serialize message files, tool files missing an upload_file_id get it set from their url
+        """
+        from factories import file_factory
+
         files = []
         for message_file in message_files:
             if message_file.transfer_method == FileTransferMethod.LOCAL_FILE.value:
@@ -1118,7 +1188,7 @@ class Message(db.Model):  # type: ignore[name-defined]
                         "transfer_method": message_file.transfer_method,
                         "upload_file_id": message_file.upload_file_id,
                     },
-                    tenant_id=current_app.tenant_id,
+                    tenant_id=tenant_id,
                 )
             elif message_file.transfer_method == FileTransferMethod.REMOTE_URL.value:
                 if message_file.url is None:
@@ -1131,7 +1201,7 @@ class Message(db.Model):  # type: ignore[name-defined]
                         "upload_file_id": message_file.upload_file_id,
                         "url": message_file.url,
                     },
-                    tenant_id=current_app.tenant_id,
+                    tenant_id=tenant_id,
                 )
             elif message_file.transfer_method == FileTransferMethod.TOOL_FILE.value:
                 if message_file.upload_file_id is None:
@@ -1145,7 +1215,7 @@ class Message(db.Model):  # type: ignore[name-defined]
                 }
                 file = file_factory.build_from_mapping(
                     mapping=mapping,
-                    tenant_id=current_app.tenant_id,
+                    tenant_id=tenant_id,
                 )
             else:
                 raise ValueError(
@@ -1153,14 +1223,11 @@ class Message(db.Model):  # type: ignore[name-defined]
                 )
             files.append(file)
 
-        result = [
+        return [
             {"belongs_to": message_file.belongs_to, **file.to_dict()}
             for (file, message_file) in zip(files, message_files)
         ]
 
-        db.session.commit()
-        return result
-
     @property
     def workflow_run(self):
         if self.workflow_run_id:
@@ -1240,6 +1307,7 @@ class MessageFeedback(db.Model):  # type: ignore[name-defined]
     updated_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
 
     @property
+    @preloaded
     def from_account(self):
         account = db.session.query(Account).filter(Account.id == self.from_account_id).first()
         return account
@@ -1307,11 +1375,13 @@ class MessageAnnotation(db.Model):  # type: ignore[name-defined]
     updated_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
 
     @property
+    @preloaded
     def account(self):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
 
     @property
+    @preloaded
     def annotation_create_account(self):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
@@ -1827,3 +1897,25 @@ class TraceAppConfig(Base):
             "created_at": str(self.created_at) if self.created_at else None,
             "updated_at": str(self.updated_at) if self.updated_at else None,
         }
+
+
+class AppDailyStatistic(Base):
+    """
+    Statistic of an app for a completed day in a timezone, rolled up from messages or workflow runs.
+    data is None when the app had no activity that day.
+    """
+
+    __tablename__ = "app_daily_statistics"
+    __table_args__ = (
+        db.PrimaryKeyConstraint("id", name="app_daily_statistic_pkey"),
+        db.UniqueConstraint("app_id", "statistic", "date", "timezone", name="unique_app_daily_statistic"),
+        db.Index("app_daily_statistic_created_at_idx", "created_at"),
+    )
+
+    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    app_id = db.Column(StringUUID, nullable=False)
+    statistic = db.Column(db.String(40), nullable=False)
+    timezone = db.Column(db.String(64), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    data = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
@@ -398,6 +398,9 @@ class WorkflowRun(Base):
         db.PrimaryKeyConstraint("id", name="workflow_run_pkey"),
         db.Index("workflow_run_triggerd_from_idx", "tenant_id", "app_id", "triggered_from"),
         db.Index("workflow_run_tenant_app_sequence_idx", "tenant_id", "app_id", "sequence_number"),
+        db.Index(
+            "workflow_run_triggered_from_created_at_idx", "tenant_id", "app_id", "triggered_from", "created_at", "id"
+        ),
     )
 
     id: Mapped[str] = mapped_column(StringUUID, server_default=db.text("uuid_generate_v4()"))
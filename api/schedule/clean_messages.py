@@ -7,7 +7,6 @@ from werkzeug.exceptions import NotFound
 import app
 from configs import dify_config
 from extensions.ext_database import db
-from extensions.ext_redis import redis_client
 from models.model import (
     App,
     Message,
@@ -47,14 +46,7 @@ def clean_messages():
         for message in messages:
             plan_sandbox_clean_message_day = message.created_at
             app = App.query.filter_by(id=message.app_id).first()
-            features_cache_key = f"features:{app.tenant_id}"
-            plan_cache = redis_client.get(features_cache_key)
-            if plan_cache is None:
-                features = FeatureService.get_features(app.tenant_id)
-                redis_client.setex(features_cache_key, 600, features.billing.subscription.plan)
-                plan = features.billing.subscription.plan
-            else:
-                plan = plan_cache.decode()
+            plan = FeatureService.get_features(app.tenant_id, use_cache=True).billing.subscription.plan
             if plan == "sandbox":
                 # clean related message
                 db.session.query(MessageFeedback).filter(MessageFeedback.message_id == message.id).delete(
@@ -38,7 +38,7 @@ def mail_clean_document_notify_task():
             dataset_auto_disable_logs_map[dataset_auto_disable_log.tenant_id].append(dataset_auto_disable_log)
         url = f"{dify_config.CONSOLE_WEB_URL}/datasets"
         for tenant_id, tenant_dataset_auto_disable_logs in dataset_auto_disable_logs_map.items():
-            features = FeatureService.get_features(tenant_id)
+            features = FeatureService.get_features(tenant_id, use_cache=True)
             plan = features.billing.subscription.plan
             if plan != "sandbox":
                 knowledge_details = []
@@ -0,0 +1,51 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+import click
+import pytz
+
+import app
+from extensions.ext_database import db
+from services.app_statistic_service import AppStatisticService
+
+
+@app.celery.task(queue="dataset")
+def roll_up_app_daily_statistics_task():
+    """
+    Invalidate the rollups of the conversations continued and of the messages given feedback since the last run,
+    then roll up the statistics of the last completed day of the dashboards opened recently,
+    so that opening them only aggregates the current day.
+    """
+    click.echo(click.style("Start roll up app daily statistics.", fg="green"))
+    start_at = time.perf_counter()
+
+    try:
+        continued = AppStatisticService.invalidate_continued_conversations()
+        click.echo(click.style(f"Invalidated daily statistics of {continued} continued conversations", fg="green"))
+    except Exception:
+        db.session.rollback()
+        click.echo(click.style("Failed to invalidate daily statistics of continued conversations", fg="red"))
+
+    try:
+        feedback = AppStatisticService.invalidate_feedback_messages()
+        click.echo(click.style(f"Invalidated daily statistics of {feedback} messages with new feedback", fg="green"))
+    except Exception:
+        db.session.rollback()
+        click.echo(click.style("Failed to invalidate daily statistics of messages with new feedback", fg="red"))
+
+    rolled_up = 0
+    for app_id, timezone in AppStatisticService.get_active_timezones():
+        try:
+            yesterday = datetime.now(UTC).astimezone(pytz.timezone(timezone)).date() - timedelta(days=1)
+            AppStatisticService.roll_up(app_id, timezone, yesterday)
+            rolled_up += 1
+        except Exception:
+            db.session.rollback()
+            click.echo(click.style(f"Failed to roll up daily statistics of app {app_id} in {timezone}", fg="red"))
+
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(
+            "Rolled up daily statistics of {} apps, latency: {}".format(rolled_up, end_at - start_at), fg="green"
+        )
+    )
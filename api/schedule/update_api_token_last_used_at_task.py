@@ -0,0 +1,34 @@
+import time
+from datetime import UTC, datetime
+
+import click
+from sqlalchemy import update
+
+import app
+from extensions.ext_database import db
+from models.model import ApiToken
+from services.api_auth_cache import ApiAuthCache
+
+
+@app.celery.task(queue="dataset")
+def update_api_token_last_used_at_task():
+    click.echo(click.style("Start update api token last used at.", fg="green"))
+    start_at = time.perf_counter()
+
+    usages = ApiAuthCache.pop_api_token_usages()
+    if usages:
+        db.session.execute(
+            update(ApiToken),
+            [
+                {"id": api_token_id, "last_used_at": datetime.fromtimestamp(used_at, UTC).replace(tzinfo=None)}
+                for api_token_id, used_at in usages.items()
+            ],
+        )
+        db.session.commit()
+
+    end_at = time.perf_counter()
+    click.echo(
+        click.style(
+            "Updated last used at of {} api tokens, latency: {}".format(len(usages), end_at - start_at), fg="green"
+        )
+    )
@@ -0,0 +1,174 @@
+import json
+import logging
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Any, Optional, TypeVar
+
+from sqlalchemy import DateTime, inspect
+from sqlalchemy.orm import class_mapper
+
+from configs import dify_config
+from core.helper.lru_cache import LRUCache
+from extensions.ext_redis import redis_client
+from models.model import ApiToken, EndUser
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ApiAuthCache:
+    """
+    Short-lived redis cache of the lookups authenticating service api and web app requests.
+
+    Api tokens are cached as their column values in json. End users are only cached as their ids and still loaded
+    by primary key, so a deleted end user is never served. Apps are still loaded on every request,
+    so disabling or deleting an app takes effect immediately.
+    """
+
+    KEY_PREFIX = "api_auth_cache"
+    API_TOKEN_LAST_USED_AT_KEY = "api_token_last_used_at"
+    # seconds between two records of the usage of the same api token
+    API_TOKEN_USAGE_RECORD_INTERVAL = 60
+
+    _usage_recorded_at = LRUCache(4096)
+    _usage_lock = Lock()
+
+    @classmethod
+    def get_api_token(cls, token: str, scope: Optional[str]) -> Optional[ApiToken]:
+        return cls._get(f"api_token:{scope}:{token}", ApiToken)
+
+    @classmethod
+    def set_api_token(cls, api_token: ApiToken) -> None:
+        cls._set(f"api_token:{api_token.type}:{api_token.token}", api_token)
+
+    @classmethod
+    def delete_api_token(cls, token: str, scope: Optional[str]) -> None:
+        """
+        Drop the cached api token, must be called when the token is deleted
+        """
+        cls._delete(f"api_token:{scope}:{token}")
+
+    @classmethod
+    def get_tenant_archived(cls, tenant_id: str) -> Optional[bool]:
+        archived = cls._get_value(f"tenant_archived:{tenant_id}")
+        return None if archived is None else bool(archived)
+
+    @classmethod
+    def set_tenant_archived(cls, tenant_id: str, archived: bool) -> None:
+        cls._set_value(f"tenant_archived:{tenant_id}", archived)
+
+    @classmethod
+    def delete_tenant(cls, tenant_id: str) -> None:
+        """
+        Drop the cached status of the tenant, must be called when the tenant is archived
+        """
+        cls._delete(f"tenant_archived:{tenant_id}")
+
+    @classmethod
+    def get_site_app_id(cls, code: str) -> Optional[str]:
+        app_id = cls._get_value(f"site_app_id:{code}")
+        return None if app_id is None else str(app_id)
+
+    @classmethod
+    def set_site_app_id(cls, code: str, app_id: str) -> None:
+        cls._set_value(f"site_app_id:{code}", app_id)
+
+    @classmethod
+    def delete_site(cls, code: str) -> None:
+        """
+        Drop the cached site code, must be called when the code of the site is reset
+        """
+        cls._delete(f"site_app_id:{code}")
+
+    @classmethod
+    def get_service_api_end_user_id(cls, app_id: str, session_id: str) -> Optional[str]:
+        end_user_id = cls._get_value(f"service_api_end_user_id:{app_id}:{session_id}")
+        return None if end_user_id is None else str(end_user_id)
+
+    @classmethod
+    def set_service_api_end_user_id(cls, end_user: EndUser) -> None:
+        cls._set_value(f"service_api_end_user_id:{end_user.app_id}:{end_user.session_id}", end_user.id)
+
+    @classmethod
+    def record_api_token_usage(cls, api_token_id: str) -> None:
+        """
+        Record the usage of the api token, its last used time is written to the database in batches
+        by the update_api_token_last_used_at_task
+        """
+        now = time.time()
+        with cls._usage_lock:
+            recorded_at = cls._usage_recorded_at.get(api_token_id)
+            if recorded_at is not None and now - recorded_at < cls.API_TOKEN_USAGE_RECORD_INTERVAL:
+                return
+            cls._usage_recorded_at.put(api_token_id, now)
+
+        try:
+            redis_client.hset(cls.API_TOKEN_LAST_USED_AT_KEY, api_token_id, now)
+        except Exception:
+            logger.warning("Failed to record usage of api token %s", api_token_id, exc_info=True)
+
+    @classmethod
+    def pop_api_token_usages(cls) -> dict[str, float]:
+        """
+        Pop the recorded usages of api tokens
+        :return: last used time of api tokens as unix timestamps
+        """
+        with redis_client.pipeline() as pipe:
+            pipe.hgetall(cls.API_TOKEN_LAST_USED_AT_KEY)
+            pipe.delete(cls.API_TOKEN_LAST_USED_AT_KEY)
+            usages, _ = pipe.execute()
+        return {api_token_id.decode(): float(used_at) for api_token_id, used_at in usages.items()}
+
+    @classmethod
+    def _get(cls, key: str, model: type[T]) -> Optional[T]:
+        """
+        Get cached row, as a new instance detached from the session
+        """
+        values = cls._get_value(key)
+        if not isinstance(values, dict):
+            return None
+
+        for attr in class_mapper(model).column_attrs:
+            value = values.get(attr.key)
+            if isinstance(value, str) and isinstance(attr.columns[0].type, DateTime):
+                values[attr.key] = datetime.fromisoformat(value)
+        return model(**values)
+
+    @classmethod
+    def _set(cls, key: str, instance: Any) -> None:
+        values = {attr.key: getattr(instance, attr.key) for attr in inspect(type(instance)).column_attrs}
+        cls._set_value(key, values)
+
+    @classmethod
+    def _get_value(cls, key: str) -> Any:
+        if not dify_config.API_AUTH_CACHE_TTL:
+            return None
+        try:
+            cached = redis_client.get(f"{cls.KEY_PREFIX}:{key}")
+            return None if cached is None else json.loads(cached)
+        except Exception:
+            logger.warning("Failed to read api auth cache %s", key, exc_info=True)
+            return None
+
+    @classmethod
+    def _set_value(cls, key: str, value: Any) -> None:
+        if not dify_config.API_AUTH_CACHE_TTL:
+            return
+        try:
+            redis_client.setex(
+                f"{cls.KEY_PREFIX}:{key}", dify_config.API_AUTH_CACHE_TTL, json.dumps(value, default=_to_json)
+            )
+        except Exception:
+            logger.warning("Failed to write api auth cache %s", key, exc_info=True)
+
+    @classmethod
+    def _delete(cls, key: str) -> None:
+        redis_client.delete(f"{cls.KEY_PREFIX}:{key}")
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not json serializable")
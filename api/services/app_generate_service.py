@@ -43,8 +43,7 @@ class AppGenerateService:
         # system level rate limiter
         if dify_config.BILLING_ENABLED:
             # check if it's free plan
-            limit_info = BillingService.get_info(app_model.tenant_id)
-            if limit_info["subscription"]["plan"] == "sandbox":
+            if BillingService.get_plan(app_model.tenant_id) == "sandbox":
                 if cls.system_rate_limiter.is_rate_limited(app_model.tenant_id):
                     raise InvokeRateLimitError(
                         "Rate limit exceeded, please upgrade your plan "
@@ -0,0 +1,402 @@
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Optional
+
+import pytz
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from configs import dify_config
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.enums import WorkflowRunTriggeredFrom
+from models.model import App, AppDailyStatistic, Conversation, Message
+
+
+@dataclass(frozen=True)
+class DailyStatistic:
+    # query grouping rows by the date in :tz, {{range}} is replaced with the conditions on created_at_column
+    sql_query: str
+    created_at_column: str
+    serialize: Callable[[Any], dict[str, Any]]
+
+
+def _messages_query(select_clause: str, join_clause: str = "", table_alias: str = "") -> str:
+    column_prefix = f"{table_alias}." if table_alias else ""
+    return f"""SELECT
+    DATE(DATE_TRUNC('day', {column_prefix}created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    {select_clause}
+FROM
+    messages {table_alias}{join_clause}
+WHERE
+    {column_prefix}app_id = :app_id
+    {{{{range}}}}
+GROUP BY date ORDER BY date"""
+
+
+def _workflow_runs_query(select_clause: str) -> str:
+    return f"""SELECT
+    DATE(DATE_TRUNC('day', created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    {select_clause}
+FROM
+    workflow_runs
+WHERE
+    app_id = :app_id
+    AND triggered_from = :triggered_from
+    {{{{range}}}}
+GROUP BY date ORDER BY date"""
+
+
+STATISTICS: dict[str, DailyStatistic] = {
+    "daily_messages": DailyStatistic(
+        sql_query=_messages_query("COUNT(*) AS message_count"),
+        created_at_column="created_at",
+        serialize=lambda row: {"message_count": row.message_count},
+    ),
+    "daily_conversations": DailyStatistic(
+        sql_query=_messages_query("COUNT(DISTINCT messages.conversation_id) AS conversation_count"),
+        created_at_column="created_at",
+        serialize=lambda row: {"conversation_count": row.conversation_count},
+    ),
+    "daily_end_users": DailyStatistic(
+        sql_query=_messages_query("COUNT(DISTINCT messages.from_end_user_id) AS terminal_count"),
+        created_at_column="created_at",
+        serialize=lambda row: {"terminal_count": row.terminal_count},
+    ),
+    "token_costs": DailyStatistic(
+        sql_query=_messages_query(
+            "(SUM(messages.message_tokens) + SUM(messages.answer_tokens)) AS token_count,\n"
+            "    SUM(total_price) AS total_price"
+        ),
+        created_at_column="created_at",
+        serialize=lambda row: {
+            "token_count": row.token_count,
+            "total_price": str(row.total_price) if row.total_price is not None else None,
+            "currency": "USD",
+        },
+    ),
+    "average_session_interactions": DailyStatistic(
+        sql_query="""SELECT
+    DATE(DATE_TRUNC('day', c.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+    AVG(subquery.message_count) AS interactions
+FROM
+    (
+        SELECT
+            m.conversation_id,
+            COUNT(m.id) AS message_count
+        FROM
+            conversations c
+        JOIN
+            messages m
+            ON c.id = m.conversation_id
+        WHERE
+            c.app_id = :app_id
+            {{range}}
+        GROUP BY m.conversation_id
+    ) subquery
+LEFT JOIN
+    conversations c
+    ON c.id = subquery.conversation_id
+GROUP BY
+    date
+ORDER BY
+    date""",
+        created_at_column="c.created_at",
+        serialize=lambda row: {"interactions": float(row.interactions.quantize(Decimal("0.01")))},
+    ),
+    "user_satisfaction_rate": DailyStatistic(
+        sql_query=_messages_query(
+            "COUNT(m.id) AS message_count,\n    COUNT(mf.id) AS feedback_count",
+            join_clause="\nLEFT JOIN\n    message_feedbacks mf\n    ON mf.message_id=m.id AND mf.rating='like'",
+            table_alias="m",
+        ),
+        created_at_column="m.created_at",
+        serialize=lambda row: {
+            "rate": round((row.feedback_count * 1000 / row.message_count) if row.message_count > 0 else 0, 2)
+        },
+    ),
+    "average_response_time": DailyStatistic(
+        sql_query=_messages_query("AVG(provider_response_latency) AS latency"),
+        created_at_column="created_at",
+        serialize=lambda row: {"latency": round(row.latency * 1000, 4)},
+    ),
+    "tokens_per_second": DailyStatistic(
+        sql_query=_messages_query(
+            """CASE
+        WHEN SUM(provider_response_latency) = 0 THEN 0
+        ELSE (SUM(answer_tokens) / SUM(provider_response_latency))
+    END as tokens_per_second"""
+        ),
+        created_at_column="created_at",
+        serialize=lambda row: {"tps": round(row.tokens_per_second, 4)},
+    ),
+    "workflow_daily_runs": DailyStatistic(
+        sql_query=_workflow_runs_query("COUNT(id) AS runs"),
+        created_at_column="created_at",
+        serialize=lambda row: {"runs": row.runs},
+    ),
+    "workflow_daily_terminals": DailyStatistic(
+        sql_query=_workflow_runs_query("COUNT(DISTINCT workflow_runs.created_by) AS terminal_count"),
+        created_at_column="created_at",
+        serialize=lambda row: {"terminal_count": row.terminal_count},
+    ),
+    "workflow_token_costs": DailyStatistic(
+        sql_query=_workflow_runs_query("SUM(workflow_runs.total_tokens) AS token_count"),
+        created_at_column="created_at",
+        serialize=lambda row: {"token_count": row.token_count},
+    ),
+    "workflow_average_app_interactions": DailyStatistic(
+        sql_query="""SELECT
+    AVG(sub.interactions) AS interactions,
+    sub.date
+FROM
+    (
+        SELECT
+            DATE(DATE_TRUNC('day', c.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz )) AS date,
+            c.created_by,
+            COUNT(c.id) AS interactions
+        FROM
+            workflow_runs c
+        WHERE
+            c.app_id = :app_id
+            AND c.triggered_from = :triggered_from
+            {{range}}
+        GROUP BY
+            date, c.created_by
+    ) sub
+GROUP BY
+    sub.date
+ORDER BY
+    sub.date""",
+        created_at_column="c.created_at",
+        serialize=lambda row: {"interactions": float(row.interactions.quantize(Decimal("0.01")))},
+    ),
+}
+
+# statistics of a completed day which still change when conversations continue or messages get feedback
+CONVERSATION_STATISTICS = ["average_session_interactions"]
+FEEDBACK_STATISTICS = ["user_satisfaction_rate"]
+
+
+class AppStatisticService:
+    """
+    Daily statistics of apps for the analytics dashboards.
+
+    Statistics of completed days are rolled up once per app, statistic and timezone into app_daily_statistics,
+    by the first request covering them or by the scheduled rollup task.
+    Only the partial days at the boundaries of the requested range, including the current day,
+    are aggregated from messages or workflow runs.
+    """
+
+    # apps and timezones of the dashboards opened recently, whose completed days are rolled up by the scheduled task
+    ACTIVE_TIMEZONES_KEY = "app_daily_statistics:active_timezones"
+    ACTIVE_TIMEZONES_DAYS = 7
+    # conversations continued since the last invalidation of their rollups by the scheduled task
+    CONTINUED_CONVERSATIONS_KEY = "app_daily_statistics:continued_conversations"
+    # messages whose feedback changed since the last invalidation of their rollups by the scheduled task
+    FEEDBACK_MESSAGES_KEY = "app_daily_statistics:feedback_messages"
+    INVALIDATION_BATCH_SIZE = 1000
+
+    @classmethod
+    def get_daily_statistics(
+        cls,
+        app_model: App,
+        statistic: str,
+        timezone: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Get the daily statistic of the app
+        :param app_model: app
+        :param statistic: name of the statistic
+        :param timezone: timezone the days are in
+        :param start: start of the range in the timezone, without tzinfo
+        :param end: end of the range in the timezone, without tzinfo
+        :return: statistic of each day with activity, ordered by date
+        """
+        tz = pytz.timezone(timezone)
+        redis_client.zadd(cls.ACTIVE_TIMEZONES_KEY, {f"{app_model.id}:{timezone}": int(datetime.now(UTC).timestamp())})
+        start_utc = tz.localize(start).astimezone(pytz.utc) if start else None
+        end_utc = tz.localize(end).astimezone(pytz.utc) if end else None
+
+        # only completed days in the range are rolled up, once the messages and runs of the day are finished
+        now = datetime.now(UTC)
+        settled = now - cls._get_settle_time()
+        lower = start_utc or app_model.created_at.replace(tzinfo=UTC)
+        upper = min(end_utc, settled) if end_utc else settled
+        first_date = lower.astimezone(tz).date()
+        if _start_of_day(tz, first_date) < lower:
+            first_date += timedelta(days=1)
+        last_date = upper.astimezone(tz).date() - timedelta(days=1)
+
+        if first_date > last_date:
+            data = cls._aggregate(app_model.id, statistic, timezone, start_utc, end_utc)
+            return [{"date": str(day), **day_data} for day, day_data in sorted(data.items()) if day_data is not None]
+
+        data = cls._aggregate(app_model.id, statistic, timezone, start_utc, _start_of_day(tz, first_date))
+        data.update(cls._get_rollups(app_model.id, statistic, timezone, first_date, last_date))
+        data.update(
+            cls._aggregate(app_model.id, statistic, timezone, _start_of_day(tz, last_date + timedelta(days=1)), end_utc)
+        )
+        return [{"date": str(day), **day_data} for day, day_data in sorted(data.items()) if day_data is not None]
+
+    @classmethod
+    def get_active_timezones(cls) -> list[tuple[str, str]]:
+        """
+        Get the apps and timezones of the dashboards opened recently
+        :return: app id and timezone pairs
+        """
+        expired_at = int(datetime.now(UTC).timestamp()) - cls.ACTIVE_TIMEZONES_DAYS * 86400
+        redis_client.zremrangebyscore(cls.ACTIVE_TIMEZONES_KEY, "-inf", expired_at)
+        members = redis_client.zrange(cls.ACTIVE_TIMEZONES_KEY, 0, -1)
+        return [tuple(member.decode().split(":", 1)) for member in members]  # type: ignore[misc]
+
+    @classmethod
+    def roll_up(cls, app_id: str, timezone: str, day: date) -> None:
+        """
+        Roll up every statistic of the completed day of the app, if it is not rolled up yet
+        and its messages and runs are finished
+        """
+        if _start_of_day(pytz.timezone(timezone), day + timedelta(days=1)) > datetime.now(UTC) - cls._get_settle_time():
+            return
+        for statistic in STATISTICS:
+            cls._get_rollups(app_id, statistic, timezone, day, day)
+
+    @classmethod
+    def mark_conversation_continued(cls, conversation_id: str) -> None:
+        """
+        Record that a message was added to the conversation, the rollups of the day the conversation was created
+        are invalidated by the scheduled task instead of on the request
+        """
+        redis_client.sadd(cls.CONTINUED_CONVERSATIONS_KEY, conversation_id)
+
+    @classmethod
+    def mark_message_feedback(cls, message_id: str) -> None:
+        """
+        Record that the feedback of the message was created, updated or deleted, the rollups of the day
+        the message was created are invalidated by the scheduled task instead of on the request
+        """
+        redis_client.sadd(cls.FEEDBACK_MESSAGES_KEY, message_id)
+
+    @classmethod
+    def invalidate_continued_conversations(cls) -> int:
+        """
+        Remove the rollups of the days of the conversations continued since the last call
+        :return: number of continued conversations
+        """
+        return cls._invalidate_marked(cls.CONTINUED_CONVERSATIONS_KEY, Conversation, CONVERSATION_STATISTICS)
+
+    @classmethod
+    def invalidate_feedback_messages(cls) -> int:
+        """
+        Remove the rollups of the days of the messages whose feedback changed since the last call
+        :return: number of messages
+        """
+        return cls._invalidate_marked(cls.FEEDBACK_MESSAGES_KEY, Message, FEEDBACK_STATISTICS)
+
+    @classmethod
+    def _invalidate_marked(cls, key: str, model: type[Conversation] | type[Message], statistics: Sequence[str]) -> int:
+        count = 0
+        while True:
+            members = redis_client.spop(key, cls.INVALIDATION_BATCH_SIZE)
+            if not members:
+                return count
+            count += len(members)
+
+            ids = [member.decode() if isinstance(member, bytes) else member for member in members]
+            records = db.session.execute(select(model.app_id, model.created_at).where(model.id.in_(ids))).all()
+            for app_id, created_date in {(row.app_id, row.created_at.date()) for row in records}:
+                db.session.execute(cls._delete_rollups(app_id, statistics, created_date))
+            db.session.commit()
+
+    @staticmethod
+    def _delete_rollups(app_id: str, statistics: Sequence[str], created_date: date):
+        # the day of a record in any timezone is at most one day off its day in UTC
+        return delete(AppDailyStatistic).where(
+            AppDailyStatistic.app_id == app_id,
+            AppDailyStatistic.statistic.in_(statistics),
+            AppDailyStatistic.date.between(created_date - timedelta(days=1), created_date + timedelta(days=1)),
+        )
+
+    @staticmethod
+    def _get_settle_time() -> timedelta:
+        """
+        Time after which the messages and workflow runs created by then are finished
+        """
+        return timedelta(seconds=max(dify_config.APP_MAX_EXECUTION_TIME, dify_config.WORKFLOW_MAX_EXECUTION_TIME))
+
+    @classmethod
+    def _get_rollups(
+        cls, app_id: str, statistic: str, timezone: str, first_date: date, last_date: date
+    ) -> dict[date, Optional[dict[str, Any]]]:
+        rollups = {
+            rollup.date: rollup.data
+            for rollup in db.session.scalars(
+                select(AppDailyStatistic).where(
+                    AppDailyStatistic.app_id == app_id,
+                    AppDailyStatistic.statistic == statistic,
+                    AppDailyStatistic.date.between(first_date, last_date),
+                    AppDailyStatistic.timezone == timezone,
+                )
+            )
+        }
+
+        missing_dates = [
+            first_date + timedelta(days=offset)
+            for offset in range((last_date - first_date).days + 1)
+            if first_date + timedelta(days=offset) not in rollups
+        ]
+        if not missing_dates:
+            return rollups
+
+        tz = pytz.timezone(timezone)
+        data = cls._aggregate(
+            app_id,
+            statistic,
+            timezone,
+            _start_of_day(tz, missing_dates[0]),
+            _start_of_day(tz, missing_dates[-1] + timedelta(days=1)),
+        )
+        values = [
+            {"app_id": app_id, "statistic": statistic, "timezone": timezone, "date": day, "data": data.get(day)}
+            for day in missing_dates
+        ]
+        # rollups of the same days may be inserted concurrently by the scheduled task
+        db.session.execute(insert(AppDailyStatistic).values(values).on_conflict_do_nothing())
+        db.session.commit()
+
+        rollups.update({day: data.get(day) for day in missing_dates})
+        return rollups
+
+    @classmethod
+    def _aggregate(
+        cls, app_id: str, statistic: str, timezone: str, start: Optional[datetime], end: Optional[datetime]
+    ) -> dict[date, Optional[dict[str, Any]]]:
+        daily_statistic = STATISTICS[statistic]
+        conditions = []
+        if start:
+            conditions.append(f"AND {daily_statistic.created_at_column} >= :start")
+        if end:
+            conditions.append(f"AND {daily_statistic.created_at_column} < :end")
+        if start and end and start >= end:
+            return {}
+
+        sql_query = daily_statistic.sql_query.replace("{{range}}", " ".join(conditions))
+        arg_dict = {
+            "tz": timezone,
+            "app_id": app_id,
+            "triggered_from": WorkflowRunTriggeredFrom.APP_RUN.value,
+            "start": start,
+            "end": end,
+        }
+        with db.engine.begin() as conn:
+            rs = conn.execute(db.text(sql_query), arg_dict)
+            return {row.date: daily_statistic.serialize(row) for row in rs}
+
+
+def _start_of_day(tz: Any, day: date) -> datetime:
+    start: datetime = tz.localize(datetime.combine(day, time.min)).astimezone(pytz.utc)
+    return start
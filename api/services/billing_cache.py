@@ -0,0 +1,137 @@
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class TenantBillingCache:
+    """
+    Redis cache of the plan and features of tenants returned by the billing api, for display only.
+
+    Cached usage and plans lag behind, so quota checks must request the billing api. Only the plan itself is
+    cached for rate limits, for a short time and without serving it stale.
+
+    Entries are fresh for BILLING_INFO_CACHE_TTL seconds. Stale entries are still served for
+    BILLING_INFO_CACHE_STALE_TTL more seconds while a single background refresh per tenant renews them.
+    On a miss, only one caller per tenant requests the billing api, the others wait for its result.
+    """
+
+    KEY_PREFIX = "tenant_billing_cache"
+    # seconds to wait for the refresh of another caller before requesting the billing api directly
+    REFRESH_WAIT_TIMEOUT = 5
+    REFRESH_POLL_INTERVAL = 0.05
+
+    @classmethod
+    def get(
+        cls,
+        tenant_id: str,
+        kind: str,
+        fetch: Callable[[], Any],
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        Get cached billing info of the tenant
+
+        :param tenant_id: tenant id
+        :param kind: kind of billing info, e.g. info
+        :param fetch: function requesting the billing api, its result must be json serializable
+        :param ttl: seconds the entry is fresh, BILLING_INFO_CACHE_TTL by default
+        :param stale_ttl: seconds the entry is still served while being refreshed, BILLING_INFO_CACHE_STALE_TTL
+            by default
+        :return: billing info
+        """
+        ttl = dify_config.BILLING_INFO_CACHE_TTL if ttl is None else ttl
+        stale_ttl = dify_config.BILLING_INFO_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        if ttl <= 0:
+            return fetch()
+
+        key = cls._key(tenant_id, kind)
+        try:
+            entry = cls._load(key)
+        except Exception:
+            logger.warning("Failed to read billing cache of tenant %s, skip cache", tenant_id, exc_info=True)
+            return fetch()
+
+        if entry is not None:
+            value, refreshed_at = entry
+            if time.time() - refreshed_at >= ttl and cls._acquire_refresh(key):
+                threading.Thread(
+                    target=cls._refresh_in_background, args=(key, fetch, ttl + stale_ttl), daemon=True
+                ).start()
+            return value
+
+        if cls._acquire_refresh(key):
+            return cls._refresh(key, fetch, ttl + stale_ttl)
+
+        # another caller is requesting the billing api, wait for its result
+        deadline = time.monotonic() + cls.REFRESH_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(cls.REFRESH_POLL_INTERVAL)
+            entry = cls._load(key)
+            if entry is not None:
+                return entry[0]
+
+        return fetch()
+
+    @classmethod
+    def invalidate(cls, tenant_id: str, kind: str = "info") -> None:
+        """
+        Drop cached billing info of the tenant, e.g. after its apps or members changed
+        """
+        try:
+            redis_client.delete(cls._key(tenant_id, kind))
+        except Exception:
+            logger.warning("Failed to invalidate billing cache of tenant %s", tenant_id, exc_info=True)
+
+    @classmethod
+    def _key(cls, tenant_id: str, kind: str) -> str:
+        return f"{cls.KEY_PREFIX}:{kind}:{tenant_id}"
+
+    @classmethod
+    def _load(cls, key: str) -> tuple[Any, float] | None:
+        cached = redis_client.get(key)
+        if cached is None:
+            return None
+        entry = json.loads(cached)
+        return entry["value"], entry["refreshed_at"]
+
+    @classmethod
+    def _acquire_refresh(cls, key: str) -> bool:
+        try:
+            return bool(redis_client.set(f"{key}:refresh_lock", 1, nx=True, ex=cls.REFRESH_WAIT_TIMEOUT * 2))
+        except Exception:
+            logger.warning("Failed to acquire billing cache refresh lock %s", key, exc_info=True)
+            return False
+
+    @classmethod
+    def _refresh(cls, key: str, fetch: Callable[[], Any], expires_in: int) -> Any:
+        try:
+            value = fetch()
+        except Exception:
+            redis_client.delete(f"{key}:refresh_lock")
+            raise
+
+        try:
+            with redis_client.pipeline() as pipe:
+                pipe.setex(key, expires_in, json.dumps({"value": value, "refreshed_at": time.time()}))
+                pipe.delete(f"{key}:refresh_lock")
+                pipe.execute()
+        except Exception:
+            logger.warning("Failed to write billing cache %s", key, exc_info=True)
+        return value
+
+    @classmethod
+    def _refresh_in_background(cls, key: str, fetch: Callable[[], Any], expires_in: int) -> None:
+        try:
+            cls._refresh(key, fetch, expires_in)
+        except Exception:
+            # keep serving the stale entry until it expires
+            logger.warning("Failed to refresh billing cache %s", key, exc_info=True)
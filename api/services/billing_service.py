@@ -4,9 +4,11 @@ from typing import Literal, Optional
 import httpx
 from tenacity import retry, retry_if_exception_type, stop_before_delay, wait_fixed
 
+from configs import dify_config
 from extensions.ext_database import db
 from libs.helper import RateLimiter
 from models.account import TenantAccountJoin, TenantAccountRole
+from services.billing_cache import TenantBillingCache
 
 
 class BillingService:
@@ -16,12 +18,43 @@ class BillingService:
     compliance_download_rate_limiter = RateLimiter("compliance_download_rate_limiter", 4, 60)
 
     @classmethod
-    def get_info(cls, tenant_id: str):
+    def get_info(cls, tenant_id: str, use_cache: bool = False):
+        """
+        Get the plan and features of the tenant
+        :param tenant_id: tenant id
+        :param use_cache: serve them from the cache, only for display as it lags behind usage and plan changes
+        """
         params = {"tenant_id": tenant_id}
 
-        billing_info = cls._send_request("GET", "/subscription/info", params=params)
+        if not use_cache:
+            return cls._send_request("GET", "/subscription/info", params=params)
+
+        billing_info = TenantBillingCache.get(
+            tenant_id, "info", lambda: cls._send_request("GET", "/subscription/info", params=params)
+        )
         return billing_info
 
+    @classmethod
+    def get_plan(cls, tenant_id: str) -> str:
+        """
+        Get the subscription plan of the tenant for rate limits, cached for BILLING_PLAN_CACHE_TTL seconds
+        :param tenant_id: tenant id
+        """
+        plan: str = TenantBillingCache.get(
+            tenant_id,
+            "plan",
+            lambda: cls._send_request("GET", "/subscription/info", params={"tenant_id": tenant_id})["subscription"][
+                "plan"
+            ],
+            ttl=dify_config.BILLING_PLAN_CACHE_TTL,
+            stale_ttl=0,
+        )
+        return plan
+
+    @classmethod
+    def clean_plan_cache(cls, tenant_id: str):
+        TenantBillingCache.invalidate(tenant_id, "plan")
+
     @classmethod
     def get_knowledge_rate_limit(cls, tenant_id: str):
         params = {"tenant_id": tenant_id}
@@ -33,6 +66,10 @@ class BillingService:
             "subscription_plan": knowledge_rate_limit.get("subscription_plan", "sandbox"),
         }
 
+    @classmethod
+    def clean_billing_info_cache(cls, tenant_id: str):
+        TenantBillingCache.invalidate(tenant_id)
+
     @classmethod
     def get_subscription(cls, plan: str, interval: str, prefilled_email: str = "", tenant_id: str = ""):
         params = {"plan": plan, "interval": interval, "prefilled_email": prefilled_email, "tenant_id": tenant_id}
@@ -207,7 +207,7 @@ class ClearFreePlanTenantExpiredLogs:
             try:
                 if (
                     not dify_config.BILLING_ENABLED
-                    or BillingService.get_info(tenant_id)["subscription"]["plan"] == "sandbox"
+                    or BillingService.get_info(tenant_id, use_cache=True)["subscription"]["plan"] == "sandbox"
                 ):
                     # only process sandbox tenant
                     cls.process_tenant(flask_app, tenant_id, days, batch)
@@ -0,0 +1,104 @@
+import json
+import logging
+from collections.abc import Iterable
+from json import JSONDecodeError
+from typing import Optional
+
+from sqlalchemy import ColumnElement, delete, select
+
+from core.rag.index_processor.index_processor_base import BaseIndexProcessor
+from core.tools.utils.rag_web_reader import get_image_upload_file_ids
+from extensions.ext_database import db
+from extensions.ext_storage import storage
+from libs.batch_deletion import delete_in_batches
+from models.dataset import Dataset, Document, DocumentSegment
+from models.model import UploadFile
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetCleanupService:
+    @classmethod
+    def delete_segments(
+        cls,
+        dataset: Dataset,
+        *whereclauses: ColumnElement[bool],
+        index_processor: Optional[BaseIndexProcessor] = None,
+    ) -> int:
+        """
+        Delete segments in batches, with the images uploaded in their content
+        :param dataset: dataset of the segments
+        :param whereclauses: conditions of the segments to delete
+        :param index_processor: index processor removing the index nodes of each batch, None if the index is removed
+            as a whole
+        :return: number of deleted segments
+        """
+
+        def before_delete(segment_ids: list[str]) -> None:
+            segments = db.session.execute(
+                select(DocumentSegment.index_node_id, DocumentSegment.content).where(
+                    DocumentSegment.id.in_(segment_ids)
+                )
+            ).all()
+
+            index_node_ids = [segment.index_node_id for segment in segments if segment.index_node_id]
+            # an empty list of node ids would clean the whole index
+            if index_processor and index_node_ids:
+                index_processor.clean(dataset, index_node_ids, with_keywords=True, delete_child_chunks=True)
+
+            cls.delete_upload_files(
+                upload_file_id for segment in segments for upload_file_id in get_image_upload_file_ids(segment.content)
+            )
+
+        return delete_in_batches(db.session, DocumentSegment.id, *whereclauses, before_delete=before_delete)
+
+    @classmethod
+    def delete_documents(cls, *whereclauses: ColumnElement[bool]) -> int:
+        """
+        Delete documents in batches, with their uploaded files
+        :param whereclauses: conditions of the documents to delete
+        :return: number of deleted documents
+        """
+
+        def before_delete(document_ids: list[str]) -> None:
+            documents = db.session.execute(
+                select(Document.tenant_id, Document.data_source_info).where(
+                    Document.id.in_(document_ids), Document.data_source_type == "upload_file"
+                )
+            ).all()
+            upload_file_ids: dict[str, list[str]] = {}
+            for document in documents:
+                try:
+                    data_source_info = json.loads(document.data_source_info or "{}")
+                except JSONDecodeError:
+                    continue
+                if "upload_file_id" in data_source_info:
+                    upload_file_ids.setdefault(document.tenant_id, []).append(data_source_info["upload_file_id"])
+
+            for tenant_id, tenant_upload_file_ids in upload_file_ids.items():
+                cls.delete_upload_files(tenant_upload_file_ids, tenant_id=tenant_id)
+
+        return delete_in_batches(db.session, Document.id, *whereclauses, before_delete=before_delete)
+
+    @classmethod
+    def delete_upload_files(cls, upload_file_ids: Iterable[str], tenant_id: Optional[str] = None) -> None:
+        """
+        Delete upload files from the storage and the database
+        :param upload_file_ids: upload file ids
+        :param tenant_id: tenant the files must belong to, None for any tenant
+        """
+        upload_file_ids = set(upload_file_ids)
+        if not upload_file_ids:
+            return
+
+        whereclauses: list[ColumnElement[bool]] = [UploadFile.id.in_(upload_file_ids)]
+        if tenant_id:
+            whereclauses.append(UploadFile.tenant_id == tenant_id)
+
+        keys = [key for key in db.session.scalars(select(UploadFile.key).where(*whereclauses)) if key]
+        try:
+            storage.delete_many(keys)
+        except Exception:
+            logger.exception(f"Delete upload files failed when storage deleted, upload_file_ids: {upload_file_ids}")
+
+        db.session.execute(delete(UploadFile).where(*whereclauses).execution_options(synchronize_session=False))
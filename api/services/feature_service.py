@@ -78,13 +78,18 @@ class SystemFeatureModel(BaseModel):
 
 class FeatureService:
     @classmethod
-    def get_features(cls, tenant_id: str) -> FeatureModel:
+    def get_features(cls, tenant_id: str, use_cache: bool = False) -> FeatureModel:
+        """
+        Get the features of the tenant
+        :param tenant_id: tenant id
+        :param use_cache: serve billing info from the cache, only for display as it lags behind usage and plan changes
+        """
         features = FeatureModel()
 
         cls._fulfill_params_from_env(features)
 
         if dify_config.BILLING_ENABLED and tenant_id:
-            cls._fulfill_params_from_billing_api(features, tenant_id)
+            cls._fulfill_params_from_billing_api(features, tenant_id, use_cache)
 
         return features
 
@@ -130,8 +135,8 @@ class FeatureService:
         features.dataset_operator_enabled = dify_config.DATASET_OPERATOR_ENABLED
 
     @classmethod
-    def _fulfill_params_from_billing_api(cls, features: FeatureModel, tenant_id: str):
-        billing_info = BillingService.get_info(tenant_id)
+    def _fulfill_params_from_billing_api(cls, features: FeatureModel, tenant_id: str, use_cache: bool = False):
+        billing_info = BillingService.get_info(tenant_id, use_cache=use_cache)
 
         features.billing.enabled = billing_info["enabled"]
         features.billing.subscription.plan = billing_info["subscription"]["plan"]
@@ -188,6 +188,10 @@ class FileService:
 
         return generator, upload_file
 
+    @staticmethod
+    def get_file_range(upload_file: UploadFile, offset: int, size: int) -> bytes:
+        return storage.load_range(upload_file.key, offset, size)
+
     @staticmethod
     def get_public_image_preview(file_id: str):
         upload_file = db.session.query(UploadFile).filter(UploadFile.id == file_id).first()
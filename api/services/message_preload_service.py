@@ -0,0 +1,268 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import func, or_, select
+
+from extensions.ext_database import db
+from models.account import Account
+from models.model import (
+    App,
+    AppAnnotationHitHistory,
+    AppModelConfig,
+    Conversation,
+    DatasetRetrieverResource,
+    EndUser,
+    Message,
+    MessageAgentThought,
+    MessageAnnotation,
+    MessageFeedback,
+    MessageFile,
+    set_preloaded,
+)
+from models.workflow import WorkflowRun, WorkflowRunStatus
+
+
+class MessagePreloadService:
+    """
+    Batch-load the relations serialized by the conversation and message fields for a page of rows.
+
+    Properties of the models query their relation per row, so marshalling a page of N rows runs a multiple of N
+    queries. Preloading runs a fixed number of IN queries for the whole page and attaches the results to the rows,
+    where the properties serve them from.
+    """
+
+    @classmethod
+    def preload_conversations(cls, conversations: Sequence[Conversation]) -> None:
+        """
+        Preload the relations of conversations listed in conversation logs
+        :param conversations: conversations of the page
+        """
+        if not conversations:
+            return
+
+        conversation_ids = [conversation.id for conversation in conversations]
+
+        message_counts: dict[str, int] = dict(
+            db.session.execute(  # type: ignore[arg-type]
+                select(Message.conversation_id, func.count(Message.id))
+                .where(Message.conversation_id.in_(conversation_ids))
+                .group_by(Message.conversation_id)
+            )
+        )
+
+        workflow_run_status_counts: dict[str, dict[str, int]] = defaultdict(dict)
+        for conversation_id, status, count in db.session.execute(
+            select(Message.conversation_id, WorkflowRun.status, func.count(Message.id))
+            .join(WorkflowRun, WorkflowRun.id == Message.workflow_run_id)
+            .where(Message.conversation_id.in_(conversation_ids))
+            .group_by(Message.conversation_id, WorkflowRun.status)
+        ):
+            workflow_run_status_counts[conversation_id][status] = count
+
+        ranked_messages = (
+            select(
+                Message.id,
+                func.row_number()
+                .over(partition_by=Message.conversation_id, order_by=Message.created_at.asc())
+                .label("rank"),
+            )
+            .where(Message.conversation_id.in_(conversation_ids))
+            .subquery()
+        )
+        first_messages: dict[str, Message] = {
+            message.conversation_id: message
+            for message in db.session.scalars(
+                select(Message)
+                .join(ranked_messages, ranked_messages.c.id == Message.id)
+                .where(ranked_messages.c.rank == 1)
+            )
+        }
+
+        feedback_stats: dict[tuple[str, str], dict[str, int]] = defaultdict(lambda: {"like": 0, "dislike": 0})
+        for conversation_id, from_source, rating, count in db.session.execute(
+            select(
+                MessageFeedback.conversation_id,
+                MessageFeedback.from_source,
+                MessageFeedback.rating,
+                func.count(MessageFeedback.id),
+            )
+            .where(MessageFeedback.conversation_id.in_(conversation_ids))
+            .group_by(MessageFeedback.conversation_id, MessageFeedback.from_source, MessageFeedback.rating)
+        ):
+            if rating in {"like", "dislike"}:
+                feedback_stats[(conversation_id, from_source)][rating] = count
+
+        annotations: dict[str, MessageAnnotation] = {}
+        for annotation in db.session.scalars(
+            select(MessageAnnotation)
+            .where(MessageAnnotation.conversation_id.in_(conversation_ids))
+            .order_by(MessageAnnotation.created_at.asc())
+        ):
+            annotations.setdefault(annotation.conversation_id, annotation)
+
+        app_model_config_ids = {
+            conversation.app_model_config_id for conversation in conversations if conversation.app_model_config_id
+        }
+        app_model_configs = cls._get_by_ids(AppModelConfig, app_model_config_ids)
+
+        end_user_ids = {
+            conversation.from_end_user_id for conversation in conversations if conversation.from_end_user_id
+        }
+        end_users = cls._get_by_ids(EndUser, end_user_ids)
+
+        account_ids = {conversation.from_account_id for conversation in conversations if conversation.from_account_id}
+        account_ids.update(annotation.account_id for annotation in annotations.values())
+        accounts = cls._get_by_ids(Account, account_ids)
+
+        for annotation in annotations.values():
+            set_preloaded(annotation, "account", accounts.get(annotation.account_id))
+
+        for conversation in conversations:
+            message_count = message_counts.get(conversation.id, 0)
+            status_counts = workflow_run_status_counts.get(conversation.id, {})
+            conversation_annotation = annotations.get(conversation.id)
+            end_user = end_users.get(conversation.from_end_user_id) if conversation.from_end_user_id else None
+            account = accounts.get(conversation.from_account_id) if conversation.from_account_id else None
+
+            set_preloaded(conversation, "message_count", message_count)
+            set_preloaded(
+                conversation,
+                "status_count",
+                {
+                    "success": status_counts.get(WorkflowRunStatus.SUCCEEDED, 0),
+                    "failed": status_counts.get(WorkflowRunStatus.FAILED, 0),
+                    "partial_success": status_counts.get(WorkflowRunStatus.PARTIAL_SUCCESSED, 0),
+                }
+                if message_count
+                else None,
+            )
+            set_preloaded(conversation, "first_message", first_messages.get(conversation.id))
+            set_preloaded(conversation, "user_feedback_stats", dict(feedback_stats[(conversation.id, "user")]))
+            set_preloaded(conversation, "admin_feedback_stats", dict(feedback_stats[(conversation.id, "admin")]))
+            set_preloaded(conversation, "annotation", conversation_annotation)
+            set_preloaded(conversation, "annotated", conversation_annotation is not None)
+            set_preloaded(
+                conversation,
+                "app_model_config",
+                app_model_configs.get(conversation.app_model_config_id) if conversation.app_model_config_id else None,
+            )
+            set_preloaded(conversation, "from_end_user_session_id", end_user.session_id if end_user else None)
+            set_preloaded(conversation, "from_account_name", account.name if account else None)
+
+    @classmethod
+    def preload_messages(cls, messages: Sequence[Message]) -> None:
+        """
+        Preload the relations of messages listed in a conversation
+        :param messages: messages of the page
+        """
+        if not messages:
+            return
+
+        message_ids = {message.id for message in messages}
+
+        feedbacks: dict[str, list[MessageFeedback]] = defaultdict(list)
+        for feedback in db.session.scalars(
+            select(MessageFeedback)
+            .where(MessageFeedback.message_id.in_(message_ids))
+            .order_by(MessageFeedback.created_at.asc())
+        ):
+            feedbacks[feedback.message_id].append(feedback)
+
+        hit_annotation_ids: dict[str, str] = {}
+        for hit_history in db.session.scalars(
+            select(AppAnnotationHitHistory)
+            .where(AppAnnotationHitHistory.message_id.in_(message_ids))
+            .order_by(AppAnnotationHitHistory.created_at.asc())
+        ):
+            hit_annotation_ids.setdefault(hit_history.message_id, hit_history.annotation_id)
+
+        annotations: dict[str, MessageAnnotation] = {}
+        message_annotations: dict[str, MessageAnnotation] = {}
+        annotation_filters = [MessageAnnotation.message_id.in_(message_ids)]
+        if hit_annotation_ids:
+            annotation_filters.append(MessageAnnotation.id.in_(set(hit_annotation_ids.values())))
+        for annotation in db.session.scalars(
+            select(MessageAnnotation).where(or_(*annotation_filters)).order_by(MessageAnnotation.created_at.asc())
+        ):
+            annotations[annotation.id] = annotation
+            if annotation.message_id in message_ids:
+                message_annotations.setdefault(annotation.message_id, annotation)
+
+        agent_thoughts: dict[str, list[MessageAgentThought]] = defaultdict(list)
+        for agent_thought in db.session.scalars(
+            select(MessageAgentThought)
+            .where(MessageAgentThought.message_id.in_(message_ids))
+            .order_by(MessageAgentThought.position.asc())
+        ):
+            agent_thoughts[agent_thought.message_id].append(agent_thought)
+
+        retriever_resources: dict[str, list[DatasetRetrieverResource]] = defaultdict(list)
+        for retriever_resource in db.session.scalars(
+            select(DatasetRetrieverResource)
+            .where(DatasetRetrieverResource.message_id.in_(message_ids))
+            .order_by(DatasetRetrieverResource.position.asc())
+        ):
+            retriever_resources[retriever_resource.message_id].append(retriever_resource)
+
+        message_files: dict[str, list[MessageFile]] = defaultdict(list)
+        for message_file in db.session.scalars(select(MessageFile).where(MessageFile.message_id.in_(message_ids))):
+            message_files[message_file.message_id].append(message_file)
+
+        apps = cls._get_by_ids(App, {message.app_id for message in messages})
+
+        account_ids = {
+            feedback.from_account_id
+            for message_feedbacks in feedbacks.values()
+            for feedback in message_feedbacks
+            if feedback.from_account_id
+        }
+        account_ids.update(annotation.account_id for annotation in annotations.values())
+        accounts = cls._get_by_ids(Account, account_ids)
+
+        for message_feedbacks in feedbacks.values():
+            for feedback in message_feedbacks:
+                account = accounts.get(feedback.from_account_id) if feedback.from_account_id else None
+                set_preloaded(feedback, "from_account", account)
+        for annotation in annotations.values():
+            set_preloaded(annotation, "account", accounts.get(annotation.account_id))
+            set_preloaded(annotation, "annotation_create_account", accounts.get(annotation.account_id))
+
+        for message in messages:
+            message_feedbacks = feedbacks.get(message.id, [])
+            hit_annotation_id = hit_annotation_ids.get(message.id)
+
+            set_preloaded(message, "feedbacks", message_feedbacks)
+            set_preloaded(
+                message,
+                "user_feedback",
+                next((feedback for feedback in message_feedbacks if feedback.from_source == "user"), None),
+            )
+            set_preloaded(
+                message,
+                "admin_feedback",
+                next((feedback for feedback in message_feedbacks if feedback.from_source == "admin"), None),
+            )
+            set_preloaded(message, "annotation", message_annotations.get(message.id))
+            set_preloaded(
+                message, "annotation_hit_history", annotations.get(hit_annotation_id) if hit_annotation_id else None
+            )
+            set_preloaded(message, "agent_thoughts", agent_thoughts.get(message.id, []))
+            set_preloaded(message, "retriever_resources", retriever_resources.get(message.id, []))
+
+            app = apps.get(message.app_id)
+            if not app:
+                raise ValueError(f"App {message.app_id} not found")
+            set_preloaded(
+                message, "message_files", Message.build_message_files(message_files.get(message.id, []), app.tenant_id)
+            )
+
+        # tool files of old messages get their upload_file_id set while being serialized
+        if any(message_file in db.session.dirty for files in message_files.values() for message_file in files):
+            db.session.commit()
+
+    @staticmethod
+    def _get_by_ids(model: Any, ids: set[str]) -> dict:
+        if not ids:
+            return {}
+        return {row.id: row for row in db.session.scalars(select(model).where(model.id.in_(ids)))}
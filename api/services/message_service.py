@@ -1,6 +1,8 @@
 import json
 from typing import Optional, Union
 
+from sqlalchemy import select
+
 from core.app.apps.advanced_chat.app_config_manager import AdvancedChatAppConfigManager
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.llm_generator.llm_generator import LLMGenerator
@@ -11,9 +13,10 @@ from core.ops.entities.trace_entity import TraceTaskName
 from core.ops.ops_trace_manager import TraceQueueManager, TraceTask
 from core.ops.utils import measure_time
 from extensions.ext_database import db
-from libs.infinite_scroll_pagination import InfiniteScrollPagination
+from libs.infinite_scroll_pagination import InfiniteScrollPagination, paginate_by_keyset
 from models.account import Account
 from models.model import App, AppMode, AppModelConfig, EndUser, Message, MessageFeedback
+from services.app_statistic_service import AppStatisticService
 from services.conversation_service import ConversationService
 from services.errors.message import (
     FirstMessageNotExistsError,
@@ -21,6 +24,7 @@ from services.errors.message import (
     MessageNotExistsError,
     SuggestedQuestionsAfterAnswerDisabledError,
 )
+from services.message_preload_service import MessagePreloadService
 from services.workflow_service import WorkflowService
 
 
@@ -45,47 +49,31 @@ class MessageService:
             app_model=app_model, user=user, conversation_id=conversation_id
         )
 
-        fetch_limit = limit + 1
+        stmt = select(Message).where(Message.conversation_id == conversation.id)
 
+        cursor = None
         if first_id:
-            first_message = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id, Message.id == first_id)
-                .first()
-            )
+            first_message = db.session.scalar(stmt.where(Message.id == first_id))
 
             if not first_message:
                 raise FirstMessageNotExistsError()
-
-            history_messages = (
-                db.session.query(Message)
-                .filter(
-                    Message.conversation_id == conversation.id,
-                    Message.created_at < first_message.created_at,
-                    Message.id != first_message.id,
-                )
-                .order_by(Message.created_at.desc())
-                .limit(fetch_limit)
-                .all()
-            )
-        else:
-            history_messages = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id)
-                .order_by(Message.created_at.desc())
-                .limit(fetch_limit)
-                .all()
-            )
-
-        has_more = False
-        if len(history_messages) > limit:
-            has_more = True
-            history_messages = history_messages[:-1]
+            cursor = (first_message.created_at, first_message.id)
+
+        pagination = paginate_by_keyset(
+            db.session,
+            stmt,
+            sort_column=Message.created_at,
+            id_column=Message.id,
+            limit=limit,
+            cursor=cursor,
+        )
 
         if order == "asc":
-            history_messages = list(reversed(history_messages))
+            pagination.data = list(reversed(pagination.data))
 
-        return InfiniteScrollPagination(data=history_messages, limit=limit, has_more=has_more)
+        MessagePreloadService.preload_messages(pagination.data)
+
+        return pagination
 
     @classmethod
     def pagination_by_last_id(
@@ -100,41 +88,34 @@ class MessageService:
         if not user:
             return InfiniteScrollPagination(data=[], limit=limit, has_more=False)
 
-        base_query = db.session.query(Message)
-
-        fetch_limit = limit + 1
+        stmt = select(Message)
 
         if conversation_id is not None:
             conversation = ConversationService.get_conversation(
                 app_model=app_model, user=user, conversation_id=conversation_id
             )
 
-            base_query = base_query.filter(Message.conversation_id == conversation.id)
+            stmt = stmt.where(Message.conversation_id == conversation.id)
 
         if include_ids is not None:
-            base_query = base_query.filter(Message.id.in_(include_ids))
+            stmt = stmt.where(Message.id.in_(include_ids))
 
+        cursor = None
         if last_id:
-            last_message = base_query.filter(Message.id == last_id).first()
+            last_message = db.session.scalar(stmt.where(Message.id == last_id))
 
             if not last_message:
                 raise LastMessageNotExistsError()
-
-            history_messages = (
-                base_query.filter(Message.created_at < last_message.created_at, Message.id != last_message.id)
-                .order_by(Message.created_at.desc())
-                .limit(fetch_limit)
-                .all()
-            )
-        else:
-            history_messages = base_query.order_by(Message.created_at.desc()).limit(fetch_limit).all()
-
-        has_more = False
-        if len(history_messages) > limit:
-            has_more = True
-            history_messages = history_messages[:-1]
-
-        return InfiniteScrollPagination(data=history_messages, limit=limit, has_more=has_more)
+            cursor = (last_message.created_at, last_message.id)
+
+        return paginate_by_keyset(
+            db.session,
+            stmt,
+            sort_column=Message.created_at,
+            id_column=Message.id,
+            limit=limit,
+            cursor=cursor,
+        )
 
     @classmethod
     def create_feedback(
@@ -175,6 +156,9 @@ class MessageService:
 
         db.session.commit()
 
+        # the rollups of the day the message was created are invalidated in batches by the scheduled rollup task
+        AppStatisticService.mark_message_feedback(message.id)
+
         return feedback
 
     @classmethod
@@ -5,9 +5,7 @@ import click
 from celery import shared_task  # type: ignore
 
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
-from core.tools.utils.rag_web_reader import get_image_upload_file_ids
 from extensions.ext_database import db
-from extensions.ext_storage import storage
 from models.dataset import (
     AppDatasetJoin,
     Dataset,
@@ -16,7 +14,7 @@ from models.dataset import (
     Document,
     DocumentSegment,
 )
-from models.model import UploadFile
+from services.dataset_cleanup_service import DatasetCleanupService
 
 
 # Add import statement for ValueError
@@ -51,10 +49,9 @@ def clean_dataset_task(
             index_struct=index_struct,
             collection_binding_id=collection_binding_id,
         )
-        documents = db.session.query(Document).filter(Document.dataset_id == dataset_id).all()
-        segments = db.session.query(DocumentSegment).filter(DocumentSegment.dataset_id == dataset_id).all()
+        has_documents = db.session.query(Document.id).filter(Document.dataset_id == dataset_id).first() is not None
 
-        if documents is None or len(documents) == 0:
+        if not has_documents:
             logging.info(click.style("No documents found for dataset: {}".format(dataset_id), fg="green"))
         else:
             logging.info(click.style("Cleaning documents for dataset: {}".format(dataset_id), fg="green"))
@@ -64,50 +61,14 @@ def clean_dataset_task(
             index_processor = IndexProcessorFactory(doc_form).init_index_processor()
             index_processor.clean(dataset, None, with_keywords=True, delete_child_chunks=True)
 
-            for document in documents:
-                db.session.delete(document)
-
-            for segment in segments:
-                image_upload_file_ids = get_image_upload_file_ids(segment.content)
-                for upload_file_id in image_upload_file_ids:
-                    image_file = db.session.query(UploadFile).filter(UploadFile.id == upload_file_id).first()
-                    if image_file is None:
-                        continue
-                    try:
-                        storage.delete(image_file.key)
-                    except Exception:
-                        logging.exception(
-                            "Delete image_files failed when storage deleted, \
-                                          image_upload_file_is: {}".format(upload_file_id)
-                        )
-                    db.session.delete(image_file)
-                db.session.delete(segment)
+            DatasetCleanupService.delete_documents(Document.dataset_id == dataset_id)
+            # the index was cleaned as a whole above
+            DatasetCleanupService.delete_segments(dataset, DocumentSegment.dataset_id == dataset_id)
 
         db.session.query(DatasetProcessRule).filter(DatasetProcessRule.dataset_id == dataset_id).delete()
         db.session.query(DatasetQuery).filter(DatasetQuery.dataset_id == dataset_id).delete()
         db.session.query(AppDatasetJoin).filter(AppDatasetJoin.dataset_id == dataset_id).delete()
 
-        # delete files
-        if documents:
-            for document in documents:
-                try:
-                    if document.data_source_type == "upload_file":
-                        if document.data_source_info:
-                            data_source_info = document.data_source_info_dict
-                            if data_source_info and "upload_file_id" in data_source_info:
-                                file_id = data_source_info["upload_file_id"]
-                                file = (
-                                    db.session.query(UploadFile)
-                                    .filter(UploadFile.tenant_id == document.tenant_id, UploadFile.id == file_id)
-                                    .first()
-                                )
-                                if not file:
-                                    continue
-                                storage.delete(file.key)
-                                db.session.delete(file)
-                except Exception:
-                    continue
-
         db.session.commit()
         end_at = time.perf_counter()
         logging.info(
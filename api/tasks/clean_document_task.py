@@ -6,11 +6,9 @@ import click
 from celery import shared_task  # type: ignore
 
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
-from core.tools.utils.rag_web_reader import get_image_upload_file_ids
 from extensions.ext_database import db
-from extensions.ext_storage import storage
 from models.dataset import Dataset, DocumentSegment
-from models.model import UploadFile
+from services.dataset_cleanup_service import DatasetCleanupService
 
 
 @shared_task(queue="dataset")
@@ -33,39 +31,14 @@ def clean_document_task(document_id: str, dataset_id: str, doc_form: str, file_i
         if not dataset:
             raise Exception("Document has no dataset")
 
-        segments = db.session.query(DocumentSegment).filter(DocumentSegment.document_id == document_id).all()
-        # check segment is exist
-        if segments:
-            index_node_ids = [segment.index_node_id for segment in segments]
-            index_processor = IndexProcessorFactory(doc_form).init_index_processor()
-            index_processor.clean(dataset, index_node_ids, with_keywords=True, delete_child_chunks=True)
-
-            for segment in segments:
-                image_upload_file_ids = get_image_upload_file_ids(segment.content)
-                for upload_file_id in image_upload_file_ids:
-                    image_file = db.session.query(UploadFile).filter(UploadFile.id == upload_file_id).first()
-                    if image_file is None:
-                        continue
-                    try:
-                        storage.delete(image_file.key)
-                    except Exception:
-                        logging.exception(
-                            "Delete image_files failed when storage deleted, \
-                                          image_upload_file_is: {}".format(upload_file_id)
-                        )
-                    db.session.delete(image_file)
-                db.session.delete(segment)
+        index_processor = IndexProcessorFactory(doc_form).init_index_processor()
+        DatasetCleanupService.delete_segments(
+            dataset, DocumentSegment.document_id == document_id, index_processor=index_processor
+        )
 
-            db.session.commit()
         if file_id:
-            file = db.session.query(UploadFile).filter(UploadFile.id == file_id).first()
-            if file:
-                try:
-                    storage.delete(file.key)
-                except Exception:
-                    logging.exception("Delete file failed when document deleted, file_id: {}".format(file_id))
-                db.session.delete(file)
-                db.session.commit()
+            DatasetCleanupService.delete_upload_files([file_id])
+            db.session.commit()
 
         end_at = time.perf_counter()
         logging.info(
@@ -1,18 +1,22 @@
 import logging
 import time
 from collections.abc import Callable
+from typing import Optional
 
 import click
 from celery import shared_task  # type: ignore
-from sqlalchemy import delete
+from sqlalchemy import ColumnElement, delete
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import InstrumentedAttribute
 
 from extensions.ext_database import db
+from libs.batch_deletion import delete_in_batches
 from models.dataset import AppDatasetJoin
 from models.model import (
     ApiToken,
     AppAnnotationHitHistory,
     AppAnnotationSetting,
+    AppDailyStatistic,
     AppModelConfig,
     Conversation,
     EndUser,
@@ -56,6 +60,7 @@ def remove_app_and_related_data_task(self, tenant_id: str, app_id: str):
         _delete_app_tag_bindings(tenant_id, app_id)
         _delete_end_users(tenant_id, app_id)
         _delete_trace_app_configs(tenant_id, app_id)
+        _delete_app_daily_statistics(tenant_id, app_id)
         _delete_conversation_variables(app_id=app_id)
 
         end_at = time.perf_counter()
@@ -71,162 +76,60 @@ def remove_app_and_related_data_task(self, tenant_id: str, app_id: str):
 
 
 def _delete_app_model_configs(tenant_id: str, app_id: str):
-    def del_model_config(model_config_id: str):
-        db.session.query(AppModelConfig).filter(AppModelConfig.id == model_config_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from app_model_configs where app_id=:app_id limit 1000""",
-        {"app_id": app_id},
-        del_model_config,
-        "app model config",
-    )
+    _delete_records(app_id, AppModelConfig.id, AppModelConfig.app_id == app_id)
 
 
 def _delete_app_site(tenant_id: str, app_id: str):
-    def del_site(site_id: str):
-        db.session.query(Site).filter(Site.id == site_id).delete(synchronize_session=False)
-
-    _delete_records("""select id from sites where app_id=:app_id limit 1000""", {"app_id": app_id}, del_site, "site")
+    _delete_records(app_id, Site.id, Site.app_id == app_id)
 
 
 def _delete_app_api_tokens(tenant_id: str, app_id: str):
-    def del_api_token(api_token_id: str):
-        db.session.query(ApiToken).filter(ApiToken.id == api_token_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from api_tokens where app_id=:app_id limit 1000""", {"app_id": app_id}, del_api_token, "api token"
-    )
+    _delete_records(app_id, ApiToken.id, ApiToken.app_id == app_id)
 
 
 def _delete_installed_apps(tenant_id: str, app_id: str):
-    def del_installed_app(installed_app_id: str):
-        db.session.query(InstalledApp).filter(InstalledApp.id == installed_app_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from installed_apps where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_installed_app,
-        "installed app",
-    )
+    _delete_records(app_id, InstalledApp.id, InstalledApp.tenant_id == tenant_id, InstalledApp.app_id == app_id)
 
 
 def _delete_recommended_apps(tenant_id: str, app_id: str):
-    def del_recommended_app(recommended_app_id: str):
-        db.session.query(RecommendedApp).filter(RecommendedApp.id == recommended_app_id).delete(
-            synchronize_session=False
-        )
-
-    _delete_records(
-        """select id from recommended_apps where app_id=:app_id limit 1000""",
-        {"app_id": app_id},
-        del_recommended_app,
-        "recommended app",
-    )
+    _delete_records(app_id, RecommendedApp.id, RecommendedApp.app_id == app_id)
 
 
 def _delete_app_annotation_data(tenant_id: str, app_id: str):
-    def del_annotation_hit_history(annotation_hit_history_id: str):
-        db.session.query(AppAnnotationHitHistory).filter(
-            AppAnnotationHitHistory.id == annotation_hit_history_id
-        ).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from app_annotation_hit_histories where app_id=:app_id limit 1000""",
-        {"app_id": app_id},
-        del_annotation_hit_history,
-        "annotation hit history",
-    )
-
-    def del_annotation_setting(annotation_setting_id: str):
-        db.session.query(AppAnnotationSetting).filter(AppAnnotationSetting.id == annotation_setting_id).delete(
-            synchronize_session=False
-        )
-
-    _delete_records(
-        """select id from app_annotation_settings where app_id=:app_id limit 1000""",
-        {"app_id": app_id},
-        del_annotation_setting,
-        "annotation setting",
-    )
+    _delete_records(app_id, AppAnnotationHitHistory.id, AppAnnotationHitHistory.app_id == app_id)
+    _delete_records(app_id, AppAnnotationSetting.id, AppAnnotationSetting.app_id == app_id)
 
 
 def _delete_app_dataset_joins(tenant_id: str, app_id: str):
-    def del_dataset_join(dataset_join_id: str):
-        db.session.query(AppDatasetJoin).filter(AppDatasetJoin.id == dataset_join_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from app_dataset_joins where app_id=:app_id limit 1000""",
-        {"app_id": app_id},
-        del_dataset_join,
-        "dataset join",
-    )
+    _delete_records(app_id, AppDatasetJoin.id, AppDatasetJoin.app_id == app_id)
 
 
 def _delete_app_workflows(tenant_id: str, app_id: str):
-    def del_workflow(workflow_id: str):
-        db.session.query(Workflow).filter(Workflow.id == workflow_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from workflows where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_workflow,
-        "workflow",
-    )
+    _delete_records(app_id, Workflow.id, Workflow.tenant_id == tenant_id, Workflow.app_id == app_id)
 
 
 def _delete_app_workflow_runs(tenant_id: str, app_id: str):
-    def del_workflow_run(workflow_run_id: str):
-        db.session.query(WorkflowRun).filter(WorkflowRun.id == workflow_run_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from workflow_runs where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_workflow_run,
-        "workflow run",
-    )
+    _delete_records(app_id, WorkflowRun.id, WorkflowRun.tenant_id == tenant_id, WorkflowRun.app_id == app_id)
 
 
 def _delete_app_workflow_node_executions(tenant_id: str, app_id: str):
-    def del_workflow_node_execution(workflow_node_execution_id: str):
-        db.session.query(WorkflowNodeExecution).filter(WorkflowNodeExecution.id == workflow_node_execution_id).delete(
-            synchronize_session=False
-        )
-
     _delete_records(
-        """select id from workflow_node_executions where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_workflow_node_execution,
-        "workflow node execution",
+        app_id,
+        WorkflowNodeExecution.id,
+        WorkflowNodeExecution.tenant_id == tenant_id,
+        WorkflowNodeExecution.app_id == app_id,
     )
 
 
 def _delete_app_workflow_app_logs(tenant_id: str, app_id: str):
-    def del_workflow_app_log(workflow_app_log_id: str):
-        db.session.query(WorkflowAppLog).filter(WorkflowAppLog.id == workflow_app_log_id).delete(
-            synchronize_session=False
-        )
-
-    _delete_records(
-        """select id from workflow_app_logs where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_workflow_app_log,
-        "workflow app log",
-    )
+    _delete_records(app_id, WorkflowAppLog.id, WorkflowAppLog.tenant_id == tenant_id, WorkflowAppLog.app_id == app_id)
 
 
 def _delete_app_conversations(tenant_id: str, app_id: str):
-    def del_conversation(conversation_id: str):
-        db.session.query(PinnedConversation).filter(PinnedConversation.conversation_id == conversation_id).delete(
-            synchronize_session=False
-        )
-        db.session.query(Conversation).filter(Conversation.id == conversation_id).delete(synchronize_session=False)
+    def del_conversation_relations(conversation_ids: list[str]):
+        db.session.execute(delete(PinnedConversation).where(PinnedConversation.conversation_id.in_(conversation_ids)))
 
-    _delete_records(
-        """select id from conversations where app_id=:app_id limit 1000""",
-        {"app_id": app_id},
-        del_conversation,
-        "conversation",
-    )
+    _delete_records(app_id, Conversation.id, Conversation.app_id == app_id, before_delete=del_conversation_relations)
 
 
 def _delete_conversation_variables(*, app_id: str):
@@ -238,92 +141,57 @@ def _delete_conversation_variables(*, app_id: str):
 
 
 def _delete_app_messages(tenant_id: str, app_id: str):
-    def del_message(message_id: str):
-        db.session.query(MessageFeedback).filter(MessageFeedback.message_id == message_id).delete(
-            synchronize_session=False
-        )
-        db.session.query(MessageAnnotation).filter(MessageAnnotation.message_id == message_id).delete(
-            synchronize_session=False
-        )
-        db.session.query(MessageChain).filter(MessageChain.message_id == message_id).delete(synchronize_session=False)
-        db.session.query(MessageAgentThought).filter(MessageAgentThought.message_id == message_id).delete(
-            synchronize_session=False
-        )
-        db.session.query(MessageFile).filter(MessageFile.message_id == message_id).delete(synchronize_session=False)
-        db.session.query(SavedMessage).filter(SavedMessage.message_id == message_id).delete(synchronize_session=False)
-        db.session.query(Message).filter(Message.id == message_id).delete()
+    def del_message_relations(message_ids: list[str]):
+        for model in (MessageFeedback, MessageAnnotation, MessageChain, MessageAgentThought, MessageFile, SavedMessage):
+            db.session.execute(delete(model).where(model.message_id.in_(message_ids)))
 
-    _delete_records(
-        """select id from messages where app_id=:app_id limit 1000""", {"app_id": app_id}, del_message, "message"
-    )
+    _delete_records(app_id, Message.id, Message.app_id == app_id, before_delete=del_message_relations)
 
 
 def _delete_workflow_tool_providers(tenant_id: str, app_id: str):
-    def del_tool_provider(tool_provider_id: str):
-        db.session.query(WorkflowToolProvider).filter(WorkflowToolProvider.id == tool_provider_id).delete(
-            synchronize_session=False
-        )
-
     _delete_records(
-        """select id from tool_workflow_providers where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_tool_provider,
-        "tool workflow provider",
+        app_id,
+        WorkflowToolProvider.id,
+        WorkflowToolProvider.tenant_id == tenant_id,
+        WorkflowToolProvider.app_id == app_id,
     )
 
 
 def _delete_app_tag_bindings(tenant_id: str, app_id: str):
-    def del_tag_binding(tag_binding_id: str):
-        db.session.query(TagBinding).filter(TagBinding.id == tag_binding_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from tag_bindings where tenant_id=:tenant_id and target_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_tag_binding,
-        "tag binding",
-    )
+    _delete_records(app_id, TagBinding.id, TagBinding.tenant_id == tenant_id, TagBinding.target_id == app_id)
 
 
 def _delete_end_users(tenant_id: str, app_id: str):
-    def del_end_user(end_user_id: str):
-        db.session.query(EndUser).filter(EndUser.id == end_user_id).delete(synchronize_session=False)
-
-    _delete_records(
-        """select id from end_users where tenant_id=:tenant_id and app_id=:app_id limit 1000""",
-        {"tenant_id": tenant_id, "app_id": app_id},
-        del_end_user,
-        "end user",
-    )
+    _delete_records(app_id, EndUser.id, EndUser.tenant_id == tenant_id, EndUser.app_id == app_id)
 
 
 def _delete_trace_app_configs(tenant_id: str, app_id: str):
-    def del_trace_app_config(trace_app_config_id: str):
-        db.session.query(TraceAppConfig).filter(TraceAppConfig.id == trace_app_config_id).delete(
-            synchronize_session=False
-        )
+    _delete_records(app_id, TraceAppConfig.id, TraceAppConfig.app_id == app_id)
 
-    _delete_records(
-        """select id from trace_app_config where app_id=:app_id limit 1000""",
-        {"app_id": app_id},
-        del_trace_app_config,
-        "trace app config",
-    )
 
+def _delete_app_daily_statistics(tenant_id: str, app_id: str):
+    _delete_records(app_id, AppDailyStatistic.id, AppDailyStatistic.app_id == app_id)
 
-def _delete_records(query_sql: str, params: dict, delete_func: Callable, name: str) -> None:
-    while True:
-        with db.engine.begin() as conn:
-            rs = conn.execute(db.text(query_sql), params)
-            if rs.rowcount == 0:
-                break
-
-            for i in rs:
-                record_id = str(i.id)
-                try:
-                    delete_func(record_id)
-                    db.session.commit()
-                    logging.info(click.style(f"Deleted {name} {record_id}", fg="green"))
-                except Exception:
-                    logging.exception(f"Error occurred while deleting {name} {record_id}")
-                    continue
-            rs.close()
+
+def _delete_records(
+    app_id: str,
+    id_column: InstrumentedAttribute,
+    *whereclauses: ColumnElement[bool],
+    before_delete: Optional[Callable[[list[str]], None]] = None,
+) -> None:
+    """
+    Delete the rows of a table related to the app in batches, a retry of the task resumes from the last batch
+    """
+    table_name = id_column.class_.__tablename__
+    try:
+        deleted = delete_in_batches(
+            db.session,
+            id_column,
+            *whereclauses,
+            before_delete=before_delete,
+            checkpoint_key=f"remove_app_and_related_data:{app_id}:{table_name}",
+        )
+    except Exception:
+        db.session.rollback()
+        raise
+    logging.info(click.style(f"Deleted {deleted} records of {table_name} for app {app_id}", fg="green"))
@@ -0,0 +1,46 @@
+import logging
+import time
+
+import click
+from celery import shared_task  # type: ignore
+
+from core.app.features.semantic_cache.semantic_cache import SemanticCacheFeature
+
+
+@shared_task(queue="dataset")
+def add_message_to_semantic_cache_task(
+    message_id: str, query: str, inputs_fingerprint: str, tenant_id: str, app_id: str, app_model_config_id: str
+):
+    """
+    Add the answer of a message to the semantic cache of the app.
+    :param message_id: message id
+    :param query: query of the message
+    :param inputs_fingerprint: fingerprint of the inputs of the message
+    :param tenant_id: tenant id
+    :param app_id: app id
+    :param app_model_config_id: id of the app model config the message was answered with
+
+    Usage: add_message_to_semantic_cache_task.delay(message_id, query, inputs_fingerprint, tenant_id, app_id,
+        app_model_config_id)
+    """
+    logging.info(click.style("Start add message to semantic cache: {}".format(message_id), fg="green"))
+    start_at = time.perf_counter()
+
+    try:
+        SemanticCacheFeature().add(
+            tenant_id=tenant_id,
+            app_id=app_id,
+            app_model_config_id=app_model_config_id,
+            message_id=message_id,
+            query=query,
+            inputs_fingerprint=inputs_fingerprint,
+        )
+
+        end_at = time.perf_counter()
+        logging.info(
+            click.style(
+                "Message added to semantic cache: {} latency: {}".format(message_id, end_at - start_at), fg="green"
+            )
+        )
+    except Exception:
+        logging.exception("Add message to semantic cache failed")
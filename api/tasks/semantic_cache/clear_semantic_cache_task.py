@@ -0,0 +1,30 @@
+import logging
+import time
+
+import click
+from celery import shared_task  # type: ignore
+
+from core.app.features.semantic_cache.semantic_cache import SemanticCacheFeature
+
+
+@shared_task(queue="dataset")
+def clear_semantic_cache_task(tenant_id: str, app_id: str):
+    """
+    Remove all answers from the semantic cache of the app.
+    :param tenant_id: tenant id
+    :param app_id: app id
+
+    Usage: clear_semantic_cache_task.delay(tenant_id, app_id)
+    """
+    logging.info(click.style("Start clear semantic cache of app: {}".format(app_id), fg="green"))
+    start_at = time.perf_counter()
+
+    try:
+        SemanticCacheFeature().clear(tenant_id=tenant_id, app_id=app_id)
+
+        end_at = time.perf_counter()
+        logging.info(
+            click.style("Semantic cache of app cleared: {} latency: {}".format(app_id, end_at - start_at), fg="green")
+        )
+    except Exception:
+        logging.exception("Clear semantic cache failed")
@@ -0,0 +1,175 @@
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from core.rag.datasource.vdb.local import local_vector
+from core.rag.datasource.vdb.local.local_vector import LocalVector, LocalVectorConfig
+from core.rag.models.document import Document
+from tests.integration_tests.vdb.test_vector_store import AbstractVectorTest, get_example_document
+
+
+class _FakeStorage:
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+
+    def save(self, filename, data):
+        self.files[filename] = data
+
+    def save_many(self, files):
+        self.files.update(files)
+
+    def load_once(self, filename):
+        return self.files[filename]
+
+    def download(self, filename, target_filepath):
+        with open(target_filepath, "wb") as f:
+            f.write(self.files[filename])
+
+    def exists(self, filename):
+        return filename in self.files
+
+    def delete(self, filename):
+        self.files.pop(filename, None)
+
+
+@pytest.fixture
+def setup_local_vector():
+    fake_storage = _FakeStorage()
+    values: dict[str, str] = {}
+    fake_redis = MagicMock()
+    fake_redis.get.side_effect = values.get
+    fake_redis.set.side_effect = lambda key, value, ex=None: values.__setitem__(key, value)
+    fake_redis.delete.side_effect = lambda key: values.pop(key, None)
+    with (
+        patch("core.rag.datasource.vdb.local.local_vector.storage", fake_storage),
+        patch("core.rag.datasource.vdb.local.local_vector.redis_client", fake_redis),
+    ):
+        yield fake_storage
+
+
+def _config(cache_dir, ivf_min_size: int = 20000) -> LocalVectorConfig:
+    return LocalVectorConfig(cache_dir=str(cache_dir), ivf_min_size=ivf_min_size, ivf_nprobe=4)
+
+
+def _clear_loaded_collections():
+    # behave like another process which has not loaded any collection yet
+    LocalVector._indexes.cache.clear()
+
+
+class LocalVectorTest(AbstractVectorTest):
+    def __init__(self, cache_dir):
+        super().__init__()
+        self.vector = LocalVector(collection_name=self.collection_name, config=_config(cache_dir))
+
+    def get_ids_by_metadata_field(self):
+        ids = self.vector.get_ids_by_metadata_field(key="document_id", value=self.example_doc_id)
+        assert ids == [self.example_doc_id]
+
+
+def test_local_vector(setup_local_vector, tmp_path):
+    LocalVectorTest(tmp_path).run_all_tests()
+    assert setup_local_vector.files == {}
+
+
+def test_local_vector_is_reloaded_after_writes_of_other_processes(setup_local_vector, tmp_path):
+    collection_name = f"collection_{uuid.uuid4().hex}"
+    writer = LocalVector(collection_name=collection_name, config=_config(tmp_path / "writer"))
+    reader = LocalVector(collection_name=collection_name, config=_config(tmp_path / "reader"))
+    writer.create(texts=[get_example_document("a")], embeddings=[[1.0, 0.0]])
+
+    _clear_loaded_collections()
+    assert reader.text_exists("a")
+
+    writer.add_texts(documents=[get_example_document("b")], embeddings=[[0.0, 1.0]])
+    writer.delete_by_metadata_field("document_id", "a")
+
+    _clear_loaded_collections()
+    assert not reader.text_exists("a")
+    hits = reader.search_by_vector(query_vector=[0.0, 1.0])
+    assert [hit.metadata["doc_id"] for hit in hits] == ["b"]
+
+
+def test_local_vector_ivf_search(setup_local_vector, tmp_path):
+    rng = np.random.default_rng(42)
+    centers = rng.normal(size=(8, 32))
+    embeddings = (centers[rng.integers(0, 8, size=2000)] + rng.normal(scale=0.1, size=(2000, 32))).tolist()
+    documents = [
+        Document(
+            page_content=f"chunk {i}",
+            metadata={"doc_id": f"doc-{i}", "document_id": f"document-{i % 10}"},
+        )
+        for i in range(2000)
+    ]
+    vector = LocalVector(collection_name=f"collection_{uuid.uuid4().hex}", config=_config(tmp_path, ivf_min_size=500))
+    vector.create(texts=documents[:1000], embeddings=embeddings[:1000])
+    # the second batch outgrows the first one, so both are compacted and the lists are trained on them
+    vector.add_texts(documents=documents[1000:1990], embeddings=embeddings[1000:1990])
+    # rows of the last segment are assigned to the lists when loaded
+    vector.add_texts(documents=documents[1990:], embeddings=embeddings[1990:])
+
+    _clear_loaded_collections()
+    for i in (3, 1500, 1995):
+        hits = vector.search_by_vector(query_vector=embeddings[i], top_k=5)
+        assert hits[0].metadata["doc_id"] == f"doc-{i}"
+        assert hits[0].metadata["score"] == pytest.approx(1.0)
+
+        hits = vector.search_by_vector(query_vector=embeddings[i], top_k=5, document_ids_filter=["document-7"])
+        assert len(hits) == 5
+        assert all(hit.metadata["document_id"] == "document-7" for hit in hits)
+
+    hits = vector.search_by_full_text(query="chunk 1500", top_k=1)
+    assert hits[0].metadata["doc_id"] == "doc-1500"
+
+
+def _manifest(storage: _FakeStorage, collection_name: str) -> dict:
+    return json.loads(storage.files[f"local_vector/{collection_name}/manifest.json"])
+
+
+def test_local_vector_writes_segments_and_compacts_them(setup_local_vector, tmp_path):
+    collection_name = f"collection_{uuid.uuid4().hex}"
+    vector = LocalVector(collection_name=collection_name, config=_config(tmp_path))
+    with patch("core.rag.datasource.vdb.local.local_vector._COMPACT_MAX_SEGMENTS", 4):
+        vector.create(texts=[get_example_document("a")], embeddings=[[1.0, 0.0]])
+        vector.add_texts(documents=[get_example_document("b")], embeddings=[[0.0, 1.0]])
+        files = dict(setup_local_vector.files)
+        vector.delete_by_ids(["a"])
+
+        # the delete only writes the manifest
+        manifest = _manifest(setup_local_vector, collection_name)
+        assert len(manifest["segments"]) == 2
+        assert manifest["deleted"] == ["a"]
+        assert {name for name in setup_local_vector.files if setup_local_vector.files[name] != files.get(name)} == {
+            f"local_vector/{collection_name}/manifest.json"
+        }
+        _clear_loaded_collections()
+        assert vector.existing_ids(["a", "b"]) == {"b"}
+
+        # a row added again is live, a row added with the same id replaces the previous one
+        vector.add_texts(documents=[get_example_document("a")], embeddings=[[1.0, 0.0]])
+        _clear_loaded_collections()
+        assert vector.existing_ids(["a", "b"]) == {"a", "b"}
+
+        vector.add_texts(documents=[get_example_document("b")], embeddings=[[1.0, 0.0]])
+        manifest = _manifest(setup_local_vector, collection_name)
+        assert manifest["segments"] == []
+        assert manifest["base_size"] == 2
+        # files of the compacted parts are deleted
+        assert len(setup_local_vector.files) == 3
+
+    _clear_loaded_collections()
+    hits = vector.search_by_vector(query_vector=[1.0, 0.0], top_k=2)
+    assert sorted(hit.metadata["doc_id"] for hit in hits) == ["a", "b"]
+
+
+def test_local_vector_version_is_cached_again_after_expiring(setup_local_vector, tmp_path):
+    collection_name = f"collection_{uuid.uuid4().hex}"
+    vector = LocalVector(collection_name=collection_name, config=_config(tmp_path))
+    vector.create(texts=[get_example_document("a")], embeddings=[[1.0, 0.0]])
+    redis_client = local_vector.redis_client
+    redis_client.delete(vector._version_key)
+
+    assert vector.text_exists("a")
+    assert redis_client.get(vector._version_key) == _manifest(setup_local_vector, collection_name)["version"]
@@ -0,0 +1,113 @@
+import inspect
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+from sqlalchemy import MetaData, insert
+
+from controllers.console.app.conversation import ChatConversationApi, _search_messages
+from extensions.ext_database import db
+from models import Conversation, EndUser, Message, MessageAnnotation
+
+APP_ID = uuid.uuid4()
+OTHER_APP_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    with app.app_context():
+        # sqlite copies of the tables, without the server defaults written for postgres
+        metadata = MetaData()
+        for table in (Conversation.__table__, Message.__table__, EndUser.__table__, MessageAnnotation.__table__):
+            table_copy = table.to_metadata(metadata)
+            for column in table_copy.columns:
+                column.server_default = None
+                column.nullable = not column.primary_key
+        metadata.create_all(db.engine)
+        yield app
+
+
+def _add_conversation(name: str, introduction: str = "", messages: tuple[tuple[str, str], ...] = (), app_id=APP_ID):
+    conversation_id = uuid.uuid4()
+    db.session.execute(
+        insert(Conversation.__table__).values(
+            id=conversation_id,
+            app_id=app_id,
+            name=name,
+            introduction=introduction,
+            mode="chat",
+            created_at=datetime(2025, 1, 1),
+            updated_at=datetime(2025, 1, 1),
+        )
+    )
+    for query, answer in messages:
+        db.session.execute(
+            insert(Message.__table__).values(
+                id=uuid.uuid4(),
+                app_id=app_id,
+                conversation_id=conversation_id,
+                query=query,
+                answer=answer,
+                created_at=datetime(2025, 1, 1),
+            )
+        )
+    db.session.commit()
+    return str(conversation_id)
+
+
+def _list_conversations(app: Flask, **args):
+    get = inspect.unwrap(ChatConversationApi.get)
+    query_string = {"sort_by": "created_at", **args}
+    with (
+        app.test_request_context(query_string=query_string),
+        patch("controllers.console.app.conversation.current_user", MagicMock(is_editor=True, timezone="UTC")),
+        patch("controllers.console.app.conversation.MessagePreloadService"),
+    ):
+        return get(ChatConversationApi(), MagicMock(id=APP_ID, mode="chat"))
+
+
+def test_search_messages_matches_query_or_answer_of_the_app(app):
+    in_query = _add_conversation("a", messages=(("how to deploy", "see the docs"),))
+    in_answer = _add_conversation("b", messages=(("hello", "Deploy it with docker"),))
+    _add_conversation("c", messages=(("hello", "hi"),))
+    _add_conversation("d", messages=(("deploy", "deploy"),), app_id=OTHER_APP_ID)
+
+    conversation_ids = db.session.scalars(_search_messages(MagicMock(id=APP_ID), "deploy")).all()
+
+    assert sorted(str(uuid.UUID(conversation_id)) for conversation_id in conversation_ids) == sorted(
+        [in_query, in_answer]
+    )
+
+
+def test_keyword_matches_messages_name_or_introduction(app):
+    expected = {
+        _add_conversation("message", messages=(("what is the refund policy", "..."),)),
+        _add_conversation("Refund request"),
+        _add_conversation("intro", introduction="Ask me about refunds"),
+    }
+    _add_conversation("unrelated", introduction="Ask me anything", messages=(("hello", "hi"),))
+
+    pagination = _list_conversations(app, keyword="refund")
+
+    assert pagination.total == 3
+    assert {str(uuid.UUID(conversation.id)) for conversation in pagination.items} == expected
+
+
+def test_keyword_search_is_paginated(app):
+    # a conversation with several matching messages is listed once
+    expected = {
+        _add_conversation(f"conversation {index}", messages=(("invoice", "invoice"), ("invoice again", "")))
+        for index in range(5)
+    }
+    _add_conversation("unrelated", messages=(("hello", "hi"),))
+
+    pages = [_list_conversations(app, keyword="invoice", limit=2, page=page) for page in (1, 2, 3)]
+
+    assert [page.total for page in pages] == [5, 5, 5]
+    assert [len(page.items) for page in pages] == [2, 2, 1]
+    assert {str(uuid.UUID(conversation.id)) for page in pages for conversation in page.items} == expected
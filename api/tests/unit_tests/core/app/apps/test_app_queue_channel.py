@@ -0,0 +1,142 @@
+import queue
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+
+from core.app.apps.app_queue_channel import InMemoryAppQueueChannel, RedisStreamAppQueueChannel, loads_queue_message
+from core.app.entities.queue_entities import (
+    QueueErrorEvent,
+    QueueNodeStartedEvent,
+    QueueTextChunkEvent,
+    WorkflowQueueMessage,
+)
+from core.model_runtime.errors.invoke import InvokeAuthorizationError
+from core.workflow.nodes.enums import NodeType
+from core.workflow.nodes.tool.entities import ToolNodeData
+from extensions.ext_redis import redis_client
+from libs import metrics
+
+
+class _UnrestorableError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+@pytest.fixture
+def streams():
+    # initialize redis client
+    redis_client.initialize(redis.Redis())
+
+    streams: dict[str, list[tuple[bytes, dict[bytes, bytes]]]] = {}
+
+    def xadd(key, fields, **kwargs):
+        entries = streams.setdefault(key, [])
+        entry_id = f"1-{len(entries) + 1}".encode()
+        entries.append((entry_id, {k.encode(): v for k, v in fields.items()}))
+
+    def xread(stream_ids, count, block):
+        (key, last_id), *_ = stream_ids.items()
+        last_seq = int(last_id.split("-")[1])
+        entries = [entry for entry in streams.get(key, []) if int(entry[0].split(b"-")[1]) > last_seq][:count]
+        return [(key.encode(), entries)] if entries else []
+
+    pipeline = MagicMock()
+    pipeline.xadd.side_effect = xadd
+    with (
+        patch.object(redis_client, "pipeline", return_value=pipeline),
+        patch.object(redis_client, "xread", side_effect=xread),
+    ):
+        yield streams
+
+
+def _message(text: str) -> WorkflowQueueMessage:
+    return WorkflowQueueMessage(task_id="task_id", app_mode="workflow", event=QueueTextChunkEvent(text=text))
+
+
+def test_redis_stream_channel_round_trip(streams):
+    channel = RedisStreamAppQueueChannel("task_id")
+    channel.put(_message("hello"))
+    channel.put(_message("world"))
+    channel.put(None)
+
+    first = channel.get(timeout=1)
+    assert isinstance(first.event, QueueTextChunkEvent)
+    assert first.event.text == "hello"
+    assert channel.get(timeout=1).event.text == "world"
+    assert channel.get(timeout=1) is None
+    with pytest.raises(queue.Empty):
+        channel.get(timeout=1)
+
+
+def test_redis_stream_channel_keeps_event_and_node_data_types(streams):
+    node_data = ToolNodeData(
+        title="tool",
+        provider_id="provider",
+        provider_type="builtin",
+        provider_name="provider",
+        tool_name="tool",
+        tool_label="tool",
+        tool_configurations={},
+        tool_parameters={},
+    )
+    channel = RedisStreamAppQueueChannel("task_id")
+    channel.put(
+        WorkflowQueueMessage(
+            task_id="task_id",
+            app_mode="workflow",
+            event=QueueNodeStartedEvent(
+                node_execution_id="execution_id",
+                node_id="node_id",
+                node_type=NodeType.TOOL,
+                node_data=node_data,
+                start_at=datetime(2025, 1, 1),
+            ),
+        )
+    )
+
+    message = channel.get(timeout=1)
+    assert isinstance(message.event, QueueNodeStartedEvent)
+    assert message.event.node_data == node_data
+
+
+def test_redis_stream_channel_sends_errors_as_errors_told_apart_by_task_pipelines(streams):
+    channel = RedisStreamAppQueueChannel("task_id")
+    for error in (InvokeAuthorizationError("invalid key"), _UnrestorableError(1, "boom")):
+        channel.put(WorkflowQueueMessage(task_id="task_id", app_mode="workflow", event=QueueErrorEvent(error=error)))
+
+    invoke_error = channel.get(timeout=1).event.error
+    assert isinstance(invoke_error, InvokeAuthorizationError)
+    assert str(invoke_error) == "invalid key"
+    error = channel.get(timeout=1).event.error
+    assert type(error) is Exception
+    assert str(error) == "boom"
+
+
+def test_loads_queue_message_refuses_models_out_of_the_application_core():
+    with pytest.raises(ValueError):
+        loads_queue_message(b'{"__queue_model__": "subprocess.Popen", "args": "ls"}')
+
+
+def test_closed_in_memory_channel_leaves_queue_depth():
+    from prometheus_client import REGISTRY
+
+    def depth() -> float:
+        return REGISTRY.get_sample_value("dify_app_queue_depth") or 0.0
+
+    before = depth()
+    with patch.object(metrics.dify_config, "METRICS_ENABLED", True):
+        channel = InMemoryAppQueueChannel()
+        for i in range(3):
+            channel.put(MagicMock())
+        channel.get(timeout=1)
+        assert depth() == before + 2
+
+        # the listener stopped with messages left, e.g. when the client disconnected
+        channel.close()
+        assert depth() == before
+        channel.put(MagicMock())
+        channel.get(timeout=1)
+        assert depth() == before
@@ -0,0 +1,112 @@
+import contextlib
+import queue
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import pytest
+import redis
+
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueNodeSucceededEvent, QueueTextChunkEvent
+from core.workflow.nodes.base.entities import BaseNodeData
+from core.workflow.nodes.enums import NodeType
+from extensions.ext_redis import redis_client
+from models.model import App
+
+EVENT_COUNT = 1000
+
+
+class _FakeOrmHolder:
+    _sa_instance_state = object()
+
+
+@pytest.fixture
+def queue_manager():
+    # initialize redis client
+    redis_client.initialize(redis.Redis())
+
+    with patch.object(redis_client, "setex", return_value=None):
+        yield WorkflowAppQueueManager(
+            task_id="task_id", user_id="user_id", invoke_from=InvokeFrom.SERVICE_API, app_mode="workflow"
+        )
+
+
+def _node_succeeded_event() -> QueueNodeSucceededEvent:
+    rows = [{"id": i, "text": "lorem ipsum " * 20, "tags": ["a", "b", "c"]} for i in range(200)]
+    return QueueNodeSucceededEvent(
+        node_execution_id="node_execution_id",
+        node_id="node_id",
+        node_type=NodeType.CODE,
+        node_data=BaseNodeData(title="code"),
+        start_at=datetime.now(UTC).replace(tzinfo=None),
+        inputs={"rows": rows},
+        process_data={"rows": rows},
+        outputs={"result": rows},
+    )
+
+
+def _publish_all(queue_manager, events, check_mode):
+    for event in events:
+        if check_mode == "model_dump":
+            # the check done for every event before it was made opt-in
+            queue_manager._check_for_sqlalchemy_models(event.model_dump())
+        queue_manager.publish(event, PublishFrom.TASK_PIPELINE)
+    with contextlib.suppress(queue.Empty):
+        while True:
+            queue_manager._q.get(timeout=0)
+
+
+def test_publish_checks_sqlalchemy_models_when_enabled(queue_manager):
+    event = QueueTextChunkEvent(text="chunk", from_variable_selector=["node", "text"])
+    object.__setattr__(event, "from_variable_selector", [_FakeOrmHolder()])
+
+    with patch("core.app.apps.base_app_queue_manager.dify_config.APP_QUEUE_SQLALCHEMY_MODEL_CHECK_ENABLED", True):
+        with pytest.raises(TypeError):
+            queue_manager.publish(event, PublishFrom.TASK_PIPELINE)
+
+    with (
+        patch("core.app.apps.base_app_queue_manager.dify_config.APP_QUEUE_SQLALCHEMY_MODEL_CHECK_ENABLED", False),
+        patch("core.app.apps.base_app_queue_manager.dify_config.DEBUG", False),
+    ):
+        queue_manager.publish(event, PublishFrom.TASK_PIPELINE)
+
+
+def test_check_for_sqlalchemy_models_detects_model_class(queue_manager):
+    with pytest.raises(TypeError):
+        queue_manager._check_for_sqlalchemy_models({"outputs": [App]})
+
+
+@pytest.mark.parametrize("check_mode", ["model_dump", "fields", "disabled"])
+def test_benchmark_publish_text_chunk_events(benchmark, queue_manager, check_mode):
+    events = [QueueTextChunkEvent(text=f"token {i}") for i in range(EVENT_COUNT)]
+
+    with (
+        patch(
+            "core.app.apps.base_app_queue_manager.dify_config.APP_QUEUE_SQLALCHEMY_MODEL_CHECK_ENABLED",
+            check_mode == "fields",
+        ),
+        patch("core.app.apps.base_app_queue_manager.dify_config.DEBUG", False),
+    ):
+        benchmark(_publish_all, queue_manager, events, check_mode)
+
+    if benchmark.stats:
+        benchmark.extra_info["events_per_second"] = EVENT_COUNT / benchmark.stats.stats.mean
+
+
+@pytest.mark.parametrize("check_mode", ["model_dump", "fields", "disabled"])
+def test_benchmark_publish_node_succeeded_events(benchmark, queue_manager, check_mode):
+    events = [_node_succeeded_event()] * 20
+
+    with (
+        patch(
+            "core.app.apps.base_app_queue_manager.dify_config.APP_QUEUE_SQLALCHEMY_MODEL_CHECK_ENABLED",
+            check_mode == "fields",
+        ),
+        patch("core.app.apps.base_app_queue_manager.dify_config.DEBUG", False),
+    ):
+        benchmark(_publish_all, queue_manager, events, check_mode)
+
+    if benchmark.stats:
+        benchmark.extra_info["events_per_second"] = len(events) / benchmark.stats.stats.mean
@@ -0,0 +1,77 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.app.app_config.entities import SemanticCacheEntity
+from core.app.features.semantic_cache.semantic_cache import SemanticCacheFeature, get_inputs_fingerprint
+from core.rag.models.document import Document
+
+INPUTS = {"language": "en"}
+
+
+def _document(message_id: str, **metadata) -> Document:
+    return Document(
+        page_content="how do I reset my password",
+        metadata={
+            "message_id": message_id,
+            "app_id": "app-id",
+            "app_model_config_id": "config-id",
+            "inputs_fingerprint": get_inputs_fingerprint(INPUTS),
+            "created_at": int(time.time()),
+            **metadata,
+        },
+    )
+
+
+@pytest.fixture
+def documents():
+    documents = [
+        _document("other-config", app_model_config_id="previous-config-id"),
+        _document("other-app", app_id="other-app-id"),
+        _document("expired", created_at=int(time.time()) - 30 * 86400),
+        _document("other-inputs", inputs_fingerprint=get_inputs_fingerprint({"language": "de"})),
+        _document("reusable"),
+    ]
+    vector = MagicMock()
+    vector.search_by_vector.return_value = documents
+    with patch.object(SemanticCacheFeature, "_get_vector", return_value=vector):
+        yield documents
+
+
+def _query(fingerprint_inputs: bool) -> list[str]:
+    with patch.object(SemanticCacheFeature, "_get_reusable_message") as get_reusable_message:
+        message = SemanticCacheFeature().query(
+            tenant_id="tenant-id",
+            app_id="app-id",
+            app_model_config_id="config-id",
+            semantic_cache=SemanticCacheEntity(enabled=True, fingerprint_inputs=fingerprint_inputs),
+            query="how can I reset my password",
+            inputs=INPUTS,
+        )
+
+    assert message is get_reusable_message.return_value
+    return get_reusable_message.call_args.args[1]
+
+
+def test_only_answers_of_the_current_config_and_inputs_are_reused(documents):
+    assert _query(fingerprint_inputs=True) == ["reusable"]
+
+
+def test_answers_for_other_inputs_are_reused_without_fingerprint(documents):
+    assert _query(fingerprint_inputs=False) == ["other-inputs", "reusable"]
+
+
+def test_inputs_fingerprint_ignores_key_order():
+    assert get_inputs_fingerprint({"a": 1, "b": "2"}) == get_inputs_fingerprint({"b": "2", "a": 1})
+
+
+def test_lookups_are_counted_per_app(documents):
+    redis_client = MagicMock()
+    redis_client.hmget.return_value = [b"3", None]
+    with patch("core.app.features.semantic_cache.semantic_cache.redis_client", redis_client):
+        _query(fingerprint_inputs=True)
+        statistics = SemanticCacheFeature.get_lookup_statistics("app-id")
+
+    redis_client.hincrby.assert_called_once_with("semantic_cache_lookups:app-id", "hit", 1)
+    assert statistics == {"hits": 3, "misses": 0, "hit_rate": 1.0}
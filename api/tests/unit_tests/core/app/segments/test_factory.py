@@ -13,7 +13,8 @@ from core.variables import (
     StringVariable,
 )
 from core.variables.exc import VariableError
-from core.variables.segments import ArrayAnySegment
+from core.variables.segments import ArrayAnySegment, ArrayNumberSegment, ArrayObjectSegment, ArrayStringSegment
+from core.workflow.entities.variable_pool import VariablePool
 from factories import variable_factory
 
 
@@ -163,3 +164,50 @@ def test_array_none_variable():
     var = variable_factory.build_segment([None, None, None, None])
     assert isinstance(var, ArrayAnySegment)
     assert var.value == [None, None, None, None]
+
+
+@pytest.mark.parametrize(
+    ("value", "segment_class"),
+    [
+        (["a", "b"], ArrayStringSegment),
+        ([1, 2.5, True], ArrayNumberSegment),
+        ([{"a": 1}, {}], ArrayObjectSegment),
+        (["a", 1], ArrayAnySegment),
+        ([["a"], ["b"]], ArrayAnySegment),
+        ([], ArrayAnySegment),
+    ],
+)
+def test_build_array_segment(value, segment_class):
+    segment = variable_factory.build_segment(value)
+    assert type(segment) is segment_class
+    assert segment.value == value
+
+
+def test_build_array_segment_with_not_supported_nested_value():
+    with pytest.raises(ValueError):
+        variable_factory.build_segment([[object()]])
+
+
+def _large_nested_payload() -> list:
+    return [
+        {"id": i, "name": f"item {i}", "tags": ["a", "b", "c"], "scores": [i, i * 0.5], "children": [{"id": i}]}
+        for i in range(50_000)
+    ]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        pytest.param(_large_nested_payload(), id="array_object"),
+        pytest.param([f"line {i}" for i in range(50_000)], id="array_string"),
+        pytest.param([[i, i + 1] for i in range(50_000)], id="array_array"),
+    ],
+)
+def test_benchmark_add_large_payload_to_variable_pool(benchmark, payload):
+    pool = VariablePool(system_variables={}, user_inputs={}, environment_variables=[])
+
+    benchmark(pool.add, ["node_id", "output"], payload)
+
+    segment = pool.get(["node_id", "output"])
+    assert segment is not None
+    assert len(segment.value) == len(payload)
@@ -0,0 +1,60 @@
+import base64
+from unittest.mock import patch
+
+import pytest
+
+from core.file import File, FileTransferMethod, FileType, file_manager
+from core.file.encoded_file_cache import EncodedFileCache
+from core.model_runtime.entities import ImagePromptMessageContent
+
+
+def _file(related_id: str) -> File:
+    return File(
+        id=related_id,
+        tenant_id="tenant-id",
+        type=FileType.IMAGE,
+        transfer_method=FileTransferMethod.LOCAL_FILE,
+        related_id=related_id,
+        filename="image.png",
+        extension=".png",
+        mime_type="image/png",
+        storage_key=f"upload_files/{related_id}.png",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    EncodedFileCache.clear()
+    yield
+    EncodedFileCache.clear()
+
+
+@pytest.fixture
+def storage():
+    with patch("core.file.file_manager.storage") as storage:
+        storage.load.side_effect = lambda path, stream: path.encode()
+        yield storage
+
+
+def test_to_prompt_message_content_encodes_each_file_once(storage):
+    for detail in [ImagePromptMessageContent.DETAIL.LOW, ImagePromptMessageContent.DETAIL.HIGH]:
+        content = file_manager.to_prompt_message_content(_file("file-1"), image_detail_config=detail)
+
+        assert content.base64_data == base64.b64encode(b"upload_files/file-1.png").decode()
+        assert isinstance(content, ImagePromptMessageContent)
+        assert content.detail == detail
+    storage.load.assert_called_once()
+
+
+def test_encoded_file_cache_evicts_least_recently_used_files(storage):
+    size = len(base64.b64encode(b"upload_files/file-0.png"))
+    with patch.object(file_manager.dify_config, "MULTIMODAL_ENCODED_FILE_CACHE_SIZE", size * 2):
+        for related_id in ["file-0", "file-1", "file-0", "file-2", "file-0", "file-1"]:
+            file_manager.to_prompt_message_content(_file(related_id))
+
+    assert [call.args[0] for call in storage.load.call_args_list] == [
+        "upload_files/file-0.png",
+        "upload_files/file-1.png",
+        "upload_files/file-2.png",
+        "upload_files/file-1.png",
+    ]
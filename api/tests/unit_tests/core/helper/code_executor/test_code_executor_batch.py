@@ -0,0 +1,184 @@
+import contextlib
+import io
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from core.helper.code_executor.code_executor import CodeExecutionError, CodeExecutor, CodeLanguage
+from core.helper.code_executor.python3.python3_transformer import Python3TemplateTransformer
+
+CODE = """
+def main(a: int, b: int) -> dict:
+    return {"result": a // b}
+"""
+
+
+def _fake_sandbox(language: CodeLanguage, preload: str, code: str) -> str:
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        try:
+            exec(code, {})  # noqa: S102
+        except Exception as e:
+            raise CodeExecutionError(str(e))
+    return stdout.getvalue()
+
+
+def test_code_runner_script_is_cached():
+    script = Python3TemplateTransformer.get_code_runner_script(CODE)
+    assert CODE in script
+    assert CODE not in Python3TemplateTransformer.get_code_runner_script(CODE, batch=True)
+    assert Python3TemplateTransformer.get_code_runner_script(CODE) is script
+    assert Python3TemplateTransformer.get_code_runner_script(CODE, batch=True) is not script
+
+
+def test_execute_workflow_code_template_batch():
+    with patch.object(CodeExecutor, "execute_code", side_effect=_fake_sandbox) as execute_code:
+        results = CodeExecutor.execute_workflow_code_template_batch(
+            language=CodeLanguage.PYTHON3,
+            code=CODE,
+            inputs_list=[{"a": 6, "b": 3}, {"a": 1, "b": 0}, {"a": 9, "b": 2}],
+        )
+    execute_code.assert_called_once()
+    assert results[0] == {"result": 2}
+    assert isinstance(results[1], CodeExecutionError)
+    assert "ZeroDivisionError" in str(results[1])
+    assert results[2] == {"result": 4}
+
+
+def _execute_concurrently(inputs_list: list[dict], first_call_started: threading.Event, release: threading.Event):
+    """
+    Execute CODE for the first inputs, then for the others while the first execution is still in flight
+    """
+    results: dict[int, dict] = {}
+    errors: dict[int, Exception] = {}
+
+    def execute(i: int):
+        try:
+            results[i] = CodeExecutor.execute_workflow_code_template(
+                language=CodeLanguage.PYTHON3, code=CODE, inputs=inputs_list[i], batchable=True
+            )
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=execute, args=(i,)) for i in range(len(inputs_list))]
+    threads[0].start()
+    assert first_call_started.wait(timeout=5)
+    for thread in threads[1:]:
+        thread.start()
+    while sum(len(batch.inputs_list) for batch in CodeExecutor.pending_batches.values()) < len(inputs_list) - 1:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_executions_are_batched():
+    first_call_started = threading.Event()
+    release = threading.Event()
+
+    def sandbox(language: CodeLanguage, preload: str, code: str) -> str:
+        first_call_started.set()
+        release.wait(timeout=5)
+        return _fake_sandbox(language, preload, code)
+
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.CODE_EXECUTION_BATCH_WINDOW_MS", 5000),
+        patch.object(CodeExecutor, "execute_code", side_effect=sandbox) as execute_code,
+    ):
+        results, errors = _execute_concurrently([{"a": i * 10, "b": i} for i in range(5)], first_call_started, release)
+
+    # the first execution is sent alone, the ones arriving while it is in flight in one batch after it
+    assert execute_code.call_count == 2
+    assert "inputs_list" not in execute_code.call_args_list[0].args[2]
+    assert "inputs_list" in execute_code.call_args_list[1].args[2]
+    assert results == {i: {"result": 10} for i in range(1, 5)}
+    assert isinstance(errors[0], CodeExecutionError)
+
+
+def test_failed_batch_fails_every_execution_without_retrying():
+    first_call_started = threading.Event()
+    release = threading.Event()
+
+    def sandbox(language: CodeLanguage, preload: str, code: str) -> str:
+        first_call_started.set()
+        release.wait(timeout=5)
+        if "inputs_list" in code:
+            raise CodeExecutionError("timeout")
+        return _fake_sandbox(language, preload, code)
+
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.CODE_EXECUTION_BATCH_WINDOW_MS", 5000),
+        patch.object(CodeExecutor, "execute_code", side_effect=sandbox) as execute_code,
+    ):
+        results, errors = _execute_concurrently(
+            [{"a": 1, "b": 1}, {"a": 4, "b": 2}, {"a": 9, "b": 3}], first_call_started, release
+        )
+
+    # executions of the batch may have run before it failed, so they are not run again
+    assert execute_code.call_count == 2
+    assert results == {0: {"result": 1}}
+    assert all("timeout" in str(errors[i]) for i in (1, 2))
+
+
+def test_executions_are_not_batched_unless_batchable():
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.CODE_EXECUTION_BATCH_WINDOW_MS", 5000),
+        patch.object(CodeExecutor, "_execute_workflow_code_template_in_batch") as execute_in_batch,
+        patch.object(CodeExecutor, "execute_code", side_effect=_fake_sandbox),
+    ):
+        result = CodeExecutor.execute_workflow_code_template(
+            language=CodeLanguage.PYTHON3, code=CODE, inputs={"a": 8, "b": 4}
+        )
+
+    assert result == {"result": 2}
+    execute_in_batch.assert_not_called()
+
+
+def test_batched_executions_do_not_share_state():
+    code = """
+calls = []
+
+def main() -> dict:
+    calls.append(1)
+    return {"calls": len(calls)}
+"""
+    with patch.object(CodeExecutor, "execute_code", side_effect=_fake_sandbox):
+        results = CodeExecutor.execute_workflow_code_template_batch(
+            language=CodeLanguage.PYTHON3, code=code, inputs_list=[{}, {}, {}]
+        )
+
+    assert results == [{"calls": 1}] * 3
+
+
+def test_single_execution_is_sent_without_waiting_for_the_batch_window():
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.CODE_EXECUTION_BATCH_WINDOW_MS", 5000),
+        patch.object(CodeExecutor, "execute_code", side_effect=_fake_sandbox),
+    ):
+        started_at = time.perf_counter()
+        result = CodeExecutor.execute_workflow_code_template(
+            language=CodeLanguage.PYTHON3, code=CODE, inputs={"a": 8, "b": 4}, batchable=True
+        )
+
+    assert result == {"result": 2}
+    assert time.perf_counter() - started_at < 1
+
+
+def test_single_execution_in_batch_mode_uses_plain_runner():
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.CODE_EXECUTION_BATCH_WINDOW_MS", 1),
+        patch.object(CodeExecutor, "execute_code", side_effect=_fake_sandbox) as execute_code,
+    ):
+        result = CodeExecutor.execute_workflow_code_template(
+            language=CodeLanguage.PYTHON3, code=CODE, inputs={"a": 7, "b": 7}, batchable=True
+        )
+        with pytest.raises(CodeExecutionError):
+            CodeExecutor.execute_workflow_code_template(
+                language=CodeLanguage.PYTHON3, code=CODE, inputs={"a": 7, "b": 0}, batchable=True
+            )
+
+    assert result == {"result": 1}
+    assert "inputs_list" not in execute_code.call_args_list[0].args[2]
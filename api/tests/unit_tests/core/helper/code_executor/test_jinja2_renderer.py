@@ -0,0 +1,106 @@
+import contextlib
+import io
+from unittest.mock import patch
+
+import pytest
+
+from core.helper.code_executor.code_executor import CodeExecutor, CodeLanguage
+from core.helper.code_executor.jinja2.jinja2_renderer import Jinja2InProcessRenderer, Jinja2RenderFallbackError
+from core.helper.code_executor.jinja2.jinja2_transformer import Jinja2TemplateTransformer
+
+
+def _render_with_runner_script(template: str, inputs: dict) -> str:
+    runner, _ = Jinja2TemplateTransformer.transform_caller(template, inputs)
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        exec(runner, {})  # noqa: S102
+    return Jinja2TemplateTransformer.transform_response(stdout.getvalue())["result"]
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "Hello {{ name }}",
+        "{% for item in items %}{{ loop.index }}. {{ item.title }}\n{% endfor %}",
+        "{{ items | map(attribute='title') | join(', ') }}",
+        "{{ count * 2 }} {{ flag }} {{ missing }}",
+        "line one\\nline two\\t{{ name }}",
+        "trailing newline {{ name }}\n",
+    ],
+)
+def test_render_matches_runner_script(template):
+    inputs = {"name": "Dify", "items": [{"title": "a"}, {"title": "b"}], "count": 21, "flag": True}
+    assert Jinja2InProcessRenderer.render(template, inputs) == _render_with_runner_script(template, inputs)
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "{% set items = [] %}{{ items.append(1) }}",
+        "{{ ''.__class__.__mro__ }}",
+        "{{ 'a' * 100000000 }}",
+        "{{ 2 ** 100000000 }}",
+        "{{ 'a'.center(100000000) }}",
+        "{{ 'a' | center(100000000) }}",
+        "{{ '{:>100000000}'.format(1) }}",
+        "{{ '%100000000s' % 1 }}",
+        "{{ '%100000000s' | format(1) }}",
+        "{{ ('a' * 900000).replace('a', 'aaaa') }}",
+        "{{ (['a' * 900000] * 100) | join }}",
+        "{% if %}",
+        "{{ name }}'''",
+    ],
+)
+def test_render_falls_back_for_unsafe_templates(template):
+    with pytest.raises(Jinja2RenderFallbackError):
+        Jinja2InProcessRenderer.render(template, {"name": "Dify"})
+
+
+def test_render_falls_back_when_loops_outlive_the_deadline():
+    template = "{% for i in range(100000) %}{% for j in range(100000) %}{% endfor %}{% endfor %}"
+    with patch("core.helper.code_executor.jinja2.jinja2_renderer.dify_config.JINJA2_IN_PROCESS_RENDER_TIMEOUT", 0.05):
+        with pytest.raises(Jinja2RenderFallbackError, match="timed out"):
+            Jinja2InProcessRenderer.render(template, {})
+
+
+def test_render_caches_compiled_template():
+    template = "cached {{ name }}"
+    with patch.object(
+        Jinja2InProcessRenderer._environment,
+        "from_string",
+        wraps=Jinja2InProcessRenderer._environment.from_string,
+    ) as from_string:
+        assert Jinja2InProcessRenderer.render(template, {"name": "a"}) == "cached a"
+        assert Jinja2InProcessRenderer.render(template, {"name": "b"}) == "cached b"
+    assert from_string.call_count == 1
+
+
+def test_execute_workflow_code_template_renders_in_process():
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.JINJA2_IN_PROCESS_RENDER_ENABLED", True),
+        patch.object(CodeExecutor, "execute_code") as execute_code,
+    ):
+        result = CodeExecutor.execute_workflow_code_template(
+            language=CodeLanguage.JINJA2, code="Hello {{template}}", inputs={"template": "World"}
+        )
+    assert result == {"result": "Hello World"}
+    execute_code.assert_not_called()
+
+
+def test_execute_workflow_code_template_falls_back_to_sandbox():
+    with (
+        patch("core.helper.code_executor.code_executor.dify_config.JINJA2_IN_PROCESS_RENDER_ENABLED", True),
+        patch.object(CodeExecutor, "execute_code", return_value="<<RESULT>>[1]<<RESULT>>\n") as execute_code,
+    ):
+        result = CodeExecutor.execute_workflow_code_template(
+            language=CodeLanguage.JINJA2, code="{% set a = [] %}{{ a.append(1) or a }}", inputs={}
+        )
+    assert result == {"result": "[1]"}
+    execute_code.assert_called_once()
+
+
+def test_benchmark_render_cached_template(benchmark):
+    template = "{% for item in items %}{{ loop.index }}. {{ item.title }}: {{ item.content }}\n{% endfor %}"
+    inputs = {"items": [{"title": f"title {i}", "content": "content " * 20} for i in range(20)]}
+    result = benchmark(Jinja2InProcessRenderer.render, template, inputs)
+    assert result.startswith("1. title 0")
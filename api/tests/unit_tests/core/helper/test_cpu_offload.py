@@ -0,0 +1,83 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.helper import cpu_offload
+from core.helper.cpu_offload import run_cpu_bound
+
+
+@pytest.fixture
+def offload_enabled():
+    with (
+        patch.object(cpu_offload.dify_config, "CPU_OFFLOAD_ENABLED", True),
+        patch.object(cpu_offload, "_is_gevent_patched", return_value=True),
+    ):
+        yield
+
+
+def test_run_cpu_bound_in_place_when_disabled():
+    with (
+        patch.object(cpu_offload, "_is_gevent_patched", return_value=True),
+        patch.object(cpu_offload, "_get_executor") as get_executor,
+    ):
+        assert run_cpu_bound(pow, 2, 10, input_size=10**9) == 1024
+
+    get_executor.assert_not_called()
+
+
+def test_run_cpu_bound_in_place_without_gevent():
+    with (
+        patch.object(cpu_offload.dify_config, "CPU_OFFLOAD_ENABLED", True),
+        patch.object(cpu_offload, "_get_executor") as get_executor,
+    ):
+        assert run_cpu_bound(pow, 2, 10, input_size=10**9) == 1024
+
+    get_executor.assert_not_called()
+
+
+@pytest.mark.usefixtures("offload_enabled")
+def test_run_cpu_bound_in_place_for_small_inputs():
+    with patch.object(cpu_offload, "_get_executor") as get_executor:
+        assert run_cpu_bound(pow, 2, 10, input_size=1) == 1024
+
+    get_executor.assert_not_called()
+
+
+@pytest.mark.usefixtures("offload_enabled")
+def test_run_cpu_bound_in_process_pool():
+    try:
+        assert run_cpu_bound(os.getpid, input_size=10**9) != os.getpid()
+        # an offloaded call returns the same result as in place
+        assert run_cpu_bound(sorted, "offload", reverse=True, input_size=10**9) == sorted("offload", reverse=True)
+    finally:
+        cpu_offload._discard_executor(cpu_offload._get_executor())
+
+
+@pytest.mark.usefixtures("offload_enabled")
+def test_run_cpu_bound_in_place_when_pool_can_not_accept_work():
+    executor = MagicMock()
+    executor.submit.side_effect = RuntimeError("cannot schedule new futures after shutdown")
+
+    with (
+        patch.object(cpu_offload, "_get_executor", return_value=executor),
+        patch.object(cpu_offload, "_discard_executor") as discard_executor,
+    ):
+        assert run_cpu_bound(pow, 2, 10, input_size=10**9) == 1024
+
+    discard_executor.assert_called_once_with(executor)
+
+
+@pytest.mark.usefixtures("offload_enabled")
+def test_run_cpu_bound_in_place_when_pool_breaks():
+    executor = MagicMock()
+    executor.submit.return_value.result.side_effect = BrokenProcessPool("worker died")
+
+    with (
+        patch.object(cpu_offload, "_get_executor", return_value=executor),
+        patch.object(cpu_offload, "_discard_executor") as discard_executor,
+    ):
+        assert run_cpu_bound(pow, 2, 10, input_size=10**9) == 1024
+
+    discard_executor.assert_called_once_with(executor)
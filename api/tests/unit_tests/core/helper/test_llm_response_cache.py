@@ -0,0 +1,106 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from core.helper.llm_response_cache import LLMResponseCache
+from core.model_runtime.entities.llm_entities import LLMResult, LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import AssistantPromptMessage, UserPromptMessage
+
+PROMPT_MESSAGES = [UserPromptMessage(content="classify: hello")]
+
+
+@pytest.fixture(autouse=True)
+def local_cache():
+    LLMResponseCache._local.cache.clear()
+    with (
+        patch("core.helper.llm_response_cache.dify_config.LLM_RESPONSE_CACHE_ENABLED", True),
+        patch("core.helper.llm_response_cache.dify_config.LLM_RESPONSE_CACHE_STORAGE", "local"),
+    ):
+        yield
+
+
+def _usage() -> LLMUsage:
+    usage = LLMUsage.empty_usage()
+    usage.prompt_tokens, usage.completion_tokens, usage.total_tokens = 10, 2, 12
+    usage.total_price = Decimal("0.1")
+    return usage
+
+
+def _get_key(**model_parameters) -> str | None:
+    return LLMResponseCache.get_key(
+        tenant_id="tenant-id",
+        provider="langgenius/openai/openai",
+        model="gpt-4o",
+        prompt_messages=PROMPT_MESSAGES,
+        model_parameters=model_parameters,
+        tools=None,
+        stop=None,
+    )
+
+
+def _stream():
+    contents = ["gree", "ting", ""]
+    for index, content in enumerate(contents):
+        is_last = index == len(contents) - 1
+        yield LLMResultChunk(
+            model="gpt-4o",
+            prompt_messages=PROMPT_MESSAGES,
+            delta=LLMResultChunkDelta(
+                index=index,
+                message=AssistantPromptMessage(content=content),
+                usage=_usage() if is_last else None,
+                finish_reason="stop" if is_last else None,
+            ),
+        )
+
+
+def test_only_deterministic_invocations_are_cached():
+    assert _get_key(temperature=0) is not None
+    assert _get_key(temperature=0) == _get_key(temperature=0)
+    assert _get_key(temperature=0, max_tokens=10) != _get_key(temperature=0)
+    assert _get_key(temperature=0.7) is None
+    assert _get_key() is None
+
+
+def test_streamed_response_is_replayed_as_chunks():
+    key = _get_key(temperature=0)
+    assert LLMResponseCache.get(key, PROMPT_MESSAGES, stream=True) is None
+
+    chunks = list(LLMResponseCache.record(key, _stream()))
+    assert [chunk.delta.message.content for chunk in chunks] == ["gree", "ting", ""]
+
+    replayed = list(LLMResponseCache.get(key, PROMPT_MESSAGES, stream=True))
+    assert [chunk.delta.message.content for chunk in replayed] == ["gree", "ting"]
+    assert replayed[-1].delta.finish_reason == "stop"
+    # cached responses are not billed
+    assert replayed[-1].delta.usage.total_tokens == 0
+
+    result = LLMResponseCache.get(key, PROMPT_MESSAGES, stream=False)
+    assert isinstance(result, LLMResult)
+    assert result.message.content == "greeting"
+
+
+def test_interrupted_stream_is_not_cached():
+    key = _get_key(temperature=0)
+
+    recorder = LLMResponseCache.record(key, _stream())
+    next(recorder)
+    recorder.close()
+
+    assert LLMResponseCache.get(key, PROMPT_MESSAGES, stream=True) is None
+
+
+def test_large_responses_are_not_cached():
+    key = _get_key(temperature=0)
+    result = LLMResult(
+        model="gpt-4o",
+        prompt_messages=PROMPT_MESSAGES,
+        message=AssistantPromptMessage(content="x" * 100),
+        usage=_usage(),
+    )
+
+    with patch("core.helper.llm_response_cache.dify_config.LLM_RESPONSE_CACHE_MAX_ENTRY_SIZE", 100):
+        LLMResponseCache.set(key, result)
+
+    assert LLMResponseCache.get(key, PROMPT_MESSAGES, stream=False) is None
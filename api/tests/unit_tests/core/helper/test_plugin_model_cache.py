@@ -0,0 +1,78 @@
+import time
+from unittest.mock import patch
+
+import pytest
+import redis
+
+from core.helper.plugin_model_cache import PluginModelCache
+from extensions.ext_redis import redis_client
+
+
+@pytest.fixture
+def generations():
+    # initialize redis client
+    redis_client.initialize(redis.Redis())
+
+    generations: dict[str, int] = {}
+    PluginModelCache._generations.cache.clear()
+
+    def get(key):
+        return str(generations[key]).encode() if key in generations else None
+
+    def incr(key):
+        generations[key] = generations.get(key, 0) + 1
+        return generations[key]
+
+    with (
+        patch.object(redis_client, "get", side_effect=get),
+        patch.object(redis_client, "incr", side_effect=incr),
+    ):
+        yield generations
+
+
+def test_plugin_model_cache_shared_across_calls(generations):
+    PluginModelCache.set("tenant_a", "providers", ["provider"])
+
+    assert PluginModelCache.get("tenant_a", "providers") == ["provider"]
+    assert PluginModelCache.get("tenant_b", "providers") is None
+
+
+def test_plugin_model_cache_invalidate(generations):
+    PluginModelCache.set("tenant_a", "providers", ["provider"])
+    PluginModelCache.set("tenant_b", "providers", ["provider"])
+
+    PluginModelCache.invalidate("tenant_a")
+
+    assert PluginModelCache.get("tenant_a", "providers") is None
+    assert PluginModelCache.get("tenant_b", "providers") == ["provider"]
+
+
+def test_plugin_model_cache_expired(generations):
+    with patch("core.helper.plugin_model_cache.time.monotonic", return_value=0):
+        PluginModelCache.set("tenant_a", "providers", ["provider"])
+
+    with patch("core.helper.plugin_model_cache.time.monotonic", return_value=10**9):
+        assert PluginModelCache.get("tenant_a", "providers") is None
+
+
+def test_plugin_model_cache_skipped_without_redis():
+    redis_client.initialize(redis.Redis())
+
+    with patch.object(redis_client, "get", side_effect=redis.ConnectionError()):
+        PluginModelCache.set("tenant_c", "providers", ["provider"])
+        assert PluginModelCache.get("tenant_c", "providers") is None
+
+
+def test_plugin_generation_is_read_from_redis_once_per_ttl(generations):
+    PluginModelCache.set("tenant_d", "providers", ["provider"])
+    reads = redis_client.get.call_count
+
+    assert PluginModelCache.get("tenant_d", "providers") == ["provider"]
+    assert PluginModelCache.get("tenant_d", "providers") == ["provider"]
+    assert redis_client.get.call_count == reads
+
+    # a change of plugins made in another process is seen once the generation expires
+    generations["plugin_model_cache:generation:tenant_d"] = 1
+    assert PluginModelCache.get("tenant_d", "providers") == ["provider"]
+    with patch("core.helper.plugin_model_cache.time.monotonic", return_value=time.monotonic() + 3600):
+        assert PluginModelCache.get("tenant_d", "providers") is None
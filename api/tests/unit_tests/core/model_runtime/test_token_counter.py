@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.model_runtime.entities.message_entities import (
+    ImagePromptMessageContent,
+    SystemPromptMessage,
+    TextPromptMessageContent,
+    UserPromptMessage,
+)
+from core.model_runtime.model_providers.__base.tokenizers import token_counter
+from core.model_runtime.model_providers.__base.tokenizers.token_counter import PromptTokenCounter
+
+
+class _WhitespaceEncoding:
+    def __init__(self):
+        self.encoded: list[str] = []
+
+    def encode(self, text: str) -> list[str]:
+        self.encoded.append(text)
+        return text.split()
+
+
+@pytest.fixture
+def encoding():
+    encoding = _WhitespaceEncoding()
+    PromptTokenCounter._counts.cache.clear()
+    with (
+        patch.dict(token_counter._encodings, {"o200k_base": encoding, "gpt2": encoding}),
+        patch.object(token_counter.dify_config, "LLM_TOKEN_COUNT_MODE", "local"),
+    ):
+        yield encoding
+
+
+def _count(model: str, prompt_messages, count_by_plugin) -> int:
+    return PromptTokenCounter.get_num_tokens(
+        provider="langgenius/openai/openai",
+        model=model,
+        credentials={"api_key": "key"},
+        prompt_messages=prompt_messages,
+        tools=None,
+        count_by_plugin=count_by_plugin,
+    )
+
+
+def test_known_model_is_counted_locally_and_messages_are_memoized(encoding):
+    count_by_plugin = MagicMock(return_value=100)
+    system = SystemPromptMessage(content="you are helpful")
+    history = [UserPromptMessage(content=f"question {i}") for i in range(3)]
+
+    # role and content of each message, plus the tokens of the chat format
+    assert _count("gpt-4o", [system, *history], count_by_plugin) == (4 + 3) + 3 * (3 + 3) + 3
+    encoded = len(encoding.encoded)
+    assert _count("gpt-4o", [system, *history[1:]], count_by_plugin) == (4 + 3) + 2 * (3 + 3) + 3
+
+    assert len(encoding.encoded) == encoded
+    count_by_plugin.assert_not_called()
+
+
+def test_plugin_counts_are_memoized(encoding):
+    count_by_plugin = MagicMock(return_value=100)
+    prompt_messages = [UserPromptMessage(content="hello")]
+
+    assert _count("unknown-model", prompt_messages, count_by_plugin) == 100
+    assert _count("unknown-model", prompt_messages, count_by_plugin) == 100
+    assert _count("unknown-model", [UserPromptMessage(content="hello again")], count_by_plugin) == 100
+
+    assert count_by_plugin.call_count == 2
+
+
+def test_multi_modal_messages_are_counted_by_plugin(encoding):
+    count_by_plugin = MagicMock(return_value=100)
+    image = ImagePromptMessageContent(format="png", mime_type="image/png", url="https://example.com/image.png")
+    prompt_messages = [UserPromptMessage(content=[TextPromptMessageContent(data="what is it"), image])]
+
+    assert _count("gpt-4o", prompt_messages, count_by_plugin) == 100
+    with patch.object(token_counter.dify_config, "LLM_TOKEN_COUNT_MODE", "estimate"):
+        assert _count("gpt-4o", prompt_messages, count_by_plugin) == 1 + 3 + 3 + 3
+
+    count_by_plugin.assert_called_once()
+
+
+@pytest.mark.parametrize(("mode", "plugin_calls"), [("exact", 2), ("estimate", 0)])
+def test_modes(encoding, mode, plugin_calls):
+    count_by_plugin = MagicMock(return_value=100)
+    prompt_messages = [UserPromptMessage(content="hello")]
+
+    with patch.object(token_counter.dify_config, "LLM_TOKEN_COUNT_MODE", mode):
+        _count("unknown-model", prompt_messages, count_by_plugin)
+        _count("gpt-4o", prompt_messages, count_by_plugin)
+
+    assert count_by_plugin.call_count == plugin_calls
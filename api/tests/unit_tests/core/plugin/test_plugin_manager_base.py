@@ -0,0 +1,94 @@
+import json
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from core.model_runtime.entities.llm_entities import LLMResultChunk
+from core.plugin.entities.plugin_daemon import PluginDaemonInnerError
+from core.plugin.manager.base import BasePluginManager
+
+CHUNK_COUNT = 2000
+
+CHUNK_LINE = json.dumps(
+    {
+        "code": 0,
+        "message": "",
+        "data": {
+            "model": "gpt-4o",
+            "prompt_messages": [],
+            "delta": {"index": 0, "message": {"role": "assistant", "content": "Hello, world! "}},
+        },
+    }
+).encode()
+
+
+class FakePluginDaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.endswith("/error"):
+            lines = [json.dumps({"code": -500, "message": "daemon failed", "data": None}).encode()]
+        else:
+            lines = [CHUNK_LINE] * CHUNK_COUNT
+        body = b"".join(b"data: " + line + b"\n\n" for line in lines)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def fake_plugin_daemon() -> Generator[str, None, None]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePluginDaemonHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    with patch("core.plugin.manager.base.plugin_daemon_inner_api_baseurl", url):
+        yield url
+    server.shutdown()
+
+
+def _invoke_stream(path: str = "plugin/tenant/dispatch/llm/invoke") -> list[LLMResultChunk]:
+    return list(
+        BasePluginManager()._request_with_plugin_daemon_response_stream(
+            "POST",
+            path,
+            LLMResultChunk,
+            headers={"Content-Type": "application/json"},
+            data={"data": {}},
+        )
+    )
+
+
+def test_response_stream_yields_models(fake_plugin_daemon):
+    chunks = _invoke_stream()
+    assert len(chunks) == CHUNK_COUNT
+    assert isinstance(chunks[0], LLMResultChunk)
+    assert chunks[0].delta.message.content == "Hello, world! "
+
+
+def test_response_stream_raises_daemon_error(fake_plugin_daemon):
+    with pytest.raises(PluginDaemonInnerError):
+        _invoke_stream("plugin/tenant/dispatch/llm/invoke/error")
+
+
+def test_session_is_shared_and_recreated_after_fork():
+    session = BasePluginManager._get_session()
+    assert BasePluginManager._get_session() is session
+    with patch("core.plugin.manager.base.os.getpid", return_value=-1):
+        assert BasePluginManager._get_session() is not session
+
+
+def test_benchmark_response_stream_chunks(benchmark, fake_plugin_daemon):
+    chunks = benchmark.pedantic(_invoke_stream, rounds=5)
+    assert len(chunks) == CHUNK_COUNT
+    if benchmark.stats:
+        benchmark.extra_info["chunks_per_second"] = CHUNK_COUNT / benchmark.stats.stats.mean
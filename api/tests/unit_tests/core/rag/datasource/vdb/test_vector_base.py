@@ -0,0 +1,90 @@
+import time
+from typing import Any
+
+import pytest
+
+from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.models.document import Document
+
+
+class _InMemoryVector(BaseVector):
+    def __init__(self, ids: set[str], round_trip_latency: float = 0):
+        super().__init__("collection")
+        self.ids = ids
+        self.round_trip_latency = round_trip_latency
+        self.round_trips = 0
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.round_trip_latency:
+            time.sleep(self.round_trip_latency)
+
+    def get_type(self) -> str:
+        return "in_memory"
+
+    def create(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
+        raise NotImplementedError
+
+    def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        raise NotImplementedError
+
+    def text_exists(self, id: str) -> bool:
+        self._round_trip()
+        return id in self.ids
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        raise NotImplementedError
+
+    def delete_by_metadata_field(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        raise NotImplementedError
+
+    def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
+        raise NotImplementedError
+
+    def delete(self) -> None:
+        raise NotImplementedError
+
+
+class _BatchedInMemoryVector(_InMemoryVector):
+    def existing_ids(self, ids: list[str]) -> set[str]:
+        self._round_trip()
+        return self.ids.intersection(ids)
+
+
+def _documents(count: int) -> list[Document]:
+    return [Document(page_content=f"text {i}", metadata={"doc_id": f"doc-{i}"}) for i in range(count)]
+
+
+def test_filter_duplicate_texts_looks_up_ids_in_batches():
+    documents = _documents(2500) + [Document(page_content="no doc id", metadata={})]
+    vector = _BatchedInMemoryVector({f"doc-{i}" for i in range(0, 2500, 2)})
+
+    filtered = vector._filter_duplicate_texts(documents)
+
+    assert [document.page_content for document in filtered] == [f"text {i}" for i in range(1, 2500, 2)] + ["no doc id"]
+    assert vector.round_trips == 3
+
+
+def test_filter_duplicate_texts_falls_back_to_text_exists():
+    documents = _documents(10)
+    vector = _InMemoryVector({"doc-3"})
+
+    filtered = vector._filter_duplicate_texts(documents)
+
+    assert "doc-3" not in [document.metadata["doc_id"] for document in filtered]
+    assert len(filtered) == 9
+    assert vector.round_trips == 10
+
+
+@pytest.mark.parametrize("vector_class", [_InMemoryVector, _BatchedInMemoryVector], ids=["fallback", "batched"])
+def test_benchmark_filter_duplicate_texts(benchmark, vector_class):
+    documents = _documents(10_000)
+    # simulate a fast network round-trip to the vector store
+    vector = vector_class({f"doc-{i}" for i in range(0, 10_000, 2)}, round_trip_latency=0.0001)
+
+    filtered = benchmark.pedantic(vector._filter_duplicate_texts, args=(documents,), rounds=3)
+
+    assert len(filtered) == 5_000
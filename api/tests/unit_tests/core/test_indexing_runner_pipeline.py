@@ -0,0 +1,143 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from core.indexing_runner import DocumentIsPausedError, IndexingRunner
+from core.rag.models.document import Document
+from models.dataset import Document as DatasetDocument
+
+
+def _pages(count: int) -> list[Document]:
+    return [Document(page_content=f"page {i}", metadata={"doc_id": f"page-{i}"}) for i in range(count)]
+
+
+def _transform(pages: list[Document], **kwargs) -> list[Document]:
+    # each page is split into a single segment
+    return [
+        Document(page_content=page.page_content, metadata={"doc_id": f"segment-{page.metadata['doc_id']}"})
+        for page in pages
+    ]
+
+
+class _Pipeline:
+    """
+    Runs IndexingRunner._run_pipeline with every stage backed by mocks recording what it was given
+    """
+
+    def __init__(self, page_count: int, indexing_technique: str = "high_quality"):
+        self.runner = IndexingRunner()
+        self.index_processor = MagicMock()
+        self.index_processor.transform.side_effect = _transform
+        self.dataset = MagicMock(indexing_technique=indexing_technique, tenant_id="tenant")
+        self.dataset_document = MagicMock(id="document", doc_form="text_model", doc_language="English")
+        self.pages = _pages(page_count)
+
+        self.saved_batches: list[list[str]] = []
+        self.indexed_segments: list[str] = []
+        self.keyword_batches: list[list[str]] = []
+        self.statuses: list[str] = []
+        self._lock = threading.Lock()
+
+        self.load_segments_batch = MagicMock(side_effect=self._load_segments_batch)
+        self.process_chunk = MagicMock(side_effect=self._process_chunk)
+        self.check_paused = MagicMock()
+
+    def _load_segments_batch(self, doc_store, dataset_document, documents, is_first_batch):
+        self.saved_batches.append([document.metadata["doc_id"] for document in documents])
+
+    def _process_chunk(self, flask_app, index_processor, chunk_documents, dataset, dataset_document, model_instance):
+        with self._lock:
+            self.indexed_segments.extend(document.metadata["doc_id"] for document in chunk_documents)
+        return len(chunk_documents)
+
+    def _process_keyword_index(self, flask_app, dataset_id, document_id, documents):
+        self.keyword_batches.append([document.metadata["doc_id"] for document in documents])
+
+    def _update_document_index_status(self, document_id, after_indexing_status, extra_update_params=None):
+        self.statuses.append(after_indexing_status)
+        self.extra_update_params = extra_update_params
+
+    def run(self) -> None:
+        app = Flask(__name__)
+        with (
+            app.app_context(),
+            patch("core.indexing_runner.dify_config.INDEXING_PIPELINE_BATCH_SIZE", 2),
+            patch("core.indexing_runner.dify_config.INDEXING_PIPELINE_QUEUE_SIZE", 1),
+            patch("core.indexing_runner.DatasetDocumentStore"),
+            patch.object(self.runner, "model_manager"),
+            patch.object(self.runner, "_extract", return_value=self.pages),
+            patch.object(self.runner, "_get_transform_embedding_model_instance", return_value=None),
+            patch.object(self.runner, "_check_document_paused_status", self.check_paused),
+            patch.object(self.runner, "_load_segments_batch", self.load_segments_batch),
+            patch.object(self.runner, "_process_chunk", self.process_chunk),
+            patch.object(self.runner, "_process_keyword_index", side_effect=self._process_keyword_index),
+            patch.object(self.runner, "_update_document_index_status", side_effect=self._update_document_index_status),
+        ):
+            self.runner._run_pipeline(self.index_processor, self.dataset, self.dataset_document, {"mode": "automatic"})
+
+
+def test_pipeline_saves_and_indexes_batches_in_order():
+    pipeline = _Pipeline(page_count=5)
+
+    pipeline.run()
+
+    segment_ids = [f"segment-page-{i}" for i in range(5)]
+    assert pipeline.saved_batches == [segment_ids[0:2], segment_ids[2:4], segment_ids[4:5]]
+    assert pipeline.keyword_batches == pipeline.saved_batches
+    assert sorted(pipeline.indexed_segments) == segment_ids
+    # pages are split in their order, one at a time
+    assert [call.args[0][0].metadata["doc_id"] for call in pipeline.index_processor.transform.call_args_list] == [
+        f"page-{i}" for i in range(5)
+    ]
+    assert pipeline.statuses == ["completed"]
+    # tokens consumed by every chunk are summed up
+    assert pipeline.extra_update_params[DatasetDocument.tokens] == 5
+
+
+def test_economy_pipeline_only_builds_keyword_index():
+    pipeline = _Pipeline(page_count=3, indexing_technique="economy")
+
+    pipeline.run()
+
+    pipeline.process_chunk.assert_not_called()
+    assert pipeline.keyword_batches == [["segment-page-0", "segment-page-1"], ["segment-page-2"]]
+    assert pipeline.statuses == ["completed"]
+
+
+def test_pipeline_raises_error_of_index_worker_and_stops_splitting():
+    pipeline = _Pipeline(page_count=50)
+    pipeline.process_chunk.side_effect = RuntimeError("embedding failed")
+
+    with pytest.raises(RuntimeError, match="embedding failed"):
+        pipeline.run()
+
+    assert pipeline.statuses == []
+    # the splitter stopped without splitting the remaining pages
+    assert pipeline.index_processor.transform.call_count < 50
+
+
+def test_pipeline_raises_error_of_splitter():
+    pipeline = _Pipeline(page_count=5)
+    pipeline.index_processor.transform.side_effect = [_transform(pipeline.pages[:1]), ValueError("split failed")]
+
+    with pytest.raises(ValueError, match="split failed"):
+        pipeline.run()
+
+    assert pipeline.statuses == []
+    pipeline.process_chunk.assert_not_called()
+
+
+def test_pipeline_stops_when_document_is_paused():
+    pipeline = _Pipeline(page_count=50)
+    pipeline.check_paused.side_effect = [None, DocumentIsPausedError("document paused")]
+
+    with pytest.raises(DocumentIsPausedError):
+        pipeline.run()
+
+    # the batch saved before the pause is indexed, nothing is saved after it
+    assert pipeline.saved_batches == [["segment-page-0", "segment-page-1"]]
+    assert sorted(pipeline.indexed_segments) == ["segment-page-0", "segment-page-1"]
+    assert pipeline.index_processor.transform.call_count < 50
+    assert pipeline.statuses == []
@@ -0,0 +1,87 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import String, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from libs.batch_deletion import delete_in_batches
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Item(_Base):
+    __tablename__ = "items"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    group: Mapped[str] = mapped_column(String)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(_Item(id=f"item-{i:02}", group="deleted" if i % 2 else "kept") for i in range(20))
+        session.commit()
+        yield session
+
+
+@pytest.fixture
+def redis_client():
+    redis_client = MagicMock()
+    redis_client.get.return_value = None
+    with patch("libs.batch_deletion.redis_client", redis_client):
+        yield redis_client
+
+
+def _remaining_ids(session: Session) -> list[str]:
+    return list(session.scalars(select(_Item.id).order_by(_Item.id)))
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_delete_in_batches_deletes_matching_rows_in_batches(session):
+    deleted = delete_in_batches(session, _Item.id, _Item.group == "deleted", batch_size=3)
+
+    assert deleted == 10
+    assert _remaining_ids(session) == [f"item-{i:02}" for i in range(0, 20, 2)]
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_delete_in_batches_calls_before_delete_with_each_batch(session):
+    batches: list[list[str]] = []
+
+    deleted = delete_in_batches(session, _Item.id, _Item.group == "deleted", batch_size=4, before_delete=batches.append)
+
+    assert deleted == 10
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sorted(item_id for batch in batches for item_id in batch) == [f"item-{i:02}" for i in range(1, 20, 2)]
+
+
+def test_delete_in_batches_counts_rows_deleted_before_checkpoint(session, redis_client):
+    redis_client.get.return_value = json.dumps({"deleted": 5})
+
+    deleted = delete_in_batches(session, _Item.id, _Item.group == "deleted", batch_size=3, checkpoint_key="checkpoint")
+
+    assert deleted == 15
+    assert _remaining_ids(session) == [f"item-{i:02}" for i in range(0, 20, 2)]
+    assert json.loads(redis_client.setex.call_args.args[2]) == {"deleted": 15}
+    redis_client.delete.assert_called_once_with("checkpoint")
+
+
+@pytest.mark.usefixtures("redis_client")
+def test_delete_in_batches_deletes_rows_inserted_during_deletion(session):
+    inserted = []
+
+    def before_delete(ids: list[str]) -> None:
+        if not inserted:
+            # inserted below every id deleted so far
+            session.add(_Item(id="item-000", group="deleted"))
+            inserted.append(True)
+
+    deleted = delete_in_batches(session, _Item.id, _Item.group == "deleted", batch_size=3, before_delete=before_delete)
+
+    assert deleted == 11
+    assert "item-000" not in _remaining_ids(session)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import String, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from libs.infinite_scroll_pagination import paginate_by_keyset
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Item(_Base):
+    __tablename__ = "items"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column()
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # several items share the same sort value
+        session.add_all(_Item(id=f"item-{i:02}", created_at=datetime(2025, 1, 1, i // 3)) for i in range(10))
+        session.commit()
+        yield session
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_paginate_by_keyset_walks_every_row_once(session, descending):
+    ids = []
+    cursor = None
+    pages = 0
+    while True:
+        pagination = paginate_by_keyset(
+            session,
+            select(_Item),
+            sort_column=_Item.created_at,
+            id_column=_Item.id,
+            limit=4,
+            descending=descending,
+            cursor=cursor,
+        )
+        pages += 1
+        ids.extend(item.id for item in pagination.data)
+        if not pagination.has_more:
+            break
+        cursor = (pagination.data[-1].created_at, pagination.data[-1].id)
+
+    expected = [f"item-{i:02}" for i in range(10)]
+    assert ids == (list(reversed(expected)) if descending else expected)
+    assert pages == 3
+
+
+def test_paginate_by_keyset_has_no_more_on_full_last_page(session):
+    pagination = paginate_by_keyset(session, select(_Item), sort_column=_Item.created_at, id_column=_Item.id, limit=10)
+
+    assert len(pagination.data) == 10
+    assert not pagination.has_more
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from flask import Flask
+
+from extensions import ext_app_metrics
+from libs import metrics
+
+
+def _sample(name: str, labels: dict[str, str] | None = None) -> float:
+    from prometheus_client import REGISTRY
+
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_metrics_are_not_collected_when_disabled():
+    before = _sample("dify_retrieval_stage_seconds_count", {"stage": "rerank"})
+
+    with patch.object(metrics.dify_config, "METRICS_ENABLED", False):
+        with metrics.time_retrieval_stage("rerank"):
+            pass
+
+    assert _sample("dify_retrieval_stage_seconds_count", {"stage": "rerank"}) == before
+
+
+def test_plugin_daemon_request_path_without_ids():
+    labels = {"method": "POST", "path": "/plugin/{id}/dispatch/llm/invoke"}
+    before = _sample("dify_plugin_daemon_request_seconds_count", labels)
+
+    with patch.object(metrics.dify_config, "METRICS_ENABLED", True):
+        metrics.observe_plugin_daemon_request(
+            "post", "plugin/0f6c1c4e-8a77-4a3e-9b3c-6f1d8a1b2c3d/dispatch/llm/invoke", 0.1
+        )
+
+    assert _sample("dify_plugin_daemon_request_seconds_count", labels) == before + 1
+
+
+def test_metrics_endpoint_counts_request_calls():
+    app = Flask(__name__)
+    with patch.object(metrics.dify_config, "METRICS_ENABLED", True):
+        ext_app_metrics.init_app(app)
+
+        @app.route("/calls")
+        def calls():
+            metrics.count_request_call("redis")
+            metrics.count_request_call("redis")
+            metrics.count_request_call("db")
+            return "ok"
+
+        before = _sample("dify_request_redis_calls_sum")
+        client = app.test_client()
+        assert client.get("/calls").status_code == 200
+        response = client.get("/metrics")
+
+    assert _sample("dify_request_redis_calls_sum") == before + 2
+    assert response.status_code == 200
+    assert b"dify_request_db_queries_count" in response.data
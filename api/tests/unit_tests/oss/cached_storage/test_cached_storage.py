@@ -0,0 +1,150 @@
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from extensions.storage.cached_storage import CachedStorage
+from extensions.storage.opendal_storage import OpenDALStorage
+
+
+class _CountingStorage(OpenDALStorage):
+    def __init__(self, root: str):
+        super().__init__(scheme="fs", root=root)
+        self.loads = 0
+
+    def load_once(self, filename: str) -> bytes:
+        self.loads += 1
+        return super().load_once(filename)
+
+    def load_stream(self, filename: str):
+        self.loads += 1
+        yield from super().load_stream(filename)
+
+
+@pytest.fixture
+def redis_client():
+    redis_client = MagicMock()
+    redis_client.get.return_value = None
+    with patch("extensions.storage.cached_storage.redis_client", redis_client):
+        yield redis_client
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return _CountingStorage(str(tmp_path / "remote"))
+
+
+@pytest.fixture
+def storage(backend, tmp_path, redis_client):
+    return CachedStorage(backend, path=str(tmp_path / "cache"), max_size=100, max_file_size=40, ttl=60)
+
+
+def test_load_once_reads_through_cache(storage, backend):
+    backend.save("file", b"data")
+
+    assert storage.load_once("file") == b"data"
+    assert storage.load_once("file") == b"data"
+    assert b"".join(storage.load_stream("file")) == b"data"
+    assert storage.load_range("file", 1, 2) == b"at"
+    assert backend.loads == 1
+
+
+def test_load_stream_caches_small_files_only(storage, backend):
+    backend.save("small", b"data")
+    backend.save("large", b"x" * 50)
+
+    for _ in range(2):
+        assert b"".join(storage.load_stream("small")) == b"data"
+        assert b"".join(storage.load_stream("large")) == b"x" * 50
+    assert backend.loads == 3
+
+
+def test_load_many_fetches_misses_only(storage, backend):
+    backend.save("cached", b"1")
+    backend.save("missing", b"2")
+    storage.load_once("cached")
+
+    assert storage.load_many(["cached", "missing", "cached"]) == [b"1", b"2", b"1"]
+    assert backend.loads == 2
+
+
+def test_save_writes_through_and_delete_invalidates(storage, backend, redis_client):
+    storage.save("file", b"data")
+
+    assert storage.load_once("file") == b"data"
+    assert backend.loads == 0
+
+    storage.delete("file")
+
+    assert not backend.exists("file")
+    assert redis_client.setex.call_count == 2
+    with pytest.raises(FileNotFoundError):
+        storage.load_once("file")
+
+
+def test_file_cached_before_invalidation_is_stale(storage, backend, redis_client):
+    backend.save("file", b"old")
+    storage.load_once("file")
+    # overwritten by another host
+    backend.save("file", b"new")
+    redis_client.get.return_value = str(time.time() + 1).encode()
+
+    assert storage.load_once("file") == b"new"
+
+
+def test_expired_file_is_stale(storage, backend):
+    backend.save("file", b"old")
+    storage.load_once("file")
+    backend.save("file", b"new")
+    cache_path = storage._cache_path("file")
+    cached_at = time.time() - 61
+    os.utime(cache_path, (cached_at, cached_at))
+
+    assert storage.load_once("file") == b"new"
+
+
+def test_least_recently_read_files_are_evicted(storage, backend):
+    for index in range(3):
+        storage.save(f"file-{index}", bytes([index]) * 30)
+        os.utime(storage._cache_path(f"file-{index}"), (index, time.time()))
+    # read the oldest file last
+    storage.load_once("file-0")
+
+    storage.save("file-3", b"3" * 30)
+
+    assert storage._cache_path("file-0").exists()
+    assert not storage._cache_path("file-1").exists()
+    assert storage._cache_path("file-3").exists()
+    assert storage._size <= 90
+
+
+def test_overwritten_file_is_counted_once(storage):
+    for _ in range(5):
+        storage.save("file", b"x" * 30)
+
+    assert storage._size == 30
+    assert storage._cache_path("file").exists()
+
+
+def test_files_cached_by_other_processes_are_evicted(storage, backend, tmp_path):
+    other_process = CachedStorage(backend, path=str(tmp_path / "cache"), max_size=100, max_file_size=40, ttl=60)
+    storage.save("file-0", b"0" * 30)
+    other_process.save("file-1", b"1" * 30)
+    other_process.save("file-2", b"2" * 30)
+
+    # the size written by the other process is only seen by the next scan of the directory
+    storage._next_scan_at = 0
+    storage.save("file-3", b"3" * 30)
+
+    assert storage._size <= 90
+    assert sum(storage._cache_path(f"file-{index}").exists() for index in range(4)) == 3
+
+
+def test_file_written_during_read_is_not_cached(storage, backend, redis_client):
+    backend.save("file", b"old")
+    # overwritten by another host while the old content is read
+    redis_client.get.side_effect = [None, str(time.time()).encode()]
+
+    assert storage.load_once("file") == b"old"
+    assert not storage._cache_path("file").exists()
@@ -1,8 +1,10 @@
+import time
 from collections.abc import Generator
 from pathlib import Path
 
 import pytest
 
+from extensions.storage.base_storage import BaseStorage
 from extensions.storage.opendal_storage import OpenDALStorage
 from tests.unit_tests.oss.__mock.base import (
     get_example_data,
@@ -83,3 +85,62 @@ class TestOpenDAL:
 
         self.storage.delete(filename)
         assert not self.storage.exists(filename)
+
+    def test_save_many_and_load_many(self):
+        """Test saving and loading several files."""
+        files = {f"batch-{i}.txt": f"data {i}".encode() for i in range(20)}
+
+        self.storage.save_many(files)
+        assert self.storage.load_many(list(files)) == list(files.values())
+
+    def test_delete_many(self):
+        """Test deleting several files."""
+        files = {f"batch-{i}.txt": get_example_data() for i in range(20)}
+
+        self.storage.save_many(files)
+        self.storage.delete_many(list(files))
+        assert not any(self.storage.exists(filename) for filename in files)
+
+    def test_load_range(self):
+        """Test loading part of a file."""
+        filename = get_example_filename()
+
+        self.storage.save(filename, b"0123456789")
+        assert self.storage.load_range(filename, 3, 4) == b"3456"
+        assert self.storage.load_range(filename, 8, 4) == b"89"
+        assert self.storage.load_range(filename, 12, 4) == b""
+        with pytest.raises(FileNotFoundError):
+            self.storage.load_range("missing.txt", 0, 4)
+
+
+class _RemoteOperator:
+    """
+    Operator simulating the round-trip of requests to a remote storage
+    """
+
+    def __init__(self, op, latency: float):
+        self._op = op
+        self._latency = latency
+
+    def read(self, path: str) -> bytes:
+        time.sleep(self._latency)
+        return self._op.read(path)
+
+    def exists(self, path: str) -> bool:
+        time.sleep(self._latency)
+        return self._op.exists(path)
+
+
+@pytest.mark.parametrize("latency", [0, 0.002], ids=["local", "remote"])
+@pytest.mark.parametrize("concurrent", [False, True], ids=["sequential", "concurrent"])
+def test_benchmark_load_many(benchmark, tmp_path, latency, concurrent):
+    storage = OpenDALStorage(scheme="fs", root=str(tmp_path))
+    files = {f"file-{i}.bin": bytes([i % 256]) * 64 * 1024 for i in range(200)}
+    storage.save_many(files)
+    storage.op = _RemoteOperator(storage.op, latency)
+    filenames = list(files)
+
+    load_many = storage.load_many if concurrent else lambda filenames: BaseStorage.load_many(storage, filenames)
+    loaded = benchmark.pedantic(load_many, args=(filenames,), rounds=3)
+
+    assert loaded == list(files.values())
@@ -0,0 +1,83 @@
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+
+from extensions.ext_redis import redis_client
+from models.model import ApiToken, EndUser
+from services.api_auth_cache import ApiAuthCache
+
+
+@pytest.fixture
+def store():
+    # initialize redis client
+    redis_client.initialize(redis.Redis())
+
+    store: dict = {}
+
+    def delete(*keys):
+        for key in keys:
+            store.pop(key, None)
+
+    pipeline = MagicMock()
+    pipeline.__enter__.return_value = pipeline
+    pipeline.execute.side_effect = lambda: [store.pop(ApiAuthCache.API_TOKEN_LAST_USED_AT_KEY, {}), 1]
+    with (
+        patch.object(redis_client, "get", side_effect=store.get),
+        patch.object(redis_client, "setex", side_effect=lambda key, ttl, value: store.__setitem__(key, value)),
+        patch.object(redis_client, "delete", side_effect=delete),
+        patch.object(
+            redis_client,
+            "hset",
+            side_effect=lambda key, field, value: store.setdefault(key, {}).__setitem__(field.encode(), value),
+        ),
+        patch.object(redis_client, "pipeline", return_value=pipeline),
+    ):
+        yield store
+
+
+def test_api_token_round_trip(store):
+    api_token = ApiToken(
+        id="token-id",
+        app_id="app-id",
+        tenant_id="tenant-id",
+        type="app",
+        token="app-xxx",
+        created_at=datetime(2025, 1, 1, 8, 30),
+    )
+    ApiAuthCache.set_api_token(api_token)
+
+    cached = ApiAuthCache.get_api_token("app-xxx", "app")
+    assert cached is not None
+    assert (cached.id, cached.app_id, cached.tenant_id) == ("token-id", "app-id", "tenant-id")
+    assert cached.created_at == datetime(2025, 1, 1, 8, 30)
+    assert ApiAuthCache.get_api_token("app-xxx", "dataset") is None
+
+    ApiAuthCache.delete_api_token("app-xxx", "app")
+    assert ApiAuthCache.get_api_token("app-xxx", "app") is None
+
+
+def test_cache_is_stored_as_json(store):
+    ApiAuthCache.set_api_token(ApiToken(id="token-id", type="app", token="app-xxx"))
+
+    assert json.loads(store["api_auth_cache:api_token:app:app-xxx"])["id"] == "token-id"
+
+
+def test_service_api_end_user_id_round_trip(store):
+    end_user = EndUser(id="end-user-id", tenant_id="tenant-id", app_id="app-id", type="service_api", session_id="user")
+    ApiAuthCache.set_service_api_end_user_id(end_user)
+
+    assert ApiAuthCache.get_service_api_end_user_id("app-id", "user") == "end-user-id"
+    assert ApiAuthCache.get_service_api_end_user_id("app-id", "other-user") is None
+
+
+def test_api_token_usage_is_recorded_once_per_interval(store):
+    ApiAuthCache.record_api_token_usage("token-id")
+    ApiAuthCache.record_api_token_usage("token-id")
+    ApiAuthCache.record_api_token_usage("other-token-id")
+
+    usages = ApiAuthCache.pop_api_token_usages()
+    assert set(usages) == {"token-id", "other-token-id"}
+    assert ApiAuthCache.pop_api_token_usages() == {}
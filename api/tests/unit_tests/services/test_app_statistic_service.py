@@ -0,0 +1,122 @@
+from datetime import UTC, date, datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.app_statistic_service import AppStatisticService
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2025, 3, 10, 12, 30, tzinfo=tz or UTC)
+
+
+@pytest.fixture
+def service():
+    aggregated: list[tuple] = []
+    rolled_up: list[tuple] = []
+
+    def aggregate(app_id, statistic, timezone, start, end):
+        aggregated.append((start, end))
+        day = (start or end).astimezone(UTC).date()
+        return {day: {"message_count": 1}}
+
+    def get_rollups(app_id, statistic, timezone, first_date, last_date):
+        rolled_up.append((first_date, last_date))
+        return {first_date: {"message_count": 10}, last_date: None}
+
+    with (
+        patch("services.app_statistic_service.datetime", _FrozenDatetime),
+        patch("services.app_statistic_service.redis_client", MagicMock()),
+        patch.object(AppStatisticService, "_aggregate", side_effect=aggregate),
+        patch.object(AppStatisticService, "_get_rollups", side_effect=get_rollups),
+    ):
+        yield aggregated, rolled_up
+
+
+def _app() -> MagicMock:
+    app = MagicMock()
+    app.id = "app-id"
+    app.created_at = datetime(2025, 1, 1, 8, 0)
+    return app
+
+
+def test_completed_days_are_read_from_rollups(service):
+    aggregated, rolled_up = service
+
+    data = AppStatisticService.get_daily_statistics(
+        _app(), "daily_messages", "UTC", start=datetime(2025, 3, 1, 12, 0), end=None
+    )
+
+    # the partial first day and the current day are aggregated, the days in between are rolled up
+    assert rolled_up == [(date(2025, 3, 2), date(2025, 3, 9))]
+    assert aggregated == [
+        (datetime(2025, 3, 1, 12, 0, tzinfo=UTC), datetime(2025, 3, 2, tzinfo=UTC)),
+        (datetime(2025, 3, 10, tzinfo=UTC), None),
+    ]
+    # days without activity are omitted
+    assert [item["date"] for item in data] == ["2025-03-01", "2025-03-02", "2025-03-10"]
+
+
+def test_days_are_in_the_timezone(service):
+    aggregated, rolled_up = service
+
+    AppStatisticService.get_daily_statistics(
+        _app(), "daily_messages", "Asia/Shanghai", start=datetime(2025, 3, 1, 0, 0), end=datetime(2025, 3, 5, 0, 0)
+    )
+
+    assert rolled_up == [(date(2025, 3, 1), date(2025, 3, 4))]
+    # the range starts and ends at midnight, there are no partial days to aggregate
+    assert aggregated[0][1] == datetime(2025, 2, 28, 16, 0, tzinfo=UTC)
+    assert aggregated[1][0] == datetime(2025, 3, 4, 16, 0, tzinfo=UTC)
+
+
+def test_range_within_the_current_day_is_aggregated(service):
+    aggregated, rolled_up = service
+
+    AppStatisticService.get_daily_statistics(_app(), "daily_messages", "UTC", start=datetime(2025, 3, 10, 8, 0))
+
+    assert rolled_up == []
+    assert aggregated == [(datetime(2025, 3, 10, 8, 0, tzinfo=UTC), None)]
+
+
+def test_days_are_rolled_up_once_their_runs_are_finished(service):
+    aggregated, rolled_up = service
+
+    class _AfterMidnight(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2025, 3, 10, 0, 10, tzinfo=tz or UTC)
+
+    with (
+        patch("services.app_statistic_service.datetime", _AfterMidnight),
+        patch("services.app_statistic_service.dify_config.WORKFLOW_MAX_EXECUTION_TIME", 1800),
+    ):
+        AppStatisticService.get_daily_statistics(_app(), "workflow_daily_runs", "UTC", start=datetime(2025, 3, 1))
+
+    # runs of the previous day may still be running, so it is aggregated instead of rolled up
+    assert rolled_up == [(date(2025, 3, 1), date(2025, 3, 8))]
+    assert aggregated[-1] == (datetime(2025, 3, 9, tzinfo=UTC), None)
+
+
+def test_feedback_invalidates_rollups_in_batches():
+    redis = MagicMock()
+    redis.spop.side_effect = [[b"message-1", b"message-2"], []]
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [
+        MagicMock(app_id="app-id", created_at=datetime(2025, 3, 9, 23, 0)),
+        MagicMock(app_id="app-id", created_at=datetime(2025, 3, 9, 8, 0)),
+    ]
+
+    with (
+        patch("services.app_statistic_service.redis_client", redis),
+        patch("services.app_statistic_service.db", MagicMock(session=session)),
+    ):
+        AppStatisticService.mark_message_feedback("message-1")
+        assert AppStatisticService.invalidate_feedback_messages() == 2
+
+    redis.sadd.assert_called_once_with(AppStatisticService.FEEDBACK_MESSAGES_KEY, "message-1")
+    # one query for the messages, one delete for their day
+    assert session.execute.call_count == 2
+    session.commit.assert_called_once()
@@ -0,0 +1,94 @@
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+
+from configs import dify_config
+from extensions.ext_redis import redis_client
+from services.billing_cache import TenantBillingCache
+from services.billing_service import BillingService
+
+
+@pytest.fixture
+def store():
+    # initialize redis client
+    redis_client.initialize(redis.Redis())
+
+    store: dict[str, str] = {}
+
+    def set_(key, value, nx=False, ex=None):
+        if nx and key in store:
+            return None
+        store[key] = value
+        return True
+
+    def delete(*keys):
+        for key in keys:
+            store.pop(key, None)
+
+    pipeline = MagicMock()
+    pipeline.__enter__.return_value = pipeline
+    pipeline.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    pipeline.delete.side_effect = delete
+    with (
+        patch.object(redis_client, "get", side_effect=store.get),
+        patch.object(redis_client, "set", side_effect=set_),
+        patch.object(redis_client, "delete", side_effect=delete),
+        patch.object(redis_client, "pipeline", return_value=pipeline),
+    ):
+        yield store
+
+
+def test_cache_hit_does_not_fetch(store):
+    fetch = MagicMock(return_value={"subscription": {"plan": "sandbox"}})
+
+    assert TenantBillingCache.get("tenant", "info", fetch) == {"subscription": {"plan": "sandbox"}}
+    assert TenantBillingCache.get("tenant", "info", fetch) == {"subscription": {"plan": "sandbox"}}
+    assert fetch.call_count == 1
+
+
+def test_stale_entry_is_served_while_refreshing(store):
+    store["tenant_billing_cache:info:tenant"] = json.dumps({"value": "old", "refreshed_at": time.time() - 3600})
+
+    with patch("services.billing_cache.threading.Thread") as thread:
+        assert TenantBillingCache.get("tenant", "info", lambda: "new") == "old"
+        # only one refresh is started while the first one is running
+        assert TenantBillingCache.get("tenant", "info", lambda: "new") == "old"
+    thread.assert_called_once()
+
+    key, fetch, expires_in = thread.call_args.kwargs["args"]
+    TenantBillingCache._refresh_in_background(key, fetch, expires_in)
+    assert TenantBillingCache.get("tenant", "info", lambda: "newer") == "new"
+
+
+def test_invalidate(store):
+    TenantBillingCache.get("tenant", "info", lambda: "old")
+    TenantBillingCache.invalidate("tenant")
+
+    assert TenantBillingCache.get("tenant", "info", lambda: "new") == "new"
+
+
+def test_billing_info_is_only_cached_for_display(store):
+    with patch.object(BillingService, "_send_request", return_value={"subscription": {"plan": "sandbox"}}) as request:
+        BillingService.get_info("tenant", use_cache=True)
+        BillingService.get_info("tenant", use_cache=True)
+        # quota checks always see the current usage
+        BillingService.get_info("tenant")
+
+    assert request.call_count == 2
+
+
+def test_plan_is_cached_for_rate_limits(store):
+    with patch.object(BillingService, "_send_request", return_value={"subscription": {"plan": "sandbox"}}) as request:
+        assert BillingService.get_plan("tenant") == "sandbox"
+        assert BillingService.get_plan("tenant") == "sandbox"
+        assert request.call_count == 1
+
+        # the plan expires once it is no longer fresh, it is never served stale
+        assert redis_client.pipeline().setex.call_args.args[1] == dify_config.BILLING_PLAN_CACHE_TTL
+
+        BillingService.clean_plan_cache("tenant")
+        request.return_value = {"subscription": {"plan": "team"}}
+        assert BillingService.get_plan("tenant") == "team"
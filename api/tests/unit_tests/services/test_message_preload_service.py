@@ -0,0 +1,129 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask_restful import marshal  # type: ignore
+
+from fields.conversation_fields import (
+    conversation_pagination_fields,
+    conversation_with_summary_fields,
+    message_detail_fields,
+)
+from models.account import Account
+from models.model import App, Conversation, Message, MessageAnnotation, MessageFeedback
+from services.message_preload_service import MessagePreloadService
+
+
+def _conversation(index: int) -> Conversation:
+    return Conversation(
+        id=f"conversation-{index}",
+        app_id="app-id",
+        app_model_config_id="app-model-config-id",
+        mode="chat",
+        name="conversation",
+        status="normal",
+        from_source="api",
+        from_end_user_id=f"end-user-{index}",
+    )
+
+
+def _message(index: int) -> Message:
+    return Message(
+        id=f"message-{index}",
+        app_id="app-id",
+        conversation_id="conversation-id",
+        query="query",
+        answer="answer",
+        status="normal",
+        from_source="api",
+    )
+
+
+@pytest.fixture
+def session():
+    """
+    Session of the preload service, answering each query with the rows of the page
+    """
+    rows = {
+        App: [App(id="app-id", tenant_id="tenant-id")],
+        Account: [Account(id="account-id", name="account")],
+        MessageAnnotation: [
+            MessageAnnotation(
+                id="annotation-id", conversation_id="conversation-0", message_id="message-0", account_id="account-id"
+            )
+        ],
+        MessageFeedback: [
+            MessageFeedback(
+                id="feedback-id",
+                message_id="message-0",
+                rating="like",
+                from_source="admin",
+                from_account_id="account-id",
+            )
+        ],
+    }
+    session = MagicMock()
+    session.execute.return_value = []
+    session.scalars.side_effect = lambda stmt: rows.get(stmt.column_descriptions[0]["entity"], [])
+    session.dirty = set()
+    with patch("services.message_preload_service.db") as db:
+        db.session = session
+        yield session
+
+
+@pytest.fixture
+def model_session():
+    """
+    Session of the models, marshalling preloaded rows must not query
+    """
+    with patch("models.model.db") as db:
+        yield db.session
+
+
+def _query_count(session: MagicMock) -> int:
+    return session.execute.call_count + session.scalars.call_count
+
+
+@pytest.mark.parametrize("page_size", [1, 100])
+def test_preload_conversations_runs_fixed_number_of_queries(session, model_session, page_size):
+    conversations = [_conversation(index) for index in range(page_size)]
+
+    MessagePreloadService.preload_conversations(conversations)
+    data = marshal(conversations, conversation_with_summary_fields)
+    marshal(conversations, conversation_pagination_fields["data"].container.nested)
+
+    assert _query_count(session) == 8
+    assert not model_session.mock_calls
+    assert data[0]["annotated"] is True
+    assert data[0]["message_count"] == 0
+    assert conversations[0].status_count is None
+    assert data[0]["user_feedback_stats"] == {"like": 0, "dislike": 0}
+
+
+@pytest.mark.parametrize("page_size", [1, 100])
+def test_preload_messages_runs_fixed_number_of_queries(session, model_session, page_size):
+    messages = [_message(index) for index in range(page_size)]
+
+    MessagePreloadService.preload_messages(messages)
+    data = marshal(messages, message_detail_fields)
+
+    assert _query_count(session) == 8
+    assert not model_session.mock_calls
+    assert data[0]["feedbacks"][0]["from_account"]["name"] == "account"
+    assert data[0]["annotation"]["id"] == "annotation-id"
+    assert data[0]["annotation_hit_history"] is None
+    assert data[0]["message_files"] == []
+
+
+def test_preload_nothing_runs_no_query(session):
+    MessagePreloadService.preload_conversations([])
+    MessagePreloadService.preload_messages([])
+
+    assert _query_count(session) == 0
+
+
+def test_conversation_queries_relations_when_not_preloaded(model_session):
+    conversation = _conversation(0)
+    model_session.query.return_value.filter.return_value.count.return_value = 3
+
+    assert conversation.message_count == 3
+    model_session.query.assert_called_once_with(Message)